@@ -0,0 +1,36 @@
+"""
+Compressão de páginas: bytes economizados e custo de CPU com e sem o cache de corpos comprimidos.
+
+Para páginas de empréstimos (com livro e pessoa embutidos), compara o tamanho do
+corpo original e comprimido e o tempo de comprimir a cada requisição vs. servir
+a versão já comprimida do CacheDeCompressao (digest + lookup).
+
+Uso:
+    python -m benchmarks.bench_compression [iteracoes]
+"""
+import sys
+import timeit
+from benchmarks.bench_msgpack import pagina_emprestimos
+from src.presentation.compression import CacheDeCompressao, codificacoes_disponiveis, comprimir
+from src.presentation.responses import ApiJSONResponse
+
+TAMANHOS = (20, 1000)
+
+def medir(funcao, iteracoes: int) -> float:
+    return min(timeit.repeat(funcao, number=iteracoes, repeat=3)) / iteracoes * 1e6
+
+def main(iteracoes: int = 500) -> None:
+    print(f"{'página':<18} {'codec':>5} {'bytes':>8} {'comprimido':>11} {'sempre':>9} {'cache':>8}  (µs)")
+    for tamanho in TAMANHOS:
+        corpo = ApiJSONResponse(pagina_emprestimos(tamanho)).body
+        n = max(1, iteracoes * 20 // tamanho)
+        for codificacao in codificacoes_disponiveis():
+            cache = CacheDeCompressao()
+            cache.obter(corpo, codificacao)
+            print(
+                f"{f'emprestimos x{tamanho}':<18} {codificacao:>5} {len(corpo):>8} {len(comprimir(corpo, codificacao)):>11} "
+                f"{medir(lambda: comprimir(corpo, codificacao), n):>9.1f} {medir(lambda: cache.obter(corpo, codificacao), n):>8.1f}"
+            )
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,37 @@
+"""
+Microbenchmark do custo de dependências por requisição.
+
+Compara a montagem do grafo a cada requisição (SqlAlchemyFactory) com a raiz de
+composição construída uma vez (AppContainer), onde só a sessão é vinculada.
+
+Uso:
+    python -m benchmarks.bench_dependencies [iteracoes]
+"""
+import sys
+import timeit
+from src.infrastructure.config.sqlalchemy_factory import SqlAlchemyFactory
+from src.infrastructure.config.container import get_container
+from src.infrastructure.config.db.session_context import vincular_requisicao
+
+def por_requisicao(db, cache):
+    factory = SqlAlchemyFactory(db, cache)
+    factory.create_usuario_controller()
+    factory.create_pessoa_controller()
+    factory.create_livro_controller()
+
+def container(db, cache):
+    with vincular_requisicao(db, cache):
+        c = get_container()
+        c.create_usuario_controller()
+        c.create_pessoa_controller()
+        c.create_livro_controller()
+
+def main(iteracoes: int = 100_000) -> None:
+    db, cache = object(), None
+    get_container()
+    for nome, funcao in (("SqlAlchemyFactory por requisição", por_requisicao), ("AppContainer", container)):
+        segundos = min(timeit.repeat(lambda: funcao(db, cache), number=iteracoes, repeat=3))
+        print(f"{nome:<34} {segundos / iteracoes * 1e6:8.2f} µs/requisição")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
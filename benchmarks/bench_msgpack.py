@@ -0,0 +1,59 @@
+"""
+Tamanho e custo de CPU de páginas em JSON vs. MessagePack.
+
+Mede, para páginas de livros e de empréstimos (com livro e pessoa embutidos),
+os bytes trafegados, a codificação no servidor (ApiJSONResponse vs.
+ApiMsgPackResponse) e a decodificação no cliente (json.loads vs. msgpack.unpackb).
+
+Uso:
+    python -m benchmarks.bench_msgpack [iteracoes]
+"""
+import json
+import sys
+import timeit
+import msgpack
+from src.presentation.dto.common import ApiResponse, PaginatedResponse, PaginationMeta
+from src.presentation.dto.livro_dto import LivroResponse, EmprestimoResponse, LivroBrief, PessoaBrief
+from src.presentation.responses import ApiJSONResponse, ApiMsgPackResponse
+
+TAMANHOS = (20, 1000)
+
+def pagina_livros(tamanho: int) -> ApiResponse:
+    livros = [
+        LivroResponse(id=i, titulo=f"Livro de exemplo número {i}", autor=f"Autor {i % 97}", disponivel=i % 3 != 0)
+        for i in range(1, tamanho + 1)
+    ]
+    return ApiResponse(data=PaginatedResponse(data=livros, meta=PaginationMeta.create(1, tamanho, tamanho * 50)))
+
+def pagina_emprestimos(tamanho: int) -> ApiResponse:
+    emprestimos = [
+        EmprestimoResponse(
+            id=i, livro_id=i, pessoa_id=i % 200, usuario_id=1,
+            data_emprestimo="2025-03-14T10:21:00-03:00",
+            data_devolucao=None if i % 2 else "2025-03-21T16:05:00-03:00",
+            livro=LivroBrief(id=i, titulo=f"Livro de exemplo número {i}", autor=f"Autor {i % 97}"),
+            pessoa=PessoaBrief(id=i % 200, nome=f"Pessoa {i % 200}", telefone="11987654321", email=f"pessoa{i % 200}@example.com"),
+        )
+        for i in range(1, tamanho + 1)
+    ]
+    return ApiResponse(data=PaginatedResponse(data=emprestimos, meta=PaginationMeta.create(1, tamanho, tamanho * 50)))
+
+def medir(funcao, iteracoes: int) -> float:
+    return min(timeit.repeat(funcao, number=iteracoes, repeat=3)) / iteracoes * 1e6
+
+def main(iteracoes: int = 1000) -> None:
+    print(f"{'página':<18} {'bytes json':>11} {'bytes mp':>9} {'enc json':>9} {'enc mp':>8} {'dec json':>9} {'dec mp':>8}  (µs)")
+    for nome, montar in (("livros", pagina_livros), ("emprestimos", pagina_emprestimos)):
+        for tamanho in TAMANHOS:
+            conteudo = montar(tamanho)
+            n = max(1, iteracoes * 20 // tamanho)
+            corpo_json = ApiJSONResponse(conteudo).body
+            corpo_mp = ApiMsgPackResponse(conteudo).body
+            print(
+                f"{f'{nome} x{tamanho}':<18} {len(corpo_json):>11} {len(corpo_mp):>9} "
+                f"{medir(lambda: ApiJSONResponse(conteudo), n):>9.1f} {medir(lambda: ApiMsgPackResponse(conteudo), n):>8.1f} "
+                f"{medir(lambda: json.loads(corpo_json), n):>9.1f} {medir(lambda: msgpack.unpackb(corpo_mp), n):>8.1f}"
+            )
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
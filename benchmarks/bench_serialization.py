@@ -0,0 +1,44 @@
+"""
+Custo de serialização de uma página de livros por tamanho de página.
+
+Compara o caminho padrão do FastAPI (revalidação contra o response_model,
+jsonable_encoder e json da stdlib) com api_response (envelope montado com os
+DTOs já validados e serializado direto para bytes pelo pydantic-core).
+
+Uso:
+    python -m benchmarks.bench_serialization [iteracoes]
+"""
+import sys
+import timeit
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from src.presentation.dto.common import ApiResponse, PaginatedResponse, PaginationMeta
+from src.presentation.dto.livro_dto import LivroResponse
+from src.presentation.responses import api_response
+
+TAMANHOS = (10, 20, 100, 1000)
+_modelo = TypeAdapter(ApiResponse[PaginatedResponse[LivroResponse]])
+
+def montar_pagina(tamanho: int) -> PaginatedResponse[LivroResponse]:
+    livros = [LivroResponse(id=i, titulo=f"Livro {i}", autor=f"Autor {i}", disponivel=i % 2 == 0) for i in range(tamanho)]
+    return PaginatedResponse(data=livros, meta=PaginationMeta.create(1, tamanho, tamanho * 10))
+
+def caminho_padrao(pagina) -> bytes:
+    validado = _modelo.validate_python(ApiResponse(data=pagina), from_attributes=True)
+    return JSONResponse(jsonable_encoder(validado)).body
+
+def caminho_unico(pagina) -> bytes:
+    return api_response(pagina).body
+
+def main(iteracoes: int = 2000) -> None:
+    print(f"{'itens':>6} {'padrão (µs)':>14} {'api_response (µs)':>18} {'ganho':>7}")
+    for tamanho in TAMANHOS:
+        pagina = montar_pagina(tamanho)
+        n = max(1, iteracoes * 10 // tamanho)
+        padrao = min(timeit.repeat(lambda: caminho_padrao(pagina), number=n, repeat=3)) / n * 1e6
+        unico = min(timeit.repeat(lambda: caminho_unico(pagina), number=n, repeat=3)) / n * 1e6
+        print(f"{tamanho:>6} {padrao:>14.1f} {unico:>18.1f} {padrao / unico:>6.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
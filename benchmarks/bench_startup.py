@@ -0,0 +1,79 @@
+"""
+Benchmark de partida a frio do worker.
+
+Cada execução roda em um processo novo e mede o import de src.main (create_app) e o
+tempo até a primeira resposta (lifespan + GET /health via ASGI, sem servidor). Também
+informa se o driver do banco foi carregado na partida, o que não deveria acontecer
+com o engine preguiçoso.
+
+Uso:
+    python -m benchmarks.bench_startup [execucoes] [limite_import_ms]
+
+Com limite_import_ms, termina com código 1 se a mediana do import passar do limite.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_FILHO = r"""
+import asyncio, json, sys, time
+inicio = time.perf_counter()
+from src.main import app
+importado = time.perf_counter()
+
+async def primeira_resposta():
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/health", "raw_path": b"/health", "query_string": b"",
+        "root_path": "", "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 8000),
+    }
+    async with app.router.lifespan_context(app):
+        await app(scope, receive, send)
+        return status[0], time.perf_counter()
+
+status, respondido = asyncio.run(primeira_resposta())
+print(json.dumps({
+    "import_ms": (importado - inicio) * 1000,
+    "primeira_resposta_ms": (respondido - inicio) * 1000,
+    "status": status,
+    "modulos": len(sys.modules),
+    "driver_carregado": "psycopg" in sys.modules,
+}))
+"""
+
+def executar() -> dict:
+    ambiente = dict(os.environ, WARMUP_ENABLED="false", PYTHONDONTWRITEBYTECODE="1")
+    saida = subprocess.run([sys.executable, "-c", _FILHO], env=ambiente, capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+def main(execucoes: int = 10, limite_import_ms: float | None = None) -> int:
+    resultados = [executar() for _ in range(execucoes)]
+    for chave, rotulo in (("import_ms", "import src.main"), ("primeira_resposta_ms", "até a primeira resposta")):
+        valores = [r[chave] for r in resultados]
+        print(f"{rotulo:<26} mediana {statistics.median(valores):8.1f} ms   mín {min(valores):8.1f} ms")
+    ultimo = resultados[-1]
+    print(f"{'módulos carregados':<26} {ultimo['modulos']}")
+    print(f"{'driver do banco na partida':<26} {'sim' if ultimo['driver_carregado'] else 'não'}")
+
+    mediana = statistics.median(r["import_ms"] for r in resultados)
+    if limite_import_ms is not None and mediana > limite_import_ms:
+        print(f"Regressão: import de {mediana:.1f} ms acima do limite de {limite_import_ms:.1f} ms")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10,
+        float(sys.argv[2]) if len(sys.argv) > 2 else None,
+    ))
@@ -1,19 +1,31 @@
+import logging
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from src.domain.model.emprestimo import Emprestimo
 from src.domain.ports.emprestimo_repository import EmprestimoRepositoryPort
 from src.domain.ports.livro_repository import LivroRepositoryPort
 from src.domain.ports.unit_of_work import UnitOfWorkPort
+from src.domain.ports.disponibilidade_index import DisponibilidadeIndexPort
 from src.application.service.base_service import BaseService
 from src.domain.enums.emprestimo_status import EmprestimoStatus
-from typing import Tuple
+from typing import Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 class EmprestimoService(BaseService[Emprestimo]):
-    def __init__(self, repositorio: EmprestimoRepositoryPort, livro_repo: LivroRepositoryPort, uow: UnitOfWorkPort, tz: ZoneInfo):
+    def __init__(
+        self,
+        repositorio: EmprestimoRepositoryPort,
+        livro_repo: LivroRepositoryPort,
+        uow: UnitOfWorkPort,
+        tz: ZoneInfo,
+        indice: Optional[DisponibilidadeIndexPort] = None
+    ):
         super().__init__(uow)
         self.repositorio = repositorio
         self.livros = livro_repo
         self._tz = tz
+        self.indice = indice
 
     def emprestar(self, livro_id: int, pessoa_id: int, usuario_id: int) -> Emprestimo:
         def acao():
@@ -26,7 +38,9 @@ class EmprestimoService(BaseService[Emprestimo]):
                 data_emprestimo=datetime.now(self._tz),
                 data_devolucao=None
             ))
-        return self._executar_transacao(acao)
+        emprestimo = self._executar_transacao(acao)
+        self._atualizar_indice(livro_id, False)
+        return emprestimo
 
     def devolver(self, emprestimo_id: int, livro_id: int) -> Emprestimo | None:
         def acao():
@@ -34,10 +48,28 @@ class EmprestimoService(BaseService[Emprestimo]):
             if emprestimo:
                 self.livros.atualizar_disponibilidade(livro_id, True)
             return emprestimo
-        return self._executar_transacao(acao)
+        emprestimo = self._executar_transacao(acao)
+        if emprestimo:
+            self._atualizar_indice(livro_id, True)
+        return emprestimo
 
     def buscar_ativo_por_livro(self, livro_id: int) -> Emprestimo | None:
         return self.repositorio.buscar_ativo_por_livro(livro_id)
 
     def listar_paginado(self, page: int, size: int, status: EmprestimoStatus = EmprestimoStatus.ATIVOS) -> Tuple[list[Emprestimo], int]:
         return self.repositorio.listar_paginado(page, size, status)
+
+    def listar_projecao_paginado(self, page: int, size: int, status: EmprestimoStatus, campos: list[str]) -> Tuple[list[dict], int]:
+        return self.repositorio.listar_projecao_paginado(page, size, status, campos)
+
+    def iterar(self, status: EmprestimoStatus = EmprestimoStatus.ATIVOS, tamanho_lote: int = 1000) -> Iterator[Emprestimo]:
+        return self.repositorio.iterar(status, tamanho_lote)
+
+    def _atualizar_indice(self, livro_id: int, disponivel: bool) -> None:
+        """Atualiza o índice somente após o commit; divergências são corrigidas pela reconciliação"""
+        if not self.indice:
+            return
+        try:
+            self.indice.marcar(livro_id, disponivel)
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar índice de disponibilidade do livro {livro_id}: {e}")
@@ -1,16 +1,23 @@
+import logging
 from src.domain.model.livro import Livro
 from src.domain.ports.livro_repository import LivroRepositoryPort
 from src.domain.ports.unit_of_work import UnitOfWorkPort
+from src.domain.ports.disponibilidade_index import DisponibilidadeIndexPort
 from src.application.service.base_service import BaseService
-from typing import Tuple
+from typing import Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 class LivroService(BaseService[Livro]):
-    def __init__(self, repository: LivroRepositoryPort, uow: UnitOfWorkPort):
+    def __init__(self, repository: LivroRepositoryPort, uow: UnitOfWorkPort, indice: Optional[DisponibilidadeIndexPort] = None):
         super().__init__(uow)
         self.repository = repository
+        self.indice = indice
 
     def criar(self, livro: Livro) -> Livro:
-        return self._executar_transacao(lambda: self.repository.criar(livro))
+        criado = self._executar_transacao(lambda: self.repository.criar(livro))
+        self._marcar_no_indice(criado.id, criado.disponivel)
+        return criado
 
     def listar(self) -> list[Livro]:
         return self.repository.listar()
@@ -18,8 +25,60 @@ class LivroService(BaseService[Livro]):
     def listar_paginado(self, page: int, size: int) -> Tuple[list[Livro], int]:
         return self.repository.listar_paginado(page, size)
 
+    def iterar(self, tamanho_lote: int = 1000) -> Iterator[Livro]:
+        return self.repository.iterar(tamanho_lote)
+
+    def listar_projecao_paginado(self, page: int, size: int, campos: list[str]) -> Tuple[list[dict], int]:
+        return self.repository.listar_projecao_paginado(page, size, campos)
+
     def buscar_por_id(self, livro_id: int) -> Livro | None:
         return self.repository.buscar_por_id(livro_id)
 
+    def buscar_por_ids(self, livro_ids: list[int]) -> dict[int, Livro]:
+        return self.repository.buscar_por_ids(livro_ids)
+
     def set_disponibilidade(self, livro_id: int, disponivel: bool) -> Livro | None:
-        return self._executar_transacao(lambda: self.repository.atualizar_disponibilidade(livro_id, disponivel))
+        livro = self._executar_transacao(lambda: self.repository.atualizar_disponibilidade(livro_id, disponivel))
+        if livro:
+            self._marcar_no_indice(livro.id, livro.disponivel)
+        return livro
+
+    def consultar_disponibilidade(self, livro_ids: list[int]) -> dict[int, bool]:
+        """Consulta o índice e busca no banco, em lote, apenas os ids que ele ainda não conhece"""
+        resultado = {}
+        if self.indice:
+            try:
+                resultado = self.indice.consultar(livro_ids)
+            except Exception as e:
+                logger.warning(f"Falha ao consultar índice de disponibilidade: {e}")
+
+        desconhecidos = [livro_id for livro_id in livro_ids if resultado.get(livro_id) is None]
+        if desconhecidos:
+            do_banco = self.repository.buscar_disponibilidade(desconhecidos)
+            self._preencher_indice(do_banco)
+            resultado.update(do_banco)
+
+        return {livro_id: resultado[livro_id] for livro_id in livro_ids if resultado.get(livro_id) is not None}
+
+    def reconciliar_disponibilidade(self) -> int:
+        """Reconstrói o índice a partir do banco, corrigindo divergências"""
+        if not self.indice:
+            return 0
+        return self.indice.reconstruir(self.repository.listar_disponibilidade())
+
+    def _marcar_no_indice(self, livro_id: int, disponivel: bool) -> None:
+        if not self.indice:
+            return
+        try:
+            self.indice.marcar(livro_id, disponivel)
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar índice de disponibilidade do livro {livro_id}: {e}")
+
+    def _preencher_indice(self, registros: dict[int, bool]) -> None:
+        """Backfill em lote; não sobrescreve ids marcados depois da leitura do banco"""
+        if not self.indice or not registros:
+            return
+        try:
+            self.indice.preencher(registros)
+        except Exception as e:
+            logger.warning(f"Falha ao preencher índice de disponibilidade: {e}")
@@ -2,7 +2,7 @@ from src.domain.model.pessoa import Pessoa
 from src.domain.ports.pessoa_repository import PessoaRepositoryPort
 from src.domain.ports.unit_of_work import UnitOfWorkPort
 from src.application.service.base_service import BaseService
-from typing import Tuple
+from typing import Iterator, Tuple
 
 class PessoaService(BaseService[Pessoa]):
     def __init__(self, repository: PessoaRepositoryPort, uow: UnitOfWorkPort):
@@ -20,9 +20,18 @@ class PessoaService(BaseService[Pessoa]):
     def listar_pessoas_paginado(self, page: int, size: int) -> Tuple[list[Pessoa], int]:
         return self.repository.listar_paginado(page, size)
 
+    def iterar_pessoas(self, tamanho_lote: int = 1000) -> Iterator[Pessoa]:
+        return self.repository.iterar(tamanho_lote)
+
+    def listar_pessoas_projecao(self, page: int, size: int, campos: list[str]) -> Tuple[list[dict], int]:
+        return self.repository.listar_projecao_paginado(page, size, campos)
+
     def buscar_por_id(self, pessoa_id: int) -> Pessoa | None:
         return self.repository.buscar_por_id(pessoa_id)
 
+    def buscar_por_ids(self, pessoa_ids: list[int]) -> dict[int, Pessoa]:
+        return self.repository.buscar_por_ids(pessoa_ids)
+
     def buscar_pessoa_por_email(self, email: str) -> Pessoa | None:
         return self.repository.buscar_por_email(email)
 
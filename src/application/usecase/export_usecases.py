@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime, timezone
+from src.domain.model.export_job import ExportJob
+from src.domain.enums.export_status import ExportStatus
+from src.domain.enums.emprestimo_status import EmprestimoStatus
+from src.domain.ports.export_jobs import ExportJobStorePort, ExportQueuePort
+from src.domain.exceptions import DadosInvalidosException, FilaDeExportacaoCheiaException
+
+RECURSOS_EXPORTAVEIS = ("livros", "pessoas", "emprestimos")
+FORMATOS_EXPORTACAO = ("ndjson", "csv")
+
+class ExportUseCase:
+    def __init__(self, store: ExportJobStorePort, fila: ExportQueuePort):
+        self.store = store
+        self.fila = fila
+
+    def solicitar(self, recurso: str, formato: str, status: EmprestimoStatus = EmprestimoStatus.ATIVOS) -> ExportJob:
+        """Registra o job e o coloca na fila; o arquivo é gerado em segundo plano"""
+        if recurso not in RECURSOS_EXPORTAVEIS:
+            raise DadosInvalidosException("recurso", recurso)
+        if formato not in FORMATOS_EXPORTACAO:
+            raise DadosInvalidosException("formato", formato)
+
+        job = ExportJob(
+            id=uuid.uuid4().hex,
+            recurso=recurso,
+            formato=formato,
+            status=ExportStatus.PENDENTE,
+            criado_em=datetime.now(timezone.utc),
+            filtro=status.value if recurso == "emprestimos" else None,
+        )
+        self.store.salvar(job)
+        try:
+            self.fila.enfileirar(job.id)
+        except FilaDeExportacaoCheiaException as e:
+            job.status = ExportStatus.FALHOU
+            job.erro = str(e)
+            self.store.salvar(job)
+            raise
+        return job
+
+    def consultar(self, job_id: str) -> ExportJob | None:
+        return self.store.buscar(job_id)
@@ -11,7 +11,7 @@ from src.domain.exceptions import (
 from src.application.service.livro.livro_service import LivroService
 from src.application.service.livro.emprestimo_service import EmprestimoService
 from src.application.service.pessoa.pessoa_service import PessoaService
-from typing import Tuple
+from typing import Iterator, Tuple
 
 class LivroUseCase:
     def __init__(
@@ -45,6 +45,18 @@ class LivroUseCase:
     def listar_emprestimos_paginado(self, page: int, size: int, status: EmprestimoStatus = EmprestimoStatus.ATIVOS) -> Tuple[list[Emprestimo], int]:
         return self._emprestimos.listar_paginado(page, size, status)
 
+    def listar_livros_projecao(self, page: int, size: int, campos: list[str]) -> Tuple[list[dict], int]:
+        return self._livros.listar_projecao_paginado(page, size, campos)
+
+    def listar_emprestimos_projecao(self, page: int, size: int, status: EmprestimoStatus, campos: list[str]) -> Tuple[list[dict], int]:
+        return self._emprestimos.listar_projecao_paginado(page, size, status, campos)
+
+    def exportar_livros(self, tamanho_lote: int = 1000) -> Iterator[Livro]:
+        return self._livros.iterar(tamanho_lote)
+
+    def exportar_emprestimos(self, status: EmprestimoStatus = EmprestimoStatus.ATIVOS, tamanho_lote: int = 1000) -> Iterator[Emprestimo]:
+        return self._emprestimos.iterar(status, tamanho_lote)
+
     def emprestar(self, livro_id: int, pessoa_id: int, usuario_id: int) -> Emprestimo:
         livro = self._obter_livro_disponivel(livro_id)
         self._validar_pessoa_existente(pessoa_id)
@@ -61,12 +73,24 @@ class LivroUseCase:
 
         return self._emprestimos.devolver(emprestimo_ativo.id, livro.id)
 
+    def consultar_disponibilidade(self, livro_ids: list[int]) -> dict[int, bool]:
+        return self._livros.consultar_disponibilidade(list(dict.fromkeys(livro_ids)))
+
+    def reconciliar_disponibilidade(self) -> int:
+        return self._livros.reconciliar_disponibilidade()
+
     def obter_livro_por_id(self, livro_id: int) -> Livro | None:
         return self._livros.buscar_por_id(livro_id)
 
     def obter_pessoa_por_id(self, pessoa_id: int):
         return self._pessoas.buscar_por_id(pessoa_id)
 
+    def obter_livros_por_ids(self, livro_ids: list[int]) -> dict[int, Livro]:
+        return self._livros.buscar_por_ids(livro_ids) if livro_ids else {}
+
+    def obter_pessoas_por_ids(self, pessoa_ids: list[int]) -> dict:
+        return self._pessoas.buscar_por_ids(pessoa_ids) if pessoa_ids else {}
+
     def _obter_livro_existente(self, livro_id: int) -> Livro:
         livro = self._livros.buscar_por_id(livro_id)
         if not livro:
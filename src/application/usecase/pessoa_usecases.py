@@ -1,7 +1,7 @@
 from src.domain.model.pessoa import Pessoa
 from src.domain.exceptions import EmailJaExisteException, PessoaNaoEncontradaException, DadosInvalidosException
 import re
-from typing import Tuple
+from typing import Iterator, Tuple
 
 class PessoaUseCaseValidator:
     @staticmethod
@@ -50,6 +50,12 @@ class PessoaUseCase:
     def listar_pessoas_paginado(self, page: int, size: int) -> Tuple[list[Pessoa], int]:
         return self.service.listar_pessoas_paginado(page, size)
 
+    def listar_pessoas_projecao(self, page: int, size: int, campos: list[str]) -> Tuple[list[dict], int]:
+        return self.service.listar_pessoas_projecao(page, size, campos)
+
+    def exportar_pessoas(self, tamanho_lote: int = 1000) -> Iterator[Pessoa]:
+        return self.service.iterar_pessoas(tamanho_lote)
+
     def buscar_por_id(self, pessoa_id: int) -> Pessoa | None:
         pessoa = self.service.buscar_por_id(pessoa_id)
         if not pessoa:
@@ -0,0 +1,8 @@
+from enum import Enum
+
+class ExportStatus(Enum):
+    """Ciclo de vida de um job de exportação"""
+    PENDENTE = "pendente"
+    EXECUTANDO = "executando"
+    CONCLUIDO = "concluido"
+    FALHOU = "falhou"
@@ -38,4 +38,16 @@ class LivroIndisponivelException(DomainException):
 class EmprestimoAtivoNaoEncontradoException(DomainException):
 	def __init__(self, livro_id: int):
 		self.livro_id = livro_id
-		super().__init__(f"Não há empréstimo ativo para o livro ID {livro_id}") 
\ No newline at end of file
+		super().__init__(f"Não há empréstimo ativo para o livro ID {livro_id}")
+
+class FilaDeExportacaoCheiaException(DomainException):
+	def __init__(self, limite: int):
+		self.limite = limite
+		super().__init__(f"Fila de exportação cheia ({limite} jobs pendentes)")
+
+class PrazoExpiradoException(DomainException):
+	"""Exceção lançada quando o prazo da requisição se esgota ou o cliente desconecta"""
+	def __init__(self, motivo: str, etapa: str):
+		self.motivo = motivo
+		self.etapa = etapa
+		super().__init__(f"Prazo da requisição esgotado ({motivo}) em {etapa}")
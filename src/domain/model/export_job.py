@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from src.domain.enums.export_status import ExportStatus
+
+@dataclass
+class ExportJob:
+    id: str
+    recurso: str
+    formato: str
+    status: ExportStatus
+    criado_em: datetime
+    filtro: Optional[str] = None
+    linhas: int = 0
+    total: Optional[int] = None
+    bytes: int = 0
+    arquivo: Optional[str] = None
+    erro: Optional[str] = None
+    concluido_em: Optional[datetime] = None
@@ -0,0 +1,7 @@
+from typing import Iterable, Protocol
+
+class DisponibilidadeIndexPort(Protocol):
+    def marcar(self, livro_id: int, disponivel: bool) -> None: ...
+    def consultar(self, livro_ids: list[int]) -> dict[int, bool | None]: ...
+    def preencher(self, registros: dict[int, bool]) -> int: ...
+    def reconstruir(self, registros: Iterable[tuple[int, bool]]) -> int: ...
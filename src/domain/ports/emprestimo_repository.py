@@ -1,9 +1,12 @@
-from typing import Protocol, Tuple
+from typing import Iterator, Protocol, Tuple
 from src.domain.model.emprestimo import Emprestimo
 from src.domain.enums.emprestimo_status import EmprestimoStatus
 
 class EmprestimoRepositoryPort(Protocol):
     def criar(self, emprestimo: Emprestimo) -> Emprestimo: ...
     def listar_paginado(self, page: int, size: int, status: EmprestimoStatus) -> Tuple[list[Emprestimo], int]: ...
+    def listar_projecao_paginado(self, page: int, size: int, status: EmprestimoStatus, campos: list[str]) -> Tuple[list[dict], int]: ...
+    def iterar(self, status: EmprestimoStatus, tamanho_lote: int = 1000) -> Iterator[Emprestimo]: ...
+    def contar(self, status: EmprestimoStatus) -> int: ...
     def buscar_ativo_por_livro(self, livro_id: int) -> Emprestimo | None: ...
     def finalizar(self, emprestimo_id: int) -> Emprestimo | None: ...
\ No newline at end of file
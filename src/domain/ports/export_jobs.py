@@ -0,0 +1,9 @@
+from typing import Protocol
+from src.domain.model.export_job import ExportJob
+
+class ExportJobStorePort(Protocol):
+    def salvar(self, job: ExportJob) -> None: ...
+    def buscar(self, job_id: str) -> ExportJob | None: ...
+
+class ExportQueuePort(Protocol):
+    def enfileirar(self, job_id: str) -> None: ...
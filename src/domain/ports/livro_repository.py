@@ -1,8 +1,14 @@
-from typing import Protocol
+from typing import Iterator, Protocol
 from src.domain.model.livro import Livro
 
 class LivroRepositoryPort(Protocol):
     def criar(self, livro: Livro) -> Livro: ...
     def listar(self) -> list[Livro]: ...
+    def listar_projecao_paginado(self, page: int, size: int, campos: list[str]) -> tuple[list[dict], int]: ...
     def buscar_por_id(self, livro_id: int) -> Livro | None: ...
+    def buscar_por_ids(self, livro_ids: list[int]) -> dict[int, Livro]: ...
     def atualizar_disponibilidade(self, livro_id: int, disponivel: bool) -> Livro | None: ...
+    def buscar_disponibilidade(self, livro_ids: list[int]) -> dict[int, bool]: ...
+    def listar_disponibilidade(self, tamanho_lote: int = 5000) -> Iterator[tuple[int, bool]]: ...
+    def iterar(self, tamanho_lote: int = 1000) -> Iterator[Livro]: ...
+    def contar(self) -> int: ...
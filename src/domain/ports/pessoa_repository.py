@@ -1,11 +1,15 @@
-from typing import Protocol, Tuple
+from typing import Iterator, Protocol, Tuple
 from src.domain.model.pessoa import Pessoa
 
 class PessoaRepositoryPort(Protocol):
     def criar(self, pessoa: Pessoa) -> Pessoa: ...
     def listar(self) -> list[Pessoa]: ...
     def listar_paginado(self, page: int, size: int) -> Tuple[list[Pessoa], int]: ...
+    def iterar(self, tamanho_lote: int = 1000) -> Iterator[Pessoa]: ...
+    def contar(self) -> int: ...
+    def listar_projecao_paginado(self, page: int, size: int, campos: list[str]) -> Tuple[list[dict], int]: ...
     def buscar_por_id(self, pessoa_id: int) -> Pessoa | None: ...
+    def buscar_por_ids(self, pessoa_ids: list[int]) -> dict[int, Pessoa]: ...
     def buscar_por_email(self, email: str) -> Pessoa | None: ...
     def email_existe(self, email: str) -> bool: ...
     def atualizar(self, pessoa_id: int, pessoa: Pessoa) -> Pessoa | None: ...
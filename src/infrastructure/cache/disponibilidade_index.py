@@ -0,0 +1,280 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Iterable, Optional
+import redis
+from src.infrastructure.monitoring.metrics import record_redis_command
+
+logger = logging.getLogger(__name__)
+
+# A hash tag mantém os dois bitmaps no mesmo nó quando o cache é particionado
+CHAVE_DISPONIVEIS = "{livros:disponibilidade}:bits"
+CHAVE_CONHECIDOS = "{livros:disponibilidade}:conhecidos"
+# Últimas marcações (instante:id:bit), reaplicadas sobre uma reconstrução em andamento
+CHAVE_JORNAL = "{livros:disponibilidade}:jornal"
+JORNAL_MAXIMO = int(os.getenv("DISPONIBILIDADE_JOURNAL_MAX", "10000"))
+
+_BITS_POR_PALAVRA = 63  # maior inteiro sem sinal aceito pelo BITFIELD
+_MARGEM_DE_RELOGIO_SEGUNDOS = 5.0  # workers em máquinas diferentes
+_TTL_TEMPORARIAS_SEGUNDOS = 300
+_TENTATIVAS_DE_TROCA = 10
+
+
+def _montar_bitmaps(registros: Iterable[tuple[int, bool]]) -> tuple[bytearray, bytearray, int]:
+    """Monta os bitmaps no formato do Redis (bit 0 é o bit mais significativo do primeiro byte)"""
+    disponiveis = bytearray()
+    conhecidos = bytearray()
+    total = 0
+    for livro_id, disponivel in registros:
+        byte, bit = divmod(livro_id, 8)
+        if byte >= len(conhecidos):
+            crescimento = byte + 1 - len(conhecidos)
+            disponiveis.extend(bytes(crescimento))
+            conhecidos.extend(bytes(crescimento))
+        mascara = 0x80 >> bit
+        conhecidos[byte] |= mascara
+        if disponivel:
+            disponiveis[byte] |= mascara
+        else:
+            disponiveis[byte] &= ~mascara & 0xFF
+        total += 1
+    return disponiveis, conhecidos, total
+
+
+def _plano_de_leitura(livro_ids: list[int]) -> tuple[list, Callable[[list[int], int], int]]:
+    """Argumentos de um BITFIELD que lê os bits dos ids e a função que extrai cada bit
+
+    Ids próximos são lidos em palavras de 63 bits cobrindo o intervalo; ids esparsos,
+    um GET u1 por id. Em ambos os casos é um único comando por bitmap.
+    """
+    inicio = min(livro_ids)
+    palavras = (max(livro_ids) - inicio) // _BITS_POR_PALAVRA + 1
+    if palavras <= len(livro_ids):
+        argumentos = [a for k in range(palavras) for a in ("GET", f"u{_BITS_POR_PALAVRA}", inicio + k * _BITS_POR_PALAVRA)]
+
+        def bit(valores: list[int], livro_id: int) -> int:
+            palavra, posicao = divmod(livro_id - inicio, _BITS_POR_PALAVRA)
+            return (valores[palavra] >> (_BITS_POR_PALAVRA - 1 - posicao)) & 1
+        return argumentos, bit
+
+    indices = {livro_id: n for n, livro_id in enumerate(livro_ids)}
+    argumentos = [a for livro_id in livro_ids for a in ("GET", "u1", livro_id)]
+    return argumentos, lambda valores, livro_id: valores[indices[livro_id]]
+
+
+class RedisDisponibilidadeIndex:
+    """Índice de disponibilidade em bitmaps Redis: uma consulta de N ids custa um round-trip
+
+    Cada marcação também entra em um jornal limitado; a reconstrução monta os bitmaps em
+    chaves temporárias, reaplica as marcações feitas enquanto lia o banco e troca as chaves
+    com RENAME em uma transação (WATCH no jornal), sem apagar empréstimos concorrentes.
+    """
+
+    def __init__(self, client):
+        # Todas as chaves têm a mesma hash tag: com o cache particionado, fala direto com o nó
+        self.client = client.client_for_key(CHAVE_DISPONIVEIS) if hasattr(client, "client_for_key") else client
+
+    def marcar(self, livro_id: int, disponivel: bool) -> None:
+        record_redis_command()
+        pipe = self.client.pipeline(transaction=False)
+        pipe.setbit(CHAVE_DISPONIVEIS, livro_id, 1 if disponivel else 0)
+        pipe.setbit(CHAVE_CONHECIDOS, livro_id, 1)
+        pipe.rpush(CHAVE_JORNAL, f"{time.time():.6f}:{livro_id}:{int(disponivel)}")
+        pipe.ltrim(CHAVE_JORNAL, -JORNAL_MAXIMO, -1)
+        pipe.execute()
+
+    def consultar(self, livro_ids: list[int]) -> dict[int, bool | None]:
+        validos = sorted({livro_id for livro_id in livro_ids if livro_id >= 0})
+        if not validos:
+            return {livro_id: None for livro_id in livro_ids}
+        argumentos, bit = _plano_de_leitura(validos)
+        record_redis_command()
+        pipe = self.client.pipeline(transaction=False)
+        pipe.execute_command("BITFIELD", CHAVE_CONHECIDOS, *argumentos)
+        pipe.execute_command("BITFIELD", CHAVE_DISPONIVEIS, *argumentos)
+        conhecidos, disponiveis = pipe.execute()
+        return {
+            livro_id: (bool(bit(disponiveis, livro_id)) if livro_id >= 0 and bit(conhecidos, livro_id) else None)
+            for livro_id in livro_ids
+        }
+
+    def preencher(self, registros: dict[int, bool]) -> int:
+        """Grava, em uma transação, apenas os ids que o índice ainda não conhece
+
+        Valores lidos do banco podem estar atrasados em relação a um marcar concorrente
+        (empréstimo/devolução); com WATCH nos conhecidos, um id marcado nesse meio-tempo
+        nunca é sobrescrito. Sem entrada no jornal: a reconstrução já lê o banco.
+        """
+        validos = {livro_id: disponivel for livro_id, disponivel in registros.items() if livro_id >= 0}
+        if not validos:
+            return 0
+        argumentos, bit = _plano_de_leitura(sorted(validos))
+        for _ in range(_TENTATIVAS_DE_TROCA):
+            record_redis_command()
+            with self.client.pipeline(transaction=True) as pipe:
+                try:
+                    pipe.watch(CHAVE_CONHECIDOS)
+                    conhecidos = pipe.execute_command("BITFIELD", CHAVE_CONHECIDOS, *argumentos)
+                    novos = [livro_id for livro_id in validos if not bit(conhecidos, livro_id)]
+                    if not novos:
+                        return 0
+                    pipe.multi()
+                    for livro_id in novos:
+                        pipe.setbit(CHAVE_DISPONIVEIS, livro_id, 1 if validos[livro_id] else 0)
+                        pipe.setbit(CHAVE_CONHECIDOS, livro_id, 1)
+                    pipe.execute()
+                    return len(novos)
+                except redis.WatchError:
+                    continue
+        # Marcações concorrentes o tempo todo: a próxima consulta volta ao banco
+        return 0
+
+    def reconstruir(self, registros: Iterable[tuple[int, bool]]) -> int:
+        inicio = time.time() - _MARGEM_DE_RELOGIO_SEGUNDOS
+        disponiveis, conhecidos, total = _montar_bitmaps(registros)
+        sufixo = uuid.uuid4().hex
+        temporarias = (f"{CHAVE_DISPONIVEIS}:novo:{sufixo}", f"{CHAVE_CONHECIDOS}:novo:{sufixo}")
+        record_redis_command()
+        pipe = self.client.pipeline(transaction=False)
+        # Expiram sozinhas se o processo morrer antes do RENAME
+        pipe.set(temporarias[0], bytes(disponiveis), ex=_TTL_TEMPORARIAS_SEGUNDOS)
+        pipe.set(temporarias[1], bytes(conhecidos), ex=_TTL_TEMPORARIAS_SEGUNDOS)
+        pipe.execute()
+        try:
+            for _ in range(_TENTATIVAS_DE_TROCA):
+                if self._trocar(temporarias, inicio):
+                    return total
+            raise redis.WatchError("Jornal de disponibilidade alterado durante todas as tentativas de troca")
+        finally:
+            self.client.delete(*temporarias)
+
+    def _trocar(self, temporarias: tuple[str, str], inicio: float) -> bool:
+        temp_disponiveis, temp_conhecidos = temporarias
+        record_redis_command()
+        with self.client.pipeline(transaction=True) as pipe:
+            try:
+                pipe.watch(CHAVE_JORNAL)
+                entradas = pipe.lrange(CHAVE_JORNAL, 0, -1)
+                pipe.multi()
+                for entrada in entradas:
+                    instante, livro_id, disponivel = (entrada.decode() if isinstance(entrada, bytes) else entrada).split(":")
+                    if float(instante) >= inicio:
+                        pipe.setbit(temp_disponiveis, int(livro_id), int(disponivel))
+                        pipe.setbit(temp_conhecidos, int(livro_id), 1)
+                pipe.rename(temp_disponiveis, CHAVE_DISPONIVEIS)
+                pipe.rename(temp_conhecidos, CHAVE_CONHECIDOS)
+                # RENAME leva junto o TTL das temporárias
+                pipe.persist(CHAVE_DISPONIVEIS)
+                pipe.persist(CHAVE_CONHECIDOS)
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                return False
+
+
+class InMemoryDisponibilidadeIndex:
+    """Bitset em memória usado quando o Redis não está disponível (válido por processo)"""
+
+    def __init__(self):
+        self._disponiveis = bytearray()
+        self._conhecidos = bytearray()
+        self._lock = threading.Lock()
+        self._reconstrucao = threading.Lock()
+        # Marcações feitas durante uma reconstrução, reaplicadas antes da troca
+        self._pendentes: Optional[list[tuple[int, bool]]] = None
+
+    def marcar(self, livro_id: int, disponivel: bool) -> None:
+        with self._lock:
+            if self._pendentes is not None:
+                self._pendentes.append((livro_id, disponivel))
+            self._marcar(livro_id, disponivel)
+
+    def _marcar(self, livro_id: int, disponivel: bool) -> None:
+        """Chamado com o lock tomado"""
+        byte, bit = divmod(livro_id, 8)
+        mascara = 0x80 >> bit
+        if byte >= len(self._conhecidos):
+            crescimento = byte + 1 - len(self._conhecidos)
+            self._disponiveis.extend(bytes(crescimento))
+            self._conhecidos.extend(bytes(crescimento))
+        self._conhecidos[byte] |= mascara
+        if disponivel:
+            self._disponiveis[byte] |= mascara
+        else:
+            self._disponiveis[byte] &= ~mascara & 0xFF
+
+    def consultar(self, livro_ids: list[int]) -> dict[int, bool | None]:
+        resultado = {}
+        with self._lock:
+            tamanho = len(self._conhecidos)
+            for livro_id in livro_ids:
+                byte, bit = divmod(livro_id, 8)
+                mascara = 0x80 >> bit
+                if livro_id < 0 or byte >= tamanho or not self._conhecidos[byte] & mascara:
+                    resultado[livro_id] = None
+                else:
+                    resultado[livro_id] = bool(self._disponiveis[byte] & mascara)
+        return resultado
+
+    def preencher(self, registros: dict[int, bool]) -> int:
+        novos = 0
+        with self._lock:
+            tamanho = len(self._conhecidos)
+            for livro_id, disponivel in registros.items():
+                byte, bit = divmod(livro_id, 8)
+                if livro_id < 0 or (byte < tamanho and self._conhecidos[byte] & (0x80 >> bit)):
+                    continue
+                self._marcar(livro_id, disponivel)
+                novos += 1
+        return novos
+
+    def reconstruir(self, registros: Iterable[tuple[int, bool]]) -> int:
+        with self._reconstrucao:
+            with self._lock:
+                self._pendentes = []
+            try:
+                disponiveis, conhecidos, total = _montar_bitmaps(registros)
+            except BaseException:
+                with self._lock:
+                    self._pendentes = None
+                raise
+            with self._lock:
+                pendentes, self._pendentes = self._pendentes, None
+                self._disponiveis = disponiveis
+                self._conhecidos = conhecidos
+                for livro_id, disponivel in pendentes:
+                    self._marcar(livro_id, disponivel)
+        return total
+
+
+_indice_local = InMemoryDisponibilidadeIndex()
+
+def get_disponibilidade_index(client=None):
+    """Retorna o índice em Redis quando houver cliente, senão o bitset local do processo"""
+    if client is not None:
+        return RedisDisponibilidadeIndex(client)
+    return _indice_local
+
+
+class DisponibilidadeIndexDaRequisicao:
+    """Resolve a cada chamada o índice do cliente de cache vinculado à requisição atual"""
+
+    def __init__(self, cache_provider: Callable[[], Any]):
+        self._cache_provider = cache_provider
+
+    def _indice(self):
+        return get_disponibilidade_index(self._cache_provider())
+
+    def marcar(self, livro_id: int, disponivel: bool) -> None:
+        self._indice().marcar(livro_id, disponivel)
+
+    def consultar(self, livro_ids: list[int]) -> dict[int, bool | None]:
+        return self._indice().consultar(livro_ids)
+
+    def preencher(self, registros: dict[int, bool]) -> int:
+        return self._indice().preencher(registros)
+
+    def reconstruir(self, registros: Iterable[tuple[int, bool]]) -> int:
+        return self._indice().reconstruir(registros)
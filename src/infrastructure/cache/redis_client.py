@@ -3,6 +3,9 @@ import os
 import logging
 from typing import Optional
 from src.infrastructure.monitoring.metrics import record_redis_command, record_cache_hit, record_cache_miss
+from src.infrastructure.monitoring.timing import medido
+from src.infrastructure.monitoring.tracing import rastreado_como
+from src.infrastructure.config.deadlines import esgotado, timeout_de_socket
 
 logger = logging.getLogger(__name__)
 
@@ -10,46 +13,78 @@ REDIS_URL = os.getenv("REDIS_URL")
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 REDIS_ENABLED = os.getenv("REDIS_ENABLED", "true").lower() == "true"
+REDIS_NODES = [n.strip() for n in os.getenv("REDIS_NODES", "").split(",") if n.strip()]
+CACHE_STALE_TTL_SECONDS = int(os.getenv("CACHE_STALE_TTL_SECONDS", "3600"))
+
+_REDIS_OPTIONS = dict(
+    decode_responses=True,
+    socket_connect_timeout=1,
+    socket_timeout=1,
+    retry_on_timeout=True,
+    health_check_interval=30
+)
 
 _redis_client: Optional[redis.Redis] = None
 
+class ConexaoComPrazo(redis.Connection):
+    """Conexão TCP cujo socket timeout de cada comando é limitado pelo prazo da requisição"""
+
+    def send_packed_command(self, command, check_health=True):
+        if not self._sock:
+            self.connect()
+        self._sock.settimeout(timeout_de_socket(self.socket_timeout))
+        return super().send_packed_command(command, check_health)
+
+def create_redis_client(url: Optional[str] = None) -> redis.Redis:
+    """Cria um cliente Redis com as opções padrão da aplicação"""
+    if url:
+        # Só redis:// usa conexão TCP simples; rediss:// e unix:// mantêm a classe da URL
+        extras = {"connection_class": ConexaoComPrazo} if url.startswith("redis://") else {}
+        return redis.from_url(url, **_REDIS_OPTIONS, **extras)
+    return redis.Redis(host=REDIS_HOST, port=REDIS_PORT, connection_class=ConexaoComPrazo, **_REDIS_OPTIONS)
+
+def _disponivel(client) -> bool:
+    """Cliente configurado e prazo da requisição não esgotado (esgotado, o cache é pulado)"""
+    return bool(client) and REDIS_ENABLED and not esgotado("cache")
+
 def get_redis_client() -> redis.Redis:
-    """Retorna uma instância do cliente Redis"""
+    """Retorna uma instância do cliente Redis (particionado quando REDIS_NODES estiver definido)"""
     global _redis_client
     
     if _redis_client is None and REDIS_ENABLED:
         try:
-            if REDIS_URL:
-                _redis_client = redis.from_url(
-                    REDIS_URL,
-                    decode_responses=True,
-                    socket_connect_timeout=1,
-                    socket_timeout=1,
-                    retry_on_timeout=True,
-                    health_check_interval=30
-                )
+            if REDIS_NODES:
+                from src.infrastructure.cache.sharded_redis import ShardedRedis
+                _redis_client = ShardedRedis(REDIS_NODES)
+                origem = f"{len(REDIS_NODES)} nós"
             else:
-                _redis_client = redis.Redis(
-                    host=REDIS_HOST,
-                    port=REDIS_PORT,
-                    decode_responses=True,
-                    socket_connect_timeout=1,
-                    socket_timeout=1,
-                    retry_on_timeout=True,
-                    health_check_interval=30
-                )
+                _redis_client = create_redis_client(REDIS_URL)
+                origem = 'URL' if REDIS_URL else f'{REDIS_HOST}:{REDIS_PORT}'
             
             _redis_client.ping()
-            logger.info(f"Redis conectado via {'URL' if REDIS_URL else f'{REDIS_HOST}:{REDIS_PORT}'}")
+            logger.info(f"Redis conectado via {origem}")
         except Exception as e:
             logger.warning(f"Falha ao conectar com Redis: {e}")
             _redis_client = None
     
     return _redis_client
 
+def fechar_redis_client() -> None:
+    """Fecha as conexões do cliente no shutdown; o próximo get_redis_client reconecta"""
+    global _redis_client
+    if _redis_client is None:
+        return
+    try:
+        _redis_client.close()
+    except Exception as e:
+        logger.warning(f"Falha ao fechar o cliente Redis: {e}")
+    _redis_client = None
+
+@medido("cache")
+@rastreado_como("cache.get", "cache")
 def cache_get_safe(client: redis.Redis, key: str) -> Optional[str]:
     """Busca um valor do cache de forma segura"""
-    if not client or not REDIS_ENABLED:
+    if not _disponivel(client):
         return None
     
     try:
@@ -64,9 +99,11 @@ def cache_get_safe(client: redis.Redis, key: str) -> Optional[str]:
         logger.warning(f"Erro ao buscar cache Redis: {e}")
         return None
 
+@medido("cache")
+@rastreado_como("cache.set", "cache")
 def cache_set_safe(client: redis.Redis, key: str, value: str, ttl_seconds: int = 300) -> bool:
     """Define um valor no cache de forma segura"""
-    if not client or not REDIS_ENABLED:
+    if not _disponivel(client):
         return False
     
     try:
@@ -76,9 +113,53 @@ def cache_set_safe(client: redis.Redis, key: str, value: str, ttl_seconds: int =
         logger.warning(f"Erro ao definir cache Redis: {e}")
         return False
 
+def stale_key(key: str) -> str:
+    """Chave da cópia "stale" de uma entrada de cache"""
+    return f"stale:{key}"
+
+@medido("cache")
+@rastreado_como("cache.set_with_stale", "cache")
+def cache_set_with_stale_safe(
+    client: redis.Redis,
+    key: str,
+    value: str,
+    ttl_seconds: int = 300,
+    stale_ttl_seconds: int = CACHE_STALE_TTL_SECONDS
+) -> bool:
+    """Define um valor no cache junto de uma cópia "stale" com TTL maior, servida se o banco falhar"""
+    if not _disponivel(client):
+        return False
+    
+    try:
+        record_redis_command()
+        pipe = client.pipeline(transaction=False)
+        pipe.setex(key, ttl_seconds, value)
+        pipe.setex(stale_key(key), max(stale_ttl_seconds, ttl_seconds), value)
+        pipe.execute()
+        return True
+    except Exception as e:
+        logger.warning(f"Erro ao definir cache Redis: {e}")
+        return False
+
+@medido("cache")
+@rastreado_como("cache.get_stale", "cache")
+def cache_get_stale_safe(client: redis.Redis, key: str) -> Optional[str]:
+    """Busca a cópia "stale" de uma entrada de cache de forma segura"""
+    if not _disponivel(client):
+        return None
+    
+    try:
+        record_redis_command()
+        return client.get(stale_key(key))
+    except Exception as e:
+        logger.warning(f"Erro ao buscar cache stale Redis: {e}")
+        return None
+
+@medido("cache")
+@rastreado_como("cache.delete", "cache")
 def cache_delete_safe(client: redis.Redis, key: str) -> bool:
     """Remove um valor do cache de forma segura"""
-    if not client or not REDIS_ENABLED:
+    if not _disponivel(client):
         return False
     
     try:
@@ -88,6 +169,20 @@ def cache_delete_safe(client: redis.Redis, key: str) -> bool:
         logger.warning(f"Erro ao remover cache Redis: {e}")
         return False
 
+@medido("cache")
+@rastreado_como("cache.incr", "cache")
+def cache_incr_safe(client: redis.Redis, key: str) -> Optional[int]:
+    """Incrementa um contador no cache de forma segura"""
+    if not _disponivel(client):
+        return None
+    
+    try:
+        record_redis_command()
+        return int(client.incr(key))
+    except Exception as e:
+        logger.warning(f"Erro ao incrementar contador Redis: {e}")
+        return None
+
 def cache_get(client: redis.Redis, key: str) -> Optional[str]:
     """Busca um valor do cache (versão não segura para compatibilidade)"""
     return cache_get_safe(client, key)
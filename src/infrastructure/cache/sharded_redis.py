@@ -0,0 +1,266 @@
+import bisect
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+VIRTUAL_NODES = 160
+
+
+def extrair_hash_tag(key: str) -> str:
+    """Retorna o trecho da chave usado no hash; chaves com {tag} são roteadas apenas pela tag"""
+    inicio = key.find("{")
+    if inicio != -1:
+        fim = key.find("}", inicio + 1)
+        if fim > inicio + 1:
+            return key[inicio + 1:fim]
+    return key
+
+
+def _hash(valor: str) -> int:
+    return int.from_bytes(hashlib.md5(valor.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Anel de hashing consistente com nós virtuais
+
+    O estado (hashes ordenados, donos e nós) é reconstruído a cada alteração e
+    publicado numa única atribuição, de modo que get_node nunca enxerga um anel
+    pela metade enquanto outro thread adiciona ou remove nós.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = VIRTUAL_NODES):
+        self.replicas = replicas
+        self._estado: tuple[list[int], dict[int, str], tuple[str, ...]] = ([], {}, ())
+        for node in nodes:
+            self.add_node(node)
+
+    @property
+    def nodes(self) -> list[str]:
+        return list(self._estado[2])
+
+    def add_node(self, node: str) -> None:
+        hashes, owners, nodes = self._estado
+        if node in nodes:
+            return
+        owners = dict(owners)
+        for i in range(self.replicas):
+            h = _hash(f"{node}#{i}")
+            if h not in owners:
+                owners[h] = node
+        self._estado = (sorted(owners), owners, nodes + (node,))
+
+    def remove_node(self, node: str) -> None:
+        hashes, owners, nodes = self._estado
+        if node not in nodes:
+            return
+        owners = {h: n for h, n in owners.items() if n != node}
+        self._estado = (sorted(owners), owners, tuple(n for n in nodes if n != node))
+
+    def get_node(self, key: str) -> str:
+        hashes, owners, _ = self._estado
+        if not hashes:
+            raise RuntimeError("Nenhum nó Redis configurado no anel")
+        h = _hash(extrair_hash_tag(key))
+        idx = bisect.bisect(hashes, h) % len(hashes)
+        return owners[hashes[idx]]
+
+
+def _default_client_factory(url: str):
+    from src.infrastructure.cache.redis_client import create_redis_client
+    return create_redis_client(url)
+
+
+class ShardedPipeline:
+    """Pipeline que agrupa comandos por shard e executa um pipeline por nó"""
+
+    def __init__(self, sharded: "ShardedRedis"):
+        # Fixa a topologia na criação: um nó removido durante o pipeline não quebra o execute
+        self._ring, self._clients = sharded._topologia
+        self._comandos: list[tuple[str, str, tuple, dict]] = []
+
+    def _enfileirar(self, key: str, comando: str, *args, **kwargs) -> "ShardedPipeline":
+        self._comandos.append((self._ring.get_node(key), comando, (key, *args), kwargs))
+        return self
+
+    def get(self, key: str):
+        return self._enfileirar(key, "get")
+
+    def set(self, key: str, value, **kwargs):
+        return self._enfileirar(key, "set", value, **kwargs)
+
+    def setex(self, key: str, ttl_seconds: int, value):
+        return self._enfileirar(key, "setex", ttl_seconds, value)
+
+    def delete(self, key: str):
+        return self._enfileirar(key, "delete")
+
+    def incr(self, key: str, amount: int = 1):
+        return self._enfileirar(key, "incr", amount)
+
+    def expire(self, key: str, ttl_seconds: int):
+        return self._enfileirar(key, "expire", ttl_seconds)
+
+    def setbit(self, key: str, offset: int, value: int):
+        return self._enfileirar(key, "setbit", offset, value)
+
+    def getbit(self, key: str, offset: int):
+        return self._enfileirar(key, "getbit", offset)
+
+    def execute(self) -> list[Any]:
+        por_no: dict[str, list[int]] = {}
+        for posicao, (node, _, _, _) in enumerate(self._comandos):
+            por_no.setdefault(node, []).append(posicao)
+
+        resultados: list[Any] = [None] * len(self._comandos)
+        for node, posicoes in por_no.items():
+            pipe = self._clients[node].pipeline(transaction=False)
+            for posicao in posicoes:
+                _, comando, args, kwargs = self._comandos[posicao]
+                getattr(pipe, comando)(*args, **kwargs)
+            for posicao, valor in zip(posicoes, pipe.execute()):
+                resultados[posicao] = valor
+
+        self._comandos = []
+        return resultados
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._comandos = []
+
+
+class ShardedRedis:
+    """Cliente Redis particionado entre vários nós via hashing consistente
+
+    Expõe o subconjunto de comandos usado pela camada de cache, com a mesma
+    assinatura de redis.Redis, de modo que as funções cache_*_safe funcionam
+    sem alterações.
+    """
+
+    def __init__(
+        self,
+        nodes: Iterable[str],
+        client_factory: Optional[Callable[[str], Any]] = None,
+        replicas: int = VIRTUAL_NODES,
+    ):
+        self._client_factory = client_factory or _default_client_factory
+        self._replicas = replicas
+        # Anel e clientes formam um único snapshot imutável, trocado sob o lock
+        # com uma só atribuição; as leituras não precisam do lock
+        self._topologia: tuple[HashRing, dict[str, Any]] = (HashRing(replicas=replicas), {})
+        self._lock = threading.Lock()
+        for node in nodes:
+            self.add_node(node)
+
+    @property
+    def nodes(self) -> list[str]:
+        return self._topologia[0].nodes
+
+    def add_node(self, node: str) -> None:
+        """Adiciona um nó; apenas as chaves do trecho do anel assumido por ele mudam de shard"""
+        with self._lock:
+            ring, clients = self._topologia
+            if node in clients:
+                return
+            clients = {**clients, node: self._client_factory(node)}
+            self._topologia = (HashRing([*ring.nodes, node], replicas=self._replicas), clients)
+
+    def remove_node(self, node: str) -> None:
+        """Remove um nó do anel e fecha o pool de conexões do seu cliente"""
+        with self._lock:
+            ring, clients = self._topologia
+            if node not in clients:
+                return
+            clients = dict(clients)
+            removido = clients.pop(node)
+            self._topologia = (HashRing([n for n in ring.nodes if n != node], replicas=self._replicas), clients)
+        try:
+            removido.close()
+        except Exception as e:
+            logger.warning(f"Erro ao fechar conexão Redis do nó removido {node}: {e}")
+
+    def get_node(self, key: str) -> str:
+        return self._topologia[0].get_node(key)
+
+    def client_for_node(self, node: str):
+        return self._topologia[1][node]
+
+    def client_for_key(self, key: str):
+        ring, clients = self._topologia
+        return clients[ring.get_node(key)]
+
+    def _agrupar_por_no(self, keys: Iterable[str]) -> list[tuple[Any, list[str]]]:
+        """Agrupa as chaves por nó, devolvendo o cliente de cada grupo do mesmo snapshot"""
+        ring, clients = self._topologia
+        grupos: dict[str, list[str]] = {}
+        for key in keys:
+            grupos.setdefault(ring.get_node(key), []).append(key)
+        return [(clients[node], grupo) for node, grupo in grupos.items()]
+
+    def ping(self) -> bool:
+        for client in self._topologia[1].values():
+            client.ping()
+        return True
+
+    def get(self, key: str):
+        return self.client_for_key(key).get(key)
+
+    def set(self, key: str, value, **kwargs):
+        return self.client_for_key(key).set(key, value, **kwargs)
+
+    def setex(self, key: str, ttl_seconds: int, value):
+        return self.client_for_key(key).setex(key, ttl_seconds, value)
+
+    def incr(self, key: str, amount: int = 1):
+        return self.client_for_key(key).incr(key, amount)
+
+    def expire(self, key: str, ttl_seconds: int):
+        return self.client_for_key(key).expire(key, ttl_seconds)
+
+    def setbit(self, key: str, offset: int, value: int):
+        return self.client_for_key(key).setbit(key, offset, value)
+
+    def getbit(self, key: str, offset: int):
+        return self.client_for_key(key).getbit(key, offset)
+
+    def rpush(self, key: str, *values):
+        return self.client_for_key(key).rpush(key, *values)
+
+    def llen(self, key: str):
+        return self.client_for_key(key).llen(key)
+
+    def blpop(self, keys, timeout: int = 0):
+        """Bloqueia nas listas informadas; todas precisam estar no mesmo nó (use hash tags)"""
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        grupos = self._agrupar_por_no(keys)
+        if len(grupos) > 1:
+            raise ValueError("blpop em chaves de nós diferentes; use uma hash tag comum")
+        client, _ = grupos[0]
+        return client.blpop(keys, timeout=timeout)
+
+    def delete(self, *keys: str) -> int:
+        removidas = 0
+        for client, grupo in self._agrupar_por_no(keys):
+            removidas += client.delete(*grupo)
+        return removidas
+
+    def mget(self, keys: Iterable[str]) -> list[Any]:
+        keys = list(keys)
+        valores: dict[str, Any] = {}
+        for client, grupo in self._agrupar_por_no(keys):
+            valores.update(zip(grupo, client.mget(grupo)))
+        return [valores[k] for k in keys]
+
+    def pipeline(self, transaction: bool = False) -> ShardedPipeline:
+        return ShardedPipeline(self)
+
+    def close(self) -> None:
+        for client in self._topologia[1].values():
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Erro ao fechar conexão Redis: {e}")
@@ -1,12 +1,62 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from src.infrastructure.config.exception_handlers import create_exception_handlers
 from src.presentation.routes.pessoa_routes import router as pessoa_router
 from src.presentation.routes.usuario_routes import router as usuario_router, auth_router
 from src.presentation.routes.livro_routes import router as livro_router, emprestimo_router
+from src.presentation.routes.export_routes import router as export_router
+from src.presentation.routes.admin_routes import router as admin_router
 from src.infrastructure.monitoring.metrics import get_metrics, MetricsMiddleware
+from src.infrastructure.monitoring.multiprocess import marcar_processo_encerrado
+from src.infrastructure.monitoring.runtime import RuntimeSampler, RUNTIME_SAMPLER_ENABLED
+from src.infrastructure.monitoring.timing import ServerTimingMiddleware, instrumentar_sqlalchemy
+from src.infrastructure.monitoring.profiling import ProfilingMiddleware, profiling_habilitado
+from src.infrastructure.monitoring import tracing
+from src.presentation.negotiation import ContentNegotiationMiddleware
+from src.presentation.coalescing import RequestCoalescingMiddleware
+from src.presentation.compression import CompressionMiddleware
+from src.presentation.admission import AdmissionControlMiddleware, ADMISSION_ENABLED
+from src.presentation.bulkheads import BulkheadMiddleware, BULKHEADS_ENABLED
+from src.presentation.timeouts import DeadlineMiddleware, DEADLINES_ENABLED
+from src.infrastructure.config import deadlines
+from src.infrastructure.config.traffic_classes import ajustar_threadpool
 from src.infrastructure.config.logging_config import setup_logging, get_logger
-from fastapi.openapi.utils import get_openapi
+from src.infrastructure.config.app.warmup import WarmupState, ReconciliacaoPeriodica, executar_warmup, WARMUP_ENABLED
+from src.infrastructure.config.container import get_container
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	app.state.container = get_container()
+	if BULKHEADS_ENABLED:
+		ajustar_threadpool()
+	app.state.warmup = WarmupState()
+	if WARMUP_ENABLED:
+		# Executa em segundo plano para que /health e /ready respondam durante o aquecimento
+		app.state.warmup_task = asyncio.create_task(asyncio.to_thread(executar_warmup, app, app.state.warmup))
+	else:
+		app.state.warmup.pronto = True
+	# Importados aqui para não pesar no import do app (partida do worker)
+	from src.infrastructure.exports.manager import get_export_manager
+	from src.infrastructure.config.db.database import encerrar_engine
+	from src.infrastructure.cache.redis_client import fechar_redis_client
+	exports = get_export_manager()
+	exports.iniciar()
+	sampler = RuntimeSampler()
+	if RUNTIME_SAMPLER_ENABLED:
+		sampler.iniciar()
+	reconciliacao = ReconciliacaoPeriodica()
+	reconciliacao.iniciar()
+	yield
+	await reconciliacao.parar()
+	await sampler.parar()
+	exports.parar()
+	fechar_redis_client()
+	encerrar_engine()
+	marcar_processo_encerrado()
 
 
 def create_app() -> FastAPI:
@@ -18,7 +68,8 @@ def create_app() -> FastAPI:
 		description="API RESTful para gerenciamento de biblioteca seguindo Clean Architecture",
 		version="1.0.0",
 		docs_url="/docs",
-		redoc_url="/redoc"
+		redoc_url="/redoc",
+		lifespan=lifespan
 	)
 	
 	app.add_middleware(
@@ -27,34 +78,67 @@ def create_app() -> FastAPI:
 		allow_credentials=True,
 		allow_methods=["*"],
 		allow_headers=["*"],
+		expose_headers=["X-Consistency-Token", "X-Cache", "Warning", "Server-Timing", "X-Profile-Id", "traceparent", "Retry-After"],
 	)
 	
+	# Mais interno que a negociação: cada requisição coalescida recebe seu próprio Vary
+	app.add_middleware(RequestCoalescingMiddleware)
+	app.add_middleware(ContentNegotiationMiddleware)
+	app.add_middleware(CompressionMiddleware)
+	instrumentar_sqlalchemy()
+	app.add_middleware(ServerTimingMiddleware)
+	if tracing.TRACING_ENABLED:
+		tracing.instrumentar_sqlalchemy()
+		app.add_middleware(tracing.TracingMiddleware)
+	if BULKHEADS_ENABLED:
+		app.add_middleware(BulkheadMiddleware)
+	# Por dentro das métricas, para que as recusas (503) também sejam contabilizadas
+	if ADMISSION_ENABLED:
+		app.add_middleware(AdmissionControlMiddleware)
+	# Por fora da admissão e dos bulkheads: a espera por uma vaga também consome o prazo
+	if DEADLINES_ENABLED:
+		deadlines.instrumentar_sqlalchemy()
+		app.add_middleware(DeadlineMiddleware)
 	app.add_middleware(MetricsMiddleware)
+	if profiling_habilitado():
+		app.add_middleware(ProfilingMiddleware)
 	
 	exception_handlers = create_exception_handlers()
 	for exception_class, handler in exception_handlers.items():
 		app.add_exception_handler(exception_class, handler)
 
+	# Síncrona de propósito: a agregação lê os arquivos de todos os workers e não deve
+	# ocupar o event loop; o FastAPI a executa no threadpool
 	@app.get("/metrics")
-	async def metrics():
+	def metrics():
 		return get_metrics()
 
 	@app.get("/health")
 	async def health():
 		return {"status": "healthy", "service": "api-library"}
 
+	@app.get("/ready")
+	async def ready():
+		state = getattr(app.state, "warmup", None)
+		if state is None or not state.pronto:
+			return JSONResponse(status_code=503, content={"status": "warming_up", "etapas": state.etapas if state else {}})
+		return {"status": "ready", "etapas": state.etapas, "duracao_segundos": state.duracao_segundos}
+
 	api_router = APIRouter(prefix="/api/v1")
 	api_router.include_router(auth_router)
 	api_router.include_router(usuario_router)
 	api_router.include_router(pessoa_router)
 	api_router.include_router(livro_router)
 	api_router.include_router(emprestimo_router)
+	api_router.include_router(export_router)
+	api_router.include_router(admin_router)
 
 	app.include_router(api_router)
 
 	def custom_openapi():
 		if app.openapi_schema:
 			return app.openapi_schema
+		from fastapi.openapi.utils import get_openapi
 		schema = get_openapi(
 			title=app.title,
 			version=app.version,
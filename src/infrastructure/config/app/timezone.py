@@ -0,0 +1,8 @@
+import os
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+@lru_cache(maxsize=None)
+def get_app_tz() -> ZoneInfo:
+    """Fuso horário da aplicação (APP_TZ), resolvido uma única vez por processo"""
+    return ZoneInfo(os.getenv("APP_TZ", "America/Sao_Paulo"))
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from fastapi import FastAPI
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", "5"))
+WARMUP_CACHE_PAGES = int(os.getenv("WARMUP_CACHE_PAGES", "1"))
+WARMUP_PAGE_SIZE = int(os.getenv("WARMUP_PAGE_SIZE", "10"))
+# Intervalo da reconciliação periódica do índice de disponibilidade (0 desativa)
+DISPONIBILIDADE_RECONCILE_INTERVAL_SECONDS = float(os.getenv("DISPONIBILIDADE_RECONCILE_INTERVAL_SECONDS", "300"))
+
+@dataclass
+class WarmupState:
+    """Estado do aquecimento do worker, consultado pelo endpoint /ready"""
+    pronto: bool = False
+    etapas: dict[str, str] = field(default_factory=dict)
+    duracao_segundos: Optional[float] = None
+
+def aquecer_pool_db(conexoes: int = WARMUP_DB_CONNECTIONS) -> int:
+    """Abre N conexões simultâneas para que o pool já as tenha ao receber tráfego"""
+    from src.infrastructure.config.db.database import get_engine
+
+    engine = get_engine()
+    tamanho_pool = getattr(engine.pool, "size", lambda: conexoes)()
+    abertas = []
+    try:
+        for _ in range(min(conexoes, tamanho_pool)):
+            conn = engine.connect()
+            abertas.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in abertas:
+            conn.close()
+    return len(abertas)
+
+def aquecer_redis() -> bool:
+    from src.infrastructure.cache.redis_client import get_redis_client
+
+    client = get_redis_client()
+    if client is None:
+        return False
+    client.ping()
+    return True
+
+def aquecer_caches(paginas: int = WARMUP_CACHE_PAGES, size: int = WARMUP_PAGE_SIZE) -> int:
+    """Pré-calcula as primeiras páginas de livros, pessoas e empréstimos no cache"""
+    from src.infrastructure.cache.redis_client import get_redis_client
+    from src.infrastructure.config.db.database import SessionLocal
+    from src.infrastructure.config.db.session_context import vincular_requisicao
+    from src.infrastructure.config.container import get_container
+    from src.domain.enums.emprestimo_status import EmprestimoStatus
+
+    cache = get_redis_client()
+    if cache is None:
+        return 0
+
+    db = SessionLocal()
+    try:
+        container = get_container()
+        livros = container.create_livro_controller()
+        pessoas = container.create_pessoa_controller()
+        with vincular_requisicao(db, cache):
+            for page in range(1, paginas + 1):
+                livros.listar_paginado(page, size, cache)
+                pessoas.listar_paginado(page, size, cache)
+                livros.listar_emprestimos_paginado(page, size, EmprestimoStatus.ATIVOS, cache)
+    finally:
+        db.close()
+    return paginas * 3
+
+def reconciliar_disponibilidade() -> int:
+    """Reconstrói o índice de disponibilidade de livros a partir do banco"""
+    from src.infrastructure.cache.redis_client import get_redis_client
+    from src.infrastructure.config.db.database import SessionLocal
+    from src.infrastructure.config.db.session_context import vincular_requisicao
+    from src.infrastructure.config.container import get_container
+
+    db = SessionLocal()
+    try:
+        with vincular_requisicao(db, get_redis_client()):
+            return get_container().create_livro_controller().usecase.reconciliar_disponibilidade()
+    finally:
+        db.close()
+
+class ReconciliacaoPeriodica:
+    """Reconstrói o índice de disponibilidade periodicamente, não só no aquecimento
+
+    Corrige divergências deixadas por marcações perdidas (Redis fora durante um
+    empréstimo, worker morto entre o commit e o marcar). Roda em thread, fora do
+    event loop; cada worker sorteia um atraso para não reconstruírem juntos.
+    """
+
+    def __init__(self, intervalo_segundos: float = DISPONIBILIDADE_RECONCILE_INTERVAL_SECONDS):
+        self.intervalo_segundos = intervalo_segundos
+        self._tarefa: Optional[asyncio.Task] = None
+
+    def iniciar(self) -> None:
+        if self._tarefa is not None or self.intervalo_segundos <= 0:
+            return
+        self._tarefa = asyncio.get_running_loop().create_task(self._executar())
+
+    async def parar(self) -> None:
+        if self._tarefa is None:
+            return
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._tarefa = None
+
+    async def _executar(self) -> None:
+        await asyncio.sleep(random.uniform(0, self.intervalo_segundos))
+        while True:
+            try:
+                total = await asyncio.to_thread(reconciliar_disponibilidade)
+                logger.debug(f"Índice de disponibilidade reconciliado ({total} livros)")
+            except Exception as e:
+                logger.warning(f"Falha na reconciliação periódica do índice de disponibilidade: {e}")
+            await asyncio.sleep(self.intervalo_segundos)
+
+def aquecer_openapi(app: FastAPI) -> int:
+    return len(app.openapi().get("paths", {}))
+
+def executar_warmup(app: FastAPI, state: WarmupState) -> WarmupState:
+    """Executa as etapas de aquecimento; falhas são registradas sem impedir a prontidão"""
+    etapas: list[tuple[str, Callable[[], object]]] = [
+        ("db_pool", aquecer_pool_db),
+        ("redis", aquecer_redis),
+        ("cache", aquecer_caches),
+        ("disponibilidade", reconciliar_disponibilidade),
+        ("openapi", lambda: aquecer_openapi(app)),
+    ]
+
+    inicio = time.perf_counter()
+    for nome, etapa in etapas:
+        try:
+            resultado = etapa()
+            state.etapas[nome] = f"ok ({resultado})"
+        except Exception as e:
+            logger.warning(f"Falha no aquecimento ({nome}): {e}")
+            state.etapas[nome] = f"erro: {e.__class__.__name__}"
+
+    state.duracao_segundos = round(time.perf_counter() - inicio, 3)
+    state.pronto = True
+    logger.info(f"Aquecimento concluído em {state.duracao_segundos}s: {state.etapas}")
+    return state
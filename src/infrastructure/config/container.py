@@ -0,0 +1,36 @@
+from functools import lru_cache
+from src.infrastructure.config.app.app_factory_contract import ApplicationFactory
+from src.infrastructure.config.app.timezone import get_app_tz
+from src.infrastructure.config.db.session_context import SessaoDaRequisicao, cache_atual
+from src.infrastructure.config.sqlalchemy_factory import SqlAlchemyFactory
+from src.infrastructure.cache.disponibilidade_index import DisponibilidadeIndexDaRequisicao
+
+class AppContainer(ApplicationFactory):
+    """Raiz de composição: monta o grafo de repositórios, serviços, casos de uso e
+    controllers uma única vez; apenas a sessão e o cache são vinculados por requisição
+    (ver session_context.vincular_requisicao)"""
+
+    def __init__(self):
+        self.tz = get_app_tz()
+        self.db = SessaoDaRequisicao()
+        factory = SqlAlchemyFactory(self.db, tz=self.tz, indice=DisponibilidadeIndexDaRequisicao(cache_atual))
+        self._usuario_controller = factory.create_usuario_controller()
+        self._pessoa_controller = factory.create_pessoa_controller()
+        self._livro_controller = factory.create_livro_controller()
+        self._export_controller = factory.create_export_controller()
+
+    def create_usuario_controller(self):
+        return self._usuario_controller
+
+    def create_pessoa_controller(self):
+        return self._pessoa_controller
+
+    def create_livro_controller(self):
+        return self._livro_controller
+
+    def create_export_controller(self):
+        return self._export_controller
+
+@lru_cache(maxsize=1)
+def get_container() -> AppContainer:
+    return AppContainer()
@@ -1,6 +1,10 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 import os
+import threading
+from src.infrastructure.config.db.pool import PoolMonitorado
+from src.infrastructure.config.traffic_classes import CLASSES, INTERATIVO, tamanho_do_pool
 
 def _build_database_url() -> str:
     url = os.getenv("DATABASE_URL")
@@ -15,7 +19,84 @@ def _build_database_url() -> str:
 
 DATABASE_URL = _build_database_url()
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_engines: dict[str, Engine] = {}
+_lock = threading.Lock()
+
+class _SessionLocal(sessionmaker):
+    """sessionmaker que cria o engine da sua classe de tráfego na primeira sessão aberta"""
+
+    def __init__(self, classe: str = INTERATIVO, **kw):
+        super().__init__(**kw)
+        self.classe = classe
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            get_engine(self.classe)
+        return super().__call__(**local_kw)
+
+_sessoes = {classe: _SessionLocal(classe, autocommit=False, autoflush=False) for classe in CLASSES}
+SessionLocal = _sessoes[INTERATIVO]
+
+def sessao_para(classe: str) -> Session:
+    """Sessão ligada ao pool da classe de tráfego (bulkhead)"""
+    return _sessoes[classe]()
+
+def get_engine(classe: str = INTERATIVO) -> Engine:
+    """Engine criado sob demanda: o import do módulo não carrega o driver nem abre o pool
+
+    Criar o engine carrega o dialeto e o driver (psycopg), o que pesa na partida do worker;
+    o primeiro uso acontece no warmup do lifespan ou na primeira requisição. Cada classe
+    de tráfego tem o próprio engine, com o pool dimensionado em traffic_classes.
+    """
+    engine = _engines.get(classe)
+    if engine is None:
+        with _lock:
+            engine = _engines.get(classe)
+            if engine is None:
+                if make_url(DATABASE_URL).get_backend_name() == "sqlite":
+                    opcoes = {}
+                else:
+                    tamanho, excedente = tamanho_do_pool(classe)
+                    opcoes = {"poolclass": PoolMonitorado, "pool_size": tamanho, "max_overflow": excedente}
+                engine = create_engine(DATABASE_URL, pool_pre_ping=True, **opcoes)
+                if isinstance(engine.pool, PoolMonitorado):
+                    engine.pool.nome = classe
+                _engines[classe] = engine
+                _sessoes[classe].configure(bind=engine)
+    return engine
+
+def estado_do_pool(classe: str = INTERATIVO) -> tuple[int, float]:
+    """(threads aguardando conexão, maior espera atual em segundos); zeros sem engine ou pool monitorado"""
+    engine = _engines.get(classe)
+    pool = engine.pool if engine is not None else None
+    if isinstance(pool, PoolMonitorado):
+        return pool.estatisticas()
+    return 0, 0.0
+
+def encerrar_engine() -> None:
+    """Fecha as conexões dos pools no shutdown (sem efeito para engines nunca criados)"""
+    with _lock:
+        for classe, engine in list(_engines.items()):
+            engine.dispose()
+            _sessoes[classe].configure(bind=None)
+        _engines.clear()
+
+def descartar_pool_herdado() -> None:
+    """No processo filho após um fork: abandona as conexões herdadas sem fechá-las
+
+    As conexões pertencem ao processo pai (close=False não envia nada pelo socket);
+    o filho passa a abrir as próprias sob demanda.
+    """
+    for engine in list(_engines.values()):
+        engine.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=descartar_pool_herdado)
+
+def __getattr__(nome: str):
+    # Compatibilidade com "from database import engine"
+    if nome == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 Base = declarative_base()
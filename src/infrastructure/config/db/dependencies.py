@@ -1,10 +1,11 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
-from src.infrastructure.config.db.database import SessionLocal
+from src.infrastructure.config.db.database import sessao_para
+from src.infrastructure.config.traffic_classes import classe_atual
 
 def get_db():
-    """Dependency para injetar a sessão do banco de dados"""
-    db = SessionLocal()
+    """Dependency para injetar a sessão do banco de dados (pool da classe de tráfego da requisição)"""
+    db = sessao_para(classe_atual())
     try:
         yield db
     finally:
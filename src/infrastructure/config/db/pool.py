@@ -0,0 +1,43 @@
+import threading
+import time
+from sqlalchemy.pool import QueuePool
+from src.infrastructure.monitoring.metrics import record_db_pool_wait
+
+class PoolMonitorado(QueuePool):
+    """QueuePool que expõe quantas threads aguardam uma conexão e há quanto tempo
+
+    O estado é instantâneo (não uma média): assim que as esperas acabam, o controle de
+    admissão volta a aceitar requisições, sem depender de novas amostras.
+    """
+
+    nome = "interactive"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._esperas: dict[int, float] = {}
+        self._esperas_lock = threading.Lock()
+
+    def _do_get(self):
+        thread = threading.get_ident()
+        inicio = time.perf_counter()
+        with self._esperas_lock:
+            self._esperas[thread] = inicio
+        try:
+            return super()._do_get()
+        finally:
+            with self._esperas_lock:
+                self._esperas.pop(thread, None)
+            record_db_pool_wait(self.nome, time.perf_counter() - inicio)
+
+    def recreate(self) -> "PoolMonitorado":
+        # dispose() recria o pool; o nome (rótulo da métrica) precisa sobreviver
+        novo = super().recreate()
+        novo.nome = self.nome
+        return novo
+
+    def estatisticas(self) -> tuple[int, float]:
+        """(threads aguardando checkout, maior espera em andamento em segundos)"""
+        with self._esperas_lock:
+            if not self._esperas:
+                return 0, 0.0
+            return len(self._esperas), time.perf_counter() - min(self._esperas.values())
@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+from sqlalchemy.orm import Session
+
+_sessao_atual: ContextVar[Optional[Session]] = ContextVar("sessao_atual", default=None)
+_cache_atual: ContextVar[Any] = ContextVar("cache_atual", default=None)
+
+def sessao_atual() -> Session:
+    sessao = _sessao_atual.get()
+    if sessao is None:
+        raise RuntimeError("Nenhuma sessão de banco vinculada ao contexto atual")
+    return sessao
+
+def cache_atual():
+    return _cache_atual.get()
+
+@contextmanager
+def vincular_requisicao(db: Session, cache=None) -> Iterator[None]:
+    """Vincula a sessão e o cliente de cache da requisição ao contexto atual"""
+    token_sessao = _sessao_atual.set(db)
+    token_cache = _cache_atual.set(cache)
+    try:
+        yield
+    finally:
+        _sessao_atual.reset(token_sessao)
+        _cache_atual.reset(token_cache)
+
+class SessaoDaRequisicao:
+    """Proxy para a sessão vinculada ao contexto, permitindo que repositórios sejam
+    construídos uma única vez e usem a sessão da requisição em andamento"""
+
+    def __getattr__(self, nome: str):
+        return getattr(sessao_atual(), nome)
+
+    def __repr__(self) -> str:
+        return f"<SessaoDaRequisicao {_sessao_atual.get()!r}>"
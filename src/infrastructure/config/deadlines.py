@@ -0,0 +1,172 @@
+"""
+Prazo (deadline) da requisição propagado por contextvar até o banco e o Redis.
+
+O middleware define o prazo; as threads do threadpool herdam a mesma instância (o
+contexto é copiado, o objeto é compartilhado), então o cancelamento feito no event loop
+é visto pela thread que executa o endpoint. No banco o prazo vira statement_timeout
+(SET LOCAL, PostgreSQL) e os comandos seguintes são recusados; no Redis, socket timeout.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from src.domain.exceptions import PrazoExpiradoException
+from src.infrastructure.monitoring.metrics import record_work_cancelled
+
+logger = logging.getLogger(__name__)
+
+PRAZO = "deadline"
+DESCONEXAO = "disconnect"
+
+
+class Prazo:
+    """Instante limite (monotônico) e motivo do cancelamento, quando houver"""
+
+    def __init__(self, segundos: Optional[float] = None):
+        self.expira_em = time.monotonic() + segundos if segundos is not None else None
+        self.cancelado: Optional[str] = None
+        self._execucoes: set = set()
+        self._lock = threading.Lock()
+
+    def restante(self) -> Optional[float]:
+        """Segundos até o prazo (negativo se já passou); None sem prazo"""
+        return self.expira_em - time.monotonic() if self.expira_em is not None else None
+
+    def motivo(self) -> Optional[str]:
+        """Por que o trabalho deve parar: cancelamento explícito ou prazo vencido"""
+        if self.cancelado:
+            return self.cancelado
+        restante = self.restante()
+        return PRAZO if restante is not None and restante <= 0 else None
+
+    def cancelar(self, motivo: str) -> list:
+        """Marca o cancelamento e devolve as conexões DBAPI com comandos em andamento"""
+        with self._lock:
+            self.cancelado = self.cancelado or motivo
+            return list(self._execucoes)
+
+    def _registrar(self, conexao) -> None:
+        with self._lock:
+            self._execucoes.add(conexao)
+
+    def _liberar(self, conexao) -> None:
+        with self._lock:
+            self._execucoes.discard(conexao)
+
+
+_prazo: ContextVar[Optional[Prazo]] = ContextVar("prazo_da_requisicao", default=None)
+
+
+def prazo_atual() -> Optional[Prazo]:
+    return _prazo.get()
+
+
+@contextmanager
+def usar_prazo(prazo: Prazo):
+    token = _prazo.set(prazo)
+    try:
+        yield prazo
+    finally:
+        _prazo.reset(token)
+
+
+def esgotado(etapa: str) -> bool:
+    """True (e contabiliza) se o trabalho da etapa deve ser evitado"""
+    prazo = _prazo.get()
+    motivo = prazo.motivo() if prazo is not None else None
+    if motivo is None:
+        return False
+    record_work_cancelled(motivo, etapa)
+    return True
+
+
+def verificar_prazo(etapa: str) -> None:
+    prazo = _prazo.get()
+    motivo = prazo.motivo() if prazo is not None else None
+    if motivo is not None:
+        record_work_cancelled(motivo, etapa)
+        raise PrazoExpiradoException(motivo, etapa)
+
+
+def interromper(conexoes: list) -> None:
+    """Interrompe os comandos em andamento (cancel no psycopg, interrupt no sqlite3)
+
+    Bloqueante: o cancelamento do PostgreSQL abre uma conexão própria; chamar fora do event loop.
+    """
+    for conexao in conexoes:
+        interromper_conexao = getattr(conexao, "cancel", None) or getattr(conexao, "interrupt", None)
+        if interromper_conexao is None:
+            continue
+        try:
+            interromper_conexao()
+        except Exception as e:
+            logger.warning(f"Falha ao interromper comando no banco: {e}")
+
+
+def timeout_de_socket(padrao: Optional[float]) -> Optional[float]:
+    """Timeout para uma operação de rede: o menor entre o padrão e o que resta do prazo"""
+    prazo = _prazo.get()
+    restante = prazo.restante() if prazo is not None else None
+    if restante is None:
+        return padrao
+    restante = max(restante, 0.001)
+    return min(padrao, restante) if padrao else restante
+
+
+def _ao_iniciar_transacao(session, transaction, connection):
+    prazo = _prazo.get()
+    if prazo is None:
+        return
+    verificar_prazo("db")
+    restante = prazo.restante()
+    if restante is not None and connection.dialect.name == "postgresql":
+        # SET LOCAL vale até o fim da transação; a conexão volta ao pool sem o limite
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(1, int(restante * 1000))}")
+
+
+def _antes_do_comando(conn, cursor, statement, parameters, context, executemany):
+    prazo = _prazo.get()
+    if prazo is None:
+        return
+    verificar_prazo("db")
+    prazo._registrar(conn.connection.dbapi_connection)
+
+
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany):
+    prazo = _prazo.get()
+    if prazo is not None:
+        prazo._liberar(conn.connection.dbapi_connection)
+
+
+def _ao_falhar(contexto):
+    prazo = _prazo.get()
+    if prazo is None:
+        return
+    if contexto.connection is not None and contexto.connection.connection is not None:
+        prazo._liberar(contexto.connection.connection.dbapi_connection)
+    motivo = prazo.motivo()
+    if motivo is not None and not isinstance(contexto.original_exception, PrazoExpiradoException):
+        # Comando cancelado por statement_timeout ou interrompido pelo middleware
+        record_work_cancelled(motivo, "db")
+        raise PrazoExpiradoException(motivo, "db") from contexto.original_exception
+
+
+_instrumentado = False
+
+
+def instrumentar_sqlalchemy() -> None:
+    """Aplica o prazo da requisição a todos os engines e sessões (uma única vez)"""
+    global _instrumentado
+    if _instrumentado:
+        return
+    event.listen(Session, "after_begin", _ao_iniciar_transacao)
+    # insert=True: recusa o comando antes que os demais listeners (timing, tracing) o registrem
+    event.listen(Engine, "before_cursor_execute", _antes_do_comando, insert=True)
+    event.listen(Engine, "after_cursor_execute", _depois_do_comando)
+    event.listen(Engine, "handle_error", _ao_falhar)
+    _instrumentado = True
@@ -1,16 +1,18 @@
-from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi import Request, Response
 from src.presentation.dto.common import ApiResponse
+from src.presentation.responses import resposta_negociada
 from src.domain.exceptions import (
 	DomainException,
 	EmailJaExisteException,
 	PessoaNaoEncontradaException,
-	DadosInvalidosException
+	DadosInvalidosException,
+	FilaDeExportacaoCheiaException,
+	PrazoExpiradoException
 )
 
 def create_exception_handlers():
-	async def email_ja_existe_handler(request: Request, exc: EmailJaExisteException) -> JSONResponse:
-		return JSONResponse(
+	async def email_ja_existe_handler(request: Request, exc: EmailJaExisteException) -> Response:
+		return resposta_negociada(
 			status_code=409,
 			content=ApiResponse[None](
 				success=False,
@@ -20,8 +22,8 @@ def create_exception_handlers():
 			).model_dump()
 		)
 	
-	async def pessoa_nao_encontrada_handler(request: Request, exc: PessoaNaoEncontradaException) -> JSONResponse:
-		return JSONResponse(
+	async def pessoa_nao_encontrada_handler(request: Request, exc: PessoaNaoEncontradaException) -> Response:
+		return resposta_negociada(
 			status_code=404,
 			content=ApiResponse[None](
 				success=False,
@@ -31,8 +33,8 @@ def create_exception_handlers():
 			).model_dump()
 		)
 	
-	async def dados_invalidos_handler(request: Request, exc: DadosInvalidosException) -> JSONResponse:
-		return JSONResponse(
+	async def dados_invalidos_handler(request: Request, exc: DadosInvalidosException) -> Response:
+		return resposta_negociada(
 			status_code=400,
 			content=ApiResponse[None](
 				success=False,
@@ -42,8 +44,32 @@ def create_exception_handlers():
 			).model_dump()
 		)
 	
-	async def domain_exception_handler(request: Request, exc: DomainException) -> JSONResponse:
-		return JSONResponse(
+	async def fila_exportacao_cheia_handler(request: Request, exc: FilaDeExportacaoCheiaException) -> Response:
+		resposta = resposta_negociada(
+			status_code=503,
+			content=ApiResponse[None](
+				success=False,
+				error="EXPORT_QUEUE_FULL",
+				message=str(exc),
+				details={"limite": exc.limite, "suggestion": "Tente novamente em alguns instantes"}
+			).model_dump()
+		)
+		resposta.headers["Retry-After"] = "30"
+		return resposta
+	
+	async def prazo_expirado_handler(request: Request, exc: PrazoExpiradoException) -> Response:
+		return resposta_negociada(
+			status_code=504,
+			content=ApiResponse[None](
+				success=False,
+				error="DEADLINE_EXCEEDED",
+				message="Prazo da requisição esgotado",
+				details={"reason": exc.motivo, "stage": exc.etapa}
+			).model_dump()
+		)
+	
+	async def domain_exception_handler(request: Request, exc: DomainException) -> Response:
+		return resposta_negociada(
 			status_code=422,
 			content=ApiResponse[None](
 				success=False,
@@ -57,5 +83,7 @@ def create_exception_handlers():
 		EmailJaExisteException: email_ja_existe_handler,
 		PessoaNaoEncontradaException: pessoa_nao_encontrada_handler,
 		DadosInvalidosException: dados_invalidos_handler,
+		FilaDeExportacaoCheiaException: fila_exportacao_cheia_handler,
+		PrazoExpiradoException: prazo_expirado_handler,
 		DomainException: domain_exception_handler,
 	} 
\ No newline at end of file
@@ -1,12 +1,21 @@
+from typing import AsyncIterator
 from fastapi import Depends
 from sqlalchemy.orm import Session
 from src.infrastructure.config.db.dependencies import get_db
+from src.infrastructure.config.db.session_context import vincular_requisicao
 from src.infrastructure.cache.redis_client import get_redis_client
 from src.infrastructure.config.app.app_factory_contract import ApplicationFactory
-from src.infrastructure.config.sqlalchemy_factory import SqlAlchemyFactory
+from src.infrastructure.config.container import get_container
+from src.infrastructure.monitoring.profiling import RepositorioDePerfis
 
-def get_app_factory(db: Session = Depends(get_db)) -> ApplicationFactory:
-    return SqlAlchemyFactory(db)
+def get_cache():
+    return get_redis_client()
+
+async def get_app_factory(db: Session = Depends(get_db), cache=Depends(get_cache)) -> AsyncIterator[ApplicationFactory]:
+    # Assíncrona de propósito: o vínculo é feito no contexto da requisição e herdado
+    # pelo endpoint síncrono quando ele é despachado para o threadpool
+    with vincular_requisicao(db, cache):
+        yield get_container()
 
 def get_usuario_controller(factory: ApplicationFactory = Depends(get_app_factory)):
     return factory.create_usuario_controller()
@@ -17,5 +26,8 @@ def get_pessoa_controller(factory: ApplicationFactory = Depends(get_app_factory)
 def get_livro_controller(factory: ApplicationFactory = Depends(get_app_factory)):
     return factory.create_livro_controller()
 
-def get_cache():
-    return get_redis_client() 
\ No newline at end of file
+def get_export_controller(factory: ApplicationFactory = Depends(get_app_factory)):
+    return factory.create_export_controller()
+
+def get_profile_repository() -> RepositorioDePerfis:
+    return RepositorioDePerfis()
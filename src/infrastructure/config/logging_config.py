@@ -1,63 +1,201 @@
+import atexit
+import copy
+import json
 import logging
 import logging.handlers
 import os
-from datetime import datetime
+import queue
+import random
+from datetime import datetime, timezone
+from typing import Optional
+from src.infrastructure.monitoring.metrics import record_log_dropped
+
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Loggers de acesso HTTP: vão apenas para http.log (e console), fora do app.log
+LOG_ACCESS_LOGGERS = tuple(n.strip() for n in os.getenv("LOG_ACCESS_LOGGERS", "uvicorn.access,slow_requests").split(",") if n.strip())
+# Amostragem por logger, ex.: "uvicorn.access=0.1"; WARNING e acima nunca são amostrados
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class JsonFormatter(logging.Formatter):
+    """Um objeto JSON por linha; campos passados em extra= entram no objeto"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_PADRAO and not chave.startswith("_"):
+                dados[chave] = valor
+        if record.exc_text:
+            dados["exception"] = record.exc_text
+        elif record.exc_info:
+            dados["exception"] = self.formatException(record.exc_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+def parse_amostragem(valor: str) -> dict[str, float]:
+    """"uvicorn.access=0.1,http=0.5" -> {"uvicorn.access": 0.1, "http": 0.5}"""
+    taxas = {}
+    for item in valor.split(","):
+        nome, _, taxa = item.partition("=")
+        if nome.strip() and taxa.strip():
+            taxas[nome.strip()] = min(1.0, max(0.0, float(taxa)))
+    return taxas
+
+def _pertence(nome: str, prefixos) -> bool:
+    return any(nome == p or nome.startswith(p + ".") for p in prefixos)
+
+class AmostragemPorLogger(logging.Filter):
+    """Mantém só uma fração dos registros abaixo de WARNING dos loggers configurados"""
+
+    def __init__(self, taxas: dict[str, float]):
+        super().__init__()
+        self.taxas = taxas
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.taxas:
+            return True
+        for nome, taxa in self.taxas.items():
+            if _pertence(record.name, (nome,)):
+                if random.random() < taxa:
+                    return True
+                record_log_dropped("sampled")
+                return False
+        return True
+
+class FiltroDeLoggers(logging.Filter):
+    """Aceita (incluir=True) ou rejeita os registros dos loggers informados"""
+
+    def __init__(self, nomes, incluir: bool):
+        super().__init__()
+        self.nomes = tuple(nomes)
+        self.incluir = incluir
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return _pertence(record.name, self.nomes) == self.incluir
+
+class QueueHandlerNaoBloqueante(logging.handlers.QueueHandler):
+    """Na thread da requisição só enfileira; com a fila cheia descarta e contabiliza"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve a mensagem e o traceback aqui (args e exc_info não atravessam a fila com segurança);
+        # a formatação final fica com o listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            record_log_dropped("backpressure")
+
+def caminho_do_processo(caminho: str) -> str:
+    """app.log -> app.<WORKER_ID>.log nos workers do servidor prefork
+
+    A rotação do RotatingFileHandler não é segura com vários processos no mesmo arquivo.
+    """
+    worker = os.environ.get("WORKER_ID")
+    if not worker:
+        return caminho
+    base, extensao = os.path.splitext(caminho)
+    return f"{base}.{worker}{extensao}"
+
+def _arquivo(nome: str, nivel: int, formatter: logging.Formatter) -> logging.Handler:
+    handler = logging.handlers.RotatingFileHandler(
+        caminho_do_processo(os.path.join(LOG_DIR, nome)),
+        maxBytes=10*1024*1024,  # 10MB
+        backupCount=5
+    )
+    handler.setLevel(nivel)
+    handler.setFormatter(formatter)
+    return handler
+
+def encerrar_logging() -> None:
+    """Esvazia a fila e para o listener (registrado no atexit)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def reiniciar_apos_fork() -> None:
+    """No processo filho: a thread do listener não sobrevive ao fork e a fila herdada pode
+    estar com o lock tomado, então o pipeline é recriado do zero sem tocar no anterior"""
+    global _listener
+    _listener = None
+    setup_logging()
 
 def setup_logging():
-    
-    log_dir = "logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
+    global _listener
+
+    if not os.path.exists(LOG_DIR):
+        os.makedirs(LOG_DIR)
+
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
-    
+
+    encerrar_logging()
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
-    
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
+
+    if LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    general_handler = logging.handlers.RotatingFileHandler(
-        f"{log_dir}/app.log",
-        maxBytes=10*1024*1024,  # 10MB
-        backupCount=5
-    )
-    general_handler.setLevel(logging.INFO)
-    general_handler.setFormatter(formatter)
-    logger.addHandler(general_handler)
-    
-    error_handler = logging.handlers.RotatingFileHandler(
-        f"{log_dir}/errors.log",
-        maxBytes=10*1024*1024,  # 10MB
-        backupCount=5
-    )
-    error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(formatter)
-    logger.addHandler(error_handler)
-    
-    http_handler = logging.handlers.RotatingFileHandler(
-        f"{log_dir}/http.log",
-        maxBytes=10*1024*1024,  # 10MB
-        backupCount=5
+
+    general_handler = _arquivo("app.log", logging.INFO, formatter)
+    general_handler.addFilter(FiltroDeLoggers(LOG_ACCESS_LOGGERS, incluir=False))
+
+    error_handler = _arquivo("errors.log", logging.ERROR, formatter)
+
+    http_handler = _arquivo("http.log", logging.INFO, formatter)
+    http_handler.addFilter(FiltroDeLoggers(LOG_ACCESS_LOGGERS, incluir=True))
+
+    # O listener escreve em uma thread própria; a requisição paga apenas o enfileiramento
+    fila = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = QueueHandlerNaoBloqueante(fila)
+    queue_handler.addFilter(AmostragemPorLogger(parse_amostragem(LOG_SAMPLING)))
+    logger.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        fila, console_handler, general_handler, error_handler, http_handler,
+        respect_handler_level=True
     )
-    http_handler.setLevel(logging.INFO)
-    http_handler.setFormatter(formatter)
-    logger.addHandler(http_handler)
-    
-    logging.getLogger("uvicorn.access").setLevel(logging.INFO)
+    _listener.start()
+
+    # O uvicorn configura o access log com handler próprio e sem propagação; redireciona para a fila
+    acesso = logging.getLogger("uvicorn.access")
+    acesso.setLevel(logging.INFO)
+    acesso.handlers.clear()
+    acesso.propagate = True
     logging.getLogger("uvicorn.error").setLevel(logging.ERROR)
-    
+
     logger.info("Logging configurado com sucesso")
-    logger.info(f"Logs serão salvos em: {os.path.abspath(log_dir)}")
+    logger.info(f"Logs serão salvos em: {os.path.abspath(LOG_DIR)}")
+
+atexit.register(encerrar_logging)
 
 def get_logger(name: str) -> logging.Logger:
     """Retorna um logger configurado"""
-    return logging.getLogger(name) 
\ No newline at end of file
+    return logging.getLogger(name)
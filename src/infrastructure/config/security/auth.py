@@ -2,17 +2,23 @@ import os
 import time
 import jwt
 from passlib.hash import pbkdf2_sha256
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
 from src.infrastructure.config.db.dependencies import get_db
 from src.infrastructure.persistence.repository.usuario_repository import UsuarioRepository
 from src.application.service.usuario.usuario_service import UsuarioService
 from src.infrastructure.config.db.unit_of_work import SqlAlchemyUnitOfWork
+from src.infrastructure.monitoring.timing import medir
 
 JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret-change")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRES_SECONDS = int(os.getenv("JWT_EXPIRES_SECONDS", "3600"))
+# Opt-in: com o banco indisponível, aceita as claims de um token válido apenas em leituras
+# (GET/HEAD), para manter as respostas servidas do cache. Escritas sempre falham fechadas
+AUTH_TRUST_TOKEN_ON_DB_ERROR = os.getenv("AUTH_TRUST_TOKEN_ON_DB_ERROR", "false").lower() == "true"
+_METODOS_SEGUROS = {"GET", "HEAD"}
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -28,26 +34,33 @@ def create_access_token(data: dict) -> str:
     return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
 ):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Não autenticado",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id = int(payload.get("sub")) if payload.get("sub") else None
-        email = payload.get("email")
-        if user_id is None or email is None:
+    with medir("auth"):
+        credentials_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Não autenticado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        try:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+            user_id = int(payload.get("sub")) if payload.get("sub") else None
+            email = payload.get("email")
+            if user_id is None or email is None:
+                raise credentials_exception
+        except Exception:
             raise credentials_exception
-    except Exception:
-        raise credentials_exception
 
-    uow = SqlAlchemyUnitOfWork(db)
-    service = UsuarioService(UsuarioRepository(db), uow)
-    usuario = service.buscar_por_id(user_id)
-    if not usuario or usuario.email != email:
-        raise credentials_exception
-    return {"id": usuario.id, "email": usuario.email, "nome": usuario.nome} 
\ No newline at end of file
+        uow = SqlAlchemyUnitOfWork(db)
+        service = UsuarioService(UsuarioRepository(db), uow)
+        try:
+            usuario = service.buscar_por_id(user_id)
+        except SQLAlchemyError:
+            if not AUTH_TRUST_TOKEN_ON_DB_ERROR or request.method not in _METODOS_SEGUROS:
+                raise
+            return {"id": user_id, "email": email, "nome": payload.get("nome")}
+        if not usuario or usuario.email != email:
+            raise credentials_exception
+        return {"id": usuario.id, "email": usuario.email, "nome": usuario.nome} 
\ No newline at end of file
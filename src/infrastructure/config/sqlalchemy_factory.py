@@ -1,20 +1,28 @@
 from sqlalchemy.orm import Session
 from src.infrastructure.config.app.app_factory_contract import ApplicationFactory
 from src.infrastructure.config.db.unit_of_work import SqlAlchemyUnitOfWork
+from src.infrastructure.config.app.timezone import get_app_tz
+from src.infrastructure.monitoring.tracing import rastreado
 from zoneinfo import ZoneInfo
-import os
+from typing import Optional
+
+def _transacional(service_cls):
+    """Nos serviços, só as transações viram spans; as leituras já aparecem nos repositórios"""
+    return rastreado(service_cls, "transacao", ("_executar_transacao",))
 
 class SqlAlchemyFactory(ApplicationFactory):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache=None, tz: Optional[ZoneInfo] = None, indice=None):
         self.db = db
+        self.cache = cache
         self.uow = SqlAlchemyUnitOfWork(db)
-        self.tz = ZoneInfo(os.getenv("APP_TZ", "America/Sao_Paulo"))
+        self.tz = tz or get_app_tz()
+        self.indice = indice
 
     def _build_module(self, repository_cls, service_cls, usecase_cls, controller_cls, extra_service_args=None):
-        repo = repository_cls(self.db)
-        service = service_cls(repo, self.uow, *(extra_service_args or []))
-        usecase = usecase_cls(service)
-        return controller_cls(usecase)
+        repo = rastreado(repository_cls, "repository")(self.db)
+        service = _transacional(service_cls)(repo, self.uow, *(extra_service_args or []))
+        usecase = rastreado(usecase_cls, "usecase")(service)
+        return rastreado(controller_cls, "controller")(usecase)
 
     def create_usuario_controller(self):
         from src.infrastructure.persistence.repository.usuario_repository import UsuarioRepository
@@ -41,14 +49,25 @@ class SqlAlchemyFactory(ApplicationFactory):
         from src.application.service.pessoa.pessoa_service import PessoaService
         from src.application.usecase.livro_usecases import LivroUseCase
         from src.presentation.controllers.livro_controllers import LivroControllers
+        from src.infrastructure.cache.disponibilidade_index import get_disponibilidade_index
+
+        livro_repo = rastreado(LivroRepository, "repository")(self.db)
+        emp_repo = rastreado(EmprestimoRepository, "repository")(self.db, self.tz)
+        pessoa_repo = rastreado(PessoaRepository, "repository")(self.db)
+
+        indice = self.indice or get_disponibilidade_index(self.cache)
+        livro_service = _transacional(LivroService)(livro_repo, self.uow, indice)
+        emp_service = _transacional(EmprestimoService)(emp_repo, livro_repo, self.uow, self.tz, indice)
+        pessoa_service = _transacional(PessoaService)(pessoa_repo, self.uow)
 
-        livro_repo = LivroRepository(self.db)
-        emp_repo = EmprestimoRepository(self.db)
-        pessoa_repo = PessoaRepository(self.db)
+        usecase = rastreado(LivroUseCase, "usecase")(livro_service, emp_service, pessoa_service)
+        return rastreado(LivroControllers, "controller")(usecase)
 
-        livro_service = LivroService(livro_repo, self.uow)
-        emp_service = EmprestimoService(emp_repo, livro_repo, self.uow, self.tz)
-        pessoa_service = PessoaService(pessoa_repo, self.uow)
+    def create_export_controller(self):
+        from src.application.usecase.export_usecases import ExportUseCase
+        from src.presentation.controllers.export_controllers import ExportControllers
+        from src.infrastructure.exports.manager import get_export_manager
 
-        usecase = LivroUseCase(livro_service, emp_service, pessoa_service)
-        return LivroControllers(usecase)
+        manager = get_export_manager()
+        usecase = rastreado(ExportUseCase, "usecase")(manager.store, manager.fila)
+        return rastreado(ExportControllers, "controller")(usecase)
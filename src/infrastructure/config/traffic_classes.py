@@ -0,0 +1,96 @@
+"""
+Classes de tráfego (bulkheads): cada classe tem o próprio limite de concorrência e o
+próprio pool de conexões, para que uma não esgote os recursos das outras.
+
+    interactive  leituras e escritas pontuais (padrão)
+    bulk         exportações e varreduras completas
+    auth         login e cadastro de usuários (hash pbkdf2 consome CPU)
+"""
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from urllib.parse import parse_qs
+
+INTERATIVO = "interactive"
+LOTE = "bulk"
+AUTH = "auth"
+CLASSES = (INTERATIVO, LOTE, AUTH)
+
+# (concorrência, pool_size, max_overflow, prazo em ms) por classe; a soma das concorrências
+# dimensiona o threadpool. Lote não tem prazo padrão: downloads seguem enquanto o cliente ler
+_PADROES = {
+    INTERATIVO: (32, 5, 10, 10000),
+    LOTE: (4, 2, 2, 0),
+    AUTH: (4, 2, 2, 5000),
+}
+
+# Definida pelo middleware de bulkhead; as threads do threadpool herdam uma cópia do contexto
+_classe_atual: ContextVar[str] = ContextVar("classe_de_trafego", default=INTERATIVO)
+
+
+def _status_consultado(query_string: bytes) -> Optional[str]:
+    """Valor de ?status= como o FastAPI o lê (decodificado; vale o último repetido)"""
+    valores = parse_qs(query_string.decode("latin-1")).get("status")
+    return valores[-1] if valores else None
+
+
+def classificar(scope) -> str:
+    """Classe de tráfego de uma requisição ASGI, pelo método, caminho e query string"""
+    metodo = scope.get("method", "GET")
+    caminho = scope.get("path", "").rstrip("/")
+    if caminho.startswith("/api/v1/auth/") or (metodo == "POST" and caminho == "/api/v1/usuarios"):
+        return AUTH
+    if caminho.startswith("/api/v1/exports") or caminho.endswith("/export"):
+        return LOTE
+    if caminho == "/api/v1/emprestimos" and _status_consultado(scope.get("query_string", b"")) == "todos":
+        return LOTE
+    return INTERATIVO
+
+
+def classe_atual() -> str:
+    return _classe_atual.get()
+
+
+@contextmanager
+def usar_classe(classe: str):
+    token = _classe_atual.set(classe)
+    try:
+        yield
+    finally:
+        _classe_atual.reset(token)
+
+
+def limite_de_concorrencia(classe: str) -> int:
+    """BULKHEAD_LIMIT_<CLASSE>; <= 0 deixa a classe sem limite"""
+    return int(os.getenv(f"BULKHEAD_LIMIT_{classe.upper()}", str(_PADROES[classe][0])))
+
+
+def tamanho_do_pool(classe: str) -> tuple[int, int]:
+    """(pool_size, max_overflow) via DB_POOL_SIZE_<CLASSE> e DB_MAX_OVERFLOW_<CLASSE>"""
+    _, tamanho, excedente, _ = _PADROES[classe]
+    return (
+        int(os.getenv(f"DB_POOL_SIZE_{classe.upper()}", str(tamanho))),
+        int(os.getenv(f"DB_MAX_OVERFLOW_{classe.upper()}", str(excedente))),
+    )
+
+
+def prazo_padrao_ms(classe: str) -> float:
+    """DEADLINE_MS_<CLASSE>; <= 0 deixa a classe sem prazo (o cabeçalho ainda pode definir um)"""
+    return float(os.getenv(f"DEADLINE_MS_{classe.upper()}", str(_PADROES[classe][3])))
+
+
+def ajustar_threadpool() -> int:
+    """Garante ao threadpool do anyio threads para a soma dos limites das classes
+
+    O FastAPI executa endpoints síncronos sempre no limitador padrão; com ele dimensionado
+    para a soma, o limite de cada classe vira uma fatia reservada de threads. Precisa ser
+    chamado dentro do event loop (lifespan).
+    """
+    from anyio.to_thread import current_default_thread_limiter
+
+    limitador = current_default_thread_limiter()
+    limites = [limite_de_concorrencia(classe) for classe in CLASSES]
+    if all(limite > 0 for limite in limites):
+        limitador.total_tokens = max(limitador.total_tokens, sum(limites))
+    return limitador.total_tokens
@@ -0,0 +1,62 @@
+import logging
+import os
+from functools import lru_cache
+from src.domain.ports.export_jobs import ExportJobStorePort, ExportQueuePort
+from src.infrastructure.exports.store import InMemoryExportJobStore, RedisExportJobStore
+from src.infrastructure.exports.queue import LocalExportQueue, RedisExportQueue
+from src.infrastructure.exports.writer import ExportWriter
+
+logger = logging.getLogger(__name__)
+
+EXPORTS_DIR = os.getenv("EXPORTS_DIR", "exports")
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+EXPORT_QUEUE = os.getenv("EXPORT_QUEUE", "local").lower()
+EXPORT_QUEUE_MAX = int(os.getenv("EXPORT_QUEUE_MAX", "100"))
+EXPORT_JOB_TTL_SECONDS = int(os.getenv("EXPORT_JOB_TTL_SECONDS", "86400"))
+# Sem renovação do lease por esse tempo, um job em execução volta à fila Redis
+EXPORT_VISIBILITY_TIMEOUT_SECONDS = int(os.getenv("EXPORT_VISIBILITY_TIMEOUT_SECONDS", "60"))
+
+
+class ExportManager:
+    """Agrupa o armazenamento dos jobs, a fila e o gerador de arquivos"""
+
+    def __init__(self, store: ExportJobStorePort, fila: ExportQueuePort, writer: ExportWriter):
+        self.store = store
+        self.fila = fila
+        self.writer = writer
+
+    def iniciar(self) -> None:
+        self.fila.iniciar()
+
+    def parar(self) -> None:
+        self.fila.parar()
+
+
+def criar_export_manager(
+    backend: str = EXPORT_QUEUE,
+    diretorio: str = EXPORTS_DIR,
+    workers: int = EXPORT_WORKERS,
+    limite: int = EXPORT_QUEUE_MAX,
+    client=None,
+) -> ExportManager:
+    if backend == "redis":
+        if client is None:
+            from src.infrastructure.cache.redis_client import get_redis_client
+            client = get_redis_client()
+        if client is not None:
+            store = RedisExportJobStore(client, EXPORT_JOB_TTL_SECONDS)
+            writer = ExportWriter(diretorio, store, ttl_segundos=EXPORT_JOB_TTL_SECONDS)
+            fila = RedisExportQueue(
+                client, writer.executar, workers, limite, visibilidade_segundos=EXPORT_VISIBILITY_TIMEOUT_SECONDS
+            )
+            return ExportManager(store, fila, writer)
+        logger.warning("EXPORT_QUEUE=redis sem Redis disponível; usando fila local")
+
+    store = InMemoryExportJobStore(EXPORT_JOB_TTL_SECONDS)
+    writer = ExportWriter(diretorio, store, ttl_segundos=EXPORT_JOB_TTL_SECONDS)
+    return ExportManager(store, LocalExportQueue(writer.executar, workers, limite), writer)
+
+
+@lru_cache(maxsize=1)
+def get_export_manager() -> ExportManager:
+    return criar_export_manager()
@@ -0,0 +1,213 @@
+import logging
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable
+from src.domain.exceptions import FilaDeExportacaoCheiaException
+from src.infrastructure.monitoring.metrics import record_redis_command
+
+logger = logging.getLogger(__name__)
+
+
+class _Workers(ABC):
+    """Conjunto fixo de threads consumidoras; limita quantas exportações rodam ao mesmo tempo"""
+
+    def __init__(self, executar: Callable[[str], None], workers: int):
+        self._executar = executar
+        self.workers = max(1, workers)
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _executar_job(self, job_id: str) -> None:
+        try:
+            self._executar(job_id)
+        except Exception as e:
+            logger.error(f"Erro inesperado no worker de exportação ({job_id}): {e}")
+
+    def iniciar(self) -> None:
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._consumir, name=f"export-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    @abstractmethod
+    def enfileirar(self, job_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def parar(self, timeout: float = 5.0) -> None:
+        ...
+
+    @abstractmethod
+    def _consumir(self) -> None:
+        """Laço de cada thread: retira jobs e os executa até a fila ser parada"""
+
+
+class LocalExportQueue(_Workers):
+    """Fila em memória do processo com capacidade limitada"""
+
+    def __init__(self, executar: Callable[[str], None], workers: int, limite: int):
+        super().__init__(executar, workers)
+        self.limite = limite
+        self._fila: queue.Queue = queue.Queue(maxsize=limite)
+
+    def enfileirar(self, job_id: str) -> None:
+        self.iniciar()
+        try:
+            self._fila.put_nowait(job_id)
+        except queue.Full:
+            raise FilaDeExportacaoCheiaException(self.limite)
+
+    def _consumir(self) -> None:
+        while True:
+            job_id = self._fila.get()
+            try:
+                if job_id is None:
+                    return
+                self._executar_job(job_id)
+            finally:
+                self._fila.task_done()
+
+    def aguardar(self) -> None:
+        """Bloqueia até que todos os jobs enfileirados terminem"""
+        self._fila.join()
+
+    def parar(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._fila.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+
+def _texto(valor) -> str:
+    return valor.decode() if isinstance(valor, bytes) else valor
+
+
+class RedisExportQueue(_Workers):
+    """Fila em lista Redis: qualquer processo enfileira e os workers de todos os processos consomem
+
+    O job sai da fila com BLMOVE para a lista de processamento e só é removido de lá ao
+    terminar; enquanto roda, o worker renova um lease com TTL de visibilidade_segundos.
+    Jobs na lista de processamento vistos sem lease em duas varreduras seguidas (o worker
+    morreu) voltam ao início da fila. A segunda varredura cobre o instante entre o BLMOVE
+    e a gravação do lease.
+    """
+
+    CHAVE = "{exports}:fila"
+    PROCESSANDO = "{exports}:processando"
+
+    def __init__(
+        self,
+        client,
+        executar: Callable[[str], None],
+        workers: int,
+        limite: int,
+        timeout_bloqueio: int = 1,
+        visibilidade_segundos: int = 60,
+    ):
+        super().__init__(executar, workers)
+        # Todas as chaves usam a hash tag {exports}: com Redis fragmentado, fala direto com o nó
+        self.client = client.client_for_key(self.CHAVE) if hasattr(client, "client_for_key") else client
+        self.limite = limite
+        self.timeout_bloqueio = timeout_bloqueio
+        self.visibilidade_segundos = visibilidade_segundos
+        self._parar = threading.Event()
+        self._recuperacao = threading.Lock()
+        self._ultima_recuperacao = float("-inf")
+        self._sem_lease: set[str] = set()
+
+    @staticmethod
+    def chave_lease(job_id: str) -> str:
+        return f"{{exports}}:lease:{job_id}"
+
+    def enfileirar(self, job_id: str) -> None:
+        record_redis_command()
+        if self.client.llen(self.CHAVE) >= self.limite:
+            raise FilaDeExportacaoCheiaException(self.limite)
+        record_redis_command()
+        self.client.rpush(self.CHAVE, job_id)
+
+    def iniciar(self) -> None:
+        self._parar.clear()
+        super().iniciar()
+
+    def _consumir(self) -> None:
+        while not self._parar.is_set():
+            try:
+                self._recuperar_periodicamente()
+                job_id = self.client.blmove(self.CHAVE, self.PROCESSANDO, self.timeout_bloqueio, "LEFT", "RIGHT")
+            except Exception as e:
+                logger.warning(f"Falha ao ler fila de exportação no Redis: {e}")
+                self._parar.wait(self.timeout_bloqueio)
+                continue
+            if job_id:
+                self._executar_com_lease(_texto(job_id))
+
+    def _executar_com_lease(self, job_id: str) -> None:
+        lease = self.chave_lease(job_id)
+        terminou = threading.Event()
+
+        def renovar():
+            while not terminou.wait(self.visibilidade_segundos / 3):
+                try:
+                    record_redis_command()
+                    self.client.expire(lease, self.visibilidade_segundos)
+                except Exception as e:
+                    logger.warning(f"Falha ao renovar lease da exportação {job_id}: {e}")
+
+        try:
+            record_redis_command()
+            self.client.set(lease, "1", ex=self.visibilidade_segundos)
+            threading.Thread(target=renovar, name=f"export-lease-{job_id}", daemon=True).start()
+            self._executar_job(job_id)
+        finally:
+            terminou.set()
+            try:
+                record_redis_command()
+                self.client.lrem(self.PROCESSANDO, 1, job_id)
+                record_redis_command()
+                self.client.delete(lease)
+            except Exception as e:
+                # Sem o lease o job volta à fila e o writer o ignora se já estiver concluído
+                logger.warning(f"Falha ao confirmar a exportação {job_id}: {e}")
+
+    def _recuperar_periodicamente(self) -> None:
+        agora = time.monotonic()
+        if agora - self._ultima_recuperacao < self.visibilidade_segundos / 2:
+            return
+        self._ultima_recuperacao = agora
+        self.recuperar()
+
+    def recuperar(self) -> int:
+        """Devolve à fila os jobs em processamento cujo lease expirou; devolve quantos"""
+        with self._recuperacao:
+            record_redis_command()
+            em_processamento = {_texto(j) for j in self.client.lrange(self.PROCESSANDO, 0, -1)}
+            sem_lease = set()
+            for job_id in em_processamento:
+                record_redis_command()
+                if not self.client.exists(self.chave_lease(job_id)):
+                    sem_lease.add(job_id)
+            recuperados = 0
+            for job_id in sem_lease & self._sem_lease:
+                # LREM decide qual processo devolve o job quando vários varrem ao mesmo tempo
+                record_redis_command()
+                if self.client.lrem(self.PROCESSANDO, 1, job_id):
+                    record_redis_command()
+                    self.client.lpush(self.CHAVE, job_id)
+                    recuperados += 1
+                    logger.warning(f"Exportação {job_id} devolvida à fila: worker parou de renovar o lease")
+            self._sem_lease = sem_lease - self._sem_lease
+            return recuperados
+
+    def parar(self, timeout: float = 5.0) -> None:
+        self._parar.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
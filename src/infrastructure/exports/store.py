@@ -0,0 +1,81 @@
+import json
+import threading
+import time
+from dataclasses import asdict, replace
+from datetime import datetime
+from typing import Optional
+from src.domain.model.export_job import ExportJob
+from src.domain.enums.export_status import ExportStatus
+from src.infrastructure.monitoring.metrics import record_redis_command
+
+
+def _serializar(job: ExportJob) -> str:
+    dados = asdict(job)
+    dados["status"] = job.status.value
+    dados["criado_em"] = job.criado_em.isoformat()
+    dados["concluido_em"] = job.concluido_em.isoformat() if job.concluido_em else None
+    return json.dumps(dados)
+
+
+def _desserializar(valor: str | bytes) -> ExportJob:
+    dados = json.loads(valor)
+    dados["status"] = ExportStatus(dados["status"])
+    dados["criado_em"] = datetime.fromisoformat(dados["criado_em"])
+    if dados["concluido_em"]:
+        dados["concluido_em"] = datetime.fromisoformat(dados["concluido_em"])
+    return ExportJob(**dados)
+
+
+class InMemoryExportJobStore:
+    """Jobs mantidos no processo; adequado a um único worker da API
+
+    Como no Redis, cada job expira ttl_seconds depois da última gravação; os expirados
+    são descartados a cada salvar.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds
+        self._jobs: dict[str, ExportJob] = {}
+        self._expira_em: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def salvar(self, job: ExportJob) -> None:
+        agora = time.monotonic()
+        with self._lock:
+            self._remover_expirados(agora)
+            self._jobs[job.id] = replace(job)
+            if self.ttl_seconds:
+                self._expira_em[job.id] = agora + self.ttl_seconds
+
+    def buscar(self, job_id: str) -> ExportJob | None:
+        with self._lock:
+            if self._expira_em.get(job_id, float("inf")) <= time.monotonic():
+                return None
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    def _remover_expirados(self, agora: float) -> None:
+        for job_id in [j for j, expira_em in self._expira_em.items() if expira_em <= agora]:
+            del self._jobs[job_id]
+            del self._expira_em[job_id]
+
+
+class RedisExportJobStore:
+    """Jobs em Redis, visíveis a todos os processos da API e dos workers"""
+
+    def __init__(self, client, ttl_seconds: int):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def chave(job_id: str) -> str:
+        return f"exports:job:{job_id}"
+
+    def salvar(self, job: ExportJob) -> None:
+        record_redis_command()
+        self.client.setex(self.chave(job.id), self.ttl_seconds, _serializar(job))
+
+    def buscar(self, job_id: str) -> ExportJob | None:
+        record_redis_command()
+        valor = self.client.get(self.chave(job_id))
+        return _desserializar(valor) if valor else None
@@ -0,0 +1,131 @@
+import gzip
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+from src.domain.model.export_job import ExportJob
+from src.domain.enums.export_status import ExportStatus
+from src.domain.enums.emprestimo_status import EmprestimoStatus
+from src.domain.ports.export_jobs import ExportJobStorePort
+from src.infrastructure.persistence.repository.livro_repository import LivroRepository
+from src.infrastructure.persistence.repository.pessoa_repository import PessoaRepository
+from src.infrastructure.persistence.repository.emprestimo_repository import EmprestimoRepository
+from src.presentation.exporters import em_blocos, gerador_para, registros_exportados
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 1000
+# Intervalo mínimo entre duas varreduras do diretório atrás de arquivos expirados
+INTERVALO_LIMPEZA_SEGUNDOS = 60
+
+
+def _sessao_padrao():
+    from src.infrastructure.config.db import database
+    from src.infrastructure.config.traffic_classes import LOTE
+    return database.sessao_para(LOTE)
+
+
+class ExportWriter:
+    """Gera o arquivo de um job em disco (gzip), lendo o banco em lotes por cursor no servidor"""
+
+    def __init__(
+        self,
+        diretorio: str | Path,
+        store: ExportJobStorePort,
+        session_factory: Optional[Callable[[], object]] = None,
+        ttl_segundos: Optional[int] = None,
+    ):
+        self.diretorio = Path(diretorio)
+        self.store = store
+        self._session_factory = session_factory or _sessao_padrao
+        self.ttl_segundos = ttl_segundos
+        self._ultima_limpeza = float("-inf")
+
+    def caminho(self, job: ExportJob) -> Path:
+        return self.diretorio / f"{job.id}.{job.formato}.gz"
+
+    def _fonte(self, db, job: ExportJob) -> tuple[Iterator, int]:
+        if job.recurso == "livros":
+            repo = LivroRepository(db)
+            return repo.iterar(TAMANHO_LOTE), repo.contar()
+        if job.recurso == "pessoas":
+            repo = PessoaRepository(db)
+            return repo.iterar(TAMANHO_LOTE), repo.contar()
+        status = EmprestimoStatus(job.filtro or EmprestimoStatus.ATIVOS.value)
+        repo = EmprestimoRepository(db)
+        return repo.iterar(status, TAMANHO_LOTE), repo.contar(status)
+
+    def _contar(self, registros: Iterator, job: ExportJob) -> Iterator:
+        for registro in registros:
+            yield registro
+            job.linhas += 1
+            if job.linhas % TAMANHO_LOTE == 0:
+                self.store.salvar(job)
+
+    def limpar(self, agora: Optional[float] = None) -> int:
+        """Remove arquivos (e parciais abandonados) mais velhos que ttl_segundos; devolve quantos"""
+        if not self.ttl_segundos or not self.diretorio.exists():
+            return 0
+        limite = (agora or time.time()) - self.ttl_segundos
+        removidos = 0
+        for arquivo in self.diretorio.glob("*.gz*"):
+            try:
+                if arquivo.stat().st_mtime < limite:
+                    arquivo.unlink()
+                    removidos += 1
+            except FileNotFoundError:
+                continue
+        if removidos:
+            logger.info(f"{removidos} arquivo(s) de exportação expirado(s) removido(s)")
+        return removidos
+
+    def _limpar_periodicamente(self) -> None:
+        agora = time.monotonic()
+        if agora - self._ultima_limpeza < INTERVALO_LIMPEZA_SEGUNDOS:
+            return
+        self._ultima_limpeza = agora
+        try:
+            self.limpar()
+        except OSError as e:
+            logger.warning(f"Falha ao limpar exportações expiradas: {e}")
+
+    def executar(self, job_id: str) -> None:
+        self._limpar_periodicamente()
+        job = self.store.buscar(job_id)
+        # EXECUTANDO só chega aqui quando a fila devolve o job de um worker que morreu
+        if job is None or job.status not in (ExportStatus.PENDENTE, ExportStatus.EXECUTANDO):
+            return
+
+        job.status = ExportStatus.EXECUTANDO
+        job.linhas = 0
+        self.store.salvar(job)
+
+        destino = self.caminho(job)
+        parcial = destino.with_name(destino.name + ".part")
+        db = self._session_factory()
+        try:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            registros, job.total = self._fonte(db, job)
+            self.store.salvar(job)
+
+            # Mesmos DTOs, geradores e blocos do download em streaming
+            modelos, campos = registros_exportados(job.recurso, self._contar(registros, job))
+            with gzip.open(parcial, "wb") as arquivo:
+                for bloco in em_blocos(gerador_para(job.formato)(modelos, campos)):
+                    arquivo.write(bloco)
+            os.replace(parcial, destino)
+
+            job.status = ExportStatus.CONCLUIDO
+            job.arquivo = str(destino)
+            job.bytes = destino.stat().st_size
+        except Exception as e:
+            logger.exception(f"Falha na exportação {job.id} ({job.recurso})")
+            job.status = ExportStatus.FALHOU
+            job.erro = f"{e.__class__.__name__}: {e}"
+            parcial.unlink(missing_ok=True)
+        finally:
+            db.close()
+            job.concluido_em = datetime.now(timezone.utc)
+            self.store.salvar(job)
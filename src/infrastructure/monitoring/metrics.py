@@ -1,6 +1,12 @@
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import Counter, Histogram, Gauge, CONTENT_TYPE_LATEST
 from fastapi import Response
+from starlette.routing import Match
 import time
+from src.infrastructure.monitoring.multiprocess import ExposicaoEmCache
+
+# Rótulo das requisições que não casam com nenhuma rota (404, varreduras), evitando um série por caminho
+ROTA_NAO_ENCONTRADA = "unmatched"
+BUCKETS_TAMANHO = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
 
 # Métricas de HTTP (Automáticas)
 http_requests_total = Counter(
@@ -15,13 +21,45 @@ http_request_duration_seconds = Histogram(
     ['method', 'route']
 )
 
+http_requests_in_progress = Gauge(
+    'http_requests_in_progress',
+    'Requisições HTTP em andamento',
+    ['method'],
+    multiprocess_mode='livesum'
+)
+
+http_request_size_bytes = Histogram(
+    'http_request_size_bytes',
+    'Tamanho do corpo das requisições HTTP em bytes',
+    ['method', 'route'],
+    buckets=BUCKETS_TAMANHO
+)
+
+http_response_size_bytes = Histogram(
+    'http_response_size_bytes',
+    'Tamanho do corpo das respostas HTTP em bytes',
+    ['method', 'route'],
+    buckets=BUCKETS_TAMANHO
+)
+
+http_requests_coalesced_total = Counter(
+    'http_requests_coalesced_total',
+    'Total de requisições GET atendidas pela resposta de uma requisição idêntica em andamento'
+)
+
+http_compression_total = Counter(
+    'http_compression_total',
+    'Respostas comprimidas, por codificação e uso do cache de corpos comprimidos',
+    ['encoding', 'cache']
+)
+
 # Métricas de cache Redis
 redis_cache_hits_total = Counter('redis_cache_hits_total', 'Total de hits no cache Redis')
 redis_cache_misses_total = Counter('redis_cache_misses_total', 'Total de misses no cache Redis')
 redis_commands_total = Counter('redis_commands_total', 'Total de comandos Redis executados')
 
 # Métricas de banco de dados
-db_connections_active = Gauge('db_connections_active', 'Conexões ativas com o banco')
+db_connections_active = Gauge('db_connections_active', 'Conexões ativas com o banco', multiprocess_mode='livesum')
 db_query_duration_seconds = Histogram(
     'db_query_duration_seconds',
     'Duração das queries em segundos',
@@ -36,48 +74,145 @@ http_errors_total = Counter(
 )
 
 # Métricas de performance da aplicação
-app_memory_usage_bytes = Gauge('app_memory_usage_bytes', 'Uso de memória da aplicação em bytes')
-app_cpu_usage_percent = Gauge('app_cpu_usage_percent', 'Uso de CPU da aplicação em percentual')
+# Em modo multiprocesso, gauges "live" somam apenas workers vivos (ver marcar_processo_encerrado)
+app_memory_usage_bytes = Gauge('app_memory_usage_bytes', 'Uso de memória da aplicação em bytes', multiprocess_mode='livesum')
+app_cpu_usage_percent = Gauge('app_cpu_usage_percent', 'Uso de CPU da aplicação em percentual', multiprocess_mode='livesum')
+app_cpu_seconds = Gauge('app_cpu_seconds', 'Tempo de CPU consumido pelo processo em segundos', multiprocess_mode='livesum')
+app_open_fds = Gauge('app_open_fds', 'Descritores de arquivo abertos', multiprocess_mode='livesum')
+app_gc_collections_total = Counter('app_gc_collections_total', 'Coletas do garbage collector', ['generation'])
+app_gc_pause_seconds = Histogram(
+    'app_gc_pause_seconds',
+    'Duração das pausas do garbage collector em segundos',
+    ['generation'],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+)
+app_threadpool_busy_threads = Gauge('app_threadpool_busy_threads', 'Threads do threadpool (anyio) ocupadas', multiprocess_mode='livesum')
+app_threadpool_capacity = Gauge('app_threadpool_capacity', 'Capacidade do threadpool (anyio)', multiprocess_mode='livesum')
+app_threadpool_waiting_tasks = Gauge('app_threadpool_waiting_tasks', 'Tarefas aguardando uma thread do threadpool (anyio)', multiprocess_mode='livesum')
+app_event_loop_lag_seconds = Histogram(
+    'app_event_loop_lag_seconds',
+    'Atraso do event loop em relação ao agendado, em segundos',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+db_pool_wait_seconds = Histogram(
+    'db_pool_wait_seconds',
+    'Espera por uma conexão do pool do banco, em segundos',
+    ['pool'],
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+http_requests_shed_total = Counter(
+    'http_requests_shed_total',
+    'Requisições recusadas pelo controle de admissão (503)',
+    ['reason']
+)
+bulkhead_in_flight = Gauge(
+    'bulkhead_in_flight',
+    'Requisições em andamento por classe de tráfego',
+    ['classe'],
+    multiprocess_mode='livesum'
+)
+bulkhead_queue_wait_seconds = Histogram(
+    'bulkhead_queue_wait_seconds',
+    'Espera por uma vaga no bulkhead da classe de tráfego, em segundos',
+    ['classe'],
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+bulkhead_rejected_total = Counter(
+    'bulkhead_rejected_total',
+    'Requisições recusadas (503) por falta de vaga no bulkhead da classe',
+    ['classe']
+)
+work_cancelled_total = Counter(
+    'work_cancelled_total',
+    'Trabalho interrompido por prazo esgotado ou desconexão do cliente (stage: request, db ou cache)',
+    ['reason', 'stage']
+)
+app_log_records_dropped_total = Counter(
+    'app_log_records_dropped_total',
+    'Registros de log descartados (reason: backpressure ou sampled)',
+    ['reason']
+)
+
+def resolver_rota(scope) -> str:
+    """Template da rota atendida (ex.: /api/v1/pessoas/{pessoa_id}) para usar como rótulo"""
+    rota = scope.get('route')
+    if rota is not None and getattr(rota, 'path', None):
+        return rota.path
+
+    # Versões do Starlette que não publicam scope['route']: casa o caminho com as rotas do app
+    router = getattr(scope.get('app'), 'router', None)
+    parcial = None
+    for candidata in getattr(router, 'routes', ()):
+        path = getattr(candidata, 'path', None)
+        if path is None:
+            continue
+        match, _ = candidata.matches(scope)
+        if match == Match.FULL:
+            return path
+        if match == Match.PARTIAL and parcial is None:
+            parcial = path
+    return parcial or ROTA_NAO_ENCONTRADA
 
 class MetricsMiddleware:
-    """Middleware para coletar métricas automáticas das requisições HTTP"""
+    """Middleware para coletar métricas automáticas das requisições HTTP
+
+    Rotula pelo template da rota (não pelo caminho bruto), captura o status real
+    na mensagem http.response.start e mede com relógio monotônico.
+    """
     
     def __init__(self, app):
         self.app = app
     
     async def __call__(self, scope, receive, send):
-        if scope['type'] == 'http':
-            start_time = time.time()
-            
-            # Capturar método e rota
-            method = scope['method']
-            route = scope.get('path', 'unknown')
-            
-            # Processar a requisição
+        if scope['type'] != 'http':
             await self.app(scope, receive, send)
-            
-            # Calcular duração
-            duration = time.time() - start_time
-            
-            # Determinar status code (simplificado)
-            status_code = 200  # Por padrão, assumimos sucesso
-            
-            # Incrementar contadores
+            return
+
+        method = scope['method']
+        status_code = 500
+        bytes_recebidos = 0
+        bytes_enviados = 0
+
+        async def receive_contando():
+            nonlocal bytes_recebidos
+            message = await receive()
+            if message['type'] == 'http.request':
+                bytes_recebidos += len(message.get('body', b''))
+            return message
+
+        async def send_capturando(message):
+            nonlocal status_code, bytes_enviados
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            elif message['type'] == 'http.response.body':
+                bytes_enviados += len(message.get('body', b''))
+            await send(message)
+
+        em_andamento = http_requests_in_progress.labels(method=method)
+        em_andamento.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive_contando, send_capturando)
+        finally:
+            duration = time.perf_counter() - start_time
+            em_andamento.dec()
+            route = resolver_rota(scope)
+
             http_requests_total.labels(method=method, route=route, status_code=status_code).inc()
             http_request_duration_seconds.labels(method=method, route=route).observe(duration)
-            
-            # Registrar erros se aplicável
+            http_request_size_bytes.labels(method=method, route=route).observe(bytes_recebidos)
+            http_response_size_bytes.labels(method=method, route=route).observe(bytes_enviados)
+
             if status_code >= 400:
                 error_type = 'client_error' if status_code < 500 else 'server_error'
-                http_errors_total.labels(method=method, route=route, status_code=status_code, error_type=error_type).inc()
-        
-        else:
-            await self.app(scope, receive, send)
+                record_http_error(method, route, status_code, error_type)
+
+_exposicao = ExposicaoEmCache()
 
 def get_metrics():
-    """Retorna as métricas no formato Prometheus"""
+    """Retorna as métricas no formato Prometheus (agregadas entre workers em modo multiprocesso)"""
     return Response(
-        content=generate_latest(),
+        content=_exposicao.obter(),
         media_type=CONTENT_TYPE_LATEST
     )
 
@@ -93,6 +228,14 @@ def record_redis_command():
     """Registra um comando Redis"""
     redis_commands_total.inc()
 
+def record_request_coalesced():
+    """Registra uma requisição atendida por coalescência"""
+    http_requests_coalesced_total.inc()
+
+def record_compression(encoding: str, cache: str):
+    """Registra uma resposta comprimida (cache: hit, miss ou bypass)"""
+    http_compression_total.labels(encoding=encoding, cache=cache).inc()
+
 def record_db_operation(operation: str, table: str, duration: float):
     """Registra uma operação de banco de dados"""
     db_query_duration_seconds.labels(operation=operation, table=table).observe(duration)
@@ -104,4 +247,57 @@ def record_http_error(method: str, route: str, status_code: int, error_type: str
 def update_app_metrics(memory_bytes: int, cpu_percent: float):
     """Atualiza métricas da aplicação (memória, CPU)"""
     app_memory_usage_bytes.set(memory_bytes)
-    app_cpu_usage_percent.set(cpu_percent) 
\ No newline at end of file
+    app_cpu_usage_percent.set(cpu_percent) 
+
+def update_runtime_metrics(cpu_seconds: float, open_fds: int | None):
+    """Atualiza tempo de CPU e descritores abertos do processo"""
+    app_cpu_seconds.set(cpu_seconds)
+    if open_fds is not None:
+        app_open_fds.set(open_fds)
+
+def update_threadpool_metrics(busy: float, capacity: float, waiting: int):
+    """Atualiza a ocupação do threadpool usado pelos endpoints síncronos"""
+    app_threadpool_busy_threads.set(busy)
+    app_threadpool_capacity.set(capacity)
+    app_threadpool_waiting_tasks.set(waiting)
+
+def record_gc_pause(generation: int, duration: float):
+    """Registra uma coleta do garbage collector e sua duração"""
+    app_gc_collections_total.labels(generation=str(generation)).inc()
+    app_gc_pause_seconds.labels(generation=str(generation)).observe(duration)
+
+def record_event_loop_lag(lag: float):
+    """Registra o atraso do event loop"""
+    app_event_loop_lag_seconds.observe(lag)
+
+def record_log_dropped(reason: str):
+    """Registra um registro de log descartado (fila cheia ou amostragem)"""
+    app_log_records_dropped_total.labels(reason=reason).inc()
+
+def record_db_pool_wait(pool: str, duration: float):
+    """Registra a espera por um checkout no pool do banco"""
+    db_pool_wait_seconds.labels(pool=pool).observe(duration)
+
+def record_request_shed(reason: str):
+    """Registra uma requisição recusada pelo controle de admissão"""
+    http_requests_shed_total.labels(reason=reason).inc()
+
+def record_bulkhead_wait(classe: str, duration: float):
+    """Registra a espera por uma vaga no bulkhead"""
+    bulkhead_queue_wait_seconds.labels(classe=classe).observe(duration)
+
+def record_bulkhead_rejected(classe: str):
+    """Registra uma requisição recusada pelo bulkhead"""
+    bulkhead_rejected_total.labels(classe=classe).inc()
+
+def record_bulkhead_enter(classe: str):
+    """Registra a entrada de uma requisição no bulkhead"""
+    bulkhead_in_flight.labels(classe=classe).inc()
+
+def record_bulkhead_exit(classe: str):
+    """Registra a saída de uma requisição do bulkhead"""
+    bulkhead_in_flight.labels(classe=classe).dec()
+
+def record_work_cancelled(reason: str, stage: str):
+    """Registra trabalho cancelado por prazo esgotado ou desconexão"""
+    work_cancelled_total.labels(reason=reason, stage=stage).inc()
@@ -0,0 +1,132 @@
+import fcntl
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+from prometheus_client import CollectorRegistry, generate_latest, multiprocess
+from prometheus_client.mmap_dict import MmapedDict
+
+logger = logging.getLogger(__name__)
+
+METRICS_CACHE_SECONDS = float(os.getenv("METRICS_CACHE_SECONDS", "1"))
+
+# Tipos cujos valores o coletor soma entre processos: os arquivos de workers encerrados
+# podem ser fundidos num único arquivo agregado sem mudar a exposição
+TIPOS_ACUMULADOS = ("counter", "histogram", "summary")
+SUFIXO_AGREGADO = "encerrados"
+ARQUIVO_DE_LOCK = ".compactacao.lock"
+
+
+def diretorio_multiprocesso() -> Optional[str]:
+    """Diretório compartilhado dos arquivos mmap; definido, ativa o modo multiprocesso
+
+    O prometheus_client decide o modo ao criar a primeira métrica, então a variável
+    precisa estar no ambiente antes de o processo importar as métricas.
+    """
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get("prometheus_multiproc_dir")
+
+
+def preparar_diretorio(diretorio: str) -> None:
+    """Cria o diretório e remove arquivos de execuções anteriores (chamar no processo mestre, antes dos workers)"""
+    caminho = Path(diretorio)
+    caminho.mkdir(parents=True, exist_ok=True)
+    for arquivo in caminho.glob("*.db"):
+        arquivo.unlink(missing_ok=True)
+
+
+@contextmanager
+def _lock_do_diretorio(diretorio: str, exclusivo: bool):
+    """Lock entre processos: a compactação (exclusiva) não troca arquivos no meio de uma coleta (compartilhada)"""
+    with open(os.path.join(diretorio, ARQUIVO_DE_LOCK), "a") as arquivo:
+        fcntl.flock(arquivo, fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+
+def compactar_processo_encerrado(pid: int, diretorio: Optional[str] = None) -> int:
+    """Funde os contadores/histogramas de um worker já encerrado no arquivo agregado e remove os dele
+
+    Sem isso cada reciclagem (MAX_REQUESTS) deixa arquivos por pid para trás e cada
+    scrape relê todos eles. Só pode ser chamada depois que o processo terminou, já
+    que ele não pode mais escrever nos arquivos. Retorna quantos arquivos foram removidos.
+    """
+    diretorio = diretorio or diretorio_multiprocesso()
+    if not diretorio:
+        return 0
+    removidos = 0
+    with _lock_do_diretorio(diretorio, exclusivo=True):
+        for tipo in TIPOS_ACUMULADOS:
+            arquivo = Path(diretorio) / f"{tipo}_{pid}.db"
+            if not arquivo.exists():
+                continue
+            agregado = Path(diretorio) / f"{tipo}_{SUFIXO_AGREGADO}.db"
+            totais: dict[str, float] = {}
+            for origem in (agregado, arquivo):
+                if origem.exists():
+                    for chave, valor, _, _ in MmapedDict.read_all_values_from_file(str(origem)):
+                        totais[chave] = totais.get(chave, 0.0) + valor
+
+            # Grava ao lado e troca com os.replace: uma falha no meio não corrompe o agregado
+            temporario = agregado.with_name(agregado.name + ".tmp")
+            temporario.unlink(missing_ok=True)
+            destino = MmapedDict(str(temporario))
+            try:
+                for chave, valor in totais.items():
+                    destino.write_value(chave, valor, 0.0)
+            finally:
+                destino.close()
+            os.replace(temporario, agregado)
+            arquivo.unlink()
+            removidos += 1
+    return removidos
+
+
+def marcar_processo_encerrado(pid: Optional[int] = None) -> None:
+    """Remove os arquivos de gauges "live" de um worker encerrado, para que deixem de ser somados
+
+    Chamada pelo mestre com o pid de um worker que já terminou, também compacta os
+    arquivos de contadores e histogramas dele (ver compactar_processo_encerrado).
+    """
+    if not diretorio_multiprocesso():
+        return
+    try:
+        multiprocess.mark_process_dead(pid or os.getpid())
+        if pid is not None and pid != os.getpid():
+            compactar_processo_encerrado(pid)
+    except Exception as e:
+        logger.warning(f"Falha ao limpar métricas do processo {pid}: {e}")
+
+
+def gerar_exposicao() -> bytes:
+    """Exposição no formato texto: agrega todos os workers em modo multiprocesso"""
+    diretorio = diretorio_multiprocesso()
+    if diretorio:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        with _lock_do_diretorio(diretorio, exclusivo=False):
+            return generate_latest(registry)
+    return generate_latest()
+
+
+class ExposicaoEmCache:
+    """Reaproveita a última exposição por uma janela curta; scrapes frequentes não refazem a agregação"""
+
+    def __init__(self, gerar: Callable[[], bytes] = gerar_exposicao, janela_segundos: float = METRICS_CACHE_SECONDS):
+        self._gerar = gerar
+        self.janela_segundos = janela_segundos
+        self._conteudo: Optional[bytes] = None
+        self._gerado_em = 0.0
+        self._lock = threading.Lock()
+
+    def obter(self) -> bytes:
+        with self._lock:
+            agora = time.monotonic()
+            if self._conteudo is None or agora - self._gerado_em >= self.janela_segundos:
+                self._conteudo = self._gerar()
+                self._gerado_em = agora
+            return self._conteudo
@@ -0,0 +1,207 @@
+import asyncio
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN", "")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", "50"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "logs/profiles")
+
+_RAIZ_APLICACAO = str(Path(__file__).resolve().parents[2])
+
+
+def profiling_habilitado(token: str = PROFILING_ADMIN_TOKEN, taxa: float = PROFILING_SAMPLE_RATE) -> bool:
+    """Sem token e sem taxa de amostragem o middleware nem é montado (custo zero)"""
+    return bool(token) or taxa > 0
+
+
+def token_valido(recebido: Optional[str], token: str = PROFILING_ADMIN_TOKEN) -> bool:
+    return bool(token) and bool(recebido) and hmac.compare_digest(recebido.encode(), token.encode())
+
+
+@lru_cache(maxsize=8192)
+def _rotulo(codigo) -> str:
+    arquivo = codigo.co_filename
+    if arquivo.startswith(_RAIZ_APLICACAO):
+        arquivo = os.path.relpath(arquivo, os.path.dirname(_RAIZ_APLICACAO))
+    else:
+        arquivo = os.path.basename(arquivo)
+    return f"{codigo.co_name} ({arquivo})"
+
+
+class AmostradorDePilhas:
+    """Profiler estatístico: amostra as pilhas das threads em intervalos fixos
+
+    Endpoints síncronos rodam no threadpool e o cProfile só enxerga a thread em que foi
+    ativado; amostrar sys._current_frames() cobre o event loop e os workers de uma vez.
+    Só entram pilhas com ao menos um frame da aplicação (threads ociosas são ignoradas).
+    Em instâncias com requisições simultâneas, o perfil inclui as demais em andamento.
+    """
+
+    def __init__(self, intervalo_ms: float = PROFILING_INTERVAL_MS):
+        self.intervalo = intervalo_ms / 1000
+        self.pilhas: Counter[str] = Counter()
+        self.amostras = 0
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        self._thread = threading.Thread(target=self._executar, name="profiler", daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        """Bloqueia no máximo um intervalo de amostragem, enquanto a thread termina a última amostra"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def amostrar(self) -> None:
+        proprio = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == proprio:
+                continue
+            rotulos = []
+            da_aplicacao = False
+            while frame is not None:
+                rotulos.append(_rotulo(frame.f_code))
+                da_aplicacao = da_aplicacao or frame.f_code.co_filename.startswith(_RAIZ_APLICACAO)
+                frame = frame.f_back
+            if da_aplicacao:
+                self.pilhas[";".join(reversed(rotulos))] += 1
+        self.amostras += 1
+
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self.amostrar()
+
+
+class RepositorioDePerfis:
+    """Perfis gravados em disco como JSON (pilhas no formato "folded" dos flamegraphs)"""
+
+    def __init__(self, diretorio: str = PROFILE_DIR, maximo: int = PROFILING_MAX_FILES):
+        self.diretorio = Path(diretorio)
+        self.maximo = maximo
+
+    def salvar(self, perfil: dict) -> None:
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        caminho = self.diretorio / f"{perfil['id']}.json"
+        caminho.write_text(json.dumps(perfil, ensure_ascii=False), encoding="utf-8")
+        for antigo in self._arquivos()[self.maximo:]:
+            antigo.unlink(missing_ok=True)
+
+    def listar(self, limite: int = 20) -> list[dict]:
+        """Perfis mais recentes primeiro, sem as pilhas"""
+        resumos = []
+        for caminho in self._arquivos()[:limite]:
+            perfil = self._ler(caminho)
+            if perfil is not None:
+                perfil.pop("pilhas", None)
+                resumos.append(perfil)
+        return resumos
+
+    def obter(self, perfil_id: str) -> Optional[dict]:
+        try:
+            uuid.UUID(perfil_id)
+        except ValueError:
+            return None
+        return self._ler(self.diretorio / f"{perfil_id}.json")
+
+    def _arquivos(self) -> list[Path]:
+        if not self.diretorio.exists():
+            return []
+        return sorted(self.diretorio.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+
+    @staticmethod
+    def _ler(caminho: Path) -> Optional[dict]:
+        try:
+            return json.loads(caminho.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+
+def pilhas_folded(perfil: dict) -> str:
+    """Formato aceito por flamegraph.pl / speedscope: "a;b;c contagem" por linha"""
+    return "".join(f"{pilha} {contagem}\n" for pilha, contagem in perfil.get("pilhas", {}).items())
+
+
+class ProfilingMiddleware:
+    """Captura o perfil de uma requisição sob demanda
+
+    Dispara com o cabeçalho X-Profile contendo o token de administrador ou por amostragem
+    (PROFILING_SAMPLE_RATE). Um perfil por vez: com outro em andamento, a requisição
+    segue sem perfil. O id do perfil volta no cabeçalho X-Profile-Id.
+    """
+
+    def __init__(self, app, token: str = PROFILING_ADMIN_TOKEN, taxa: float = PROFILING_SAMPLE_RATE,
+                 repositorio: Optional[RepositorioDePerfis] = None, intervalo_ms: float = PROFILING_INTERVAL_MS):
+        self.app = app
+        self.token = token
+        self.taxa = taxa
+        self.repositorio = repositorio or RepositorioDePerfis()
+        self.intervalo_ms = intervalo_ms
+        self._em_andamento = threading.Lock()
+
+    def _gatilho(self, scope) -> Optional[str]:
+        if self.token:
+            for nome, valor in scope["headers"]:
+                if nome == b"x-profile":
+                    return "admin" if token_valido(valor.decode("latin-1"), self.token) else None
+        if self.taxa > 0 and random.random() < self.taxa:
+            return "amostragem"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        gatilho = self._gatilho(scope) if scope["type"] == "http" else None
+        if gatilho is None or not self._em_andamento.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        perfil_id = str(uuid.uuid4())
+        status_code = 500
+
+        async def send_com_perfil(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", perfil_id.encode())]
+            await send(message)
+
+        amostrador = AmostradorDePilhas(self.intervalo_ms)
+        inicio = time.perf_counter()
+        amostrador.iniciar()
+        try:
+            await self.app(scope, receive, send_com_perfil)
+        finally:
+            amostrador.parar()
+            self._em_andamento.release()
+            perfil = {
+                "id": perfil_id,
+                "criado_em": datetime.now(timezone.utc).isoformat(),
+                "gatilho": gatilho,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": status_code,
+                "duracao_ms": round((time.perf_counter() - inicio) * 1000, 1),
+                "intervalo_ms": self.intervalo_ms,
+                "amostras": amostrador.amostras,
+                "pilhas": dict(amostrador.pilhas.most_common()),
+            }
+            try:
+                await asyncio.to_thread(self.repositorio.salvar, perfil)
+            except OSError as e:
+                logger.warning(f"Falha ao gravar perfil {perfil_id}: {e}")
@@ -0,0 +1,126 @@
+import asyncio
+import gc
+import logging
+import os
+import time
+from collections import deque
+from typing import Optional
+from src.infrastructure.monitoring.metrics import (
+    update_app_metrics,
+    update_runtime_metrics,
+    update_threadpool_metrics,
+    record_gc_pause,
+    record_event_loop_lag,
+)
+
+logger = logging.getLogger(__name__)
+
+RUNTIME_SAMPLER_ENABLED = os.getenv("RUNTIME_SAMPLER_ENABLED", "true").lower() == "true"
+RUNTIME_SAMPLE_INTERVAL_SECONDS = float(os.getenv("RUNTIME_SAMPLE_INTERVAL_SECONDS", "5"))
+# Pausas do GC guardadas entre duas amostras; as mais antigas são descartadas se o amostrador atrasar
+_PAUSAS_PENDENTES_MAXIMO = 10000
+
+_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def memoria_residente() -> int:
+    """RSS atual em bytes; fora do Linux usa o pico reportado por getrusage"""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * _PAGINA
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == "darwin" else pico * 1024
+
+
+def descritores_abertos() -> Optional[int]:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+class RuntimeSampler:
+    """Amostra periodicamente recursos do processo e o atraso do event loop
+
+    Cada amostra custa algumas leituras de /proc; as pausas do GC são medidas por
+    callback em gc.callbacks, sem polling. O callback roda no meio de qualquer alocação,
+    inclusive com o lock (não reentrante) do prometheus_client já adquirido, então só
+    guarda a pausa numa deque; as métricas são atualizadas pela tarefa de amostragem.
+    """
+
+    def __init__(self, intervalo_segundos: float = RUNTIME_SAMPLE_INTERVAL_SECONDS):
+        self.intervalo_segundos = intervalo_segundos
+        self._tarefa: Optional[asyncio.Task] = None
+        self._gc_inicio: Optional[float] = None
+        self._pausas: deque[tuple[int, float]] = deque(maxlen=_PAUSAS_PENDENTES_MAXIMO)
+        self._cpu_anterior = time.process_time()
+        self._relogio_anterior = time.perf_counter()
+
+    def iniciar(self) -> None:
+        """Agenda a amostragem no event loop corrente e passa a medir as pausas do GC"""
+        if self._tarefa is not None:
+            return
+        gc.callbacks.append(self._medir_gc)
+        self._tarefa = asyncio.get_running_loop().create_task(self._executar())
+
+    async def parar(self) -> None:
+        if self._medir_gc in gc.callbacks:
+            gc.callbacks.remove(self._medir_gc)
+        self.registrar_pausas_do_gc()
+        if self._tarefa is None:
+            return
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._tarefa = None
+
+    def amostrar(self) -> None:
+        cpu = time.process_time()
+        relogio = time.perf_counter()
+        decorrido = relogio - self._relogio_anterior
+        percentual = (cpu - self._cpu_anterior) / decorrido * 100 if decorrido > 0 else 0.0
+        self._cpu_anterior, self._relogio_anterior = cpu, relogio
+
+        update_app_metrics(memoria_residente(), round(percentual, 2))
+        update_runtime_metrics(cpu, descritores_abertos())
+        self._amostrar_threadpool()
+
+    def registrar_pausas_do_gc(self) -> None:
+        """Move para as métricas as pausas do GC acumuladas pelo callback"""
+        while self._pausas:
+            geracao, duracao = self._pausas.popleft()
+            record_gc_pause(geracao, duracao)
+
+    def _amostrar_threadpool(self) -> None:
+        """Ocupação do limitador do anyio usado por run_in_threadpool (endpoints síncronos)"""
+        try:
+            from anyio.to_thread import current_default_thread_limiter
+            limitador = current_default_thread_limiter()
+        except Exception:
+            return
+        update_threadpool_metrics(limitador.borrowed_tokens, limitador.total_tokens, limitador.statistics().tasks_waiting)
+
+    async def _executar(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            agendado = loop.time() + self.intervalo_segundos
+            await asyncio.sleep(self.intervalo_segundos)
+            # O sleep acorda atrasado na medida em que o loop estava ocupado
+            record_event_loop_lag(max(0.0, loop.time() - agendado))
+            try:
+                self.registrar_pausas_do_gc()
+                self.amostrar()
+            except Exception as e:
+                logger.warning(f"Falha ao amostrar métricas de runtime: {e}")
+
+    def _medir_gc(self, fase: str, info: dict) -> None:
+        if fase == "start":
+            self._gc_inicio = time.perf_counter()
+        elif self._gc_inicio is not None:
+            self._pausas.append((info.get("generation", -1), time.perf_counter() - self._gc_inicio))
+            self._gc_inicio = None
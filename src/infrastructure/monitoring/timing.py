@@ -0,0 +1,139 @@
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.infrastructure.monitoring.metrics import resolver_rota
+
+logger = logging.getLogger("slow_requests")
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "1000"))
+
+# Tempo acumulado por etapa na requisição atual: nome -> [segundos, ocorrências]
+# O dicionário é criado pelo middleware; threads do threadpool recebem uma cópia do
+# contexto que aponta para o mesmo objeto, então as medições feitas lá são somadas aqui.
+_tempos: ContextVar[Optional[dict[str, list]]] = ContextVar("tempos_requisicao", default=None)
+
+def tempos_atuais() -> dict[str, list]:
+    return _tempos.get() or {}
+
+def registrar_tempo(nome: str, duracao: float) -> None:
+    tempos = _tempos.get()
+    if tempos is None:
+        return
+    acumulado = tempos.setdefault(nome, [0.0, 0])
+    acumulado[0] += duracao
+    acumulado[1] += 1
+
+@contextmanager
+def medir(nome: str):
+    """Soma a duração do bloco à etapa informada; fora de uma requisição não mede nada"""
+    if _tempos.get() is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_tempo(nome, time.perf_counter() - inicio)
+
+def medido(nome: str) -> Callable:
+    """Decorator equivalente a envolver a função em medir(nome)"""
+    def decorator(funcao):
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            with medir(nome):
+                return funcao(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# O início fica no ExecutionContext (um por comando): em conn.info, um comando com erro
+# deixaria o início para trás e o próximo comando seria medido a partir dele
+def _antes_da_query(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _tempos.get() is not None:
+        context._inicio_query = time.perf_counter()
+
+def _depois_da_query(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_inicio_query", None)
+    if inicio is not None:
+        context._inicio_query = None
+        registrar_tempo("db", time.perf_counter() - inicio)
+
+_engine_instrumentado = False
+
+def instrumentar_sqlalchemy() -> None:
+    """Registra os eventos de cursor em todos os engines (uma única vez)"""
+    global _engine_instrumentado
+    if _engine_instrumentado:
+        return
+    event.listen(Engine, "before_cursor_execute", _antes_da_query)
+    event.listen(Engine, "after_cursor_execute", _depois_da_query)
+    _engine_instrumentado = True
+
+def server_timing(tempos: dict[str, list], total: float) -> str:
+    """Formata o cabeçalho Server-Timing (durações em milissegundos)"""
+    partes = [
+        f'{nome};dur={segundos * 1000:.1f};desc="{ocorrencias}x"'
+        for nome, (segundos, ocorrencias) in tempos.items()
+    ]
+    partes.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(partes)
+
+class ServerTimingMiddleware:
+    """Contabiliza o tempo da requisição por etapa (db, cache, auth, render)
+
+    Devolve o detalhamento no cabeçalho Server-Timing e registra uma linha JSON no
+    logger "slow_requests" quando a requisição passa de SLOW_REQUEST_THRESHOLD_MS.
+    """
+
+    def __init__(self, app, cabecalho: bool = SERVER_TIMING_ENABLED, limite_ms: float = SLOW_REQUEST_THRESHOLD_MS):
+        self.app = app
+        self.cabecalho = cabecalho
+        self.limite_ms = limite_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tempos: dict[str, list] = {}
+        token = _tempos.set(tempos)
+        inicio = time.perf_counter()
+        status_code = 500
+
+        async def send_com_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.cabecalho:
+                    valor = server_timing(tempos, time.perf_counter() - inicio)
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", valor.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_com_timing)
+        finally:
+            _tempos.reset(token)
+            total_ms = (time.perf_counter() - inicio) * 1000
+            if total_ms >= self.limite_ms:
+                self._registrar_lenta(scope, status_code, total_ms, tempos)
+
+    def _registrar_lenta(self, scope, status_code: int, total_ms: float, tempos: dict[str, list]) -> None:
+        logger.warning(json.dumps({
+            "evento": "requisicao_lenta",
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": resolver_rota(scope),
+            "status_code": status_code,
+            "total_ms": round(total_ms, 1),
+            "etapas": {
+                nome: {"ms": round(segundos * 1000, 1), "ocorrencias": ocorrencias}
+                for nome, (segundos, ocorrencias) in tempos.items()
+            },
+        }, ensure_ascii=False))
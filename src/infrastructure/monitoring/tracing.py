@@ -0,0 +1,392 @@
+import asyncio
+import functools
+import inspect
+import ipaddress
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.infrastructure.config.logging_config import caminho_do_processo
+from src.infrastructure.monitoring.metrics import resolver_rota
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "0.01"))
+TRACING_EXPORT_PATH = os.getenv("TRACING_EXPORT_PATH", "logs/traces.jsonl")
+TRACING_EXPORT_MAX_BYTES = int(os.getenv("TRACING_EXPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+TRACING_EXPORT_BACKUPS = int(os.getenv("TRACING_EXPORT_BACKUPS", "3"))
+# Peers (IPs ou redes CIDR) cujo flag "sampled" do traceparent é respeitado
+TRACING_TRUSTED_PEERS = os.getenv("TRACING_TRUSTED_PEERS", "127.0.0.1,::1")
+# Teto de traces exportados por segundo, inclusive os pedidos por peers confiáveis (<= 0 desliga)
+TRACING_MAX_TRACES_PER_SECOND = float(os.getenv("TRACING_MAX_TRACES_PER_SECOND", "10"))
+SERVICE_NAME = os.getenv("SERVICE_NAME", "api-library")
+
+
+@dataclass
+class Span:
+    nome: str
+    span_id: str
+    parent_id: Optional[str]
+    atributos: dict = field(default_factory=dict)
+    inicio_ns: int = field(default_factory=time.time_ns)
+    fim_ns: Optional[int] = None
+    erro: Optional[str] = None
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    spans: list[Span] = field(default_factory=list)
+
+    def chamadas_por_camada(self) -> Counter:
+        return Counter(span.atributos.get("camada") for span in self.spans if span.atributos.get("camada"))
+
+
+# O Trace é criado pelo middleware e compartilhado (por referência) com as threads do
+# threadpool; o span corrente é por contexto, então cada thread monta a própria subárvore.
+_trace: ContextVar[Optional[Trace]] = ContextVar("trace_atual", default=None)
+_span_atual: ContextVar[Optional[Span]] = ContextVar("span_atual", default=None)
+
+
+def _novo_id(bytes_: int) -> str:
+    return f"{random.getrandbits(bytes_ * 8):0{bytes_ * 2}x}"
+
+
+def trace_atual() -> Optional[Trace]:
+    return _trace.get()
+
+
+@contextmanager
+def span(nome: str, **atributos):
+    """Abre um span filho do corrente; fora de um trace amostrado não faz nada"""
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    pai = _span_atual.get()
+    atual = Span(nome, _novo_id(8), pai.span_id if pai else None, atributos)
+    token = _span_atual.set(atual)
+    try:
+        yield atual
+    except BaseException as e:
+        atual.erro = type(e).__name__
+        raise
+    finally:
+        atual.fim_ns = time.time_ns()
+        _span_atual.reset(token)
+        trace.spans.append(atual)
+
+
+def rastreado_como(nome: str, camada: str) -> Callable:
+    """Decorator de função: executa a chamada dentro de um span"""
+    def decorator(funcao):
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            if _trace.get() is None:
+                return funcao(*args, **kwargs)
+            with span(nome, camada=camada):
+                return funcao(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@functools.lru_cache(maxsize=None)
+def rastreado(cls: type, camada: str, metodos: Optional[tuple[str, ...]] = None) -> type:
+    """Subclasse de cls com os métodos envolvidos em spans (padrão: os públicos definidos em cls)
+
+    Aplicado na raiz de composição, mantém domínio e aplicação sem dependência do tracing.
+    Com TRACING_ENABLED=false devolve a própria classe.
+    """
+    if not TRACING_ENABLED:
+        return cls
+    if metodos is None:
+        metodos = tuple(
+            nome for nome, valor in vars(cls).items()
+            if not nome.startswith("_") and inspect.isfunction(valor)
+        )
+    envolvidos = {nome: rastreado_como(f"{cls.__name__}.{nome}", camada)(getattr(cls, nome)) for nome in metodos}
+    return type(cls.__name__, (cls,), {**envolvidos, "__module__": cls.__module__, "__qualname__": cls.__qualname__})
+
+
+# O início fica no ExecutionContext, descartado ao fim de cada comando (mesmo com erro),
+# e não em conn.info, que vive tanto quanto a conexão do pool
+def _antes_da_query(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _trace.get() is not None:
+        context._span_sql = (time.time_ns(), _span_atual.get())
+
+
+def _registrar_span_sql(context, statement: str, erro: Optional[str] = None) -> None:
+    inicio = getattr(context, "_span_sql", None)
+    trace = _trace.get()
+    if inicio is None or trace is None:
+        return
+    context._span_sql = None
+    inicio_ns, pai = inicio
+    operacao = statement.lstrip().split(" ", 1)[0].upper()
+    trace.spans.append(Span(
+        f"db.{operacao.lower()}", _novo_id(8), pai.span_id if pai else None,
+        {"camada": "db", "db.statement": statement[:500]}, inicio_ns, time.time_ns(), erro,
+    ))
+
+
+def _depois_da_query(conn, cursor, statement, parameters, context, executemany):
+    _registrar_span_sql(context, statement)
+
+
+def _erro_na_query(exception_context):
+    if exception_context.execution_context is not None:
+        _registrar_span_sql(
+            exception_context.execution_context,
+            exception_context.statement or "",
+            type(exception_context.original_exception).__name__,
+        )
+
+
+_engine_instrumentado = False
+
+
+def instrumentar_sqlalchemy() -> None:
+    """Um span por comando SQL, filho do span corrente (uma única vez para todos os engines)"""
+    global _engine_instrumentado
+    if _engine_instrumentado:
+        return
+    event.listen(Engine, "before_cursor_execute", _antes_da_query)
+    event.listen(Engine, "after_cursor_execute", _depois_da_query)
+    event.listen(Engine, "handle_error", _erro_na_query)
+    _engine_instrumentado = True
+
+
+def _valor_otlp(valor) -> dict:
+    if isinstance(valor, bool):
+        return {"boolValue": valor}
+    if isinstance(valor, int):
+        return {"intValue": str(valor)}
+    if isinstance(valor, float):
+        return {"doubleValue": valor}
+    return {"stringValue": str(valor)}
+
+
+def otlp_json(trace: Trace, servico: str = SERVICE_NAME) -> dict:
+    """Codificação OTLP/JSON (ExportTraceServiceRequest): cada linha pode ser enviada a /v1/traces"""
+    spans = [{
+        "traceId": trace.trace_id,
+        "spanId": s.span_id,
+        **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+        "name": s.nome,
+        "kind": 2 if s.parent_id is None else 1,
+        "startTimeUnixNano": str(s.inicio_ns),
+        "endTimeUnixNano": str(s.fim_ns or s.inicio_ns),
+        "attributes": [{"key": k, "value": _valor_otlp(v)} for k, v in s.atributos.items()],
+        "status": {"code": 2, "message": s.erro} if s.erro else {"code": 1},
+    } for s in trace.spans]
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": servico}}]},
+        "scopeSpans": [{"scope": {"name": "src.infrastructure.monitoring.tracing"}, "spans": spans}],
+    }]}
+
+
+class ExportadorEmArquivo:
+    """Acrescenta um trace por linha (OTLP/JSON) em um arquivo local
+
+    Como o RotatingFileHandler dos logs: passando de maximo_bytes, o arquivo vira
+    <caminho>.1 (as cópias anteriores avançam um número) e só copias arquivos são mantidos.
+    Nos workers do servidor prefork cada processo grava no próprio arquivo (caminho_do_processo).
+    """
+
+    def __init__(
+        self,
+        caminho: str = TRACING_EXPORT_PATH,
+        maximo_bytes: int = TRACING_EXPORT_MAX_BYTES,
+        copias: int = TRACING_EXPORT_BACKUPS,
+    ):
+        self._caminho = Path(caminho)
+        self.maximo_bytes = maximo_bytes
+        self.copias = copias
+        self._lock = threading.Lock()
+
+    @property
+    def caminho(self) -> Path:
+        # Resolvido a cada escrita: o exportador é criado no mestre, antes do fork
+        return Path(caminho_do_processo(str(self._caminho)))
+
+    def exportar(self, trace: Trace) -> None:
+        linha = json.dumps(otlp_json(trace), ensure_ascii=False) + "\n"
+        with self._lock:
+            self.caminho.parent.mkdir(parents=True, exist_ok=True)
+            if self._precisa_rotacionar(len(linha.encode("utf-8"))):
+                self._rotacionar()
+            with self.caminho.open("a", encoding="utf-8") as arquivo:
+                arquivo.write(linha)
+
+    def _precisa_rotacionar(self, tamanho_da_linha: int) -> bool:
+        if self.maximo_bytes <= 0:
+            return False
+        try:
+            atual = self.caminho.stat().st_size
+        except FileNotFoundError:
+            return False
+        return atual > 0 and atual + tamanho_da_linha > self.maximo_bytes
+
+    def _copia(self, numero: int) -> Path:
+        return self.caminho.with_name(f"{self.caminho.name}.{numero}")
+
+    def _rotacionar(self) -> None:
+        if self.copias <= 0:
+            self.caminho.unlink(missing_ok=True)
+            return
+        for numero in range(self.copias - 1, 0, -1):
+            if self._copia(numero).exists():
+                self._copia(numero).replace(self._copia(numero + 1))
+        self.caminho.replace(self._copia(1))
+
+
+class LimiteDeTraces:
+    """Balde de fichas: no máximo por_segundo traces, com rajada de até um segundo"""
+
+    def __init__(self, por_segundo: float = TRACING_MAX_TRACES_PER_SECOND):
+        self.por_segundo = por_segundo
+        self._fichas = max(por_segundo, 1.0)
+        self._ultimo = time.monotonic()
+
+    def permitir(self) -> bool:
+        if self.por_segundo <= 0:
+            return True
+        agora = time.monotonic()
+        self._fichas = min(max(self.por_segundo, 1.0), self._fichas + (agora - self._ultimo) * self.por_segundo)
+        self._ultimo = agora
+        if self._fichas < 1:
+            return False
+        self._fichas -= 1
+        return True
+
+
+def parse_peers(valor: str) -> list:
+    """'10.0.0.0/8, ::1, gateway' -> redes IP; itens que não são IP valem como nome exato"""
+    peers = []
+    for item in valor.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            peers.append(ipaddress.ip_network(item, strict=False))
+        except ValueError:
+            peers.append(item)
+    return peers
+
+
+def peer_confiavel(host: Optional[str], peers: list) -> bool:
+    if not host:
+        return False
+    try:
+        endereco = ipaddress.ip_address(host)
+    except ValueError:
+        return host in peers
+    return any(not isinstance(peer, str) and endereco in peer for peer in peers)
+
+
+def parse_traceparent(valor: Optional[str]) -> Optional[tuple[str, str, bool]]:
+    """W3C traceparent "00-<trace_id>-<parent_id>-<flags>" -> (trace_id, parent_id, amostrado)"""
+    if not valor:
+        return None
+    partes = valor.strip().split("-")
+    if len(partes) != 4 or len(partes[1]) != 32 or len(partes[2]) != 16 or len(partes[3]) != 2:
+        return None
+    try:
+        int(partes[1], 16), int(partes[2], 16)
+        flags = int(partes[3], 16)
+    except ValueError:
+        return None
+    if partes[1] == "0" * 32 or partes[2] == "0" * 16:
+        return None
+    return partes[1], partes[2], bool(flags & 1)
+
+
+class TracingMiddleware:
+    """Abre o span raiz da requisição com amostragem na entrada (head-based sampling)
+
+    O flag "sampled" do traceparent recebido só decide quando o peer está em
+    TRACING_TRUSTED_PEERS; dos demais o trace_id é continuado, mas a decisão é a fração
+    local TRACING_SAMPLE_RATE. Em qualquer caso no máximo TRACING_MAX_TRACES_PER_SECOND
+    traces são gravados, para que um cliente não force o tracing de todo o tráfego.
+    Requisições não amostradas não criam spans. O trace completo é exportado ao final,
+    com a contagem de chamadas por camada no span raiz, e o traceparent volta na resposta.
+    """
+
+    def __init__(
+        self,
+        app,
+        taxa: float = TRACING_SAMPLE_RATE,
+        exportador: Optional[ExportadorEmArquivo] = None,
+        peers_confiaveis: Optional[list] = None,
+        limite: Optional[LimiteDeTraces] = None,
+    ):
+        self.app = app
+        self.taxa = taxa
+        self.exportador = exportador or ExportadorEmArquivo()
+        self.peers_confiaveis = peers_confiaveis if peers_confiaveis is not None else parse_peers(TRACING_TRUSTED_PEERS)
+        self.limite = limite or LimiteDeTraces()
+
+    def amostrar(self, scope, recebido: Optional[tuple[str, str, bool]]) -> bool:
+        cliente = scope.get("client")
+        if recebido and peer_confiavel(cliente[0] if cliente else None, self.peers_confiaveis):
+            amostrado = recebido[2]
+        else:
+            amostrado = random.random() < self.taxa
+        return amostrado and self.limite.permitir()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _trace.get() is not None:
+            await self.app(scope, receive, send)
+            return
+
+        recebido = None
+        for nome, valor in scope["headers"]:
+            if nome == b"traceparent":
+                recebido = parse_traceparent(valor.decode("latin-1"))
+                break
+        if not self.amostrar(scope, recebido):
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(recebido[0] if recebido else _novo_id(16))
+        raiz = Span(f"{scope['method']} {scope['path']}", _novo_id(8), recebido[1] if recebido else None,
+                    {"http.method": scope["method"], "http.target": scope["path"]})
+        token_trace = _trace.set(trace)
+        token_span = _span_atual.set(raiz)
+
+        async def send_com_trace(message):
+            if message["type"] == "http.response.start":
+                raiz.atributos["http.status_code"] = message["status"]
+                traceparent = f"00-{trace.trace_id}-{raiz.span_id}-01".encode()
+                message["headers"] = list(message.get("headers", [])) + [(b"traceparent", traceparent)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_com_trace)
+        except BaseException as e:
+            raiz.erro = type(e).__name__
+            raise
+        finally:
+            _span_atual.reset(token_span)
+            _trace.reset(token_trace)
+            raiz.fim_ns = time.time_ns()
+            raiz.nome = f"{scope['method']} {resolver_rota(scope)}"
+            for camada, chamadas in trace.chamadas_por_camada().items():
+                raiz.atributos[f"{camada}.chamadas"] = chamadas
+            # Span raiz primeiro: facilita a leitura do arquivo sem reordenar
+            trace.spans.insert(0, raiz)
+            try:
+                await asyncio.to_thread(self.exportador.exportar, trace)
+            except OSError as e:
+                logger.warning(f"Falha ao exportar trace {trace.trace_id}: {e}")
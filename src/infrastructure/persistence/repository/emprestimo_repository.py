@@ -4,14 +4,14 @@ from src.domain.model.emprestimo import Emprestimo
 from src.domain.ports.emprestimo_repository import EmprestimoRepositoryPort
 from src.infrastructure.persistence.entities.emprestimo_entity import EmprestimoModel
 from src.domain.enums.emprestimo_status import EmprestimoStatus
-from typing import Tuple
+from typing import Iterator, Optional, Tuple
 from zoneinfo import ZoneInfo
-import os
+from src.infrastructure.config.app.timezone import get_app_tz
 
 class EmprestimoRepository(EmprestimoRepositoryPort):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, tz: Optional[ZoneInfo] = None):
         self.db = db
-        self._tz = ZoneInfo(os.getenv("APP_TZ", "America/Sao_Paulo"))
+        self._tz = tz or get_app_tz()
 
     def criar(self, emprestimo: Emprestimo) -> Emprestimo:
         db_emp = EmprestimoModel(**emprestimo.__dict__)
@@ -22,24 +22,11 @@ class EmprestimoRepository(EmprestimoRepositoryPort):
     def listar_paginado(self, page: int, size: int, status: EmprestimoStatus = EmprestimoStatus.ATIVOS) -> Tuple[list[Emprestimo], int]:
         offset = (page - 1) * size
         
-        query = self.db.query(EmprestimoModel)
-        
-        if status == EmprestimoStatus.ATIVOS:
-            query = query.filter(
-                EmprestimoModel.data_emprestimo.isnot(None),
-                EmprestimoModel.data_devolucao.is_(None)
-            )
-        elif status == EmprestimoStatus.DEVOLVIDOS:
-            query = query.filter(
-                EmprestimoModel.data_emprestimo.isnot(None),
-                EmprestimoModel.data_devolucao.isnot(None)
-            )
-        elif status == EmprestimoStatus.TODOS:
-            query = query.filter(EmprestimoModel.data_emprestimo.isnot(None))
+        query = self._filtrar_status(self.db.query(EmprestimoModel), status)
         
         total = query.count()
         
-        emprestimos = query.offset(offset).limit(size).all()
+        emprestimos = query.order_by(EmprestimoModel.id).offset(offset).limit(size).all()
         
         result = []
         for emp in emprestimos:
@@ -55,6 +42,58 @@ class EmprestimoRepository(EmprestimoRepositoryPort):
         
         return result, total
 
+    def listar_projecao_paginado(self, page: int, size: int, status: EmprestimoStatus, campos: list[str]) -> Tuple[list[dict], int]:
+        """Seleciona apenas as colunas pedidas, sem materializar entidades"""
+        offset = (page - 1) * size
+        total = self.contar(status)
+        linhas = (
+            self._filtrar_status(self.db.query(*[getattr(EmprestimoModel, campo) for campo in campos]), status)
+            .order_by(EmprestimoModel.id)
+            .offset(offset)
+            .limit(size)
+        )
+        return [dict(r._mapping) for r in linhas], total
+
+    def iterar(self, status: EmprestimoStatus, tamanho_lote: int = 1000) -> Iterator[Emprestimo]:
+        """Percorre os empréstimos do status com cursor no servidor, um lote por vez"""
+        colunas = (
+            EmprestimoModel.id, EmprestimoModel.livro_id, EmprestimoModel.pessoa_id,
+            EmprestimoModel.usuario_id, EmprestimoModel.data_emprestimo, EmprestimoModel.data_devolucao
+        )
+        linhas = (
+            self._filtrar_status(self.db.query(*colunas), status)
+            .order_by(EmprestimoModel.id)
+            .execution_options(yield_per=tamanho_lote)
+        )
+        for r in linhas:
+            yield Emprestimo(
+                id=r.id,
+                livro_id=r.livro_id,
+                pessoa_id=r.pessoa_id,
+                usuario_id=r.usuario_id,
+                data_emprestimo=r.data_emprestimo,
+                data_devolucao=r.data_devolucao
+            )
+
+    def contar(self, status: EmprestimoStatus) -> int:
+        return self._filtrar_status(self.db.query(EmprestimoModel), status).count()
+
+    @staticmethod
+    def _filtrar_status(query, status: EmprestimoStatus):
+        if status == EmprestimoStatus.ATIVOS:
+            return query.filter(
+                EmprestimoModel.data_emprestimo.isnot(None),
+                EmprestimoModel.data_devolucao.is_(None)
+            )
+        if status == EmprestimoStatus.DEVOLVIDOS:
+            return query.filter(
+                EmprestimoModel.data_emprestimo.isnot(None),
+                EmprestimoModel.data_devolucao.isnot(None)
+            )
+        if status == EmprestimoStatus.TODOS:
+            return query.filter(EmprestimoModel.data_emprestimo.isnot(None))
+        return query
+
     def buscar_ativo_por_livro(self, livro_id: int) -> Emprestimo | None:
         r = self.db.query(EmprestimoModel).filter(
             EmprestimoModel.livro_id == livro_id,
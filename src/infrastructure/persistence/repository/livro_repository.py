@@ -2,7 +2,7 @@ from sqlalchemy.orm import Session
 from src.domain.model.livro import Livro
 from src.domain.ports.livro_repository import LivroRepositoryPort
 from src.infrastructure.persistence.entities.livro_entity import LivroModel
-from typing import Tuple
+from typing import Iterator, Tuple
 
 class LivroRepository(LivroRepositoryPort):
     def __init__(self, db: Session):
@@ -20,14 +20,34 @@ class LivroRepository(LivroRepositoryPort):
     def listar_paginado(self, page: int, size: int) -> Tuple[list[Livro], int]:
         offset = (page - 1) * size
         total = self.db.query(LivroModel).count()
-        livros = self.db.query(LivroModel).offset(offset).limit(size).all()
+        livros = self.db.query(LivroModel).order_by(LivroModel.id).offset(offset).limit(size).all()
         result = [Livro(r.id, r.titulo, r.autor, r.disponivel) for r in livros]
         return result, total
 
+    def listar_projecao_paginado(self, page: int, size: int, campos: list[str]) -> Tuple[list[dict], int]:
+        """Seleciona apenas as colunas pedidas, sem materializar entidades"""
+        offset = (page - 1) * size
+        total = self.db.query(LivroModel).count()
+        linhas = (
+            self.db.query(*[getattr(LivroModel, campo) for campo in campos])
+            .order_by(LivroModel.id)
+            .offset(offset)
+            .limit(size)
+        )
+        return [dict(r._mapping) for r in linhas], total
+
     def buscar_por_id(self, livro_id: int) -> Livro | None:
         r = self.db.query(LivroModel).filter(LivroModel.id == livro_id).first()
         return Livro(r.id, r.titulo, r.autor, r.disponivel) if r else None
 
+    def buscar_por_ids(self, livro_ids: list[int]) -> dict[int, Livro]:
+        resultado = {}
+        ids = list(dict.fromkeys(livro_ids))
+        for inicio in range(0, len(ids), 1000):
+            linhas = self.db.query(LivroModel).filter(LivroModel.id.in_(ids[inicio:inicio + 1000]))
+            resultado.update({r.id: Livro(r.id, r.titulo, r.autor, r.disponivel) for r in linhas})
+        return resultado
+
     def atualizar_disponibilidade(self, livro_id: int, disponivel: bool) -> Livro | None:
         db_livro = self.db.query(LivroModel).filter(LivroModel.id == livro_id).first()
         if not db_livro:
@@ -35,3 +55,33 @@ class LivroRepository(LivroRepositoryPort):
         db_livro.disponivel = disponivel
         self.db.flush()
         return Livro(db_livro.id, db_livro.titulo, db_livro.autor, db_livro.disponivel)
+
+    def buscar_disponibilidade(self, livro_ids: list[int]) -> dict[int, bool]:
+        resultado = {}
+        for inicio in range(0, len(livro_ids), 1000):
+            lote = livro_ids[inicio:inicio + 1000]
+            linhas = self.db.query(LivroModel.id, LivroModel.disponivel).filter(LivroModel.id.in_(lote))
+            resultado.update({livro_id: disponivel for livro_id, disponivel in linhas})
+        return resultado
+
+    def listar_disponibilidade(self, tamanho_lote: int = 5000) -> Iterator[tuple[int, bool]]:
+        linhas = (
+            self.db.query(LivroModel.id, LivroModel.disponivel)
+            .order_by(LivroModel.id)
+            .execution_options(yield_per=tamanho_lote)
+        )
+        for livro_id, disponivel in linhas:
+            yield livro_id, disponivel
+
+    def iterar(self, tamanho_lote: int = 1000) -> Iterator[Livro]:
+        """Percorre a tabela com cursor no servidor, mantendo em memória apenas um lote por vez"""
+        linhas = (
+            self.db.query(LivroModel.id, LivroModel.titulo, LivroModel.autor, LivroModel.disponivel)
+            .order_by(LivroModel.id)
+            .execution_options(yield_per=tamanho_lote)
+        )
+        for r in linhas:
+            yield Livro(r.id, r.titulo, r.autor, r.disponivel)
+
+    def contar(self) -> int:
+        return self.db.query(LivroModel).count()
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from src.domain.model.pessoa import Pessoa
 from src.infrastructure.persistence.entities.pessoa_entity import PessoaModel
-from typing import Tuple
+from typing import Iterator, Tuple
 
 class PessoaRepository:
     def __init__(self, db: Session):
@@ -25,14 +25,47 @@ class PessoaRepository:
     def listar_paginado(self, page: int, size: int) -> Tuple[list[Pessoa], int]:
         offset = (page - 1) * size
         total = self.db.query(PessoaModel).count()
-        pessoas = self.db.query(PessoaModel).offset(offset).limit(size).all()
+        pessoas = self.db.query(PessoaModel).order_by(PessoaModel.id).offset(offset).limit(size).all()
         result = [Pessoa(p.id, p.nome, p.telefone, p.data_nascimento, p.email) for p in pessoas]
         return result, total
 
+    def iterar(self, tamanho_lote: int = 1000) -> Iterator[Pessoa]:
+        """Percorre a tabela com cursor no servidor, mantendo em memória apenas um lote por vez"""
+        linhas = (
+            self.db.query(PessoaModel.id, PessoaModel.nome, PessoaModel.telefone, PessoaModel.data_nascimento, PessoaModel.email)
+            .order_by(PessoaModel.id)
+            .execution_options(yield_per=tamanho_lote)
+        )
+        for p in linhas:
+            yield Pessoa(p.id, p.nome, p.telefone, p.data_nascimento, p.email)
+
+    def contar(self) -> int:
+        return self.db.query(PessoaModel).count()
+
+    def listar_projecao_paginado(self, page: int, size: int, campos: list[str]) -> Tuple[list[dict], int]:
+        """Seleciona apenas as colunas pedidas, sem materializar entidades"""
+        offset = (page - 1) * size
+        total = self.db.query(PessoaModel).count()
+        linhas = (
+            self.db.query(*[getattr(PessoaModel, campo) for campo in campos])
+            .order_by(PessoaModel.id)
+            .offset(offset)
+            .limit(size)
+        )
+        return [dict(p._mapping) for p in linhas], total
+
     def buscar_por_id(self, pessoa_id: int) -> Pessoa | None:
         p = self.db.query(PessoaModel).filter(PessoaModel.id == pessoa_id).first()
         return Pessoa(p.id, p.nome, p.telefone, p.data_nascimento, p.email) if p else None
 
+    def buscar_por_ids(self, pessoa_ids: list[int]) -> dict[int, Pessoa]:
+        resultado = {}
+        ids = list(dict.fromkeys(pessoa_ids))
+        for inicio in range(0, len(ids), 1000):
+            pessoas = self.db.query(PessoaModel).filter(PessoaModel.id.in_(ids[inicio:inicio + 1000]))
+            resultado.update({p.id: Pessoa(p.id, p.nome, p.telefone, p.data_nascimento, p.email) for p in pessoas})
+        return resultado
+
     def buscar_por_email(self, email: str) -> Pessoa | None:
         p = self.db.query(PessoaModel).filter(PessoaModel.email == email).first()
         return Pessoa(p.id, p.nome, p.telefone, p.data_nascimento, p.email) if p else None
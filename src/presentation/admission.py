@@ -0,0 +1,105 @@
+import json
+import os
+from typing import Callable, Optional
+from src.infrastructure.config.db.database import estado_do_pool
+from src.infrastructure.config.traffic_classes import INTERATIVO, classificar
+from src.infrastructure.monitoring.metrics import record_request_shed
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "200"))
+ADMISSION_MAX_POOL_WAITERS = int(os.getenv("ADMISSION_MAX_POOL_WAITERS", "20"))
+ADMISSION_MAX_POOL_WAIT_MS = float(os.getenv("ADMISSION_MAX_POOL_WAIT_MS", "500"))
+ADMISSION_MAX_THREADPOOL_WAITING = int(os.getenv("ADMISSION_MAX_THREADPOOL_WAITING", "50"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+# Rotas baratas que continuam respondendo sob sobrecarga (orquestrador e scraper dependem delas)
+ADMISSION_EXEMPT_PATHS = tuple(p.strip() for p in os.getenv("ADMISSION_EXEMPT_PATHS", "/health,/ready,/metrics").split(",") if p.strip())
+
+def fila_do_threadpool() -> int:
+	"""Tarefas aguardando uma thread do limitador do anyio (endpoints síncronos)"""
+	try:
+		from anyio.to_thread import current_default_thread_limiter
+		return current_default_thread_limiter().statistics().tasks_waiting
+	except Exception:
+		return 0
+
+async def responder_503(send, motivo: str, retry_after: int) -> None:
+	"""Resposta de sobrecarga no formato ApiResponse, com Retry-After"""
+	corpo = json.dumps({
+		"success": False,
+		"data": None,
+		"message": "Serviço sobrecarregado; tente novamente em instantes",
+		"error": "SERVICE_OVERLOADED",
+		"details": {"reason": motivo},
+	}).encode()
+	await send({
+		"type": "http.response.start",
+		"status": 503,
+		"headers": [
+			(b"content-type", b"application/json"),
+			(b"content-length", str(len(corpo)).encode()),
+			(b"retry-after", str(retry_after).encode()),
+		],
+	})
+	await send({"type": "http.response.body", "body": corpo})
+
+class AdmissionControlMiddleware:
+	"""Recusa requisições com 503 + Retry-After quando o serviço já está saturado
+
+	Critérios, em ordem de custo: requisições em andamento neste worker, fila do
+	threadpool e esperas por conexão no pool do banco da classe de tráfego da requisição
+	(quantidade e a mais antiga): um pool de exportações saturado não recusa leituras.
+	Recusar na entrada custa microssegundos e preserva a latência das aceitas, em vez
+	de deixar todas esperarem até o timeout. Limites <= 0 desativam o critério.
+	"""
+
+	def __init__(
+		self,
+		app,
+		max_em_andamento: int = ADMISSION_MAX_IN_FLIGHT,
+		max_fila_threadpool: int = ADMISSION_MAX_THREADPOOL_WAITING,
+		max_aguardando_pool: int = ADMISSION_MAX_POOL_WAITERS,
+		max_espera_pool_ms: float = ADMISSION_MAX_POOL_WAIT_MS,
+		retry_after: int = ADMISSION_RETRY_AFTER_SECONDS,
+		isentos: tuple[str, ...] = ADMISSION_EXEMPT_PATHS,
+		estado_pool: Callable[[str], tuple[int, float]] = estado_do_pool,
+		fila_threadpool: Callable[[], int] = fila_do_threadpool,
+	):
+		self.app = app
+		self.max_em_andamento = max_em_andamento
+		self.max_fila_threadpool = max_fila_threadpool
+		self.max_aguardando_pool = max_aguardando_pool
+		self.max_espera_pool = max_espera_pool_ms / 1000
+		self.retry_after = retry_after
+		self.isentos = isentos
+		self.estado_pool = estado_pool
+		self.fila_threadpool = fila_threadpool
+		self.em_andamento = 0
+
+	def motivo_para_recusar(self, classe: str = INTERATIVO) -> Optional[str]:
+		if 0 < self.max_em_andamento <= self.em_andamento:
+			return "in_flight"
+		if 0 < self.max_fila_threadpool <= self.fila_threadpool():
+			return "threadpool"
+		aguardando, maior_espera = self.estado_pool(classe)
+		if 0 < self.max_aguardando_pool <= aguardando:
+			return "db_pool_waiters"
+		if 0 < self.max_espera_pool <= maior_espera:
+			return "db_pool_wait"
+		return None
+
+	async def __call__(self, scope, receive, send):
+		if scope["type"] != "http" or scope["path"] in self.isentos:
+			await self.app(scope, receive, send)
+			return
+
+		motivo = self.motivo_para_recusar(classificar(scope))
+		if motivo is not None:
+			record_request_shed(motivo)
+			await responder_503(send, motivo, self.retry_after)
+			return
+
+		self.em_andamento += 1
+		try:
+			await self.app(scope, receive, send)
+		finally:
+			self.em_andamento -= 1
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import time
+from typing import Optional
+from src.infrastructure.config.traffic_classes import CLASSES, classificar, limite_de_concorrencia, usar_classe
+from src.infrastructure.monitoring.metrics import (
+	record_bulkhead_enter,
+	record_bulkhead_exit,
+	record_bulkhead_rejected,
+	record_bulkhead_wait,
+)
+from src.presentation.admission import ADMISSION_EXEMPT_PATHS, ADMISSION_RETRY_AFTER_SECONDS, responder_503
+
+BULKHEADS_ENABLED = os.getenv("BULKHEADS_ENABLED", "true").lower() == "true"
+BULKHEAD_QUEUE_TIMEOUT_MS = float(os.getenv("BULKHEAD_QUEUE_TIMEOUT_MS", "1000"))
+
+class BulkheadMiddleware:
+	"""Limita a concorrência de cada classe de tráfego (interactive, bulk, auth) separadamente
+
+	Uma rajada de logins ou de exportações ocupa no máximo as vagas da própria classe; as
+	demais requisições aguardam na fila da sua classe por até BULKHEAD_QUEUE_TIMEOUT_MS e
+	então recebem 503 + Retry-After. A classe fica no contexto da requisição para que a
+	sessão do banco use o pool correspondente. Limites <= 0 deixam a classe sem limite.
+	"""
+
+	def __init__(
+		self,
+		app,
+		limites: Optional[dict[str, int]] = None,
+		espera_maxima_ms: float = BULKHEAD_QUEUE_TIMEOUT_MS,
+		retry_after: int = ADMISSION_RETRY_AFTER_SECONDS,
+		isentos: tuple[str, ...] = ADMISSION_EXEMPT_PATHS,
+	):
+		self.app = app
+		limites = limites if limites is not None else {classe: limite_de_concorrencia(classe) for classe in CLASSES}
+		self.vagas = {classe: asyncio.Semaphore(limite) for classe, limite in limites.items() if limite > 0}
+		self.espera_maxima = espera_maxima_ms / 1000
+		self.retry_after = retry_after
+		self.isentos = isentos
+
+	async def __call__(self, scope, receive, send):
+		if scope["type"] != "http" or scope["path"] in self.isentos:
+			await self.app(scope, receive, send)
+			return
+
+		classe = classificar(scope)
+		vagas = self.vagas.get(classe)
+		if vagas is None:
+			with usar_classe(classe):
+				await self.app(scope, receive, send)
+			return
+
+		inicio = time.perf_counter()
+		try:
+			await asyncio.wait_for(vagas.acquire(), self.espera_maxima)
+		except asyncio.TimeoutError:
+			record_bulkhead_rejected(classe)
+			await responder_503(send, f"bulkhead:{classe}", self.retry_after)
+			return
+		record_bulkhead_wait(classe, time.perf_counter() - inicio)
+
+		record_bulkhead_enter(classe)
+		try:
+			with usar_classe(classe):
+				await self.app(scope, receive, send)
+		finally:
+			record_bulkhead_exit(classe)
+			vagas.release()
@@ -0,0 +1,89 @@
+import asyncio
+import os
+from typing import Optional
+from src.infrastructure.monitoring.metrics import record_request_coalesced
+
+COALESCING_ENABLED = os.getenv("COALESCING_ENABLED", "true").lower() == "true"
+COALESCING_MAX_BYTES = int(os.getenv("COALESCING_MAX_BYTES", str(1024 * 1024)))
+
+# Cabeçalhos que mudam a resposta (ou quem pode vê-la) e por isso entram na chave; o CORS
+# (dentro deste middleware) ecoa o Origin em Access-Control-Allow-Origin quando há cookie
+_CABECALHOS_DA_CHAVE = (b"authorization", b"cookie", b"origin", b"accept", b"accept-encoding", b"x-consistency-token")
+
+def _coalescivel(path: str) -> bool:
+	"""Apenas rotas da API; exportações são streams longos e ficam de fora"""
+	if not path.startswith("/api/"):
+		return False
+	return not path.startswith("/api/v1/exports") and not path.rstrip("/").endswith("/export")
+
+def chave_requisicao(scope) -> Optional[tuple]:
+	"""Identifica GETs equivalentes: mesmo caminho, query e credenciais/negociação"""
+	if scope["method"] != "GET" or not _coalescivel(scope["path"]):
+		return None
+	headers = dict(scope["headers"])
+	return (scope["path"], scope.get("query_string", b""), *(headers.get(nome, b"") for nome in _CABECALHOS_DA_CHAVE))
+
+def _copiar(message: dict) -> dict:
+	if "headers" in message:
+		return dict(message, headers=list(message["headers"]))
+	return dict(message)
+
+class RequestCoalescingMiddleware:
+	"""Faz GETs idênticos e simultâneos compartilharem uma única execução
+
+	A primeira requisição (líder) é processada normalmente e suas mensagens de resposta
+	são gravadas; as que chegam enquanto ela está em andamento aguardam e recebem os
+	mesmos bytes. Respostas com Set-Cookie, maiores que o limite ou que falharem não
+	são compartilhadas: nesse caso cada requisição em espera é processada por conta própria.
+	"""
+
+	def __init__(self, app, habilitado: bool = COALESCING_ENABLED, limite_bytes: int = COALESCING_MAX_BYTES):
+		self.app = app
+		self.habilitado = habilitado
+		self.limite_bytes = limite_bytes
+		self._em_andamento: dict[tuple, asyncio.Future] = {}
+
+	async def __call__(self, scope, receive, send):
+		chave = chave_requisicao(scope) if self.habilitado and scope["type"] == "http" else None
+		if chave is None:
+			await self.app(scope, receive, send)
+			return
+
+		lider = self._em_andamento.get(chave)
+		if lider is not None:
+			mensagens = await asyncio.shield(lider)
+			if mensagens is None:
+				await self.app(scope, receive, send)
+				return
+			record_request_coalesced()
+			for message in mensagens:
+				await send(_copiar(message))
+			return
+
+		futuro = asyncio.get_running_loop().create_future()
+		self._em_andamento[chave] = futuro
+		mensagens: list[dict] = []
+		tamanho = 0
+		compartilhavel = True
+
+		async def send_gravando(message):
+			nonlocal tamanho, compartilhavel
+			if compartilhavel:
+				if message["type"] == "http.response.start":
+					compartilhavel = not any(nome.lower() == b"set-cookie" for nome, _ in message.get("headers", []))
+				elif message["type"] == "http.response.body":
+					tamanho += len(message.get("body", b""))
+					compartilhavel = tamanho <= self.limite_bytes
+				if compartilhavel:
+					mensagens.append(_copiar(message))
+			await send(message)
+
+		concluida = False
+		try:
+			await self.app(scope, receive, send_gravando)
+			concluida = True
+		finally:
+			# Sai do mapa antes de liberar as requisições em espera: novas chegadas recomeçam
+			self._em_andamento.pop(chave, None)
+			if not futuro.done():
+				futuro.set_result(mensagens if concluida and compartilhavel else None)
@@ -0,0 +1,203 @@
+import gzip
+import hashlib
+import os
+import zlib
+from collections import OrderedDict
+from typing import Optional
+from src.infrastructure.monitoring.metrics import record_compression
+
+try:
+	import brotli
+except ImportError:
+	# "brotli" é dependência do projeto; em ambientes sem o pacote apenas gzip é oferecido
+	brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_CACHE_ENTRIES = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256"))
+COMPRESSION_CACHE_MAX_BODY = int(os.getenv("COMPRESSION_CACHE_MAX_BODY", str(1024 * 1024)))
+
+TIPOS_COMPRESSIVEIS = (
+	"application/json", "application/msgpack", "application/x-msgpack",
+	"application/x-ndjson", "text/",
+)
+
+def codificacoes_disponiveis() -> tuple[str, ...]:
+	"""Codificações suportadas, em ordem de preferência do servidor"""
+	return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def _qualidades(accept_encoding: str) -> dict[str, float]:
+	qualidades = {}
+	for item in accept_encoding.split(","):
+		nome, *params = [p.strip() for p in item.split(";")]
+		if not nome:
+			continue
+		q = 1.0
+		for param in params:
+			chave, _, valor = param.partition("=")
+			if chave.strip() == "q":
+				try:
+					q = float(valor)
+				except ValueError:
+					q = 0.0
+		qualidades[nome.lower()] = q
+	return qualidades
+
+def negociar_codificacao(accept_encoding: Optional[str], disponiveis: Optional[tuple[str, ...]] = None) -> Optional[str]:
+	"""Escolhe a codificação de maior q aceita pelo cliente; empates seguem a preferência do servidor"""
+	if not accept_encoding:
+		return None
+	disponiveis = disponiveis or codificacoes_disponiveis()
+	qualidades = _qualidades(accept_encoding)
+	curinga = qualidades.get("*", 0.0)
+	melhor, melhor_q = None, 0.0
+	for codificacao in disponiveis:
+		q = qualidades.get(codificacao, curinga)
+		if q > melhor_q:
+			melhor, melhor_q = codificacao, q
+	return melhor
+
+def comprimir(corpo: bytes, codificacao: str) -> bytes:
+	if codificacao == "br":
+		return brotli.compress(corpo, quality=COMPRESSION_BROTLI_QUALITY)
+	return gzip.compress(corpo, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+class _CompressorIncremental:
+	"""Comprime um corpo em streaming, liberando a saída a cada bloco recebido"""
+
+	def __init__(self, codificacao: str):
+		self.codificacao = codificacao
+		if codificacao == "br":
+			self._brotli = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+		else:
+			self._zlib = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+	def bloco(self, dados: bytes) -> bytes:
+		if self.codificacao == "br":
+			return self._brotli.process(dados) + self._brotli.flush()
+		return self._zlib.compress(dados) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+	def finalizar(self) -> bytes:
+		if self.codificacao == "br":
+			return self._brotli.finish()
+		return self._zlib.flush(zlib.Z_FINISH)
+
+class CacheDeCompressao:
+	"""LRU de corpos já comprimidos, indexado pelo digest do corpo original e pela codificação
+
+	Páginas quentes produzem os mesmos bytes a cada requisição; calcular o digest custa
+	uma fração da compressão, então a versão comprimida é reaproveitada diretamente.
+	"""
+
+	def __init__(self, capacidade: int = COMPRESSION_CACHE_ENTRIES, maximo_corpo: int = COMPRESSION_CACHE_MAX_BODY):
+		self.capacidade = capacidade
+		self.maximo_corpo = maximo_corpo
+		self._entradas: OrderedDict[tuple[bytes, str], bytes] = OrderedDict()
+
+	def obter(self, corpo: bytes, codificacao: str) -> bytes:
+		if self.capacidade <= 0 or len(corpo) > self.maximo_corpo:
+			record_compression(codificacao, "bypass")
+			return comprimir(corpo, codificacao)
+
+		chave = (hashlib.blake2b(corpo, digest_size=16).digest(), codificacao)
+		comprimido = self._entradas.get(chave)
+		if comprimido is not None:
+			self._entradas.move_to_end(chave)
+			record_compression(codificacao, "hit")
+			return comprimido
+
+		comprimido = comprimir(corpo, codificacao)
+		self._entradas[chave] = comprimido
+		if len(self._entradas) > self.capacidade:
+			self._entradas.popitem(last=False)
+		record_compression(codificacao, "miss")
+		return comprimido
+
+def _compressivel(headers: list[tuple[bytes, bytes]], status: int) -> bool:
+	"""Só comprime tipos textuais, sem Content-Encoding prévio e fora de respostas parciais"""
+	if status < 200 or status in (204, 206, 304):
+		return False
+	tipo = b""
+	for nome, valor in headers:
+		nome = nome.lower()
+		if nome in (b"content-encoding", b"content-range"):
+			return False
+		if nome == b"content-type":
+			tipo = valor
+	tipo = tipo.split(b";")[0].strip().decode("latin-1").lower()
+	return any(tipo.startswith(t) for t in TIPOS_COMPRESSIVEIS)
+
+class CompressionMiddleware:
+	"""Comprime respostas (br/gzip) conforme o Accept-Encoding, acima de um tamanho mínimo
+
+	Respostas de corpo único passam pelo cache de corpos comprimidos; respostas em
+	streaming (exportações) são comprimidas incrementalmente. Downloads já comprimidos
+	(application/gzip) e respostas parciais (206) seguem intactos.
+	"""
+
+	def __init__(self, app, minimo_bytes: int = COMPRESSION_MIN_BYTES, cache: Optional[CacheDeCompressao] = None):
+		self.app = app
+		self.minimo_bytes = minimo_bytes
+		self.cache = cache or CacheDeCompressao()
+
+	async def __call__(self, scope, receive, send):
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+
+		accept_encoding = dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1")
+		codificacao = negociar_codificacao(accept_encoding)
+		inicio: Optional[dict] = None
+		compressor: Optional[_CompressorIncremental] = None
+		repassar = False
+
+		async def send_comprimindo(message):
+			nonlocal inicio, compressor, repassar
+			if message["type"] == "http.response.start":
+				headers = list(message.get("headers", []))
+				if not _compressivel(headers, message["status"]):
+					repassar = True
+					await send(message)
+					return
+				inicio = dict(message, headers=headers + [(b"vary", b"Accept-Encoding")])
+				if codificacao is None:
+					repassar = True
+					await send(inicio)
+				return
+
+			if repassar or message["type"] != "http.response.body":
+				await send(message)
+				return
+
+			corpo = message.get("body", b"")
+			mais = message.get("more_body", False)
+
+			if compressor is None:
+				if not mais and len(corpo) < self.minimo_bytes:
+					await send(inicio)
+					await send(message)
+					repassar = True
+					return
+				if not mais:
+					comprimido = self.cache.obter(corpo, codificacao)
+					await send(self._cabecalhos(inicio, codificacao, len(comprimido)))
+					await send({"type": "http.response.body", "body": comprimido, "more_body": False})
+					return
+				compressor = _CompressorIncremental(codificacao)
+				await send(self._cabecalhos(inicio, codificacao, None))
+
+			saida = compressor.bloco(corpo) if corpo else b""
+			if not mais:
+				saida += compressor.finalizar()
+			await send({"type": "http.response.body", "body": saida, "more_body": mais})
+
+		await self.app(scope, receive, send_comprimindo)
+
+	@staticmethod
+	def _cabecalhos(inicio: dict, codificacao: str, tamanho: Optional[int]) -> dict:
+		headers = [(nome, valor) for nome, valor in inicio["headers"] if nome.lower() != b"content-length"]
+		headers.append((b"content-encoding", codificacao.encode()))
+		if tamanho is not None:
+			headers.append((b"content-length", str(tamanho).encode()))
+		return dict(inicio, headers=headers)
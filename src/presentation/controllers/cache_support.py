@@ -0,0 +1,59 @@
+import json
+from typing import Optional
+from fastapi import Response
+from sqlalchemy.exc import SQLAlchemyError
+from redis import Redis
+from src.infrastructure.cache.redis_client import cache_get_safe, cache_incr_safe
+
+# Falhas do caminho de banco (indisponibilidade, timeout do pool, statement timeout)
+# que permitem servir a cópia "stale" do cache
+ERROS_DE_BANCO = (SQLAlchemyError, TimeoutError, ConnectionError)
+
+CONSISTENCY_HEADER = "X-Consistency-Token"
+
+def marcar_resposta_stale(response: Optional[Response]) -> None:
+	"""Sinaliza ao cliente que a resposta veio da cópia stale do cache"""
+	if response is None:
+		return
+	response.headers["X-Cache"] = "STALE"
+	response.headers["Warning"] = '110 - "Response is Stale"'
+
+def chave_geracao(colecao: str) -> str:
+	return f"gen:{colecao}"
+
+def geracao_atual(cache: Redis, colecao: str) -> int:
+	"""Geração corrente da coleção; entradas de cache guardam a geração em que foram montadas"""
+	valor = cache_get_safe(cache, chave_geracao(colecao))
+	try:
+		return int(valor) if valor else 0
+	except (TypeError, ValueError):
+		return 0
+
+def avancar_geracao(cache: Redis, colecao: str) -> Optional[int]:
+	return cache_incr_safe(cache, chave_geracao(colecao))
+
+def registrar_token(response: Optional[Response], geracoes: dict[str, Optional[int]]) -> None:
+	"""Devolve ao cliente o token de consistência ("colecao:geracao,...") gerado pela escrita"""
+	partes = [f"{colecao}:{geracao}" for colecao, geracao in geracoes.items() if geracao is not None]
+	if response is None or not partes:
+		return
+	response.headers[CONSISTENCY_HEADER] = ",".join(partes)
+
+def geracao_minima(token: Optional[str], colecao: str) -> Optional[int]:
+	"""Extrai do token enviado pelo cliente a geração mínima aceitável para a coleção"""
+	if not token:
+		return None
+	for parte in token.split(","):
+		nome, _, geracao = parte.strip().partition(":")
+		if nome == colecao and geracao.isdigit():
+			return int(geracao)
+	return None
+
+def carregar_entrada(cached: Optional[str], minima: Optional[int] = None) -> Optional[dict]:
+	"""Desserializa uma entrada de cache, descartando-a se for anterior à geração exigida"""
+	if not cached:
+		return None
+	dados = json.loads(cached)
+	if minima is not None and dados.get("geracao", 0) < minima:
+		return None
+	return dados
@@ -0,0 +1,53 @@
+from pathlib import Path
+from typing import Optional
+from fastapi import HTTPException, Response
+from src.application.usecase.export_usecases import ExportUseCase
+from src.domain.enums.export_status import ExportStatus
+from src.domain.model.export_job import ExportJob
+from src.presentation.dto.export_dto import ExportCreateRequest, ExportJobResponse
+from src.presentation.downloads import resposta_arquivo
+
+class ExportControllers:
+	def __init__(self, usecase: ExportUseCase, prefixo_url: str = "/api/v1/exports"):
+		self.usecase = usecase
+		self.prefixo_url = prefixo_url
+
+	def solicitar(self, request: ExportCreateRequest, response: Optional[Response] = None) -> ExportJobResponse:
+		job = self.usecase.solicitar(request.recurso, request.formato.value, request.status)
+		if response is not None:
+			response.status_code = 202
+			response.headers["Location"] = f"{self.prefixo_url}/{job.id}"
+		return self._para_resposta(job)
+
+	def consultar(self, job_id: str) -> ExportJobResponse:
+		return self._para_resposta(self._buscar(job_id))
+
+	def baixar(self, job_id: str, range_header: Optional[str] = None) -> Response:
+		job = self._buscar(job_id)
+		if job.status != ExportStatus.CONCLUIDO or not job.arquivo or not Path(job.arquivo).exists():
+			raise HTTPException(status_code=409, detail=f"Exportação '{job_id}' ainda não está disponível ({job.status.value})")
+		return resposta_arquivo(Path(job.arquivo), "application/gzip", Path(job.arquivo).name, range_header)
+
+	def _buscar(self, job_id: str) -> ExportJob:
+		job = self.usecase.consultar(job_id)
+		if not job:
+			raise HTTPException(status_code=404, detail=f"Exportação '{job_id}' não encontrada")
+		return job
+
+	def _para_resposta(self, job: ExportJob) -> ExportJobResponse:
+		progresso = round(job.linhas / job.total, 4) if job.total else (1.0 if job.status == ExportStatus.CONCLUIDO else None)
+		return ExportJobResponse(
+			id=job.id,
+			recurso=job.recurso,
+			formato=job.formato,
+			status=job.status.value,
+			filtro=job.filtro,
+			linhas=job.linhas,
+			total=job.total,
+			progresso=progresso,
+			bytes=job.bytes,
+			erro=job.erro,
+			criado_em=job.criado_em,
+			concluido_em=job.concluido_em,
+			download_url=f"{self.prefixo_url}/{job.id}/download" if job.status == ExportStatus.CONCLUIDO else None,
+		)
@@ -1,131 +1,215 @@
 from src.application.usecase.livro_usecases import LivroUseCase
-from src.presentation.dto.livro_dto import LivroCreateRequest, LivroResponse, EmprestimoResponse, LivroBrief, PessoaBrief
+from src.presentation.dto.livro_dto import (
+	LivroCreateRequest, LivroResponse, EmprestimoResponse, LivroBrief, PessoaBrief, DisponibilidadeRequest, DisponibilidadeResponse
+)
 from src.presentation.dto.common import PaginationParams, PaginationMeta, PaginatedResponse
 from src.domain.enums.emprestimo_status import EmprestimoStatus
 import json
+from typing import Optional
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from src.presentation.exporters import FormatoExportacao, registros_exportados, resposta_exportacao
+from src.presentation.projecao import parse_campos, parse_include, chave_projecao, projetar
 from redis import Redis
-from src.infrastructure.cache.redis_client import cache_get_safe, cache_set_safe, cache_delete_safe
+from src.infrastructure.cache.redis_client import cache_get_safe, cache_set_with_stale_safe, cache_get_stale_safe, cache_delete_safe
+from src.presentation.controllers.cache_support import (
+	ERROS_DE_BANCO, marcar_resposta_stale, carregar_entrada, geracao_atual, avancar_geracao, registrar_token
+)
+
+CAMPOS_LIVRO = list(LivroResponse.model_fields)
+RELACOES_EMPRESTIMO = ("livro", "pessoa")
+CAMPOS_EMPRESTIMO = [campo for campo in EmprestimoResponse.model_fields if campo not in RELACOES_EMPRESTIMO]
 
 class LivroControllers:
 	def __init__(self, usecase: LivroUseCase):
 		self.usecase = usecase
 		self.CACHE_TTL = 120
 
-	def cadastrar(self, request: LivroCreateRequest, cache: Redis):
+	def cadastrar(self, request: LivroCreateRequest, cache: Redis, response: Optional[Response] = None):
 		result = self.usecase.cadastrar_livro(request.titulo, request.autor)
 		
 		cache_delete_safe(cache, "livros:list")
 		cache_delete_safe(cache, f"livros:{result.id}")
+		registrar_token(response, {"livros": avancar_geracao(cache, "livros")})
 		
 		return result
 
 	def listar(self):
 		return self.usecase.listar_livros()
 
-	def listar_paginado(self, page: int, size: int, cache: Redis) -> PaginatedResponse[LivroResponse]:
+	def exportar_livros(self, formato: FormatoExportacao) -> StreamingResponse:
+		livros, campos = registros_exportados("livros", self.usecase.exportar_livros())
+		return resposta_exportacao(livros, formato, "livros", campos)
+
+	def exportar_emprestimos(self, status: EmprestimoStatus, formato: FormatoExportacao) -> StreamingResponse:
+		emprestimos, campos = registros_exportados("emprestimos", self.usecase.exportar_emprestimos(status))
+		return resposta_exportacao(emprestimos, formato, f"emprestimos-{status.value}", campos)
+
+	def consultar_disponibilidade(self, request: DisponibilidadeRequest) -> DisponibilidadeResponse:
+		disponibilidade = self.usecase.consultar_disponibilidade(request.ids)
+		return DisponibilidadeResponse(
+			disponibilidade=disponibilidade,
+			nao_encontrados=[i for i in dict.fromkeys(request.ids) if i not in disponibilidade]
+		)
+
+	def listar_paginado(self, page: int, size: int, cache: Redis, response: Optional[Response] = None, geracao_minima: Optional[int] = None, fields: Optional[str] = None) -> PaginatedResponse[LivroResponse]:
 		pagination = PaginationParams(page=page, size=size)
 		pagination.validate_page_size()
+		campos = parse_campos(fields, CAMPOS_LIVRO)
 		
-		cache_key = f"livros:list:page:{pagination.page}:size:{pagination.size}"
+		cache_key = f"livros:list:page:{pagination.page}:size:{pagination.size}{chave_projecao(campos)}"
 		
-		cached = cache_get_safe(cache, cache_key)
+		cached = carregar_entrada(cache_get_safe(cache, cache_key), geracao_minima)
 		if cached:
-			cached_data = json.loads(cached)
-			return PaginatedResponse(
-				data=[LivroResponse(**p) for p in cached_data["data"]],
-				meta=PaginationMeta(**cached_data["meta"])
-			)
-		
-		livros, total = self.usecase.listar_livros_paginado(pagination.page, pagination.size)
+			return self._pagina_livros_do_cache(cached, campos)
+		
+		geracao = geracao_atual(cache, "livros")
+		try:
+			if campos is None:
+				livros, total = self.usecase.listar_livros_paginado(pagination.page, pagination.size)
+				response_data = [LivroResponse.model_validate(l) for l in livros]
+			else:
+				linhas, total = self.usecase.listar_livros_projecao(pagination.page, pagination.size, campos)
+				response_data = [projetar(l, campos) for l in linhas]
+		except ERROS_DE_BANCO:
+			stale = cache_get_stale_safe(cache, cache_key)
+			if not stale:
+				raise
+			marcar_resposta_stale(response)
+			return self._pagina_livros_do_cache(json.loads(stale), campos)
 		
 		meta = PaginationMeta.create(pagination.page, pagination.size, total)
-		response_data = [LivroResponse.model_validate(l) for l in livros]
 		
 		cache_payload = {
-			"data": [l.model_dump(mode="json") for l in response_data],
-			"meta": meta.model_dump()
+			"data": [l.model_dump(mode="json") for l in response_data] if campos is None else response_data,
+			"meta": meta.model_dump(),
+			"geracao": geracao
 		}
-		cache_set_safe(cache, cache_key, json.dumps(cache_payload), ttl_seconds=self.CACHE_TTL)
+		cache_set_with_stale_safe(cache, cache_key, json.dumps(cache_payload), ttl_seconds=self.CACHE_TTL)
 		
 		return PaginatedResponse(data=response_data, meta=meta)
 
-	def listar_emprestimos_paginado(self, page: int, size: int, status: EmprestimoStatus, cache: Redis) -> PaginatedResponse[EmprestimoResponse]:
+	def listar_emprestimos_paginado(self, page: int, size: int, status: EmprestimoStatus, cache: Redis, response: Optional[Response] = None, geracao_minima: Optional[int] = None, fields: Optional[str] = None, include: Optional[str] = None) -> PaginatedResponse[EmprestimoResponse]:
 		pagination = PaginationParams(page=page, size=size)
 		pagination.validate_page_size()
+		campos = parse_campos(fields, CAMPOS_EMPRESTIMO)
+		relacoes = parse_include(include, RELACOES_EMPRESTIMO)
+		projetado = campos is not None or relacoes != RELACOES_EMPRESTIMO
+		if projetado:
+			campos = campos or CAMPOS_EMPRESTIMO
 		
 		cache_key = f"emprestimos:list:status:{status.value}:page:{pagination.page}:size:{pagination.size}"
+		if projetado:
+			cache_key += chave_projecao(campos, relacoes)
 		
-		cached = cache_get_safe(cache, cache_key)
+		cached = carregar_entrada(cache_get_safe(cache, cache_key), geracao_minima)
 		if cached:
-			cached_data = json.loads(cached)
-			return PaginatedResponse(
-				data=[EmprestimoResponse(**p) for p in cached_data["data"]],
-				meta=PaginationMeta(**cached_data["meta"])
-			)
-		
-		emprestimos, total = self.usecase.listar_emprestimos_paginado(pagination.page, pagination.size, status)
+			return self._pagina_emprestimos_do_cache(cached, projetado)
+		
+		geracao = geracao_atual(cache, "emprestimos")
+		try:
+			if projetado:
+				response_data, total = self._emprestimos_projetados(pagination, status, campos, relacoes)
+			else:
+				emprestimos, total = self.usecase.listar_emprestimos_paginado(pagination.page, pagination.size, status)
+				livros = self.usecase.obter_livros_por_ids([e.livro_id for e in emprestimos])
+				pessoas = self.usecase.obter_pessoas_por_ids([e.pessoa_id for e in emprestimos])
+				response_data = [self._emprestimo_response(e, livros.get(e.livro_id), pessoas.get(e.pessoa_id)) for e in emprestimos]
+		except ERROS_DE_BANCO:
+			stale = cache_get_stale_safe(cache, cache_key)
+			if not stale:
+				raise
+			marcar_resposta_stale(response)
+			return self._pagina_emprestimos_do_cache(json.loads(stale), projetado)
 		
 		meta = PaginationMeta.create(pagination.page, pagination.size, total)
-		response_data = []
-		
-		for e in emprestimos:
-			livro = self.usecase.obter_livro_por_id(e.livro_id)
-			pessoa = self.usecase.obter_pessoa_por_id(e.pessoa_id)
-			response_data.append(EmprestimoResponse(
-				id=e.id,
-				livro_id=e.livro_id,
-				pessoa_id=e.pessoa_id,
-				usuario_id=e.usuario_id,
-				data_emprestimo=e.data_emprestimo.isoformat(),
-				data_devolucao=e.data_devolucao.isoformat() if e.data_devolucao else None,
-				livro=LivroBrief(id=livro.id, titulo=livro.titulo, autor=livro.autor) if livro else None,
-				pessoa=PessoaBrief(id=pessoa.id, nome=pessoa.nome, telefone=pessoa.telefone, email=pessoa.email) if pessoa else None,
-			))
 		
 		cache_payload = {
-			"data": [e.model_dump(mode="json") for e in response_data],
-			"meta": meta.model_dump()
+			"data": response_data if projetado else [e.model_dump(mode="json") for e in response_data],
+			"meta": meta.model_dump(),
+			"geracao": geracao
 		}
-		cache_set_safe(cache, cache_key, json.dumps(cache_payload), ttl_seconds=self.CACHE_TTL)
+		cache_set_with_stale_safe(cache, cache_key, json.dumps(cache_payload), ttl_seconds=self.CACHE_TTL)
 		
 		return PaginatedResponse(data=response_data, meta=meta)
 
-	def emprestar(self, livro_id: int, pessoa_id: int, usuario_id: int, cache: Redis) -> EmprestimoResponse:
+	def _emprestimos_projetados(self, pagination: PaginationParams, status: EmprestimoStatus, campos: list[str], relacoes: tuple[str, ...]) -> tuple[list[dict], int]:
+		"""Seleciona só as colunas pedidas e embute as relações pedidas com uma consulta em lote cada"""
+		colunas = list(dict.fromkeys(campos + [f"{relacao}_id" for relacao in relacoes]))
+		linhas, total = self.usecase.listar_emprestimos_projecao(pagination.page, pagination.size, status, colunas)
+		livros = self.usecase.obter_livros_por_ids([l["livro_id"] for l in linhas]) if "livro" in relacoes else {}
+		pessoas = self.usecase.obter_pessoas_por_ids([l["pessoa_id"] for l in linhas]) if "pessoa" in relacoes else {}
+		
+		dados = []
+		for linha in linhas:
+			item = projetar(linha, campos)
+			if "livro" in relacoes:
+				livro = self._livro_brief(livros.get(linha["livro_id"]))
+				item["livro"] = livro.model_dump() if livro else None
+			if "pessoa" in relacoes:
+				pessoa = self._pessoa_brief(pessoas.get(linha["pessoa_id"]))
+				item["pessoa"] = pessoa.model_dump() if pessoa else None
+			dados.append(item)
+		return dados, total
+
+	@staticmethod
+	def _livro_brief(livro) -> Optional[LivroBrief]:
+		return LivroBrief(id=livro.id, titulo=livro.titulo, autor=livro.autor) if livro else None
+
+	@staticmethod
+	def _pessoa_brief(pessoa) -> Optional[PessoaBrief]:
+		return PessoaBrief(id=pessoa.id, nome=pessoa.nome, telefone=pessoa.telefone, email=pessoa.email) if pessoa else None
+
+	def _emprestimo_response(self, emprestimo, livro, pessoa) -> EmprestimoResponse:
+		return EmprestimoResponse(
+			id=emprestimo.id,
+			livro_id=emprestimo.livro_id,
+			pessoa_id=emprestimo.pessoa_id,
+			usuario_id=emprestimo.usuario_id,
+			data_emprestimo=emprestimo.data_emprestimo.isoformat(),
+			data_devolucao=emprestimo.data_devolucao.isoformat() if emprestimo.data_devolucao else None,
+			livro=self._livro_brief(livro),
+			pessoa=self._pessoa_brief(pessoa),
+		)
+
+	def _pagina_livros_do_cache(self, cached_data: dict, campos: Optional[list[str]] = None) -> PaginatedResponse[LivroResponse]:
+		return PaginatedResponse(
+			data=[LivroResponse(**p) for p in cached_data["data"]] if campos is None else cached_data["data"],
+			meta=PaginationMeta(**cached_data["meta"])
+		)
+
+	def _pagina_emprestimos_do_cache(self, cached_data: dict, projetado: bool = False) -> PaginatedResponse[EmprestimoResponse]:
+		return PaginatedResponse(
+			data=cached_data["data"] if projetado else [EmprestimoResponse(**p) for p in cached_data["data"]],
+			meta=PaginationMeta(**cached_data["meta"])
+		)
+
+	def emprestar(self, livro_id: int, pessoa_id: int, usuario_id: int, cache: Redis, response: Optional[Response] = None) -> EmprestimoResponse:
 		result = self.usecase.emprestar(livro_id, pessoa_id, usuario_id)
 		
 		cache_delete_safe(cache, "livros:list")
 		cache_delete_safe(cache, f"livros:{livro_id}")
 		cache_delete_safe(cache, "emprestimos:list")
+		registrar_token(response, {
+			"livros": avancar_geracao(cache, "livros"),
+			"emprestimos": avancar_geracao(cache, "emprestimos"),
+		})
 		
 		livro = self.usecase.obter_livro_por_id(result.livro_id)
 		pessoa = self.usecase.obter_pessoa_por_id(result.pessoa_id)
-		return EmprestimoResponse(
-			id=result.id,
-			livro_id=result.livro_id,
-			pessoa_id=result.pessoa_id,
-			usuario_id=result.usuario_id,
-			data_emprestimo=result.data_emprestimo.isoformat(),
-			data_devolucao=result.data_devolucao.isoformat() if result.data_devolucao else None,
-			livro=LivroBrief(id=livro.id, titulo=livro.titulo, autor=livro.autor) if livro else None,
-			pessoa=PessoaBrief(id=pessoa.id, nome=pessoa.nome, telefone=pessoa.telefone, email=pessoa.email) if pessoa else None,
-		)
+		return self._emprestimo_response(result, livro, pessoa)
 
-	def devolver(self, livro_id: int, cache: Redis) -> EmprestimoResponse:
+	def devolver(self, livro_id: int, cache: Redis, response: Optional[Response] = None) -> EmprestimoResponse:
 		result = self.usecase.devolver(livro_id)
 		
 		cache_delete_safe(cache, "livros:list")
 		cache_delete_safe(cache, f"livros:{livro_id}")
 		cache_delete_safe(cache, "emprestimos:list")
+		registrar_token(response, {
+			"livros": avancar_geracao(cache, "livros"),
+			"emprestimos": avancar_geracao(cache, "emprestimos"),
+		})
 		
 		livro = self.usecase.obter_livro_por_id(result.livro_id)
 		pessoa = self.usecase.obter_pessoa_por_id(result.pessoa_id)
-		return EmprestimoResponse(
-			id=result.id,
-			livro_id=result.livro_id,
-			pessoa_id=result.pessoa_id,
-			usuario_id=result.usuario_id,
-			data_emprestimo=result.data_emprestimo.isoformat(),
-			data_devolucao=result.data_devolucao.isoformat() if result.data_devolucao else None,
-			livro=LivroBrief(id=livro.id, titulo=livro.titulo, autor=livro.autor) if livro else None,
-			pessoa=PessoaBrief(id=pessoa.id, nome=pessoa.nome, telefone=pessoa.telefone, email=pessoa.email) if pessoa else None,
-		) 
\ No newline at end of file
+		return self._emprestimo_response(result, livro, pessoa) 
\ No newline at end of file
@@ -4,15 +4,25 @@ from src.presentation.dto.pessoa_dto import PessoaCreateRequest, PessoaResponse
 from src.domain.model.pessoa import Pessoa
 from src.presentation.dto.common import PaginationParams, PaginationMeta, PaginatedResponse
 import json
+from typing import Optional
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from src.presentation.exporters import FormatoExportacao, registros_exportados, resposta_exportacao
+from src.presentation.projecao import parse_campos, chave_projecao, projetar
 from redis import Redis
-from src.infrastructure.cache.redis_client import cache_get_safe, cache_set_safe, cache_delete_safe
+from src.infrastructure.cache.redis_client import cache_get_safe, cache_set_safe, cache_set_with_stale_safe, cache_get_stale_safe, cache_delete_safe
+from src.presentation.controllers.cache_support import (
+	ERROS_DE_BANCO, marcar_resposta_stale, carregar_entrada, geracao_atual, avancar_geracao, registrar_token
+)
+
+CAMPOS_PESSOA = list(PessoaResponse.model_fields)
 
 class PessoaControllers:
 	def __init__(self, usecase: PessoaUseCase):
 		self.usecase = usecase
 		self.CACHE_TTL = 120
 
-	def criar(self, request: PessoaCreateRequest, cache: Redis) -> Pessoa:
+	def criar(self, request: PessoaCreateRequest, cache: Redis, response: Optional[Response] = None) -> Pessoa:
 		pessoa = Pessoa(None, request.nome, request.telefone, request.data_nascimento, request.email)
 		result = self.usecase.criar_pessoa(pessoa)
 		
@@ -20,48 +30,77 @@ class PessoaControllers:
 		if result.email:
 			cache_delete_safe(cache, f"pessoas:email:{result.email}")
 		cache_delete_safe(cache, f"pessoas:{result.id}")
+		registrar_token(response, {"pessoas": avancar_geracao(cache, "pessoas")})
 		
 		return result
 
 	def listar(self) -> list[Pessoa]:
 		return self.usecase.listar_pessoas()
 
-	def listar_paginado(self, page: int, size: int, cache: Redis) -> PaginatedResponse[PessoaResponse]:
+	def listar_paginado(self, page: int, size: int, cache: Redis, response: Optional[Response] = None, geracao_minima: Optional[int] = None, fields: Optional[str] = None) -> PaginatedResponse[PessoaResponse]:
 		pagination = PaginationParams(page=page, size=size)
 		pagination.validate_page_size()
+		campos = parse_campos(fields, CAMPOS_PESSOA)
 		
-		cache_key = f"pessoas:list:page:{pagination.page}:size:{pagination.size}"
+		cache_key = f"pessoas:list:page:{pagination.page}:size:{pagination.size}{chave_projecao(campos)}"
 		
-		cached = cache_get_safe(cache, cache_key)
+		cached = carregar_entrada(cache_get_safe(cache, cache_key), geracao_minima)
 		if cached:
-			cached_data = json.loads(cached)
-			return PaginatedResponse(
-				data=[PessoaResponse(**p) for p in cached_data["data"]],
-				meta=PaginationMeta(**cached_data["meta"])
-			)
+			return self._pagina_do_cache(cached, campos)
 		
-		pessoas, total = self.usecase.listar_pessoas_paginado(pagination.page, pagination.size)
+		geracao = geracao_atual(cache, "pessoas")
+		try:
+			if campos is None:
+				pessoas, total = self.usecase.listar_pessoas_paginado(pagination.page, pagination.size)
+				response_data = [PessoaResponse.model_validate(p) for p in pessoas]
+			else:
+				linhas, total = self.usecase.listar_pessoas_projecao(pagination.page, pagination.size, campos)
+				response_data = [projetar(p, campos) for p in linhas]
+		except ERROS_DE_BANCO:
+			stale = cache_get_stale_safe(cache, cache_key)
+			if not stale:
+				raise
+			marcar_resposta_stale(response)
+			return self._pagina_do_cache(json.loads(stale), campos)
 		
 		meta = PaginationMeta.create(pagination.page, pagination.size, total)
-		response_data = [PessoaResponse.model_validate(p) for p in pessoas]
 		
 		cache_payload = {
-			"data": [p.model_dump(mode="json") for p in response_data],
-			"meta": meta.model_dump()
+			"data": [p.model_dump(mode="json") for p in response_data] if campos is None else response_data,
+			"meta": meta.model_dump(),
+			"geracao": geracao
 		}
-		cache_set_safe(cache, cache_key, json.dumps(cache_payload), ttl_seconds=self.CACHE_TTL)
+		cache_set_with_stale_safe(cache, cache_key, json.dumps(cache_payload), ttl_seconds=self.CACHE_TTL)
 		
 		return PaginatedResponse(data=response_data, meta=meta)
 
-	def buscar_por_id(self, pessoa_id: int, cache: Redis) -> PessoaResponse:
+	def exportar(self, formato: FormatoExportacao) -> StreamingResponse:
+		pessoas, campos = registros_exportados("pessoas", self.usecase.exportar_pessoas())
+		return resposta_exportacao(pessoas, formato, "pessoas", campos)
+
+	def _pagina_do_cache(self, cached_data: dict, campos: Optional[list[str]] = None) -> PaginatedResponse[PessoaResponse]:
+		return PaginatedResponse(
+			data=[PessoaResponse(**p) for p in cached_data["data"]] if campos is None else cached_data["data"],
+			meta=PaginationMeta(**cached_data["meta"])
+		)
+
+	def buscar_por_id(self, pessoa_id: int, cache: Redis, response: Optional[Response] = None) -> PessoaResponse:
 		key = f"pessoas:{pessoa_id}"
 		cached = cache_get_safe(cache, key)
 		if cached:
 			return PessoaResponse(**json.loads(cached))
 		
-		pessoa = self.usecase.buscar_por_id(pessoa_id)
+		try:
+			pessoa = self.usecase.buscar_por_id(pessoa_id)
+		except ERROS_DE_BANCO:
+			stale = cache_get_stale_safe(cache, key)
+			if not stale:
+				raise
+			marcar_resposta_stale(response)
+			return PessoaResponse(**json.loads(stale))
+		
 		resp = PessoaResponse.model_validate(pessoa)
-		cache_set_safe(cache, key, resp.model_dump_json(), ttl_seconds=self.CACHE_TTL)
+		cache_set_with_stale_safe(cache, key, resp.model_dump_json(), ttl_seconds=self.CACHE_TTL)
 		return resp
 
 	def buscar_por_email(self, email: str, cache: Redis) -> PessoaResponse:
@@ -78,7 +117,7 @@ class PessoaControllers:
 		cache_set_safe(cache, key, resp.model_dump_json(), ttl_seconds=self.CACHE_TTL)
 		return resp
 
-	def atualizar(self, pessoa_id: int, request: PessoaCreateRequest, cache: Redis) -> PessoaResponse:
+	def atualizar(self, pessoa_id: int, request: PessoaCreateRequest, cache: Redis, response: Optional[Response] = None) -> PessoaResponse:
 		pessoa = Pessoa(None, request.nome, request.telefone, request.data_nascimento, request.email)
 		result = self.usecase.atualizar_pessoa(pessoa_id, pessoa)
 		
@@ -86,11 +125,13 @@ class PessoaControllers:
 		cache_delete_safe(cache, f"pessoas:{pessoa_id}")
 		if pessoa.email:
 			cache_delete_safe(cache, f"pessoas:email:{pessoa.email}")
+		registrar_token(response, {"pessoas": avancar_geracao(cache, "pessoas")})
 		
 		return PessoaResponse.model_validate(result)
 
-	def remover_pessoa(self, pessoa_id: int, cache: Redis) -> None:
+	def remover_pessoa(self, pessoa_id: int, cache: Redis, response: Optional[Response] = None) -> None:
 		self.usecase.remover_pessoa(pessoa_id)
 		
 		cache_delete_safe(cache, "pessoas:list")
-		cache_delete_safe(cache, f"pessoas:{pessoa_id}") 
\ No newline at end of file
+		cache_delete_safe(cache, f"pessoas:{pessoa_id}")
+		registrar_token(response, {"pessoas": avancar_geracao(cache, "pessoas")}) 
\ No newline at end of file
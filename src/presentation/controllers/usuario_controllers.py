@@ -2,8 +2,13 @@ from src.application.usecase.usuario_usecases import UsuarioUseCase
 from src.presentation.dto.usuario_dto import UsuarioCreateRequest, UsuarioUpdateRequest, UsuarioResponse
 from src.presentation.dto.common import PaginationParams, PaginationMeta, PaginatedResponse
 import json
+from typing import Optional
+from fastapi import Response
 from redis import Redis
-from src.infrastructure.cache.redis_client import cache_get_safe, cache_set_safe, cache_delete_safe
+from src.infrastructure.cache.redis_client import cache_get_safe, cache_set_safe, cache_set_with_stale_safe, cache_get_stale_safe, cache_delete_safe
+from src.presentation.controllers.cache_support import (
+	ERROS_DE_BANCO, marcar_resposta_stale, carregar_entrada, geracao_atual, avancar_geracao, registrar_token
+)
 
 class UsuarioControllers:
 	def __init__(self, usecase: UsuarioUseCase):
@@ -19,42 +24,61 @@ class UsuarioControllers:
 	def listar(self):
 		return self.usecase.listar()
 
-	def listar_paginado(self, page: int, size: int, cache: Redis) -> PaginatedResponse[UsuarioResponse]:
+	def listar_paginado(self, page: int, size: int, cache: Redis, response: Optional[Response] = None, geracao_minima: Optional[int] = None) -> PaginatedResponse[UsuarioResponse]:
 		pagination = PaginationParams(page=page, size=size)
 		pagination.validate_page_size()
 		
 		cache_key = f"usuarios:list:page:{pagination.page}:size:{pagination.size}"
 		
-		cached = cache_get_safe(cache, cache_key)
+		cached = carregar_entrada(cache_get_safe(cache, cache_key), geracao_minima)
 		if cached:
-			cached_data = json.loads(cached)
-			return PaginatedResponse(
-				data=[UsuarioResponse(**p) for p in cached_data["data"]],
-				meta=PaginationMeta(**cached_data["meta"])
-			)
+			return self._pagina_do_cache(cached)
 		
-		usuarios, total = self.usecase.listar_paginado(pagination.page, pagination.size)
+		geracao = geracao_atual(cache, "usuarios")
+		try:
+			usuarios, total = self.usecase.listar_paginado(pagination.page, pagination.size)
+		except ERROS_DE_BANCO:
+			stale = cache_get_stale_safe(cache, cache_key)
+			if not stale:
+				raise
+			marcar_resposta_stale(response)
+			return self._pagina_do_cache(json.loads(stale))
 		
 		meta = PaginationMeta.create(pagination.page, pagination.size, total)
 		response_data = [UsuarioResponse.model_validate(u) for u in usuarios]
 		
 		cache_payload = {
 			"data": [u.model_dump(mode="json") for u in response_data],
-			"meta": meta.model_dump()
+			"meta": meta.model_dump(),
+			"geracao": geracao
 		}
-		cache_set_safe(cache, cache_key, json.dumps(cache_payload), ttl_seconds=self.CACHE_TTL)
+		cache_set_with_stale_safe(cache, cache_key, json.dumps(cache_payload), ttl_seconds=self.CACHE_TTL)
 		
 		return PaginatedResponse(data=response_data, meta=meta)
 
-	def buscar_por_id(self, usuario_id: int, cache: Redis) -> UsuarioResponse:
+	def _pagina_do_cache(self, cached_data: dict) -> PaginatedResponse[UsuarioResponse]:
+		return PaginatedResponse(
+			data=[UsuarioResponse(**u) for u in cached_data["data"]],
+			meta=PaginationMeta(**cached_data["meta"])
+		)
+
+	def buscar_por_id(self, usuario_id: int, cache: Redis, response: Optional[Response] = None) -> UsuarioResponse:
 		key = f"usuarios:{usuario_id}"
 		cached = cache_get_safe(cache, key)
 		if cached:
 			return UsuarioResponse(**json.loads(cached))
 		
-		usuario = self.usecase.buscar_por_id(usuario_id)
+		try:
+			usuario = self.usecase.buscar_por_id(usuario_id)
+		except ERROS_DE_BANCO:
+			stale = cache_get_stale_safe(cache, key)
+			if not stale:
+				raise
+			marcar_resposta_stale(response)
+			return UsuarioResponse(**json.loads(stale))
+		
 		resp = UsuarioResponse.model_validate(usuario)
-		cache_set_safe(cache, key, resp.model_dump_json(), ttl_seconds=self.CACHE_TTL)
+		cache_set_with_stale_safe(cache, key, resp.model_dump_json(), ttl_seconds=self.CACHE_TTL)
 		return resp
 
 	def buscar_por_email(self, email: str, cache: Redis) -> UsuarioResponse:
@@ -71,18 +95,20 @@ class UsuarioControllers:
 		cache_set_safe(cache, key, resp.model_dump_json(), ttl_seconds=self.CACHE_TTL)
 		return resp
 
-	def atualizar(self, usuario_id: int, request: UsuarioUpdateRequest, cache: Redis) -> UsuarioResponse:
+	def atualizar(self, usuario_id: int, request: UsuarioUpdateRequest, cache: Redis, response: Optional[Response] = None) -> UsuarioResponse:
 		result = self.usecase.atualizar(usuario_id, request.nome, request.email, request.senha)
 		
 		cache_delete_safe(cache, f"usuarios:{usuario_id}")
 		cache_delete_safe(cache, "usuarios:list")
 		if request.email:
 			cache_delete_safe(cache, f"usuarios:email:{request.email}")
+		registrar_token(response, {"usuarios": avancar_geracao(cache, "usuarios")})
 		
 		return UsuarioResponse.model_validate(result)
 
-	def remover(self, usuario_id: int, cache: Redis) -> None:
+	def remover(self, usuario_id: int, cache: Redis, response: Optional[Response] = None) -> None:
 		self.usecase.remover(usuario_id)
 		
 		cache_delete_safe(cache, f"usuarios:{usuario_id}")
-		cache_delete_safe(cache, "usuarios:list") 
\ No newline at end of file
+		cache_delete_safe(cache, "usuarios:list")
+		registrar_token(response, {"usuarios": avancar_geracao(cache, "usuarios")}) 
\ No newline at end of file
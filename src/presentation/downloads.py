@@ -0,0 +1,57 @@
+import os
+import re
+from pathlib import Path
+from typing import Iterator, Optional
+from fastapi.responses import Response, StreamingResponse
+
+TAMANHO_BLOCO = 64 * 1024
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def _intervalo(range_header: str, tamanho: int) -> Optional[tuple[int, int]]:
+	"""Interpreta um único intervalo "bytes=inicio-fim"; None quando não é satisfazível"""
+	match = _RANGE.match(range_header.strip())
+	if not match or not any(match.groups()):
+		return None
+	inicio, fim = match.groups()
+	if not inicio:
+		# Sufixo: os últimos N bytes
+		n = int(fim)
+		if n == 0:
+			return None
+		return max(tamanho - n, 0), tamanho - 1
+	inicio = int(inicio)
+	fim = min(int(fim), tamanho - 1) if fim else tamanho - 1
+	if inicio >= tamanho or inicio > fim:
+		return None
+	return inicio, fim
+
+def _ler(caminho: Path, inicio: int, fim: int) -> Iterator[bytes]:
+	restante = fim - inicio + 1
+	with open(caminho, "rb") as arquivo:
+		arquivo.seek(inicio)
+		while restante > 0:
+			bloco = arquivo.read(min(TAMANHO_BLOCO, restante))
+			if not bloco:
+				break
+			restante -= len(bloco)
+			yield bloco
+
+def resposta_arquivo(caminho: Path, media_type: str, nome_arquivo: str, range_header: Optional[str] = None) -> Response:
+	"""Serve o arquivo em blocos, com suporte a Range (206) para retomar downloads"""
+	tamanho = os.path.getsize(caminho)
+	headers = {
+		"Accept-Ranges": "bytes",
+		"Content-Disposition": f'attachment; filename="{nome_arquivo}"',
+	}
+
+	if range_header and range_header.startswith("bytes=") and "," not in range_header:
+		intervalo = _intervalo(range_header, tamanho)
+		if intervalo is None:
+			return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{tamanho}"})
+		inicio, fim = intervalo
+		headers["Content-Range"] = f"bytes {inicio}-{fim}/{tamanho}"
+		headers["Content-Length"] = str(fim - inicio + 1)
+		return StreamingResponse(_ler(caminho, inicio, fim), status_code=206, media_type=media_type, headers=headers)
+
+	headers["Content-Length"] = str(tamanho)
+	return StreamingResponse(_ler(caminho, 0, tamanho - 1), media_type=media_type, headers=headers)
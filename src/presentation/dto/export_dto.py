@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Literal, Optional
+from pydantic import BaseModel
+from src.domain.enums.emprestimo_status import EmprestimoStatus
+from src.presentation.exporters import FormatoExportacao
+
+class ExportCreateRequest(BaseModel):
+    recurso: Literal["livros", "pessoas", "emprestimos"]
+    formato: FormatoExportacao = FormatoExportacao.NDJSON
+    status: EmprestimoStatus = EmprestimoStatus.ATIVOS
+
+class ExportJobResponse(BaseModel):
+    id: str
+    recurso: str
+    formato: str
+    status: str
+    filtro: Optional[str] = None
+    linhas: int
+    total: Optional[int] = None
+    progresso: Optional[float] = None
+    bytes: int
+    erro: Optional[str] = None
+    criado_em: datetime
+    concluido_em: Optional[datetime] = None
+    download_url: Optional[str] = None
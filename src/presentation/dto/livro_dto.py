@@ -25,6 +25,21 @@ class LivroResponse(BaseModel):
     autor: str
     disponivel: bool
 
+class DisponibilidadeRequest(BaseModel):
+    ids: list[int]
+
+    @field_validator('ids')
+    def validar_ids(cls, v):
+        if len(v) > 10000:
+            raise ValueError('Máximo de 10000 ids por consulta')
+        if any(i < 1 for i in v):
+            raise ValueError('Ids devem ser positivos')
+        return v
+
+class DisponibilidadeResponse(BaseModel):
+    disponibilidade: dict[int, bool]
+    nao_encontrados: list[int]
+
 class EmprestimoCreateRequest(BaseModel):
     livro_id: int
     pessoa_id: int
@@ -0,0 +1,13 @@
+from datetime import datetime
+from pydantic import BaseModel
+
+class ProfileResponse(BaseModel):
+    id: str
+    criado_em: datetime
+    gatilho: str
+    method: str
+    path: str
+    status_code: int
+    duracao_ms: float
+    intervalo_ms: float
+    amostras: int
@@ -0,0 +1,93 @@
+import csv
+import io
+from enum import Enum
+from typing import Iterable, Iterator, Sequence
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from src.presentation.dto.livro_dto import EmprestimoResponse, LivroResponse
+from src.presentation.dto.pessoa_dto import PessoaResponse
+
+# Linhas são agrupadas em blocos para reduzir o número de mensagens ASGI por exportação
+TAMANHO_BLOCO = 64 * 1024
+
+class FormatoExportacao(str, Enum):
+	NDJSON = "ndjson"
+	CSV = "csv"
+
+MEDIA_TYPES = {
+	FormatoExportacao.NDJSON: "application/x-ndjson",
+	FormatoExportacao.CSV: "text/csv; charset=utf-8",
+}
+
+CAMPOS_EMPRESTIMO = ["id", "livro_id", "pessoa_id", "usuario_id", "data_emprestimo", "data_devolucao"]
+
+def em_blocos(linhas: Iterable[bytes], tamanho: int = TAMANHO_BLOCO) -> Iterator[bytes]:
+	bloco = bytearray()
+	for linha in linhas:
+		bloco.extend(linha)
+		if len(bloco) >= tamanho:
+			yield bytes(bloco)
+			bloco.clear()
+	if bloco:
+		yield bytes(bloco)
+
+def gerar_ndjson(registros: Iterable[BaseModel], campos: Sequence[str]) -> Iterator[bytes]:
+	incluir = set(campos)
+	for registro in registros:
+		yield registro.model_dump_json(include=incluir).encode() + b"\n"
+
+def gerar_csv(registros: Iterable[BaseModel], campos: Sequence[str]) -> Iterator[bytes]:
+	buffer = io.StringIO()
+	writer = csv.writer(buffer)
+	writer.writerow(campos)
+	for registro in registros:
+		dados = registro.model_dump(mode="json", include=set(campos))
+		writer.writerow([dados.get(campo) for campo in campos])
+		yield buffer.getvalue().encode("utf-8")
+		buffer.seek(0)
+		buffer.truncate()
+	resto = buffer.getvalue()
+	if resto:
+		yield resto.encode("utf-8")
+
+def _emprestimo_response(e) -> EmprestimoResponse:
+	return EmprestimoResponse(
+		id=e.id,
+		livro_id=e.livro_id,
+		pessoa_id=e.pessoa_id,
+		usuario_id=e.usuario_id,
+		data_emprestimo=e.data_emprestimo.isoformat(),
+		data_devolucao=e.data_devolucao.isoformat() if e.data_devolucao else None,
+	)
+
+def registros_exportados(recurso: str, entidades: Iterable) -> tuple[Iterator[BaseModel], list[str]]:
+	"""Converte as entidades de livros, pessoas ou emprestimos nos DTOs de resposta e devolve as colunas
+
+	Usado pelo download em streaming e pelo job em segundo plano, para que os dois
+	gerem o mesmo conteúdo.
+	"""
+	if recurso == "livros":
+		return (LivroResponse.model_validate(l) for l in entidades), list(LivroResponse.model_fields)
+	if recurso == "pessoas":
+		return (PessoaResponse.model_validate(p) for p in entidades), list(PessoaResponse.model_fields)
+	return (_emprestimo_response(e) for e in entidades), CAMPOS_EMPRESTIMO
+
+def gerador_para(formato: FormatoExportacao | str):
+	return gerar_csv if FormatoExportacao(formato) == FormatoExportacao.CSV else gerar_ndjson
+
+def resposta_exportacao(
+	registros: Iterable[BaseModel],
+	formato: FormatoExportacao,
+	nome_arquivo: str,
+	campos: Sequence[str],
+) -> StreamingResponse:
+	"""Transmite os registros em NDJSON ou CSV conforme são lidos do banco
+
+	Os registros devem vir de um iterador preguiçoso (cursor no servidor), de modo
+	que a memória usada não dependa do tamanho da tabela.
+	"""
+	return StreamingResponse(
+		em_blocos(gerador_para(formato)(registros, campos)),
+		media_type=MEDIA_TYPES[formato],
+		headers={"Content-Disposition": f'attachment; filename="{nome_arquivo}.{formato.value}"'},
+	)
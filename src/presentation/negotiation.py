@@ -0,0 +1,125 @@
+import json
+from contextvars import ContextVar
+from typing import Optional
+import msgpack
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+_formato_resposta: ContextVar[str] = ContextVar("formato_resposta", default=JSON_MEDIA_TYPE)
+
+def formato_resposta() -> str:
+	"""Formato negociado para a requisição atual (application/json ou application/msgpack)"""
+	return _formato_resposta.get()
+
+def _qualidade(accept: str, tipos: tuple[str, ...], curingas: tuple[str, ...]) -> float:
+	melhor = 0.0
+	for item in accept.split(","):
+		tipo, *params = [p.strip() for p in item.split(";")]
+		if tipo not in tipos and tipo not in curingas:
+			continue
+		q = 1.0
+		for param in params:
+			nome, _, valor = param.partition("=")
+			if nome.strip() == "q":
+				try:
+					q = float(valor)
+				except ValueError:
+					q = 0.0
+		# Tipos explícitos prevalecem sobre curingas
+		if tipo in tipos:
+			return q
+		melhor = max(melhor, q)
+	return melhor
+
+def negociar_formato(accept: Optional[str]) -> str:
+	"""Escolhe MessagePack apenas quando o cliente o pede explicitamente com q >= ao do JSON"""
+	if not accept:
+		return JSON_MEDIA_TYPE
+	q_msgpack = _qualidade(accept, MSGPACK_MEDIA_TYPES, ())
+	q_json = _qualidade(accept, (JSON_MEDIA_TYPE,), ("*/*", "application/*"))
+	if q_msgpack > 0 and q_msgpack >= q_json:
+		return MSGPACK_MEDIA_TYPE
+	return JSON_MEDIA_TYPE
+
+def _erro_corpo_invalido(mensagem: str) -> bytes:
+	return json.dumps({
+		"success": False, "data": None, "message": mensagem, "error": "INVALID_MSGPACK", "details": None
+	}).encode()
+
+class ContentNegotiationMiddleware:
+	"""Negocia o formato da resposta pelo Accept e aceita corpos em MessagePack
+
+	Corpos application/msgpack são convertidos para JSON antes de chegarem ao roteamento,
+	de modo que os mesmos DTOs validam as duas representações.
+	"""
+
+	def __init__(self, app):
+		self.app = app
+
+	async def __call__(self, scope, receive, send):
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+
+		headers = dict(scope["headers"])
+		formato = negociar_formato(headers.get(b"accept", b"").decode("latin-1"))
+		token = _formato_resposta.set(formato)
+
+		async def send_com_vary(message):
+			if message["type"] == "http.response.start":
+				message["headers"] = list(message.get("headers", [])) + [(b"vary", b"Accept")]
+			await send(message)
+
+		try:
+			tipo_corpo = headers.get(b"content-type", b"").split(b";")[0].strip().decode("latin-1")
+			if tipo_corpo in MSGPACK_MEDIA_TYPES:
+				scope, receive = await self._converter_corpo(scope, receive, send_com_vary)
+				if scope is None:
+					return
+			await self.app(scope, receive, send_com_vary)
+		finally:
+			_formato_resposta.reset(token)
+
+	async def _converter_corpo(self, scope, receive, send):
+		corpo = bytearray()
+		while True:
+			message = await receive()
+			if message["type"] == "http.disconnect":
+				return None, None
+			corpo.extend(message.get("body", b""))
+			if not message.get("more_body", False):
+				break
+
+		try:
+			convertido = json.dumps(msgpack.unpackb(bytes(corpo), raw=False), default=str).encode()
+		except (ValueError, TypeError):
+			await self._responder(send, 400, _erro_corpo_invalido("Corpo MessagePack inválido"))
+			return None, None
+
+		headers = [
+			(nome, valor) for nome, valor in scope["headers"]
+			if nome not in (b"content-type", b"content-length")
+		]
+		headers += [(b"content-type", JSON_MEDIA_TYPE.encode()), (b"content-length", str(len(convertido)).encode())]
+		enviado = False
+
+		async def receive_convertido():
+			nonlocal enviado
+			if enviado:
+				return await receive()
+			enviado = True
+			return {"type": "http.request", "body": convertido, "more_body": False}
+
+		# Altera o próprio scope para que o roteamento (scope["route"]) fique visível aos middlewares externos
+		scope["headers"] = headers
+		return scope, receive_convertido
+
+	async def _responder(self, send, status: int, corpo: bytes) -> None:
+		await send({
+			"type": "http.response.start",
+			"status": status,
+			"headers": [(b"content-type", JSON_MEDIA_TYPE.encode()), (b"content-length", str(len(corpo)).encode())],
+		})
+		await send({"type": "http.response.body", "body": corpo})
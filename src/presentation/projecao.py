@@ -0,0 +1,44 @@
+from datetime import date
+from typing import Iterable, Optional
+from fastapi import HTTPException
+
+def _separar(valor: str) -> list[str]:
+	return [parte.strip() for parte in valor.split(",") if parte.strip()]
+
+def parse_campos(fields: Optional[str], permitidos: Iterable[str]) -> Optional[list[str]]:
+	"""Converte ?fields=a,b na lista de colunas a selecionar; None mantém a resposta completa
+
+	O id é sempre incluído e a ordem segue a do modelo de resposta.
+	"""
+	if fields is None:
+		return None
+	permitidos = list(permitidos)
+	pedidos = set(_separar(fields))
+	invalidos = sorted(pedidos - set(permitidos))
+	if invalidos:
+		raise HTTPException(status_code=400, detail=f"Campos inválidos: {', '.join(invalidos)}. Permitidos: {', '.join(permitidos)}")
+	return [campo for campo in permitidos if campo == "id" or campo in pedidos]
+
+def parse_include(include: Optional[str], permitidas: Iterable[str]) -> tuple[str, ...]:
+	"""Converte ?include=a,b nas relações a embutir; sem o parâmetro, todas são embutidas"""
+	permitidas = tuple(permitidas)
+	if include is None:
+		return permitidas
+	pedidas = set(_separar(include))
+	invalidas = sorted(pedidas - set(permitidas))
+	if invalidas:
+		raise HTTPException(status_code=400, detail=f"Relações inválidas: {', '.join(invalidas)}. Permitidas: {', '.join(permitidas)}")
+	return tuple(relacao for relacao in permitidas if relacao in pedidas)
+
+def chave_projecao(campos: Optional[list[str]], relacoes: Optional[tuple[str, ...]] = None) -> str:
+	"""Sufixo da chave de cache para respostas projetadas"""
+	partes = []
+	if campos is not None:
+		partes.append(f"fields:{','.join(campos)}")
+	if relacoes is not None:
+		partes.append(f"include:{','.join(relacoes)}")
+	return ":" + ":".join(partes) if partes else ""
+
+def projetar(linha: dict, campos: list[str]) -> dict:
+	"""Mantém apenas os campos pedidos, com datas em ISO 8601 como nas respostas completas"""
+	return {campo: linha[campo].isoformat() if isinstance(linha[campo], date) else linha[campo] for campo in campos}
@@ -0,0 +1,51 @@
+from typing import Any, Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json, to_jsonable_python
+from src.presentation.dto.common import ApiResponse
+import msgpack
+from src.presentation.negotiation import MSGPACK_MEDIA_TYPE, formato_resposta
+from src.infrastructure.monitoring.timing import medir
+
+class ApiJSONResponse(JSONResponse):
+	"""Serializa o conteúdo direto para bytes pelo serializador do pydantic-core,
+	sem passar por jsonable_encoder nem pelo json da stdlib"""
+
+	def render(self, content: Any) -> bytes:
+		with medir("render"):
+			return to_json(content)
+
+class ApiMsgPackResponse(Response):
+	"""Mesmo esquema do JSON (datas como strings ISO), codificado em MessagePack"""
+	media_type = MSGPACK_MEDIA_TYPE
+
+	def render(self, content: Any) -> bytes:
+		with medir("render"):
+			return msgpack.packb(to_jsonable_python(content), use_bin_type=True)
+
+def resposta_negociada(content: Any, status_code: int = 200) -> Response:
+	"""Instancia a resposta no formato negociado para a requisição atual"""
+	if formato_resposta() == MSGPACK_MEDIA_TYPE:
+		return ApiMsgPackResponse(content, status_code=status_code)
+	return ApiJSONResponse(content, status_code=status_code)
+
+def api_response(
+	data: Any = None,
+	response: Optional[Response] = None,
+	message: Optional[str] = None,
+	status_code: int = 200,
+) -> Response:
+	"""Monta o envelope ApiResponse com dados já validados pelos DTOs e o devolve pronto
+
+	Retornar um Response faz o FastAPI dispensar a revalidação contra o response_model
+	(que continua declarado nas rotas para a documentação OpenAPI). Cabeçalhos e status
+	definidos pelos controllers no Response injetado são preservados.
+	"""
+	resposta = resposta_negociada(ApiResponse(data=data, message=message), status_code=status_code)
+	if response is not None:
+		if response.status_code:
+			resposta.status_code = response.status_code
+		resposta.raw_headers.extend(
+			(nome, valor) for nome, valor in response.raw_headers if nome != b"content-length"
+		)
+	return resposta
@@ -0,0 +1,33 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from src.infrastructure.config.factories import get_profile_repository
+from src.infrastructure.monitoring.profiling import PROFILING_ADMIN_TOKEN, RepositorioDePerfis, pilhas_folded, token_valido
+from src.presentation.dto.common import ApiResponse
+from src.presentation.dto.profile_dto import ProfileResponse
+from src.presentation.responses import ApiJSONResponse, api_response
+
+def exigir_admin(x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    """Sem PROFILING_ADMIN_TOKEN configurado as rotas de administração não existem"""
+    if not PROFILING_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token_valido(x_admin_token, PROFILING_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Token de administrador inválido")
+
+router = APIRouter(prefix="/admin", tags=["Admin"], default_response_class=ApiJSONResponse, dependencies=[Depends(exigir_admin)])
+
+@router.get("/profiles", response_model=ApiResponse[list[ProfileResponse]])
+def listar_perfis(
+    limite: int = Query(20, ge=1, le=100, description="Quantidade de perfis mais recentes"),
+    repositorio: RepositorioDePerfis = Depends(get_profile_repository)
+):
+    perfis = [ProfileResponse.model_validate(perfil) for perfil in repositorio.listar(limite)]
+    return api_response(perfis)
+
+@router.get("/profiles/{perfil_id}", response_class=PlainTextResponse)
+def obter_perfil(perfil_id: str, repositorio: RepositorioDePerfis = Depends(get_profile_repository)):
+    """Pilhas no formato folded (flamegraph.pl, speedscope)"""
+    perfil = repositorio.obter(perfil_id)
+    if perfil is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return PlainTextResponse(pilhas_folded(perfil))
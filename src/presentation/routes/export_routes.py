@@ -0,0 +1,28 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Response
+from fastapi.responses import StreamingResponse
+from src.infrastructure.config.security.auth import get_current_user
+from src.infrastructure.config.factories import get_export_controller
+from src.presentation.controllers.export_controllers import ExportControllers
+from src.presentation.dto.export_dto import ExportCreateRequest, ExportJobResponse
+from src.presentation.dto.common import ApiResponse
+from src.presentation.responses import ApiJSONResponse, api_response
+
+router = APIRouter(prefix="/exports", tags=["Exports"], default_response_class=ApiJSONResponse, dependencies=[Depends(get_current_user)])
+
+@router.post("/", response_model=ApiResponse[ExportJobResponse], status_code=202)
+def solicitar_exportacao(request: ExportCreateRequest, response: Response, controller: ExportControllers = Depends(get_export_controller)):
+	result = controller.solicitar(request, response)
+	return api_response(result, response)
+
+@router.get("/{job_id}", response_model=ApiResponse[ExportJobResponse])
+def consultar_exportacao(job_id: str, controller: ExportControllers = Depends(get_export_controller)):
+	return api_response(controller.consultar(job_id))
+
+@router.get("/{job_id}/download", response_class=StreamingResponse)
+def baixar_exportacao(
+	job_id: str,
+	range_header: Optional[str] = Header(None, alias="Range"),
+	controller: ExportControllers = Depends(get_export_controller)
+):
+	return controller.baixar(job_id, range_header)
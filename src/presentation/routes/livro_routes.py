@@ -1,49 +1,83 @@
-from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Response, Header
+from fastapi.responses import StreamingResponse
 from src.infrastructure.config.security.auth import get_current_user
 from src.infrastructure.config.factories import get_livro_controller, get_cache
 from src.presentation.controllers.livro_controllers import LivroControllers
-from src.presentation.dto.livro_dto import LivroCreateRequest, LivroResponse, EmprestimoCreateRequest, EmprestimoResponse
+from src.presentation.dto.livro_dto import (
+	LivroCreateRequest, LivroResponse, EmprestimoCreateRequest, EmprestimoResponse, DisponibilidadeRequest, DisponibilidadeResponse
+)
 from src.presentation.dto.common import ApiResponse, PaginatedResponse
+from src.presentation.responses import ApiJSONResponse, api_response
+from src.presentation.exporters import FormatoExportacao
 from src.domain.enums.emprestimo_status import EmprestimoStatus
+from src.presentation.controllers.cache_support import CONSISTENCY_HEADER, geracao_minima
 from redis import Redis
 
-router = APIRouter(tags=["Livros"], dependencies=[Depends(get_current_user)], prefix="/livros")
+router = APIRouter(tags=["Livros"], default_response_class=ApiJSONResponse, dependencies=[Depends(get_current_user)], prefix="/livros")
 
-emprestimo_router = APIRouter(tags=["Emprestimos"], dependencies=[Depends(get_current_user)], prefix="/emprestimos")
+emprestimo_router = APIRouter(tags=["Emprestimos"], default_response_class=ApiJSONResponse, dependencies=[Depends(get_current_user)], prefix="/emprestimos")
 
 @router.post("/", response_model=ApiResponse[LivroResponse])
-def cadastrar_livro(request: LivroCreateRequest, controller: LivroControllers = Depends(get_livro_controller), cache: Redis = Depends(get_cache)):
-	result = controller.cadastrar(request, cache)
-	return ApiResponse(data=LivroResponse.model_validate(result))
+def cadastrar_livro(request: LivroCreateRequest, response: Response, controller: LivroControllers = Depends(get_livro_controller), cache: Redis = Depends(get_cache)):
+	result = controller.cadastrar(request, cache, response)
+	return api_response(LivroResponse.model_validate(result), response)
 
 @router.get("/", response_model=ApiResponse[PaginatedResponse[LivroResponse]])
 def listar_livros(
+	response: Response,
 	page: int = Query(1, ge=1, description="Número da página"),
 	size: int = Query(10, ge=1, le=20, description="Tamanho da página (máx: 20)"),
+	fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: id,titulo)"),
+	consistency_token: Optional[str] = Header(None, alias=CONSISTENCY_HEADER),
 	controller: LivroControllers = Depends(get_livro_controller), 
 	cache: Redis = Depends(get_cache)
 ):
-	result = controller.listar_paginado(page, size, cache)
-	return ApiResponse(data=result)
+	result = controller.listar_paginado(page, size, cache, response, geracao_minima(consistency_token, "livros"), fields)
+	return api_response(result, response)
+
+@router.get("/export", response_class=StreamingResponse)
+def exportar_livros(
+	formato: FormatoExportacao = Query(FormatoExportacao.NDJSON, description="Formato: ndjson ou csv"),
+	controller: LivroControllers = Depends(get_livro_controller)
+):
+	return controller.exportar_livros(formato)
+
+@router.post("/disponibilidade", response_model=ApiResponse[DisponibilidadeResponse])
+def consultar_disponibilidade(request: DisponibilidadeRequest, controller: LivroControllers = Depends(get_livro_controller)):
+	result = controller.consultar_disponibilidade(request)
+	return api_response(result)
 
 @router.post("/emprestimos", response_model=ApiResponse[EmprestimoResponse])
-def emprestar(request: EmprestimoCreateRequest, current_user = Depends(get_current_user), controller: LivroControllers = Depends(get_livro_controller), cache: Redis = Depends(get_cache)):
-	result = controller.emprestar(request.livro_id, request.pessoa_id, current_user["id"], cache)
-	return ApiResponse(data=result)
+def emprestar(request: EmprestimoCreateRequest, response: Response, current_user = Depends(get_current_user), controller: LivroControllers = Depends(get_livro_controller), cache: Redis = Depends(get_cache)):
+	result = controller.emprestar(request.livro_id, request.pessoa_id, current_user["id"], cache, response)
+	return api_response(result, response)
 
 @router.put("/{livro_id}/devolver", response_model=ApiResponse[EmprestimoResponse])
-def devolver(livro_id: int, controller: LivroControllers = Depends(get_livro_controller), cache: Redis = Depends(get_cache)):
-	result = controller.devolver(livro_id, cache)
-	return ApiResponse(data=result)
+def devolver(livro_id: int, response: Response, controller: LivroControllers = Depends(get_livro_controller), cache: Redis = Depends(get_cache)):
+	result = controller.devolver(livro_id, cache, response)
+	return api_response(result, response)
 
 # Rotas de Empréstimos
 @emprestimo_router.get("/", response_model=ApiResponse[PaginatedResponse[EmprestimoResponse]])
 def listar_emprestimos(
+	response: Response,
 	page: int = Query(1, ge=1, description="Número da página"),
 	size: int = Query(10, ge=1, le=20, description="Tamanho da página (máx: 20)"),
 	status: EmprestimoStatus = Query(EmprestimoStatus.ATIVOS, description="Filtrar por status: ativos, devolvidos ou todos"),
+	fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: id,livro_id)"),
+	include: Optional[str] = Query(None, description="Relações a embutir: livro, pessoa (padrão: ambas; vazio: nenhuma)"),
+	consistency_token: Optional[str] = Header(None, alias=CONSISTENCY_HEADER),
 	controller: LivroControllers = Depends(get_livro_controller), 
 	cache: Redis = Depends(get_cache)
 ):
-	result = controller.listar_emprestimos_paginado(page, size, status, cache)
-	return ApiResponse(data=result) 
\ No newline at end of file
+	result = controller.listar_emprestimos_paginado(page, size, status, cache, response, geracao_minima(consistency_token, "emprestimos"), fields, include)
+	return api_response(result, response)
+
+@emprestimo_router.get("/export", response_class=StreamingResponse)
+def exportar_emprestimos(
+	status: EmprestimoStatus = Query(EmprestimoStatus.ATIVOS, description="Filtrar por status: ativos, devolvidos ou todos"),
+	formato: FormatoExportacao = Query(FormatoExportacao.NDJSON, description="Formato: ndjson ou csv"),
+	controller: LivroControllers = Depends(get_livro_controller)
+):
+	return controller.exportar_emprestimos(status, formato)
@@ -1,41 +1,58 @@
-from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Response, Header
+from fastapi.responses import StreamingResponse
 
 from src.presentation.dto.pessoa_dto import PessoaCreateRequest, PessoaResponse
 from src.infrastructure.config.security.auth import get_current_user
 from src.infrastructure.config.factories import get_pessoa_controller, get_cache
 from src.presentation.controllers.pessoa_controllers import PessoaControllers
 from src.presentation.dto.common import ApiResponse, PaginatedResponse
+from src.presentation.responses import ApiJSONResponse, api_response
+from src.presentation.exporters import FormatoExportacao
+from src.presentation.controllers.cache_support import CONSISTENCY_HEADER, geracao_minima
 from redis import Redis
 
-router = APIRouter(prefix="/pessoas", tags=["Pessoas"], dependencies=[Depends(get_current_user)])
+router = APIRouter(prefix="/pessoas", tags=["Pessoas"], default_response_class=ApiJSONResponse, dependencies=[Depends(get_current_user)])
 
 @router.post("/", response_model=ApiResponse[PessoaResponse])
 def criar_pessoa(
     request: PessoaCreateRequest,
+    response: Response,
     controller: PessoaControllers = Depends(get_pessoa_controller),
     cache: Redis = Depends(get_cache)
 ):
-    pessoa = controller.criar(request, cache)
-    return ApiResponse(data=PessoaResponse.model_validate(pessoa))
+    pessoa = controller.criar(request, cache, response)
+    return api_response(PessoaResponse.model_validate(pessoa), response)
 
 @router.get("/", response_model=ApiResponse[PaginatedResponse[PessoaResponse]])
 def listar_pessoas(
+    response: Response,
     page: int = Query(1, ge=1, description="Número da página"),
     size: int = Query(10, ge=1, le=20, description="Tamanho da página (máx: 20)"),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: id,nome)"),
+    consistency_token: Optional[str] = Header(None, alias=CONSISTENCY_HEADER),
     controller: PessoaControllers = Depends(get_pessoa_controller), 
     cache: Redis = Depends(get_cache)
 ):
-    result = controller.listar_paginado(page, size, cache)
-    return ApiResponse(data=result)
+    result = controller.listar_paginado(page, size, cache, response, geracao_minima(consistency_token, "pessoas"), fields)
+    return api_response(result, response)
+
+@router.get("/export", response_class=StreamingResponse)
+def exportar_pessoas(
+    formato: FormatoExportacao = Query(FormatoExportacao.NDJSON, description="Formato: ndjson ou csv"),
+    controller: PessoaControllers = Depends(get_pessoa_controller)
+):
+    return controller.exportar(formato)
 
 @router.get("/{pessoa_id}", response_model=ApiResponse[PessoaResponse])
 def buscar_por_id(
     pessoa_id: int,
+    response: Response,
     controller: PessoaControllers = Depends(get_pessoa_controller),
     cache: Redis = Depends(get_cache)
 ):
-    result = controller.buscar_por_id(pessoa_id, cache)
-    return ApiResponse(data=result)
+    result = controller.buscar_por_id(pessoa_id, cache, response)
+    return api_response(result, response)
 
 @router.get("/email/{email}", response_model=ApiResponse[PessoaResponse])
 def buscar_pessoa_por_email(
@@ -44,23 +61,25 @@ def buscar_pessoa_por_email(
     cache: Redis = Depends(get_cache)
 ):
     result = controller.buscar_por_email(email, cache)
-    return ApiResponse(data=result)
+    return api_response(result)
 
 @router.put("/{pessoa_id}", response_model=ApiResponse[PessoaResponse])
 def atualizar_pessoa(
     pessoa_id: int,
     request: PessoaCreateRequest,
+    response: Response,
     controller: PessoaControllers = Depends(get_pessoa_controller),
     cache: Redis = Depends(get_cache)
 ):
-    result = controller.atualizar(pessoa_id, request, cache)
-    return ApiResponse(data=result)
+    result = controller.atualizar(pessoa_id, request, cache, response)
+    return api_response(result, response)
 
 @router.delete("/{pessoa_id}", response_model=ApiResponse[None])
 def remover_pessoa(
     pessoa_id: int,
+    response: Response,
     controller: PessoaControllers = Depends(get_pessoa_controller),
     cache: Redis = Depends(get_cache)
 ):
-    controller.remover_pessoa(pessoa_id, cache)
-    return ApiResponse(message="Pessoa removida com sucesso") 
\ No newline at end of file
+    controller.remover_pessoa(pessoa_id, cache, response)
+    return api_response(response=response, message="Pessoa removida com sucesso") 
\ No newline at end of file
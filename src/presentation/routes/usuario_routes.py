@@ -1,55 +1,60 @@
-from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Response, Header
 from src.infrastructure.config.factories import get_usuario_controller, get_cache
 from src.presentation.controllers.usuario_controllers import UsuarioControllers
 from src.presentation.dto.usuario_dto import (
     UsuarioCreateRequest, UsuarioUpdateRequest, UsuarioResponse, LoginRequest, TokenResponse
 )
 from src.presentation.dto.common import ApiResponse, PaginatedResponse
+from src.presentation.responses import ApiJSONResponse, api_response
 from src.infrastructure.config.security.auth import get_current_user
+from src.presentation.controllers.cache_support import CONSISTENCY_HEADER, geracao_minima
 from redis import Redis
 
-router = APIRouter(prefix="/usuarios", tags=["Usuarios"])
+router = APIRouter(prefix="/usuarios", tags=["Usuarios"], default_response_class=ApiJSONResponse)
 
-auth_router = APIRouter(prefix="/auth", tags=["Auth"])
+auth_router = APIRouter(prefix="/auth", tags=["Auth"], default_response_class=ApiJSONResponse)
 
 # Rotas públicas
 @router.post("/", response_model=ApiResponse[UsuarioResponse])
 def cadastrar_usuario(request: UsuarioCreateRequest, controller: UsuarioControllers = Depends(get_usuario_controller)):
     u = controller.cadastrar(request)
-    return ApiResponse(data=UsuarioResponse.model_validate(u))
+    return api_response(UsuarioResponse.model_validate(u))
 
 @auth_router.post("/login", response_model=ApiResponse[TokenResponse])
 def login(request: LoginRequest, controller: UsuarioControllers = Depends(get_usuario_controller)):
     token = controller.login(request.email, request.senha)
-    return ApiResponse(data=token)
+    return api_response(TokenResponse.model_validate(token))
 
 # Rotas protegidas
 @router.get("/", response_model=ApiResponse[PaginatedResponse[UsuarioResponse]], dependencies=[Depends(get_current_user)])
 def listar_usuarios(
+    response: Response,
     page: int = Query(1, ge=1, description="Número da página"),
     size: int = Query(10, ge=1, le=20, description="Tamanho da página (máx: 20)"),
+    consistency_token: Optional[str] = Header(None, alias=CONSISTENCY_HEADER),
     controller: UsuarioControllers = Depends(get_usuario_controller), 
     cache: Redis = Depends(get_cache)
 ):
-    result = controller.listar_paginado(page, size, cache)
-    return ApiResponse(data=result)
+    result = controller.listar_paginado(page, size, cache, response, geracao_minima(consistency_token, "usuarios"))
+    return api_response(result, response)
 
 @router.get("/{usuario_id}", response_model=ApiResponse[UsuarioResponse], dependencies=[Depends(get_current_user)])
-def buscar_usuario(usuario_id: int, controller: UsuarioControllers = Depends(get_usuario_controller), cache: Redis = Depends(get_cache)):
-    result = controller.buscar_por_id(usuario_id, cache)
-    return ApiResponse(data=result)
+def buscar_usuario(usuario_id: int, response: Response, controller: UsuarioControllers = Depends(get_usuario_controller), cache: Redis = Depends(get_cache)):
+    result = controller.buscar_por_id(usuario_id, cache, response)
+    return api_response(result, response)
 
 @router.get("/email/{email}", response_model=ApiResponse[UsuarioResponse], dependencies=[Depends(get_current_user)])
 def buscar_usuario_por_email(email: str, controller: UsuarioControllers = Depends(get_usuario_controller), cache: Redis = Depends(get_cache)):
     result = controller.buscar_por_email(email, cache)
-    return ApiResponse(data=result)
+    return api_response(result)
 
 @router.put("/{usuario_id}", response_model=ApiResponse[UsuarioResponse], dependencies=[Depends(get_current_user)])
-def atualizar_usuario(usuario_id: int, request: UsuarioUpdateRequest, controller: UsuarioControllers = Depends(get_usuario_controller), cache: Redis = Depends(get_cache)):
-    result = controller.atualizar(usuario_id, request, cache)
-    return ApiResponse(data=result)
+def atualizar_usuario(usuario_id: int, request: UsuarioUpdateRequest, response: Response, controller: UsuarioControllers = Depends(get_usuario_controller), cache: Redis = Depends(get_cache)):
+    result = controller.atualizar(usuario_id, request, cache, response)
+    return api_response(result, response)
 
 @router.delete("/{usuario_id}", response_model=ApiResponse[None], dependencies=[Depends(get_current_user)])
-def remover_usuario(usuario_id: int, controller: UsuarioControllers = Depends(get_usuario_controller), cache: Redis = Depends(get_cache)):
-    controller.remover(usuario_id, cache)
-    return ApiResponse(message="Usuário removido com sucesso") 
\ No newline at end of file
+def remover_usuario(usuario_id: int, response: Response, controller: UsuarioControllers = Depends(get_usuario_controller), cache: Redis = Depends(get_cache)):
+    controller.remover(usuario_id, cache, response)
+    return api_response(response=response, message="Usuário removido com sucesso") 
\ No newline at end of file
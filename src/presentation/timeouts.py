@@ -0,0 +1,166 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Optional
+from src.infrastructure.config.deadlines import DESCONEXAO, PRAZO, Prazo, interromper, usar_prazo
+from src.infrastructure.config.traffic_classes import classificar, prazo_padrao_ms
+from src.infrastructure.monitoring.metrics import record_work_cancelled
+from src.presentation.admission import ADMISSION_EXEMPT_PATHS
+
+logger = logging.getLogger(__name__)
+
+DEADLINES_ENABLED = os.getenv("DEADLINES_ENABLED", "true").lower() == "true"
+DEADLINE_HEADER = os.getenv("DEADLINE_HEADER", "X-Request-Timeout-Ms")
+DEADLINE_MAX_MS = float(os.getenv("DEADLINE_MAX_MS", "60000"))
+# Prazo por rota, ex.: "/api/v1/emprestimos=3000,/api/v1/auth/login=2000" (prefixo mais longo vence)
+DEADLINE_ROUTES = os.getenv("DEADLINE_ROUTES", "")
+
+def parse_rotas(valor: str) -> dict[str, float]:
+	"""'/a=100,/b=200' -> {'/a': 100.0, '/b': 200.0}"""
+	rotas = {}
+	for item in valor.split(","):
+		prefixo, _, ms = item.partition("=")
+		if prefixo.strip() and ms.strip():
+			rotas[prefixo.strip()] = float(ms)
+	return rotas
+
+def _corpo_504() -> bytes:
+	return json.dumps({
+		"success": False,
+		"data": None,
+		"message": "Prazo da requisição esgotado",
+		"error": "DEADLINE_EXCEEDED",
+		"details": {"reason": PRAZO, "stage": "request"},
+	}).encode()
+
+class DeadlineMiddleware:
+	"""Define o prazo da requisição e cancela o trabalho quando ele vence ou o cliente desconecta
+
+	O prazo vem da rota (DEADLINE_ROUTES) ou da classe de tráfego (DEADLINE_MS_<CLASSE>); o
+	cabeçalho X-Request-Timeout-Ms pode encurtá-lo, limitado a DEADLINE_MAX_MS. Vencido
+	antes do início da resposta, devolve 504; com o cliente desconectado, apenas cancela.
+	Em ambos os casos os comandos em andamento no banco são interrompidos e a thread do
+	endpoint encontra o prazo esgotado no próximo acesso ao banco ou ao Redis.
+	"""
+
+	def __init__(
+		self,
+		app,
+		rotas: Optional[dict[str, float]] = None,
+		cabecalho: str = DEADLINE_HEADER,
+		maximo_ms: float = DEADLINE_MAX_MS,
+		isentos: tuple[str, ...] = ADMISSION_EXEMPT_PATHS,
+	):
+		self.app = app
+		rotas = rotas if rotas is not None else parse_rotas(DEADLINE_ROUTES)
+		self.rotas = sorted(rotas.items(), key=lambda item: len(item[0]), reverse=True)
+		self.cabecalho = cabecalho.lower().encode("latin-1")
+		self.maximo_ms = maximo_ms
+		self.isentos = isentos
+
+	def prazo_em_segundos(self, scope) -> Optional[float]:
+		configurado = next((ms for prefixo, ms in self.rotas if scope["path"].startswith(prefixo)), None)
+		if configurado is None:
+			configurado = prazo_padrao_ms(classificar(scope))
+		pedido = None
+		for nome, valor in scope["headers"]:
+			if nome == self.cabecalho:
+				try:
+					pedido = min(float(valor), self.maximo_ms)
+				except ValueError:
+					pedido = None
+				break
+		candidatos = [ms for ms in (configurado, pedido) if ms is not None and ms > 0]
+		return min(candidatos) / 1000 if candidatos else None
+
+	async def __call__(self, scope, receive, send):
+		if scope["type"] != "http" or scope["path"] in self.isentos:
+			await self.app(scope, receive, send)
+			return
+
+		prazo = Prazo(self.prazo_em_segundos(scope))
+		# Uma tarefa lê o receive do servidor para notar a desconexão mesmo enquanto o endpoint
+		# roda no threadpool; maxsize=1 preserva o backpressure na leitura do corpo
+		mensagens: asyncio.Queue = asyncio.Queue(maxsize=1)
+		desconectou = asyncio.Event()
+		resposta = {"iniciada": False, "substituida": False}
+
+		async def ler_do_servidor():
+			while True:
+				message = await receive()
+				if message["type"] == "http.disconnect":
+					desconectou.set()
+				await mensagens.put(message)
+				if message["type"] == "http.disconnect":
+					return
+
+		async def enviar(message):
+			if resposta["substituida"]:
+				return
+			if message["type"] == "http.response.start":
+				resposta["iniciada"] = True
+			await send(message)
+
+		with usar_prazo(prazo):
+			# A tarefa copia o contexto aqui: endpoint e threads compartilham este Prazo
+			tarefa = asyncio.ensure_future(self.app(scope, mensagens.get, enviar))
+		leitura = asyncio.ensure_future(ler_do_servidor())
+		desconexao = asyncio.ensure_future(desconectou.wait())
+		try:
+			motivo = await self._aguardar(tarefa, desconexao, prazo, resposta)
+			if motivo is None:
+				tarefa.result()
+				return
+			conexoes = prazo.cancelar(motivo)
+			record_work_cancelled(motivo, "request")
+			if motivo == PRAZO:
+				resposta["substituida"] = True
+				await self._responder_504(send)
+			tarefa.cancel()
+			if conexoes:
+				await asyncio.to_thread(interromper, conexoes)
+			try:
+				await tarefa
+			except asyncio.CancelledError:
+				pass
+			except Exception as e:
+				# O endpoint falhou depois de cancelado (ex.: prazo esgotado no banco); a resposta já foi decidida
+				logger.debug(f"Requisição cancelada ({motivo}) terminou com {type(e).__name__}")
+		finally:
+			if not tarefa.done():
+				tarefa.cancel()
+			leitura.cancel()
+			desconexao.cancel()
+
+	@staticmethod
+	async def _aguardar(tarefa, desconexao, prazo: Prazo, resposta: dict) -> Optional[str]:
+		"""Espera o endpoint terminar; devolve o motivo se for preciso cancelá-lo antes"""
+		while not tarefa.done():
+			# Depois que a resposta começou o prazo não interrompe mais (o status já foi enviado)
+			restante = None if resposta["iniciada"] else prazo.restante()
+			await asyncio.wait(
+				{tarefa, desconexao},
+				timeout=max(restante, 0) if restante is not None else None,
+				return_when=asyncio.FIRST_COMPLETED,
+			)
+			if tarefa.done():
+				return None
+			if desconexao.done():
+				return DESCONEXAO
+			if not resposta["iniciada"] and prazo.motivo() == PRAZO:
+				return PRAZO
+		return None
+
+	@staticmethod
+	async def _responder_504(send) -> None:
+		corpo = _corpo_504()
+		await send({
+			"type": "http.response.start",
+			"status": 504,
+			"headers": [
+				(b"content-type", b"application/json"),
+				(b"content-length", str(len(corpo)).encode()),
+			],
+		})
+		await send({"type": "http.response.body", "body": corpo})
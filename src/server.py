@@ -0,0 +1,231 @@
+"""
+Entrypoint de produção: processo mestre com a aplicação pré-carregada e N workers uvicorn.
+
+    python -m src.server
+
+O mestre importa a aplicação uma vez e faz fork dos workers, que compartilham as páginas
+do código carregado por copy-on-write. Todos escutam no mesmo socket, aberto pelo mestre.
+Workers são reciclados após MAX_REQUESTS requisições (com jitter, para não reiniciarem
+juntos) e substituídos quando terminam por qualquer motivo.
+
+Com mais de um worker, o estado que a aplicação guarda em memória (fila e status das
+exportações, índice de disponibilidade) divergiria entre os processos: sem os backends
+compartilhados no Redis, WEB_CONCURRENCY > 1 é recusado na partida e, sem WEB_CONCURRENCY,
+o servidor sobe com um único worker. Cada worker recebe WORKER_ID e grava logs e traces em
+arquivos próprios, separados também dos do mestre: a rotação não é segura entre processos.
+
+Este módulo só importa a biblioteca padrão no topo: o diretório de métricas multiprocesso
+precisa estar no ambiente antes de o prometheus_client ser importado pela aplicação.
+"""
+import gc
+import importlib
+import logging
+import os
+import random
+import signal
+import socket
+import tempfile
+import time
+from typing import Optional
+
+logger = logging.getLogger("server")
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+APP = os.getenv("APP_MODULE", "src.main:app")
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", "10000"))
+MAX_REQUESTS_JITTER = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+BACKLOG = int(os.getenv("BACKLOG", "2048"))
+
+# Worker que morre antes disso é tratado como falha de inicialização (evita respawn em laço)
+_VIDA_MINIMA_SEGUNDOS = 1.0
+
+
+def calcular_workers() -> int:
+    """WEB_CONCURRENCY ou a quantidade de CPUs disponíveis para o processo (respeita cpuset)"""
+    configurado = os.getenv("WEB_CONCURRENCY")
+    if configurado:
+        return max(1, int(configurado))
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+def estado_local_do_processo() -> list[str]:
+    """Recursos que, com a configuração atual, ficariam na memória de cada worker"""
+    locais = []
+    if os.getenv("EXPORT_QUEUE", "local").lower() != "redis":
+        locais.append("fila e status das exportações (EXPORT_QUEUE=redis)")
+    if os.getenv("REDIS_ENABLED", "true").lower() != "true":
+        locais.append("índice de disponibilidade e cache (REDIS_ENABLED=true)")
+    return locais
+
+
+def decidir_workers() -> int:
+    """Quantidade de workers, recusando WEB_CONCURRENCY > 1 sem estado compartilhado"""
+    workers = calcular_workers()
+    locais = estado_local_do_processo() if workers > 1 else []
+    if not locais:
+        return workers
+    if os.getenv("WEB_CONCURRENCY"):
+        raise SystemExit(
+            f"WEB_CONCURRENCY={workers} exige estado compartilhado entre os workers; configure: "
+            f"{'; '.join(locais)} ou use WEB_CONCURRENCY=1"
+        )
+    logger.warning(f"Iniciando com 1 worker: estado por processo em {'; '.join(locais)}")
+    return 1
+
+
+def limite_de_requisicoes(base: int = MAX_REQUESTS, jitter: int = MAX_REQUESTS_JITTER) -> Optional[int]:
+    """Requisições até o worker ser reciclado; None desativa a reciclagem"""
+    if base <= 0:
+        return None
+    return base + random.randint(0, max(0, jitter))
+
+
+def configurar_metricas_multiprocesso() -> str:
+    """Define PROMETHEUS_MULTIPROC_DIR (se ausente) e limpa os arquivos de execuções anteriores"""
+    diretorio = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.path.join(tempfile.gettempdir(), "prometheus-api-library")
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = diretorio
+    from src.infrastructure.monitoring.multiprocess import preparar_diretorio
+    preparar_diretorio(diretorio)
+    return diretorio
+
+
+def carregar_app(caminho: str = APP):
+    modulo, _, atributo = caminho.partition(":")
+    return getattr(importlib.import_module(modulo), atributo or "app")
+
+
+def criar_socket(host: str = HOST, port: int = PORT, backlog: int = BACKLOG) -> socket.socket:
+    familia = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(familia, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class ServidorPrefork:
+    """Mestre: pré-carrega a aplicação, mantém N workers vivos e coordena o encerramento"""
+
+    def __init__(self, app, sock: socket.socket, workers: int, graceful_timeout: int = GRACEFUL_TIMEOUT):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self._ativos: dict[int, float] = {}
+        # Posição (WORKER_ID) de cada worker; o substituto herda a do que terminou
+        self._posicoes: dict[int, int] = {}
+        self._encerrando = False
+
+    def executar(self) -> None:
+        # Objetos já carregados saem do rastreamento do GC: as coletas nos workers não tocam
+        # essas páginas, preservando o compartilhamento por copy-on-write
+        gc.freeze()
+        signal.signal(signal.SIGTERM, self._pedir_encerramento)
+        signal.signal(signal.SIGINT, self._pedir_encerramento)
+        signal.signal(signal.SIGALRM, self._forcar_encerramento)
+        for posicao in range(self.workers):
+            self._iniciar_worker(posicao)
+        logger.info(f"Mestre {os.getpid()} servindo com {self.workers} workers")
+
+        while self._ativos:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            self._worker_encerrado(pid, status)
+
+    def _worker_encerrado(self, pid: int, status: int) -> None:
+        from src.infrastructure.monitoring.multiprocess import marcar_processo_encerrado
+
+        iniciado_em = self._ativos.pop(pid, None)
+        posicao = self._posicoes.pop(pid, 0)
+        marcar_processo_encerrado(pid)
+        if self._encerrando or iniciado_em is None:
+            return
+        codigo = os.waitstatus_to_exitcode(status)
+        if codigo == 0:
+            logger.info(f"Worker {pid} reciclado")
+        else:
+            logger.warning(f"Worker {pid} terminou com código {codigo}")
+        if time.monotonic() - iniciado_em < _VIDA_MINIMA_SEGUNDOS:
+            time.sleep(_VIDA_MINIMA_SEGUNDOS)
+            # Um SIGTERM durante a espera não alcançaria o substituto
+            if self._encerrando:
+                return
+        self._iniciar_worker(posicao)
+
+    def _iniciar_worker(self, posicao: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            codigo = 0
+            # Sempre, mesmo com um worker: o mestre mantém os próprios handlers de arquivo
+            os.environ["WORKER_ID"] = str(posicao)
+            try:
+                self._executar_worker()
+            except BaseException:
+                logger.exception("Falha no worker")
+                codigo = 1
+            finally:
+                # os._exit: o filho não deve executar os handlers de atexit herdados do mestre
+                os._exit(codigo)
+        self._ativos[pid] = time.monotonic()
+        self._posicoes[pid] = posicao
+
+    def _executar_worker(self) -> None:
+        for sinal in (signal.SIGTERM, signal.SIGINT, signal.SIGALRM):
+            signal.signal(sinal, signal.SIG_DFL)
+        from src.infrastructure.config import logging_config
+        logging_config.reiniciar_apos_fork()
+
+        import uvicorn
+        config = uvicorn.Config(
+            self.app,
+            lifespan="on",
+            # O logging da aplicação já está configurado; o access log do uvicorn segue para a fila
+            log_config=None,
+            limit_max_requests=limite_de_requisicoes(),
+            timeout_graceful_shutdown=self.graceful_timeout,
+        )
+        try:
+            uvicorn.Server(config).run(sockets=[self.sock])
+        finally:
+            logging_config.encerrar_logging()
+
+    def _pedir_encerramento(self, signum, frame) -> None:
+        if self._encerrando:
+            return
+        self._encerrando = True
+        logger.info(f"Encerrando {len(self._ativos)} workers (sinal {signum})")
+        for pid in list(self._ativos):
+            self._sinalizar(pid, signal.SIGTERM)
+        signal.alarm(self.graceful_timeout + 5)
+
+    def _forcar_encerramento(self, signum, frame) -> None:
+        for pid in list(self._ativos):
+            logger.warning(f"Worker {pid} não encerrou a tempo; enviando SIGKILL")
+            self._sinalizar(pid, signal.SIGKILL)
+
+    @staticmethod
+    def _sinalizar(pid: int, sinal: int) -> None:
+        try:
+            os.kill(pid, sinal)
+        except ProcessLookupError:
+            pass
+
+
+def main() -> None:
+    workers = decidir_workers()
+    configurar_metricas_multiprocesso()
+    sock = criar_socket()
+    app = carregar_app()
+    ServidorPrefork(app, sock, workers).executar()
+
+
+if __name__ == "__main__":
+    main()
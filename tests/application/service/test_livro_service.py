@@ -9,6 +9,7 @@ from src.application.service.livro.livro_service import LivroService
 from src.domain.model.livro import Livro
 from src.domain.ports.livro_repository import LivroRepositoryPort
 from src.domain.ports.unit_of_work import UnitOfWorkPort
+from src.infrastructure.cache.disponibilidade_index import InMemoryDisponibilidadeIndex
 
 
 class TestLivroService:
@@ -338,4 +339,83 @@ class TestLivroService:
         # Assert
         assert resultado_emprestimo.disponivel is False
         assert resultado_devolucao.disponivel is True
-        assert mock_uow.commit.call_count == 2  # Duas operações transacionais
\ No newline at end of file
+        assert mock_uow.commit.call_count == 2  # Duas operações transacionais
+
+class TestLivroServiceIndiceDisponibilidade:
+    """Testes da integração do LivroService com o índice de disponibilidade."""
+
+    @pytest.fixture
+    def mock_repository(self):
+        return Mock(spec=LivroRepositoryPort)
+
+    @pytest.fixture
+    def mock_uow(self):
+        return Mock(spec=UnitOfWorkPort)
+
+    @pytest.fixture
+    def indice(self):
+        return InMemoryDisponibilidadeIndex()
+
+    @pytest.fixture
+    def service(self, mock_repository, mock_uow, indice):
+        return LivroService(mock_repository, mock_uow, indice)
+
+    def test_criar_marca_indice_apos_commit(self, service, mock_repository, mock_uow, indice):
+        """O índice só é atualizado depois do commit."""
+        mock_repository.criar.return_value = Livro(7, "Duna", "Frank Herbert", True)
+        mock_uow.commit.side_effect = lambda: assert_indice_vazio(indice, 7)
+
+        service.criar(Livro(None, "Duna", "Frank Herbert", True))
+
+        assert indice.consultar([7]) == {7: True}
+
+    def test_rollback_nao_altera_indice(self, service, mock_repository, indice):
+        mock_repository.atualizar_disponibilidade.side_effect = Exception("Erro no banco")
+
+        with pytest.raises(Exception):
+            service.set_disponibilidade(7, False)
+
+        assert indice.consultar([7]) == {7: None}
+
+    def test_consulta_usa_banco_apenas_para_desconhecidos(self, service, mock_repository, indice):
+        indice.marcar(1, True)
+        indice.marcar(2, False)
+        mock_repository.buscar_disponibilidade.return_value = {3: True}
+
+        resultado = service.consultar_disponibilidade([1, 2, 3, 4])
+
+        assert resultado == {1: True, 2: False, 3: True}
+        mock_repository.buscar_disponibilidade.assert_called_once_with([3, 4])
+        assert indice.consultar([3]) == {3: True}
+
+    def test_preenchimento_nao_sobrescreve_marcacao_concorrente(self, service, mock_repository, indice):
+        """Um empréstimo marcado enquanto o banco era lido prevalece sobre o valor lido."""
+        def ler_banco(ids):
+            indice.marcar(3, False)
+            return {3: True, 4: True}
+        mock_repository.buscar_disponibilidade.side_effect = ler_banco
+
+        service.consultar_disponibilidade([3, 4])
+
+        assert indice.consultar([3, 4]) == {3: False, 4: True}
+
+    def test_falha_no_indice_recorre_ao_banco(self, mock_repository, mock_uow):
+        indice = Mock()
+        indice.consultar.side_effect = ConnectionError("redis fora")
+        indice.marcar.side_effect = ConnectionError("redis fora")
+        indice.preencher.side_effect = ConnectionError("redis fora")
+        mock_repository.buscar_disponibilidade.return_value = {1: True}
+        service = LivroService(mock_repository, mock_uow, indice)
+
+        assert service.consultar_disponibilidade([1]) == {1: True}
+
+    def test_reconciliar_reconstroi_indice(self, service, mock_repository, indice):
+        indice.marcar(9, True)
+        mock_repository.listar_disponibilidade.return_value = iter([(1, True), (2, False)])
+
+        assert service.reconciliar_disponibilidade() == 2
+        assert indice.consultar([1, 2, 9]) == {1: True, 2: False, 9: None}
+
+
+def assert_indice_vazio(indice, livro_id):
+    assert indice.consultar([livro_id]) == {livro_id: None}
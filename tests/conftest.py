@@ -1,6 +1,8 @@
 """
 Fixtures base para todos os testes da aplicação.
 """
+import os
+import tempfile
 import pytest
 from unittest.mock import Mock
 from fastapi.testclient import TestClient
@@ -8,6 +10,14 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
+# Logs, traces, perfis e exportações dos testes vão para um diretório temporário, nunca para o
+# repositório; precisa vir antes de importar a aplicação, que lê esses caminhos na importação
+_SAIDA_DOS_TESTES = tempfile.mkdtemp(prefix="api-library-testes-")
+os.environ["LOG_DIR"] = os.path.join(_SAIDA_DOS_TESTES, "logs")
+os.environ["TRACING_EXPORT_PATH"] = os.path.join(_SAIDA_DOS_TESTES, "logs", "traces.jsonl")
+os.environ["PROFILE_DIR"] = os.path.join(_SAIDA_DOS_TESTES, "profiles")
+os.environ["EXPORTS_DIR"] = os.path.join(_SAIDA_DOS_TESTES, "exports")
+
 # Importar a aplicação
 from src.main import app
 
@@ -49,6 +59,191 @@ def mock_redis():
 	return Mock()
 
 
+class InMemoryRedis:
+	"""Stand-in em memória para os comandos Redis usados pela aplicação."""
+
+	def __init__(self):
+		self.data = {}
+		self.versoes = {}
+
+	def _tocar(self, key):
+		self.versoes[key] = self.versoes.get(key, 0) + 1
+
+	def ping(self):
+		return True
+
+	def get(self, key):
+		return self.data.get(key)
+
+	def set(self, key, value, **kwargs):
+		self.data[key] = value
+		self._tocar(key)
+		return True
+
+	def setex(self, key, ttl, value):
+		self.data[key] = value
+		self._tocar(key)
+		return True
+
+	def delete(self, *keys):
+		for k in keys:
+			self._tocar(k)
+		return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+	def incr(self, key, amount=1):
+		self.data[key] = str(int(self.data.get(key, 0)) + amount)
+		self._tocar(key)
+		return int(self.data[key])
+
+	def rename(self, origem, destino):
+		self.data[destino] = self.data.pop(origem)
+		self._tocar(origem)
+		self._tocar(destino)
+		return True
+
+	def persist(self, key):
+		return key in self.data
+
+	def setbit(self, key, offset, value):
+		bits = bytearray(self.data.get(key, b""))
+		byte, bit = divmod(offset, 8)
+		if byte >= len(bits):
+			bits.extend(bytes(byte + 1 - len(bits)))
+		anterior = 1 if bits[byte] & (0x80 >> bit) else 0
+		if value:
+			bits[byte] |= 0x80 >> bit
+		else:
+			bits[byte] &= ~(0x80 >> bit) & 0xFF
+		self.data[key] = bytes(bits)
+		self._tocar(key)
+		return anterior
+
+	def getbit(self, key, offset):
+		bits = self.data.get(key, b"")
+		byte, bit = divmod(offset, 8)
+		return 1 if byte < len(bits) and bits[byte] & (0x80 >> bit) else 0
+
+	def bitfield(self, key, *args):
+		"""Apenas subcomandos GET u<n> <offset>"""
+		valores = []
+		for i in range(0, len(args), 3):
+			_, tipo, offset = args[i:i + 3]
+			valor = 0
+			for k in range(int(tipo[1:])):
+				valor = (valor << 1) | self.getbit(key, int(offset) + k)
+			valores.append(valor)
+		return valores
+
+	def execute_command(self, comando, *args):
+		return getattr(self, comando.lower())(*args)
+
+	def rpush(self, key, *values):
+		self.data.setdefault(key, []).extend(values)
+		self._tocar(key)
+		return len(self.data[key])
+
+	def lrange(self, key, inicio, fim):
+		itens = self.data.get(key, [])
+		return itens[inicio:] if fim == -1 else itens[inicio:fim + 1]
+
+	def ltrim(self, key, inicio, fim):
+		self.data[key] = self.lrange(key, inicio, fim)
+		self._tocar(key)
+		return True
+
+	def lpush(self, key, *values):
+		self.data.setdefault(key, [])[:0] = reversed(values)
+		self._tocar(key)
+		return len(self.data[key])
+
+	def lrem(self, key, count, value):
+		itens = self.data.get(key, [])
+		removidos = 0
+		while value in itens and (count == 0 or removidos < count):
+			itens.remove(value)
+			removidos += 1
+		if removidos:
+			self._tocar(key)
+		return removidos
+
+	def llen(self, key):
+		return len(self.data.get(key, []))
+
+	def exists(self, *keys):
+		return sum(1 for k in keys if k in self.data)
+
+	def expire(self, key, ttl):
+		return key in self.data
+
+	def blmove(self, origem, destino, timeout, src="LEFT", dest="RIGHT"):
+		"""Não bloqueia: devolve None com a origem vazia"""
+		if not self.data.get(origem):
+			return None
+		valor = self.data[origem].pop(0 if src == "LEFT" else -1)
+		if dest == "LEFT":
+			self.lpush(destino, valor)
+		else:
+			self.rpush(destino, valor)
+		self._tocar(origem)
+		return valor
+
+	def blpop(self, keys, timeout=0):
+		for key in keys:
+			if self.data.get(key):
+				self._tocar(key)
+				return key, self.data[key].pop(0)
+		return None
+
+	def pipeline(self, transaction=False):
+		return _InMemoryPipeline(self)
+
+
+class _InMemoryPipeline:
+	def __init__(self, client):
+		self.client = client
+		self.comandos = []
+		self.observadas = {}
+		self.imediato = False
+
+	def watch(self, *keys):
+		self.observadas = {k: self.client.versoes.get(k, 0) for k in keys}
+		self.imediato = True
+
+	def multi(self):
+		self.imediato = False
+
+	def __getattr__(self, nome):
+		if self.imediato:
+			return getattr(self.client, nome)
+
+		def enfileirar(*args, **kwargs):
+			self.comandos.append((nome, args, kwargs))
+			return self
+		return enfileirar
+
+	def execute(self):
+		import redis
+		if any(self.client.versoes.get(k, 0) != v for k, v in self.observadas.items()):
+			self.comandos = []
+			raise redis.WatchError("Chave observada alterada")
+		resultados = [getattr(self.client, nome)(*args, **kwargs) for nome, args, kwargs in self.comandos]
+		self.comandos = []
+		return resultados
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.comandos = []
+		self.observadas = {}
+
+
+@pytest.fixture
+def memory_redis():
+	"""Redis em memória para testes que dependem do comportamento real do cache."""
+	return InMemoryRedis()
+
+
 @pytest.fixture
 def client(db_session, mock_redis):
 	"""Cliente HTTP para testes de API com overrides de dependências."""
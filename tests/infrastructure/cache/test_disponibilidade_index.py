@@ -0,0 +1,151 @@
+"""
+Testes para o índice de disponibilidade de livros (bitmap Redis e bitset local).
+"""
+import pytest
+from src.infrastructure.cache.disponibilidade_index import (
+    InMemoryDisponibilidadeIndex,
+    CHAVE_JORNAL,
+    RedisDisponibilidadeIndex,
+    get_disponibilidade_index,
+)
+
+
+@pytest.fixture(params=["memoria", "redis"])
+def indice(request, memory_redis):
+    if request.param == "redis":
+        return RedisDisponibilidadeIndex(memory_redis)
+    return InMemoryDisponibilidadeIndex()
+
+
+class TestDisponibilidadeIndex:
+    def test_ids_desconhecidos_retornam_none(self, indice):
+        assert indice.consultar([1, 999]) == {1: None, 999: None}
+
+    def test_marcar_e_consultar(self, indice):
+        indice.marcar(3, True)
+        indice.marcar(10, False)
+        assert indice.consultar([3, 10, 11]) == {3: True, 10: False, 11: None}
+
+    def test_marcar_sobrescreve_estado(self, indice):
+        indice.marcar(5, True)
+        indice.marcar(5, False)
+        assert indice.consultar([5]) == {5: False}
+
+    def test_reconstruir_substitui_indice(self, indice):
+        indice.reconstruir(iter([(1, True)]))
+        total = indice.reconstruir(iter([(2, True), (3, False), (17, True)]))
+        assert total == 3
+        assert indice.consultar([1, 2, 3, 17]) == {1: None, 2: True, 3: False, 17: True}
+
+    def test_consulta_em_lote_grande(self, indice):
+        indice.reconstruir((i, i % 2 == 0) for i in range(1, 5001))
+        resultado = indice.consultar(list(range(1, 5001)))
+        assert all(resultado[i] is (i % 2 == 0) for i in range(1, 5001))
+
+
+    def test_marcacao_durante_reconstrucao_nao_se_perde(self, indice):
+        def registros_do_banco():
+            # Leitura do banco antes da devolução do livro 4, que chega no meio da reconstrução
+            yield 4, False
+            indice.marcar(4, True)
+            yield 5, True
+
+        indice.reconstruir(registros_do_banco())
+
+        assert indice.consultar([4, 5]) == {4: True, 5: True}
+
+    def test_preencher_grava_apenas_ids_desconhecidos(self, indice):
+        indice.marcar(2, False)
+        assert indice.preencher({1: True, 2: True, 3: False, -1: True}) == 2
+        assert indice.consultar([1, 2, 3]) == {1: True, 2: False, 3: False}
+
+    def test_consulta_ids_esparsos_e_negativos(self, indice):
+        indice.reconstruir(iter([(0, True), (100000, False)]))
+        assert indice.consultar([100000, -1, 0, 7]) == {100000: False, -1: None, 0: True, 7: None}
+
+
+class TestRedisDisponibilidadeIndex:
+    def test_consulta_usa_um_comando_por_bitmap(self, memory_redis):
+        indice = RedisDisponibilidadeIndex(memory_redis)
+        indice.reconstruir((i, True) for i in range(1, 10001))
+        comandos = []
+        original = memory_redis.execute_command
+
+        def registrar(comando, *args):
+            comandos.append(comando)
+            return original(comando, *args)
+
+        memory_redis.execute_command = registrar
+        resultado = indice.consultar(list(range(1, 10001)))
+
+        assert comandos == ["BITFIELD", "BITFIELD"]
+        assert all(resultado.values())
+
+    def test_reconstrucao_nao_deixa_chaves_temporarias(self, memory_redis):
+        RedisDisponibilidadeIndex(memory_redis).reconstruir(iter([(1, True)]))
+        assert not [k for k in memory_redis.data if ":novo:" in k]
+
+    def test_refaz_a_troca_quando_o_jornal_muda(self, memory_redis):
+        indice = RedisDisponibilidadeIndex(memory_redis)
+        lrange = memory_redis.lrange
+        leituras = []
+
+        def lrange_com_marcacao_concorrente(chave, inicio, fim):
+            itens = lrange(chave, inicio, fim)
+            if (inicio, fim) != (0, -1):
+                return itens
+            leituras.append(chave)
+            if len(leituras) == 1:
+                # Outra instância marca entre o WATCH e o EXEC: a troca é refeita
+                indice.marcar(9, True)
+            return itens
+
+        memory_redis.lrange = lrange_com_marcacao_concorrente
+        indice.reconstruir(iter([(9, False)]))
+
+        assert len(leituras) == 2
+        assert indice.consultar([9]) == {9: True}
+
+
+    def test_preencher_e_uma_transacao_sem_jornal(self, memory_redis):
+        indice = RedisDisponibilidadeIndex(memory_redis)
+        pipelines = []
+        original = memory_redis.pipeline
+
+        def registrar(*args, **kwargs):
+            pipelines.append(kwargs)
+            return original(*args, **kwargs)
+
+        memory_redis.pipeline = registrar
+        assert indice.preencher({i: True for i in range(1, 101)}) == 100
+
+        assert pipelines == [{"transaction": True}]
+        assert CHAVE_JORNAL not in memory_redis.data
+
+    def test_preencher_refaz_quando_o_id_e_marcado_antes_do_exec(self, memory_redis):
+        indice = RedisDisponibilidadeIndex(memory_redis)
+        original = memory_redis.bitfield
+        leituras = []
+
+        def bitfield_com_marcacao_concorrente(chave, *args):
+            valores = original(chave, *args)
+            leituras.append(chave)
+            if len(leituras) == 1:
+                # Empréstimo do livro 5 commitado depois da leitura do banco
+                indice.marcar(5, False)
+            return valores
+
+        memory_redis.bitfield = bitfield_com_marcacao_concorrente
+        assert indice.preencher({5: True, 6: True}) == 1
+
+        assert len(leituras) == 2
+        assert indice.consultar([5, 6]) == {5: False, 6: True}
+
+
+class TestGetDisponibilidadeIndex:
+    def test_sem_cliente_usa_bitset_local(self):
+        assert isinstance(get_disponibilidade_index(None), InMemoryDisponibilidadeIndex)
+        assert get_disponibilidade_index(None) is get_disponibilidade_index(None)
+
+    def test_com_cliente_usa_redis(self, memory_redis):
+        assert isinstance(get_disponibilidade_index(memory_redis), RedisDisponibilidadeIndex)
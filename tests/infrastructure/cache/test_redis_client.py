@@ -0,0 +1,40 @@
+"""
+Testes para as funções de cache com cópia stale.
+"""
+from unittest.mock import Mock
+from src.infrastructure.cache.redis_client import (
+    cache_set_with_stale_safe,
+    cache_get_stale_safe,
+    stale_key,
+)
+
+
+class TestCacheStale:
+    def test_set_grava_valor_e_copia_stale_com_ttl_maior(self):
+        client = Mock()
+        assert cache_set_with_stale_safe(client, "livros:1", "v", ttl_seconds=60, stale_ttl_seconds=600) is True
+        pipe = client.pipeline.return_value
+        assert [c.args for c in pipe.setex.call_args_list] == [("livros:1", 60, "v"), ("stale:livros:1", 600, "v")]
+        pipe.execute.assert_called_once()
+
+    def test_set_stale_nunca_expira_antes_do_valor(self):
+        client = Mock()
+        cache_set_with_stale_safe(client, "k", "v", ttl_seconds=600, stale_ttl_seconds=60)
+        assert client.pipeline.return_value.setex.call_args_list[1].args == ("stale:k", 600, "v")
+
+    def test_get_stale(self):
+        client = Mock()
+        client.get.return_value = "v"
+        assert cache_get_stale_safe(client, "k") == "v"
+        client.get.assert_called_once_with(stale_key("k"))
+
+    def test_erros_do_redis_sao_silenciados(self):
+        client = Mock()
+        client.get.side_effect = ConnectionError()
+        client.pipeline.side_effect = ConnectionError()
+        assert cache_get_stale_safe(client, "k") is None
+        assert cache_set_with_stale_safe(client, "k", "v") is False
+
+    def test_sem_cliente(self):
+        assert cache_get_stale_safe(None, "k") is None
+        assert cache_set_with_stale_safe(None, "k", "v") is False
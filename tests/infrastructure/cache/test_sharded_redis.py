@@ -0,0 +1,185 @@
+"""
+Testes para o cliente Redis particionado (ShardedRedis).
+"""
+import threading
+
+import pytest
+from src.infrastructure.cache.sharded_redis import ShardedRedis, HashRing, extrair_hash_tag
+from src.infrastructure.cache.redis_client import cache_get_safe, cache_set_safe, cache_delete_safe
+
+
+class FakeRedis:
+    """Stand-in em memória compatível com o subconjunto de comandos usado."""
+
+    def __init__(self, url):
+        self.url = url
+        self.data = {}
+        self.pipelines_executados = 0
+        self.fechado = False
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, **kwargs):
+        self.data[key] = value
+        return True
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+    def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def incr(self, key, amount=1):
+        self.data[key] = int(self.data.get(key, 0)) + amount
+        return self.data[key]
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def close(self):
+        self.fechado = True
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.comandos = []
+
+    def __getattr__(self, nome):
+        def enfileirar(*args, **kwargs):
+            self.comandos.append((nome, args, kwargs))
+            return self
+        return enfileirar
+
+    def execute(self):
+        self.client.pipelines_executados += 1
+        return [getattr(self.client, nome)(*args, **kwargs) for nome, args, kwargs in self.comandos]
+
+
+NODES = ["redis://a:6379", "redis://b:6379", "redis://c:6379"]
+
+
+@pytest.fixture
+def sharded():
+    return ShardedRedis(NODES, client_factory=FakeRedis)
+
+
+class TestHashTag:
+    def test_chave_sem_tag(self):
+        assert extrair_hash_tag("livros:1") == "livros:1"
+
+    def test_chave_com_tag(self):
+        assert extrair_hash_tag("{livros}:list:page:1") == "livros"
+
+    def test_tag_vazia_usa_chave_inteira(self):
+        assert extrair_hash_tag("{}:x") == "{}:x"
+
+
+class TestShardedRedis:
+    def test_distribui_chaves_entre_nos(self, sharded):
+        for i in range(300):
+            sharded.setex(f"livros:{i}", 60, str(i))
+
+        contagens = [len(sharded.client_for_node(n).data) for n in NODES]
+        assert sum(contagens) == 300
+        assert all(c > 0 for c in contagens)
+
+    def test_get_le_do_mesmo_no(self, sharded):
+        sharded.setex("pessoas:10", 60, "x")
+        assert sharded.get("pessoas:10") == "x"
+        assert sharded.client_for_key("pessoas:10").data["pessoas:10"] == "x"
+
+    def test_hash_tags_colocalizam_chaves(self, sharded):
+        nos = {sharded.get_node(f"{{livros}}:list:page:{i}") for i in range(50)}
+        assert len(nos) == 1
+
+    def test_pipeline_executa_um_pipeline_por_shard(self, sharded):
+        pipe = sharded.pipeline()
+        for i in range(30):
+            pipe.setex(f"k:{i}", 60, str(i))
+        for i in range(30):
+            pipe.get(f"k:{i}")
+        resultados = pipe.execute()
+
+        assert resultados[30:] == [str(i) for i in range(30)]
+        assert all(sharded.client_for_node(n).pipelines_executados == 1 for n in NODES)
+
+    def test_mget_e_delete_multiplos_shards(self, sharded):
+        for i in range(20):
+            sharded.set(f"k:{i}", str(i))
+        assert sharded.mget([f"k:{i}" for i in range(20)]) == [str(i) for i in range(20)]
+        assert sharded.delete(*[f"k:{i}" for i in range(20)]) == 20
+
+    def test_adicionar_no_rebalanceia_minimamente(self):
+        ring = HashRing(NODES)
+        chaves = [f"livros:{i}" for i in range(2000)]
+        antes = {k: ring.get_node(k) for k in chaves}
+
+        ring.add_node("redis://d:6379")
+        movidas = [k for k in chaves if ring.get_node(k) != antes[k]]
+
+        # Apenas chaves assumidas pelo novo nó mudam de lugar (~1/4 do total)
+        assert all(ring.get_node(k) == "redis://d:6379" for k in movidas)
+        assert 0 < len(movidas) < len(chaves) * 0.4
+
+    def test_remover_no(self, sharded):
+        sharded.remove_node("redis://a:6379")
+        assert sharded.nodes == ["redis://b:6379", "redis://c:6379"]
+        assert all(sharded.get_node(f"k:{i}") != "redis://a:6379" for i in range(100))
+
+    def test_remover_no_fecha_o_cliente(self, sharded):
+        removido = sharded.client_for_node("redis://a:6379")
+        sharded.remove_node("redis://a:6379")
+        assert removido.fechado is True
+        assert not any(sharded.client_for_node(n).fechado for n in sharded.nodes)
+
+    def test_pipeline_criado_antes_da_remocao_continua_valido(self, sharded):
+        pipe = sharded.pipeline()
+        for i in range(30):
+            pipe.set(f"k:{i}", str(i))
+        sharded.remove_node("redis://a:6379")
+        assert pipe.execute() == [True] * 30
+
+    def test_consultas_concorrentes_com_alteracao_do_anel(self, sharded):
+        erros = []
+        parar = threading.Event()
+
+        def consultar():
+            while not parar.is_set():
+                try:
+                    for i in range(50):
+                        sharded.client_for_key(f"k:{i}")
+                except Exception as e:
+                    erros.append(e)
+                    return
+
+        leitores = [threading.Thread(target=consultar) for _ in range(4)]
+        for t in leitores:
+            t.start()
+        for _ in range(200):
+            sharded.remove_node("redis://a:6379")
+            sharded.add_node("redis://a:6379")
+        parar.set()
+        for t in leitores:
+            t.join()
+
+        assert erros == []
+        assert set(sharded.nodes) == set(NODES)
+
+    def test_anel_vazio(self):
+        with pytest.raises(RuntimeError):
+            HashRing().get_node("x")
+
+    def test_funcoes_de_cache_com_cliente_particionado(self, sharded):
+        assert cache_set_safe(sharded, "usuarios:1", "{}", ttl_seconds=10)
+        assert cache_get_safe(sharded, "usuarios:1") == "{}"
+        assert cache_delete_safe(sharded, "usuarios:1") is True
+        assert cache_get_safe(sharded, "usuarios:1") is None
@@ -0,0 +1,53 @@
+"""
+Testes para a raiz de composição (AppContainer) e o vínculo da sessão por requisição.
+"""
+import contextvars
+import pytest
+from src.infrastructure.config.container import AppContainer, get_container
+from src.infrastructure.config.db.session_context import (
+    SessaoDaRequisicao, vincular_requisicao, sessao_atual, cache_atual
+)
+from src.infrastructure.config.app.timezone import get_app_tz
+from src.presentation.controllers.livro_controllers import LivroControllers
+
+
+class TestSessionContext:
+    def test_sem_vinculo_gera_erro(self):
+        with pytest.raises(RuntimeError):
+            sessao_atual()
+
+    def test_proxy_delega_para_sessao_vinculada(self, db_session, memory_redis):
+        proxy = SessaoDaRequisicao()
+        with vincular_requisicao(db_session, memory_redis):
+            assert proxy.bind is db_session.bind
+            assert cache_atual() is memory_redis
+        assert cache_atual() is None
+
+    def test_contextos_isolados(self):
+        sessoes = []
+
+        def requisicao(nome):
+            with vincular_requisicao(nome):
+                sessoes.append(sessao_atual())
+
+        contextvars.copy_context().run(requisicao, "a")
+        contextvars.copy_context().run(requisicao, "b")
+        assert sessoes == ["a", "b"]
+
+
+class TestAppContainer:
+    def test_controllers_construidos_uma_vez(self):
+        container = AppContainer()
+        assert isinstance(container.create_livro_controller(), LivroControllers)
+        assert container.create_livro_controller() is container.create_livro_controller()
+        assert get_container() is get_container()
+
+    def test_usa_sessao_da_requisicao(self, db_session):
+        controller = AppContainer().create_livro_controller()
+        with vincular_requisicao(db_session):
+            livro = controller.usecase.cadastrar_livro("Duna", "Frank Herbert")
+            assert [l.id for l in controller.usecase.listar_livros()] == [livro.id]
+
+    def test_fuso_horario_resolvido_uma_vez(self):
+        assert get_app_tz() is get_app_tz()
+        assert AppContainer().tz is get_app_tz()
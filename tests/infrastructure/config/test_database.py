@@ -0,0 +1,54 @@
+"""
+Testes para a criação preguiçosa do engine do banco.
+"""
+import subprocess
+import sys
+import pytest
+from sqlalchemy import text
+from src.infrastructure.config.db import database
+
+
+@pytest.fixture
+def engine_sqlite(monkeypatch):
+    database.encerrar_engine()
+    monkeypatch.setattr(database, "DATABASE_URL", "sqlite://")
+    yield
+    database.encerrar_engine()
+
+
+class TestEnginePreguicoso:
+    def test_import_da_aplicacao_nao_carrega_o_driver(self):
+        saida = subprocess.run(
+            [sys.executable, "-c", "import sys, src.main; print('psycopg' in sys.modules)"],
+            capture_output=True, text=True, check=True,
+        )
+        assert saida.stdout.strip().splitlines()[-1] == "False"
+
+    def test_primeira_sessao_cria_o_engine(self, engine_sqlite):
+        assert database._engines == {}
+
+        sessao = database.SessionLocal()
+        try:
+            assert sessao.execute(text("SELECT 1")).scalar() == 1
+        finally:
+            sessao.close()
+
+        assert database.get_engine() is database._engines["interactive"]
+        assert database.engine is database._engines["interactive"]
+
+    def test_encerrar_descarta_o_engine(self, engine_sqlite):
+        database.get_engine()
+        database.encerrar_engine()
+
+        assert database._engines == {}
+        assert database.SessionLocal.kw["bind"] is None
+
+    def test_cada_classe_de_trafego_tem_o_proprio_engine(self, engine_sqlite):
+        sessao = database.sessao_para("bulk")
+        try:
+            assert sessao.get_bind() is database._engines["bulk"]
+        finally:
+            sessao.close()
+
+        assert set(database._engines) == {"bulk"}
+        assert database.get_engine("auth") is not database._engines["bulk"]
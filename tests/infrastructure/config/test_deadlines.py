@@ -0,0 +1,92 @@
+"""
+Testes para a propagação do prazo da requisição ao banco e ao Redis.
+"""
+import threading
+import time
+from unittest.mock import Mock
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from src.domain.exceptions import PrazoExpiradoException
+from src.infrastructure.cache.redis_client import cache_get_safe
+from src.infrastructure.config import deadlines
+from src.infrastructure.config.deadlines import Prazo, interromper, timeout_de_socket, usar_prazo
+from src.infrastructure.monitoring.metrics import work_cancelled_total
+
+CONSULTA_LENTA = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 500000000) SELECT count(*) FROM c"
+)
+
+
+@pytest.fixture
+def engine():
+    deadlines.instrumentar_sqlalchemy()
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+class TestPrazo:
+    def test_sem_prazo_nao_expira(self):
+        prazo = Prazo()
+        assert prazo.restante() is None
+        assert prazo.motivo() is None
+
+    def test_cancelamento_tem_precedencia(self):
+        prazo = Prazo(60)
+        prazo.cancelar("disconnect")
+        assert prazo.motivo() == "disconnect"
+
+    def test_timeout_de_socket_limitado_pelo_prazo(self):
+        assert timeout_de_socket(1.0) == 1.0
+        with usar_prazo(Prazo(0.2)):
+            assert timeout_de_socket(1.0) <= 0.2
+        with usar_prazo(Prazo(-1)):
+            assert timeout_de_socket(1.0) == 0.001
+
+
+class TestPrazoNoBanco:
+    def test_comando_recusado_com_prazo_esgotado(self, engine):
+        recusas = work_cancelled_total.labels(reason="deadline", stage="db")
+        antes = recusas._value.get()
+
+        with usar_prazo(Prazo(-1)), Session(engine) as sessao:
+            with pytest.raises(PrazoExpiradoException) as erro:
+                sessao.execute(text("SELECT 1"))
+
+        assert erro.value.etapa == "db"
+        assert recusas._value.get() > antes
+
+    def test_dentro_do_prazo_executa_normalmente(self, engine):
+        with usar_prazo(Prazo(5)), Session(engine) as sessao:
+            assert sessao.execute(text("SELECT 1")).scalar() == 1
+
+    def test_interrompe_comando_em_andamento(self, engine):
+        prazo = Prazo(60)
+        resultado = {}
+
+        def consultar():
+            with usar_prazo(prazo), Session(engine) as sessao:
+                try:
+                    sessao.execute(CONSULTA_LENTA)
+                    resultado["erro"] = None
+                except PrazoExpiradoException as e:
+                    resultado["erro"] = e
+
+        thread = threading.Thread(target=consultar)
+        inicio = time.monotonic()
+        thread.start()
+        time.sleep(0.2)
+        interromper(prazo.cancelar("disconnect"))
+        thread.join(timeout=10)
+
+        assert time.monotonic() - inicio < 5
+        assert resultado["erro"].motivo == "disconnect"
+
+
+class TestPrazoNoRedis:
+    def test_cache_pulado_com_prazo_esgotado(self):
+        client = Mock()
+        with usar_prazo(Prazo(-1)):
+            assert cache_get_safe(client, "chave") is None
+        client.get.assert_not_called()
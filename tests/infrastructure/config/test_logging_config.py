@@ -0,0 +1,94 @@
+"""
+Testes para o pipeline de logging assíncrono (fila, JSON, amostragem e roteamento).
+"""
+import json
+import logging
+import queue
+import pytest
+from src.infrastructure.config import logging_config
+from src.infrastructure.config.logging_config import (
+    AmostragemPorLogger, JsonFormatter, QueueHandlerNaoBloqueante, parse_amostragem
+)
+from src.infrastructure.monitoring.metrics import app_log_records_dropped_total
+
+
+def registro(nome="src.teste", nivel=logging.INFO, msg="mensagem %s", args=("x",), **extra):
+    record = logging.LogRecord(nome, nivel, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJsonFormatter:
+    def test_campos_e_extras(self):
+        dados = json.loads(JsonFormatter().format(registro(pedido_id=42)))
+
+        assert dados["level"] == "INFO"
+        assert dados["logger"] == "src.teste"
+        assert dados["message"] == "mensagem x"
+        assert dados["pedido_id"] == 42
+
+    def test_excecao_resolvida_antes_da_fila(self):
+        try:
+            raise ValueError("falhou")
+        except ValueError:
+            import sys
+            record = registro(nivel=logging.ERROR)
+            record.exc_info = sys.exc_info()
+
+        preparado = QueueHandlerNaoBloqueante(queue.Queue()).prepare(record)
+        dados = json.loads(JsonFormatter().format(preparado))
+
+        assert preparado.exc_info is None and preparado.args is None
+        assert "ValueError: falhou" in dados["exception"]
+
+
+class TestAmostragem:
+    def test_parse(self):
+        assert parse_amostragem("uvicorn.access=0.1, http=2") == {"uvicorn.access": 0.1, "http": 1.0}
+        assert parse_amostragem("") == {}
+
+    def test_descarta_apenas_abaixo_de_warning_dos_loggers_configurados(self):
+        filtro = AmostragemPorLogger({"uvicorn.access": 0.0})
+        amostrados = app_log_records_dropped_total.labels(reason="sampled")
+        antes = amostrados._value.get()
+
+        assert not filtro.filter(registro("uvicorn.access"))
+        assert filtro.filter(registro("uvicorn.access", logging.WARNING))
+        assert filtro.filter(registro("uvicorn.accessorio"))
+        assert filtro.filter(registro("src.teste"))
+        assert amostrados._value.get() == antes + 1
+
+
+class TestQueueHandlerNaoBloqueante:
+    def test_fila_cheia_descarta_sem_bloquear(self):
+        handler = QueueHandlerNaoBloqueante(queue.Queue(maxsize=1))
+        descartados = app_log_records_dropped_total.labels(reason="backpressure")
+        antes = descartados._value.get()
+
+        handler.handle(registro())
+        handler.handle(registro())
+
+        assert handler.queue.qsize() == 1
+        assert descartados._value.get() == antes + 1
+
+
+class TestSetupLogging:
+    @pytest.fixture
+    def diretorio(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(logging_config, "LOG_DIR", str(tmp_path))
+        yield tmp_path
+        monkeypatch.undo()
+        logging_config.setup_logging()
+
+    def test_http_log_recebe_apenas_os_loggers_de_acesso(self, diretorio):
+        logging_config.setup_logging()
+        logging.getLogger("uvicorn.access").info("GET /health 200")
+        logging.getLogger("src.teste").info("evento da aplicacao")
+        logging_config.encerrar_logging()
+
+        http = [json.loads(l) for l in (diretorio / "http.log").read_text().splitlines()]
+        app = [json.loads(l) for l in (diretorio / "app.log").read_text().splitlines()]
+
+        assert [r["message"] for r in http] == ["GET /health 200"]
+        assert "evento da aplicacao" in [r["message"] for r in app]
+        assert all(r["logger"] != "uvicorn.access" for r in app)
@@ -0,0 +1,109 @@
+"""
+Testes para o aquecimento do worker e o endpoint /ready.
+"""
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from src.infrastructure.config.app import warmup
+from src.infrastructure.config.app.warmup import ReconciliacaoPeriodica, WarmupState, executar_warmup
+
+
+class TestWarmup:
+    def test_executar_warmup_registra_etapas(self, monkeypatch):
+        monkeypatch.setattr(warmup, "aquecer_pool_db", lambda: 5)
+        monkeypatch.setattr(warmup, "aquecer_redis", lambda: True)
+        monkeypatch.setattr(warmup, "aquecer_caches", lambda: 3)
+        monkeypatch.setattr(warmup, "reconciliar_disponibilidade", lambda: 7)
+        app = type("App", (), {"openapi": lambda self: {"paths": {"/a": {}}}})()
+
+        state = executar_warmup(app, WarmupState())
+
+        assert state.pronto is True
+        assert state.etapas == {
+            "db_pool": "ok (5)", "redis": "ok (True)", "cache": "ok (3)", "disponibilidade": "ok (7)", "openapi": "ok (1)"
+        }
+        assert state.duracao_segundos is not None
+
+    def test_falha_em_etapa_nao_impede_prontidao(self, monkeypatch):
+        def falhar():
+            raise ConnectionError("postgres fora")
+        monkeypatch.setattr(warmup, "aquecer_pool_db", falhar)
+        monkeypatch.setattr(warmup, "aquecer_redis", lambda: False)
+        monkeypatch.setattr(warmup, "aquecer_caches", lambda: 0)
+        monkeypatch.setattr(warmup, "reconciliar_disponibilidade", lambda: 0)
+        app = type("App", (), {"openapi": lambda self: {}})()
+
+        state = executar_warmup(app, WarmupState())
+
+        assert state.pronto is True
+        assert state.etapas["db_pool"] == "erro: ConnectionError"
+
+    def test_aquecer_caches_preenche_primeiras_paginas(self, monkeypatch, db_session, memory_redis):
+        from src.infrastructure.cache import redis_client
+        from src.infrastructure.config.db import database
+        monkeypatch.setattr(redis_client, "get_redis_client", lambda: memory_redis)
+        monkeypatch.setattr(database, "SessionLocal", lambda: db_session)
+
+        assert warmup.aquecer_caches(paginas=1, size=10) == 3
+        assert "livros:list:page:1:size:10" in memory_redis.data
+        assert "pessoas:list:page:1:size:10" in memory_redis.data
+        assert "emprestimos:list:status:ativos:page:1:size:10" in memory_redis.data
+
+    def test_aquecer_caches_sem_redis(self, monkeypatch):
+        from src.infrastructure.cache import redis_client
+        monkeypatch.setattr(redis_client, "get_redis_client", lambda: None)
+        assert warmup.aquecer_caches() == 0
+
+
+class TestReconciliacaoPeriodica:
+    def test_reconcilia_a_cada_intervalo_e_sobrevive_a_falhas(self, monkeypatch):
+        chamadas = []
+
+        def reconciliar():
+            chamadas.append(1)
+            if len(chamadas) == 1:
+                raise ConnectionError("postgres fora")
+            return 3
+        monkeypatch.setattr(warmup, "reconciliar_disponibilidade", reconciliar)
+
+        async def cenario():
+            reconciliacao = ReconciliacaoPeriodica(intervalo_segundos=0.01)
+            reconciliacao.iniciar()
+            for _ in range(200):
+                if len(chamadas) >= 3:
+                    break
+                await asyncio.sleep(0.01)
+            await reconciliacao.parar()
+
+        asyncio.run(cenario())
+        assert len(chamadas) >= 3
+
+    def test_intervalo_zero_desativa(self):
+        async def cenario():
+            reconciliacao = ReconciliacaoPeriodica(intervalo_segundos=0)
+            reconciliacao.iniciar()
+            return reconciliacao._tarefa
+
+        assert asyncio.run(cenario()) is None
+
+
+class TestReadyEndpoint:
+    def test_ready_indisponivel_antes_do_aquecimento(self):
+        from src.infrastructure.config.app.app_factory import create_app
+        client = TestClient(create_app())
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming_up"
+
+    def test_ready_apos_aquecimento(self, monkeypatch):
+        from src.infrastructure.config.app import app_factory
+        monkeypatch.setattr(app_factory, "executar_warmup", lambda app, state: setattr(state, "pronto", True))
+        with TestClient(app_factory.create_app()) as client:
+            for _ in range(100):
+                response = client.get("/ready")
+                if response.status_code == 200:
+                    break
+                time.sleep(0.01)
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
@@ -0,0 +1,253 @@
+"""
+Testes para o subsistema de exportação em segundo plano (store, fila e writer).
+"""
+import csv
+import gzip
+import json
+import os
+import time
+from datetime import date, datetime, timezone
+import pytest
+from src.domain.enums.export_status import ExportStatus
+from src.domain.enums.emprestimo_status import EmprestimoStatus
+from src.domain.exceptions import FilaDeExportacaoCheiaException
+from src.domain.model.export_job import ExportJob
+from src.domain.model.livro import Livro
+from src.domain.model.pessoa import Pessoa
+from src.application.usecase.export_usecases import ExportUseCase
+from src.infrastructure.exports.store import InMemoryExportJobStore, RedisExportJobStore
+from src.infrastructure.exports import store as store_module
+from src.infrastructure.exports.queue import LocalExportQueue, RedisExportQueue, _Workers
+from src.infrastructure.exports.writer import ExportWriter
+from src.infrastructure.exports import writer as writer_module
+from src.infrastructure.persistence.repository.livro_repository import LivroRepository
+from src.infrastructure.persistence.repository.pessoa_repository import PessoaRepository
+
+
+def novo_job(recurso="livros", formato="ndjson", filtro=None):
+    return ExportJob(
+        id="job1", recurso=recurso, formato=formato, status=ExportStatus.PENDENTE,
+        criado_em=datetime.now(timezone.utc), filtro=filtro,
+    )
+
+
+@pytest.fixture
+def store():
+    return InMemoryExportJobStore()
+
+
+@pytest.fixture
+def writer(tmp_path, store, db_session):
+    return ExportWriter(tmp_path, store, session_factory=lambda: db_session)
+
+
+class TestExportWriter:
+    def test_gera_ndjson_compactado(self, writer, store, db_session):
+        repo = LivroRepository(db_session)
+        for i in range(5):
+            repo.criar(Livro(None, f"Livro {i}", "Autor", True))
+        db_session.commit()
+        store.salvar(novo_job())
+
+        writer.executar("job1")
+
+        job = store.buscar("job1")
+        assert job.status == ExportStatus.CONCLUIDO
+        assert (job.linhas, job.total) == (5, 5)
+        with gzip.open(job.arquivo, "rt") as f:
+            linhas = [json.loads(l) for l in f]
+        assert [l["titulo"] for l in linhas] == [f"Livro {i}" for i in range(5)]
+        assert job.bytes > 0
+
+    def test_gera_csv_com_datas_iso(self, writer, store, db_session):
+        PessoaRepository(db_session).criar(Pessoa(None, "Ana", "11999999999", date(1990, 5, 1), "ana@x.com"))
+        db_session.commit()
+        store.salvar(novo_job("pessoas", "csv"))
+
+        writer.executar("job1")
+
+        with gzip.open(store.buscar("job1").arquivo, "rt") as f:
+            linhas = list(csv.reader(f))
+        assert linhas[0] == ["id", "nome", "telefone", "data_nascimento", "email"]
+        assert linhas[1][1:] == ["Ana", "11999999999", "1990-05-01", "ana@x.com"]
+
+    def test_progresso_salvo_a_cada_lote(self, writer, store, db_session, monkeypatch):
+        monkeypatch.setattr(writer_module, "TAMANHO_LOTE", 2)
+        repo = LivroRepository(db_session)
+        for i in range(5):
+            repo.criar(Livro(None, f"Livro {i}", "Autor", True))
+        db_session.commit()
+        store.salvar(novo_job())
+        salvos = []
+        salvar = store.salvar
+        monkeypatch.setattr(store, "salvar", lambda job: (salvos.append(job.linhas), salvar(job)))
+
+        writer.executar("job1")
+
+        assert 2 in salvos and 4 in salvos
+
+    def test_falha_marca_job_e_remove_parcial(self, tmp_path, store):
+        class SessaoQuebrada:
+            def query(self, *args):
+                raise RuntimeError("banco fora")
+
+            def close(self):
+                pass
+
+        writer = ExportWriter(tmp_path, store, session_factory=SessaoQuebrada)
+        store.salvar(novo_job("emprestimos", filtro=EmprestimoStatus.TODOS.value))
+
+        writer.executar("job1")
+
+        job = store.buscar("job1")
+        assert job.status == ExportStatus.FALHOU
+        assert "banco fora" in job.erro
+        assert list(tmp_path.iterdir()) == []
+
+    def test_reexecuta_job_devolvido_pela_fila(self, writer, store, db_session):
+        LivroRepository(db_session).criar(Livro(None, "Livro", "Autor", True))
+        db_session.commit()
+        job = novo_job()
+        job.status = ExportStatus.EXECUTANDO
+        job.linhas = 7
+        store.salvar(job)
+
+        writer.executar("job1")
+
+        job = store.buscar("job1")
+        assert job.status == ExportStatus.CONCLUIDO
+        assert job.linhas == 1
+
+    def test_csv_de_emprestimos_usa_as_colunas_do_download(self, writer, store):
+        store.salvar(novo_job("emprestimos", "csv", EmprestimoStatus.TODOS.value))
+
+        writer.executar("job1")
+
+        with gzip.open(store.buscar("job1").arquivo, "rt") as f:
+            assert next(csv.reader(f)) == ["id", "livro_id", "pessoa_id", "usuario_id", "data_emprestimo", "data_devolucao"]
+
+    def test_limpar_remove_arquivos_expirados(self, tmp_path, store):
+        writer = ExportWriter(tmp_path, store, ttl_segundos=60)
+        antigo, parcial, recente = tmp_path / "a.csv.gz", tmp_path / "b.csv.gz.part", tmp_path / "c.csv.gz"
+        for arquivo in (antigo, parcial, recente):
+            arquivo.write_bytes(b"x")
+        uma_hora_atras = time.time() - 3600
+        os.utime(antigo, (uma_hora_atras, uma_hora_atras))
+        os.utime(parcial, (uma_hora_atras, uma_hora_atras))
+
+        assert writer.limpar() == 2
+        assert list(tmp_path.iterdir()) == [recente]
+
+    def test_ignora_job_que_nao_esta_pendente(self, writer, store):
+        job = novo_job()
+        job.status = ExportStatus.CONCLUIDO
+        store.salvar(job)
+        writer.executar("job1")
+        assert store.buscar("job1").arquivo is None
+
+
+class TestFilas:
+    def test_fila_local_executa_com_concorrencia_limitada(self):
+        executados = []
+        fila = LocalExportQueue(executados.append, workers=2, limite=10)
+        for i in range(5):
+            fila.enfileirar(f"job{i}")
+        fila.aguardar()
+        fila.parar()
+        assert sorted(executados) == [f"job{i}" for i in range(5)]
+
+    def test_fila_local_cheia(self):
+        fila = LocalExportQueue(lambda job_id: None, workers=1, limite=1)
+        fila._fila.put_nowait("ocupando")
+        fila.iniciar = lambda: None
+        with pytest.raises(FilaDeExportacaoCheiaException):
+            fila.enfileirar("outro")
+
+    def test_fila_redis(self, memory_redis):
+        executados = []
+        fila = RedisExportQueue(memory_redis, executados.append, workers=1, limite=2)
+        fila.enfileirar("a")
+        fila.enfileirar("b")
+        with pytest.raises(FilaDeExportacaoCheiaException):
+            fila.enfileirar("c")
+
+        job_id = memory_redis.blmove(fila.CHAVE, fila.PROCESSANDO, 1)
+        fila._executar_com_lease(job_id)
+
+        assert executados == ["a"]
+        assert memory_redis.lrange(fila.PROCESSANDO, 0, -1) == []
+        assert not memory_redis.exists(fila.chave_lease("a"))
+
+    def test_fila_redis_consome_pela_lista_de_processamento(self, memory_redis):
+        em_processamento = []
+        fila = RedisExportQueue(memory_redis, lambda job_id: None, workers=1, limite=10)
+
+        def executar(job_id):
+            em_processamento.append((memory_redis.lrange(fila.PROCESSANDO, 0, -1), memory_redis.exists(fila.chave_lease(job_id))))
+            fila._parar.set()
+
+        fila._executar = executar
+        fila.enfileirar("a")
+        fila._consumir()
+
+        assert em_processamento == [(["a"], 1)]
+        assert memory_redis.lrange(fila.PROCESSANDO, 0, -1) == []
+
+    def test_fila_redis_devolve_job_de_worker_morto(self, memory_redis):
+        fila = RedisExportQueue(memory_redis, lambda job_id: None, workers=1, limite=10)
+        memory_redis.rpush(fila.CHAVE, "novo")
+        memory_redis.rpush(fila.PROCESSANDO, "morto", "vivo")
+        memory_redis.set(fila.chave_lease("vivo"), "1")
+
+        # Na primeira varredura o job sem lease é só suspeito (pode ter acabado de sair da fila)
+        assert fila.recuperar() == 0
+        assert fila.recuperar() == 1
+
+        assert memory_redis.lrange(fila.CHAVE, 0, -1) == ["morto", "novo"]
+        assert memory_redis.lrange(fila.PROCESSANDO, 0, -1) == ["vivo"]
+
+    def test_filas_implementam_o_contrato(self):
+        class FilaIncompleta(_Workers):
+            def enfileirar(self, job_id):
+                pass
+
+        with pytest.raises(TypeError):
+            FilaIncompleta(lambda job_id: None, 1)
+
+    def test_use_case_marca_falha_quando_fila_cheia(self, store):
+        class FilaCheia:
+            def enfileirar(self, job_id):
+                raise FilaDeExportacaoCheiaException(1)
+
+        with pytest.raises(FilaDeExportacaoCheiaException):
+            ExportUseCase(store, FilaCheia()).solicitar("livros", "ndjson")
+        [job] = store._jobs.values()
+        assert job.status == ExportStatus.FALHOU
+
+
+class TestInMemoryExportJobStore:
+    def test_job_expira_depois_do_ttl(self, monkeypatch):
+        agora = [1000.0]
+        monkeypatch.setattr(store_module.time, "monotonic", lambda: agora[0])
+        store = InMemoryExportJobStore(ttl_seconds=60)
+        store.salvar(novo_job())
+
+        agora[0] += 30
+        assert store.buscar("job1") is not None
+        agora[0] += 31
+        assert store.buscar("job1") is None
+
+        outro = novo_job()
+        outro.id = "job2"
+        store.salvar(outro)
+        assert set(store._jobs) == {"job2"}
+
+
+class TestRedisExportJobStore:
+    def test_ida_e_volta(self, memory_redis):
+        store = RedisExportJobStore(memory_redis, ttl_seconds=60)
+        job = novo_job("emprestimos", "csv", "todos")
+        job.concluido_em = datetime.now(timezone.utc)
+        store.salvar(job)
+        assert store.buscar("job1") == job
+        assert store.buscar("outro") is None
@@ -2,9 +2,14 @@
 Testes para o MetricsMiddleware e endpoint de métricas.
 """
 import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
 from src.infrastructure.monitoring.metrics import (
     MetricsMiddleware,
     http_requests_total,
+    http_errors_total,
+    http_requests_in_progress,
+    http_response_size_bytes,
     get_metrics,
 )
 
@@ -26,16 +31,75 @@ async def test_metrics_middleware_increments_counters():
     async def dummy_send(message):
         pass
 
-    labels = http_requests_total.labels(method="GET", route="/teste", status_code=200)
+    # Sem rota conhecida, o caminho bruto não vira rótulo
+    labels = http_requests_total.labels(method="GET", route="unmatched", status_code=200)
     before = labels._value.get()
 
     await middleware(scope, dummy_receive, dummy_send)
 
     after = labels._value.get()
     assert after == before + 1
+    assert http_requests_in_progress.labels(method="GET")._value.get() == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_middleware_registra_500_quando_app_falha():
+    async def app_com_erro(scope, receive, send):
+        raise RuntimeError("falha")
+
+    labels = http_errors_total.labels(method="GET", route="unmatched", status_code=500, error_type="server_error")
+    before = labels._value.get()
+
+    with pytest.raises(RuntimeError):
+        await MetricsMiddleware(app_com_erro)({"type": "http", "method": "GET", "path": "/x"}, None, None)
+
+    assert labels._value.get() == before + 1
+
+
+class TestMetricsMiddlewareComRotas:
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/itens/{item_id}")
+        def obter(item_id: int):
+            if item_id == 0:
+                raise HTTPException(status_code=404, detail="não encontrado")
+            return {"id": item_id}
+
+        return TestClient(app)
+
+    def test_rotula_pelo_template_da_rota(self, client):
+        labels = http_requests_total.labels(method="GET", route="/itens/{item_id}", status_code=200)
+        before = labels._value.get()
+
+        client.get("/itens/1")
+        client.get("/itens/2")
+
+        assert labels._value.get() == before + 2
+        assert http_requests_total.labels(method="GET", route="/itens/1", status_code=200)._value.get() == 0
+
+    def test_status_real_e_erros(self, client):
+        erros = http_errors_total.labels(method="GET", route="/itens/{item_id}", status_code=404, error_type="client_error")
+        before = erros._value.get()
+
+        assert client.get("/itens/0").status_code == 404
+
+        assert erros._value.get() == before + 1
+
+    def test_caminho_desconhecido_e_tamanho_da_resposta(self, client):
+        tamanhos = http_response_size_bytes.labels(method="GET", route="/itens/{item_id}")
+        soma = tamanhos._sum.get()
+
+        client.get("/nao/existe")
+        corpo = client.get("/itens/7").content
+
+        assert http_requests_total.labels(method="GET", route="unmatched", status_code=404)._value.get() >= 1
+        assert tamanhos._sum.get() == soma + len(corpo)
 
 
 def test_get_metrics_returns_response():
     resp = get_metrics()
     assert resp.status_code == 200
-    assert resp.media_type.startswith("text/plain") 
\ No newline at end of file
+    assert resp.media_type.startswith("text/plain")
@@ -0,0 +1,92 @@
+"""
+Testes para a exposição de métricas em modo multiprocesso.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from src.infrastructure.monitoring.multiprocess import (
+    ExposicaoEmCache,
+    compactar_processo_encerrado,
+    preparar_diretorio,
+)
+
+RAIZ = Path(__file__).resolve().parents[3]
+
+WORKER = """
+from src.infrastructure.monitoring.metrics import http_requests_total, http_requests_in_progress, http_request_duration_seconds
+http_requests_total.labels(method="GET", route="/livros/", status_code=200).inc(3)
+http_requests_in_progress.labels(method="GET").inc()
+http_request_duration_seconds.labels(method="GET", route="/livros/").observe(0.2)
+"""
+
+COLETOR = """
+import os
+from src.infrastructure.monitoring.multiprocess import gerar_exposicao, marcar_processo_encerrado
+for pid in os.environ.get("PIDS_ENCERRADOS", "").split():
+    marcar_processo_encerrado(int(pid))
+print(gerar_exposicao().decode())
+"""
+
+
+def executar(codigo, diretorio, **env):
+    ambiente = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(diretorio), **env)
+    return subprocess.run(
+        [sys.executable, "-c", codigo], cwd=RAIZ, env=ambiente, capture_output=True, text=True, check=True
+    )
+
+
+def amostra(exposicao, prefixo):
+    return next(float(l.rsplit(" ", 1)[1]) for l in exposicao.splitlines() if l.startswith(prefixo))
+
+
+class TestMultiprocesso:
+    def test_agrega_contadores_e_descarta_gauges_de_workers_encerrados(self, tmp_path):
+        preparar_diretorio(str(tmp_path))
+        for _ in range(2):
+            executar(WORKER, tmp_path)
+        pids = sorted(p.stem.rsplit("_", 1)[1] for p in tmp_path.glob("gauge_livesum_*.db"))
+
+        vivos = executar(COLETOR, tmp_path).stdout
+        assert amostra(vivos, 'http_requests_total{method="GET",route="/livros/",status_code="200"}') == 6
+        assert amostra(vivos, 'http_requests_in_progress{method="GET"}') == 2
+
+        encerrado = executar(COLETOR, tmp_path, PIDS_ENCERRADOS=pids[0]).stdout
+        assert amostra(encerrado, 'http_requests_in_progress{method="GET"}') == 1
+        assert amostra(encerrado, 'http_requests_total{method="GET",route="/livros/",status_code="200"}') == 6
+
+    def test_compacta_arquivos_de_workers_encerrados_sem_alterar_totais(self, tmp_path):
+        preparar_diretorio(str(tmp_path))
+        for _ in range(3):
+            executar(WORKER, tmp_path)
+        pids = sorted(p.stem.rsplit("_", 1)[1] for p in tmp_path.glob("counter_*.db"))
+        antes = executar(COLETOR, tmp_path).stdout
+
+        for pid in pids[:2]:
+            assert compactar_processo_encerrado(int(pid), str(tmp_path)) == 2
+        assert compactar_processo_encerrado(int(pids[0]), str(tmp_path)) == 0
+
+        assert {p.name for p in tmp_path.glob("counter_*.db")} == {"counter_encerrados.db", f"counter_{pids[2]}.db"}
+        assert {p.name for p in tmp_path.glob("histogram_*.db")} == {"histogram_encerrados.db", f"histogram_{pids[2]}.db"}
+        depois = executar(COLETOR, tmp_path).stdout
+        assert sorted(depois.splitlines()) == sorted(antes.splitlines())
+        assert amostra(depois, 'http_requests_total{method="GET",route="/livros/",status_code="200"}') == 9
+        assert amostra(depois, 'http_request_duration_seconds_count{method="GET",route="/livros/"}') == 3
+
+    def test_preparar_diretorio_remove_arquivos_anteriores(self, tmp_path):
+        (tmp_path / "counter_123.db").write_bytes(b"x")
+        preparar_diretorio(str(tmp_path))
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestExposicaoEmCache:
+    def test_reaproveita_dentro_da_janela(self):
+        chamadas = []
+        cache = ExposicaoEmCache(lambda: chamadas.append(1) or str(len(chamadas)).encode(), janela_segundos=60)
+        assert cache.obter() == cache.obter() == b"1"
+
+    def test_regenera_apos_a_janela(self):
+        chamadas = []
+        cache = ExposicaoEmCache(lambda: chamadas.append(1) or str(len(chamadas)).encode(), janela_segundos=0)
+        assert cache.obter() == b"1"
+        assert cache.obter() == b"2"
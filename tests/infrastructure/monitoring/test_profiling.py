@@ -0,0 +1,81 @@
+"""
+Testes para o profiling sob demanda de requisições.
+"""
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from src.infrastructure.monitoring.profiling import (
+    AmostradorDePilhas, ProfilingMiddleware, RepositorioDePerfis, pilhas_folded, profiling_habilitado
+)
+from src.infrastructure.monitoring.timing import medido
+
+
+class TestAmostradorDePilhas:
+    def test_registra_apenas_pilhas_da_aplicacao(self):
+        liberar = threading.Event()
+        ociosa = threading.Thread(target=liberar.wait)
+        da_aplicacao = threading.Thread(target=medido("db")(liberar.wait))
+        ociosa.start()
+        da_aplicacao.start()
+        try:
+            amostrador = AmostradorDePilhas()
+            amostrador.amostrar()
+        finally:
+            liberar.set()
+            ociosa.join()
+            da_aplicacao.join()
+
+        assert amostrador.amostras == 1
+        assert len(amostrador.pilhas) == 1
+        pilha = next(iter(amostrador.pilhas))
+        assert "wrapper (src/infrastructure/monitoring/timing.py)" in pilha
+        assert pilha.endswith("wait (threading.py)")
+
+
+class TestRepositorioDePerfis:
+    def test_mantem_apenas_os_mais_recentes(self, tmp_path):
+        repositorio = RepositorioDePerfis(str(tmp_path), maximo=2)
+        ids = [f"00000000-0000-0000-0000-00000000000{i}" for i in range(3)]
+        for perfil_id in ids:
+            repositorio.salvar({"id": perfil_id, "pilhas": {"a;b": 2}})
+            time.sleep(0.01)
+
+        assert [p["id"] for p in repositorio.listar()] == [ids[2], ids[1]]
+        assert "pilhas" not in repositorio.listar()[0]
+        assert pilhas_folded(repositorio.obter(ids[2])) == "a;b 2\n"
+        assert repositorio.obter("../segredo") is None
+
+
+class TestProfilingMiddleware:
+    def test_desabilitado_sem_token_e_sem_taxa(self):
+        assert not profiling_habilitado("", 0)
+        assert profiling_habilitado("segredo", 0)
+        assert profiling_habilitado("", 0.01)
+
+    @pytest.fixture
+    def perfilado(self, client, memory_redis, tmp_path):
+        from src.main import app
+        from src.infrastructure.config.factories import get_cache
+        app.dependency_overrides[get_cache] = lambda: memory_redis
+        repositorio = RepositorioDePerfis(str(tmp_path))
+        return TestClient(ProfilingMiddleware(app, token="segredo", repositorio=repositorio, intervalo_ms=1)), repositorio
+
+    def test_cabecalho_de_admin_gera_perfil(self, perfilado, auth_headers):
+        cliente, repositorio = perfilado
+        r = cliente.get("/api/v1/pessoas/", headers=auth_headers | {"X-Profile": "segredo"})
+
+        assert r.status_code == 200
+        [perfil] = repositorio.listar()
+        assert perfil["id"] == r.headers["x-profile-id"]
+        assert perfil["gatilho"] == "admin"
+        assert perfil["path"] == "/api/v1/pessoas/"
+        assert perfil["status_code"] == 200
+
+    def test_token_invalido_ou_ausente_nao_perfila(self, perfilado, auth_headers):
+        cliente, repositorio = perfilado
+        r1 = cliente.get("/api/v1/pessoas/", headers=auth_headers | {"X-Profile": "errado"})
+        r2 = cliente.get("/api/v1/pessoas/", headers=auth_headers)
+
+        assert "x-profile-id" not in r1.headers and "x-profile-id" not in r2.headers
+        assert repositorio.listar() == []
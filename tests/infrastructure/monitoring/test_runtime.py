@@ -0,0 +1,75 @@
+"""
+Testes para o amostrador de métricas de runtime.
+"""
+import asyncio
+import gc
+import threading
+import pytest
+from src.infrastructure.monitoring.metrics import (
+    app_memory_usage_bytes,
+    app_threadpool_capacity,
+    app_gc_collections_total,
+    app_event_loop_lag_seconds,
+)
+from src.infrastructure.monitoring.runtime import RuntimeSampler, memoria_residente
+
+
+def total_amostras(histograma):
+    return next(s.value for m in histograma.collect() for s in m.samples if s.name.endswith("_count"))
+
+
+class TestRuntimeSampler:
+    def test_memoria_residente(self):
+        assert memoria_residente() > 1024 * 1024
+
+    @pytest.mark.asyncio
+    async def test_amostrar_atualiza_gauges(self):
+        RuntimeSampler().amostrar()
+
+        assert app_memory_usage_bytes._value.get() > 0
+        assert app_threadpool_capacity._value.get() >= 1
+
+    @pytest.mark.asyncio
+    async def test_mede_pausas_do_gc_enquanto_ativo(self):
+        sampler = RuntimeSampler(intervalo_segundos=60)
+        coletas = app_gc_collections_total.labels(generation="2")
+        antes = coletas._value.get()
+
+        sampler.iniciar()
+        gc.collect()
+        await sampler.parar()
+        gc.collect()
+
+        assert coletas._value.get() == antes + 1
+        assert sampler._medir_gc not in gc.callbacks
+
+    def test_callback_do_gc_nao_toca_nas_metricas(self):
+        sampler = RuntimeSampler(intervalo_segundos=60)
+        coletas = app_gc_collections_total.labels(generation="2")
+        antes = coletas._value.get()
+
+        def coletar_durante_atualizacao_de_metrica():
+            sampler._medir_gc("start", {"generation": 2})
+            sampler._medir_gc("stop", {"generation": 2})
+
+        # Simula uma coleta disparada enquanto a thread atual atualiza uma métrica
+        with coletas._value._lock:
+            coleta = threading.Thread(target=coletar_durante_atualizacao_de_metrica)
+            coleta.start()
+            coleta.join(timeout=2)
+            assert not coleta.is_alive()
+
+        assert coletas._value.get() == antes
+        sampler.registrar_pausas_do_gc()
+        assert coletas._value.get() == antes + 1
+
+    @pytest.mark.asyncio
+    async def test_registra_atraso_do_event_loop(self):
+        sampler = RuntimeSampler(intervalo_segundos=0.01)
+        antes = total_amostras(app_event_loop_lag_seconds)
+
+        sampler.iniciar()
+        await asyncio.sleep(0.05)
+        await sampler.parar()
+
+        assert total_amostras(app_event_loop_lag_seconds) > antes
@@ -0,0 +1,97 @@
+"""
+Testes para o detalhamento de tempo por requisição (Server-Timing e log de requisições lentas).
+"""
+import json
+import logging
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from src.infrastructure.monitoring import timing
+from src.infrastructure.monitoring.timing import (
+    ServerTimingMiddleware, medir, registrar_tempo, server_timing, tempos_atuais
+)
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def app_com_etapas(scope, receive, send):
+    with medir("cache"):
+        pass
+    registrar_tempo("db", 0.25)
+    registrar_tempo("db", 0.25)
+    await send({"type": "http.response.start", "status": 201, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+class TestServerTimingMiddleware:
+    def test_medir_fora_de_requisicao_nao_acumula(self):
+        with medir("db"):
+            pass
+        assert tempos_atuais() == {}
+
+    def test_formato_do_cabecalho(self):
+        assert server_timing({"db": [0.0123, 2]}, 0.05) == 'db;dur=12.3;desc="2x", total;dur=50.0'
+
+    @pytest.mark.asyncio
+    async def test_cabecalho_e_log_de_requisicao_lenta(self, caplog):
+        mensagens = []
+
+        async def send(message):
+            mensagens.append(message)
+
+        middleware = ServerTimingMiddleware(app_com_etapas, limite_ms=0)
+        with caplog.at_level(logging.WARNING, logger="slow_requests"):
+            await middleware({"type": "http", "method": "POST", "path": "/x"}, receive, send)
+
+        cabecalho = dict(mensagens[0]["headers"])[b"server-timing"].decode()
+        assert cabecalho.startswith('cache;dur=')
+        assert 'db;dur=500.0;desc="2x"' in cabecalho
+
+        registro = json.loads(caplog.records[-1].getMessage())
+        assert registro["status_code"] == 201
+        assert registro["route"] == "unmatched"
+        assert registro["etapas"]["db"] == {"ms": 500.0, "ocorrencias": 2}
+
+    @pytest.mark.asyncio
+    async def test_sem_log_abaixo_do_limite(self, caplog):
+        async def send(message):
+            pass
+
+        with caplog.at_level(logging.WARNING, logger="slow_requests"):
+            await ServerTimingMiddleware(app_com_etapas, limite_ms=60_000)({"type": "http", "method": "GET", "path": "/x"}, receive, send)
+
+        assert not [r for r in caplog.records if r.name == "slow_requests"]
+
+
+
+class TestTempoDoBanco:
+    def test_comando_com_erro_nao_contamina_o_proximo(self):
+        timing.instrumentar_sqlalchemy()
+        engine = create_engine("sqlite://")
+        token = timing._tempos.set({})
+        try:
+            with engine.connect() as conn:
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM tabela_inexistente"))
+                conn.execute(text("SELECT 1"))
+                assert "_inicio_queries" not in conn.info
+            assert tempos_atuais()["db"][1] == 1
+        finally:
+            timing._tempos.reset(token)
+
+
+class TestServerTimingNaAplicacao:
+    @pytest.fixture
+    def client(self, client, memory_redis):
+        from src.main import app
+        from src.infrastructure.config.factories import get_cache
+        app.dependency_overrides[get_cache] = lambda: memory_redis
+        return client
+
+    def test_rota_real_detalha_etapas(self, client, auth_headers):
+        r = client.get("/api/v1/livros/", headers=auth_headers)
+
+        etapas = {parte.split(";")[0].strip() for parte in r.headers["server-timing"].split(",")}
+        assert {"auth", "cache", "db", "render", "total"} <= etapas
@@ -0,0 +1,209 @@
+"""
+Testes para o tracing em processo (spans por camada, amostragem e exportação OTLP/JSON).
+"""
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from src.infrastructure.monitoring import tracing
+from src.infrastructure.monitoring.tracing import (
+    ExportadorEmArquivo, LimiteDeTraces, Trace, TracingMiddleware, parse_peers, parse_traceparent,
+    peer_confiavel, rastreado, Span, span
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+class Repositorio:
+    def buscar(self, valor):
+        return valor
+
+    def falhar(self):
+        raise ValueError("erro")
+
+    @staticmethod
+    def auxiliar():
+        return "ok"
+
+
+class Servico:
+    def __init__(self, repositorio):
+        self.repositorio = repositorio
+
+    def obter(self, valor):
+        return self._executar_transacao(lambda: self.repositorio.buscar(valor))
+
+    def _executar_transacao(self, acao):
+        return acao()
+
+
+@pytest.fixture
+def trace():
+    atual = Trace(TRACE_ID)
+    token = tracing._trace.set(atual)
+    yield atual
+    tracing._trace.reset(token)
+
+
+class TestSpans:
+    def test_fora_de_um_trace_nada_e_registrado(self):
+        with span("x") as atual:
+            assert atual is None
+        assert rastreado(Repositorio, "repository")().buscar(1) == 1
+
+    def test_arvore_de_spans_por_camada(self, trace):
+        RepositorioRastreado = rastreado(Repositorio, "repository")
+        servico = rastreado(Servico, "transacao", ("_executar_transacao",))(RepositorioRastreado())
+
+        assert servico.obter(7) == 7
+        assert isinstance(servico, Servico)
+        assert RepositorioRastreado.auxiliar() == "ok"
+
+        repositorio, transacao = trace.spans
+        assert transacao.nome == "Servico._executar_transacao"
+        assert repositorio.nome == "Repositorio.buscar"
+        assert repositorio.parent_id == transacao.span_id
+        assert trace.chamadas_por_camada() == {"repository": 1, "transacao": 1}
+
+    def test_excecao_marca_o_span_com_erro(self, trace):
+        with pytest.raises(ValueError):
+            rastreado(Repositorio, "repository")().falhar()
+        assert trace.spans[0].erro == "ValueError"
+
+
+class TestSpansSql:
+    def test_comando_com_erro_nao_deixa_estado_na_conexao(self, trace):
+        tracing.instrumentar_sqlalchemy()
+        engine = create_engine("sqlite://")
+        with engine.connect() as conn:
+            with span("consulta"):
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM tabela_inexistente"))
+                conn.execute(text("SELECT 1"))
+            assert "_spans_sql" not in conn.info
+
+        falha, sucesso, consulta = trace.spans
+        assert (falha.nome, falha.erro) == ("db.select", "OperationalError")
+        assert sucesso.erro is None
+        assert falha.parent_id == sucesso.parent_id == consulta.span_id
+
+
+class TestTraceparent:
+    @pytest.mark.parametrize("valor, esperado", [
+        (f"00-{TRACE_ID}-00f067aa0ba902b7-01", (TRACE_ID, "00f067aa0ba902b7", True)),
+        (f"00-{TRACE_ID}-00f067aa0ba902b7-00", (TRACE_ID, "00f067aa0ba902b7", False)),
+        (f"00-{'0' * 32}-00f067aa0ba902b7-01", None),
+        ("00-xyz-00f067aa0ba902b7-01", None),
+        (None, None),
+    ])
+    def test_parse(self, valor, esperado):
+        assert parse_traceparent(valor) == esperado
+
+    def test_peers_confiaveis(self):
+        peers = parse_peers("10.0.0.0/8, ::1, gateway,")
+
+        assert peer_confiavel("10.1.2.3", peers)
+        assert peer_confiavel("::1", peers)
+        assert peer_confiavel("gateway", peers)
+        assert not peer_confiavel("192.168.0.1", peers)
+        assert not peer_confiavel(None, peers)
+
+
+class TestLimiteDeTraces:
+    def test_limita_por_segundo(self, monkeypatch):
+        agora = [100.0]
+        monkeypatch.setattr(tracing.time, "monotonic", lambda: agora[0])
+        limite = LimiteDeTraces(2)
+
+        assert [limite.permitir() for _ in range(3)] == [True, True, False]
+        agora[0] += 0.5
+        assert [limite.permitir() for _ in range(2)] == [True, False]
+
+    def test_sem_limite(self):
+        limite = LimiteDeTraces(0)
+        assert all(limite.permitir() for _ in range(100))
+
+
+class TestExportadorEmArquivo:
+    def test_rotaciona_e_mantem_as_copias(self, tmp_path):
+        arquivo = tmp_path / "traces.jsonl"
+        exportador = ExportadorEmArquivo(str(arquivo), maximo_bytes=1, copias=2)
+
+        for i in range(4):
+            exportador.exportar(Trace(f"{i:032x}", [Span("GET /", f"{i:016x}", None)]))
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["traces.jsonl", "traces.jsonl.1", "traces.jsonl.2"]
+        assert f"{3:032x}" in arquivo.read_text()
+        assert f"{1:032x}" in (tmp_path / "traces.jsonl.2").read_text()
+
+
+class TestTracingMiddleware:
+    @pytest.fixture
+    def cliente(self, client, memory_redis, tmp_path):
+        from src.main import app
+        from src.infrastructure.config.factories import get_cache
+        app.dependency_overrides[get_cache] = lambda: memory_redis
+        tracing.instrumentar_sqlalchemy()
+
+        def criar(taxa, peers=("testclient",), limite=0):
+            arquivo = tmp_path / "traces.jsonl"
+            middleware = TracingMiddleware(
+                app, taxa=taxa, exportador=ExportadorEmArquivo(str(arquivo)),
+                peers_confiaveis=list(peers), limite=LimiteDeTraces(limite),
+            )
+            return TestClient(middleware), arquivo
+        return criar
+
+    @staticmethod
+    def spans(arquivo):
+        [linha] = arquivo.read_text().splitlines()
+        return json.loads(linha)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+    def test_requisicao_amostrada_exporta_a_arvore(self, cliente, auth_headers):
+        http, arquivo = cliente(1.0)
+        r = http.get("/api/v1/livros/", headers=auth_headers)
+
+        raiz, *filhos = self.spans(arquivo)
+        assert r.headers["traceparent"] == f"00-{raiz['traceId']}-{raiz['spanId']}-01"
+        atributos = {a["key"]: a["value"] for a in raiz["attributes"]}
+        assert atributos["http.status_code"] == {"intValue": "200"}
+        assert int(atributos["db.chamadas"]["intValue"]) >= 1
+        assert int(atributos["cache.chamadas"]["intValue"]) >= 1
+
+        por_nome = {s["name"]: s for s in filhos}
+        controller = por_nome["LivroControllers.listar_paginado"]
+        usecase = por_nome["LivroUseCase.listar_livros_paginado"]
+        assert usecase["parentSpanId"] == controller["spanId"]
+        assert por_nome["LivroRepository.listar_paginado"]["parentSpanId"] == usecase["spanId"]
+
+    def test_sem_amostragem_nada_e_exportado(self, cliente, auth_headers):
+        http, arquivo = cliente(0.0)
+        r = http.get("/api/v1/livros/", headers=auth_headers)
+
+        assert "traceparent" not in r.headers
+        assert not arquivo.exists()
+
+    def test_traceparent_recebido_decide_a_amostragem(self, cliente, auth_headers):
+        http, arquivo = cliente(0.0)
+        r = http.get("/api/v1/livros/", headers=auth_headers | {"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"})
+
+        raiz = self.spans(arquivo)[0]
+        assert raiz["traceId"] == TRACE_ID
+        assert raiz["parentSpanId"] == "00f067aa0ba902b7"
+        assert r.headers["traceparent"].startswith(f"00-{TRACE_ID}-")
+
+    def test_flag_de_peer_nao_confiavel_e_ignorado(self, cliente, auth_headers):
+        http, arquivo = cliente(0.0, peers=())
+        r = http.get("/api/v1/livros/", headers=auth_headers | {"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"})
+
+        assert r.status_code == 200
+        assert "traceparent" not in r.headers
+        assert not arquivo.exists()
+
+    def test_teto_vale_tambem_para_peers_confiaveis(self, cliente, auth_headers):
+        http, arquivo = cliente(0.0, limite=1)
+        for _ in range(3):
+            http.get("/api/v1/livros/", headers=auth_headers | {"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"})
+
+        assert len(arquivo.read_text().splitlines()) == 1
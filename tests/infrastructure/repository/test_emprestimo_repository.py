@@ -421,4 +421,44 @@ class TestEmprestimoRepository:
         assert emprestimo_ativo is not None
         assert emprestimo_ativo.pessoa_id == pessoa2.id  # Deve ser o segundo empréstimo
         assert len(emprestimos_todos) == 2
-        assert total_todos == 2
\ No newline at end of file
+        assert total_todos == 2
+
+    def test_iterar_filtra_por_status(self, db_session: Session, setup_data):
+        """Testa que iterar aplica o mesmo filtro de status da paginação."""
+        repository = EmprestimoRepository(db_session)
+        agora = datetime.now(ZoneInfo("America/Sao_Paulo"))
+        ativo = repository.criar(Emprestimo(None, setup_data["livro_id"], setup_data["pessoa_id"], setup_data["usuario_id"], agora, None))
+        devolvido = repository.criar(Emprestimo(None, setup_data["livro_id"], setup_data["pessoa_id"], setup_data["usuario_id"], agora, None))
+        repository.finalizar(devolvido.id)
+        db_session.commit()
+
+        assert [e.id for e in repository.iterar(EmprestimoStatus.ATIVOS, tamanho_lote=1)] == [ativo.id]
+        assert [e.id for e in repository.iterar(EmprestimoStatus.DEVOLVIDOS)] == [devolvido.id]
+        assert len(list(repository.iterar(EmprestimoStatus.TODOS))) == 2
+
+    def test_paginas_iguais_com_e_sem_projecao(self, db_session: Session, setup_data):
+        """Testa que a listagem completa e a projeção devolvem os mesmos empréstimos em cada página."""
+        repository = EmprestimoRepository(db_session)
+        agora = datetime.now(ZoneInfo("America/Sao_Paulo"))
+        for _ in range(5):
+            repository.criar(Emprestimo(None, setup_data["livro_id"], setup_data["pessoa_id"], setup_data["usuario_id"], agora, None))
+        db_session.commit()
+
+        for page in (1, 2, 3):
+            emprestimos, _ = repository.listar_paginado(page, 2, EmprestimoStatus.TODOS)
+            linhas, _ = repository.listar_projecao_paginado(page, 2, EmprestimoStatus.TODOS, ["id"])
+            assert [e.id for e in emprestimos] == [l["id"] for l in linhas]
+
+    def test_listar_projecao_filtra_por_status(self, db_session: Session, setup_data):
+        """Testa que a projeção aplica o filtro de status e seleciona só as colunas pedidas."""
+        repository = EmprestimoRepository(db_session)
+        agora = datetime.now(ZoneInfo("America/Sao_Paulo"))
+        ativo = repository.criar(Emprestimo(None, setup_data["livro_id"], setup_data["pessoa_id"], setup_data["usuario_id"], agora, None))
+        devolvido = repository.criar(Emprestimo(None, setup_data["livro_id"], setup_data["pessoa_id"], setup_data["usuario_id"], agora, None))
+        repository.finalizar(devolvido.id)
+        db_session.commit()
+
+        linhas, total = repository.listar_projecao_paginado(1, 10, EmprestimoStatus.ATIVOS, ["id", "livro_id"])
+
+        assert total == 1
+        assert linhas == [{"id": ativo.id, "livro_id": setup_data["livro_id"]}]
@@ -3,6 +3,7 @@ Testes para LivroRepository - Fase 2 do plano de testes.
 Testa operações CRUD, queries complexas, paginação e tratamento de erros.
 """
 import pytest
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from src.infrastructure.persistence.repository.livro_repository import LivroRepository
@@ -331,4 +332,64 @@ class TestLivroRepository:
         assert "Disponível 1" in titulos_disponiveis
         assert "Disponível 2" in titulos_disponiveis
         
-        assert livros_indisponiveis[0].titulo == "Indisponível 1"
\ No newline at end of file
+        assert livros_indisponiveis[0].titulo == "Indisponível 1"
+
+    def test_iterar_percorre_em_lotes_ordenado_por_id(self, db_session: Session):
+        """Testa que iterar devolve todos os livros em ordem, independente do tamanho do lote."""
+        repository = LivroRepository(db_session)
+        for i in range(7):
+            repository.criar(Livro(None, f"Livro {i}", "Autor", i % 2 == 0))
+        db_session.commit()
+
+        livros = list(repository.iterar(tamanho_lote=3))
+
+        assert [l.titulo for l in livros] == [f"Livro {i}" for i in range(7)]
+        assert [l.id for l in livros] == sorted(l.id for l in livros)
+
+    def test_listar_projecao_seleciona_apenas_campos_pedidos(self, db_session: Session):
+        """Testa que a projeção devolve dicionários só com as colunas pedidas."""
+        repository = LivroRepository(db_session)
+        for i in range(3):
+            repository.criar(Livro(None, f"Livro {i}", "Autor", True))
+        db_session.commit()
+
+        linhas, total = repository.listar_projecao_paginado(1, 2, ["id", "titulo"])
+
+        assert total == 3
+        assert [set(l) for l in linhas] == [{"id", "titulo"}] * 2
+        assert [l["titulo"] for l in linhas] == ["Livro 0", "Livro 1"]
+
+    def test_paginas_iguais_com_e_sem_projecao(self, db_session: Session):
+        """Testa que a listagem completa e a projeção ordenam por id e devolvem as mesmas páginas."""
+        repository = LivroRepository(db_session)
+        for i in range(5):
+            repository.criar(Livro(None, f"Livro {i}", "Autor", True))
+        db_session.commit()
+        consultas = []
+
+        def registrar(conn, cursor, sql, *args):
+            consultas.append(sql)
+
+        event.listen(db_session.bind, "before_cursor_execute", registrar)
+        try:
+            for page in (1, 2, 3):
+                livros, _ = repository.listar_paginado(page, 2)
+                linhas, _ = repository.listar_projecao_paginado(page, 2, ["id", "titulo"])
+                assert [(l.id, l.titulo) for l in livros] == [(l["id"], l["titulo"]) for l in linhas]
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", registrar)
+
+        paginadas = [sql for sql in consultas if "LIMIT" in sql]
+        assert paginadas and all("ORDER BY livros.id" in sql for sql in paginadas)
+
+    def test_buscar_por_ids_em_lote(self, db_session: Session):
+        """Testa que buscar_por_ids ignora ids repetidos e inexistentes."""
+        repository = LivroRepository(db_session)
+        a = repository.criar(Livro(None, "Livro A", "Autor", True))
+        b = repository.criar(Livro(None, "Livro B", "Autor", True))
+        db_session.commit()
+
+        livros = repository.buscar_por_ids([a.id, b.id, a.id, 999])
+
+        assert set(livros) == {a.id, b.id}
+        assert livros[b.id].titulo == "Livro B"
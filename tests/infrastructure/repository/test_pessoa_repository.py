@@ -397,4 +397,41 @@ class TestPessoaRepository:
         assert encontrada_por_id.nome == "Busca Por ID"
         
         assert encontrada_por_email is not None
-        assert encontrada_por_email.nome == "Busca Por Email"
\ No newline at end of file
+        assert encontrada_por_email.nome == "Busca Por Email"
+
+    def test_iterar_percorre_todas_as_pessoas(self, db_session: Session):
+        """Testa que iterar devolve todas as pessoas em lotes."""
+        repository = PessoaRepository(db_session)
+        for i in range(5):
+            repository.criar(Pessoa(None, f"Pessoa {i}", "11999999999", date(1990, 1, 1), f"p{i}@email.com"))
+        db_session.commit()
+
+        assert [p.email for p in repository.iterar(tamanho_lote=2)] == [f"p{i}@email.com" for i in range(5)]
+
+    def test_paginas_iguais_com_e_sem_projecao(self, db_session: Session):
+        """Testa que a listagem completa e a projeção devolvem as mesmas pessoas em cada página."""
+        repository = PessoaRepository(db_session)
+        for i in range(5):
+            repository.criar(Pessoa(None, f"Pessoa {i}", "11999999999", date(1990, 1, 1), f"p{i}@email.com"))
+        db_session.commit()
+
+        for page in (1, 2, 3):
+            pessoas, _ = repository.listar_paginado(page, 2)
+            linhas, _ = repository.listar_projecao_paginado(page, 2, ["id", "email"])
+            assert [(p.id, p.email) for p in pessoas] == [(l["id"], l["email"]) for l in linhas]
+
+    def test_listar_projecao_e_buscar_por_ids(self, db_session: Session):
+        """Testa a projeção de colunas e a busca em lote por ids."""
+        repository = PessoaRepository(db_session)
+        criadas = [
+            repository.criar(Pessoa(None, f"Pessoa {i}", "11999999999", date(1990, 1, 1), f"p{i}@email.com"))
+            for i in range(3)
+        ]
+        db_session.commit()
+
+        linhas, total = repository.listar_projecao_paginado(1, 10, ["id", "email"])
+        pessoas = repository.buscar_por_ids([criadas[0].id, criadas[2].id])
+
+        assert total == 3
+        assert linhas[0] == {"id": criadas[0].id, "email": "p0@email.com"}
+        assert {p.nome for p in pessoas.values()} == {"Pessoa 0", "Pessoa 2"}
@@ -1,11 +1,17 @@
 """
 Testes para o módulo de autenticação (hash, verificação, tokens, fluxos inválidos).
 """
+from types import SimpleNamespace
 import pytest
 from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
 from src.infrastructure.config.security import auth
 
 
+def requisicao(metodo: str = "GET"):
+    return SimpleNamespace(method=metodo)
+
+
 class TestAuth:
     def test_password_hash_and_verify(self):
         senha = "minha_senha_secreta"
@@ -25,12 +31,38 @@ class TestAuth:
     @pytest.mark.asyncio
     async def test_get_current_user_invalid_token_raises(self, mock_db_session):
         with pytest.raises(HTTPException) as exc:
-            await auth.get_current_user(token="token_invalido", db=mock_db_session)
+            await auth.get_current_user(requisicao(), token="token_invalido", db=mock_db_session)
         assert exc.value.status_code == 401
 
     @pytest.mark.asyncio
     async def test_get_current_user_missing_claims_raises(self, mock_db_session):
         token = auth.create_access_token({})
         with pytest.raises(HTTPException) as exc:
-            await auth.get_current_user(token=token, db=mock_db_session)
-        assert exc.value.status_code == 401 
\ No newline at end of file
+            await auth.get_current_user(requisicao(), token=token, db=mock_db_session)
+        assert exc.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_get_current_user_usa_claims_quando_banco_indisponivel(self, mock_db_session, monkeypatch):
+        monkeypatch.setattr(auth, "AUTH_TRUST_TOKEN_ON_DB_ERROR", True)
+        token = auth.create_access_token({"sub": "7", "email": "user@email.com"})
+        mock_db_session.query.side_effect = OperationalError("SELECT", {}, Exception("down"))
+        user = await auth.get_current_user(requisicao("GET"), token=token, db=mock_db_session)
+        assert user["id"] == 7
+        assert user["email"] == "user@email.com"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("metodo", ["POST", "PUT", "DELETE"])
+    async def test_escrita_falha_fechada_com_banco_indisponivel(self, mock_db_session, monkeypatch, metodo):
+        monkeypatch.setattr(auth, "AUTH_TRUST_TOKEN_ON_DB_ERROR", True)
+        token = auth.create_access_token({"sub": "7", "email": "user@email.com"})
+        mock_db_session.query.side_effect = OperationalError("SELECT", {}, Exception("down"))
+        with pytest.raises(OperationalError):
+            await auth.get_current_user(requisicao(metodo), token=token, db=mock_db_session)
+
+    @pytest.mark.asyncio
+    async def test_confiar_no_token_e_desativado_por_padrao(self, mock_db_session):
+        assert auth.AUTH_TRUST_TOKEN_ON_DB_ERROR is False
+        token = auth.create_access_token({"sub": "7", "email": "user@email.com"})
+        mock_db_session.query.side_effect = OperationalError("SELECT", {}, Exception("down"))
+        with pytest.raises(OperationalError):
+            await auth.get_current_user(requisicao("GET"), token=token, db=mock_db_session)
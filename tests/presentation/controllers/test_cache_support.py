@@ -0,0 +1,50 @@
+"""
+Testes para os utilitários de cache dos controllers (stale e tokens de consistência).
+"""
+import json
+from unittest.mock import Mock
+from fastapi import Response
+from src.presentation.controllers.cache_support import (
+    CONSISTENCY_HEADER,
+    avancar_geracao,
+    carregar_entrada,
+    geracao_atual,
+    geracao_minima,
+    registrar_token,
+)
+
+
+class TestTokensDeConsistencia:
+    def test_geracao_minima_extrai_colecao(self):
+        assert geracao_minima("livros:5,emprestimos:3", "emprestimos") == 3
+        assert geracao_minima("livros:5", "pessoas") is None
+        assert geracao_minima(None, "livros") is None
+        assert geracao_minima("livros:abc", "livros") is None
+
+    def test_registrar_token(self):
+        response = Response()
+        registrar_token(response, {"livros": 4, "emprestimos": None})
+        assert response.headers[CONSISTENCY_HEADER] == "livros:4"
+
+    def test_registrar_token_sem_geracoes_nao_define_header(self):
+        response = Response()
+        registrar_token(response, {"livros": None})
+        assert CONSISTENCY_HEADER not in response.headers
+
+    def test_avancar_e_ler_geracao(self, memory_redis):
+        assert geracao_atual(memory_redis, "livros") == 0
+        assert avancar_geracao(memory_redis, "livros") == 1
+        assert avancar_geracao(memory_redis, "livros") == 2
+        assert geracao_atual(memory_redis, "livros") == 2
+
+    def test_geracao_sem_redis(self):
+        assert geracao_atual(None, "livros") == 0
+        assert avancar_geracao(None, "livros") is None
+
+    def test_carregar_entrada_descarta_geracao_antiga(self):
+        cached = json.dumps({"data": [], "geracao": 2})
+        assert carregar_entrada(cached, None) == {"data": [], "geracao": 2}
+        assert carregar_entrada(cached, 2) is not None
+        assert carregar_entrada(cached, 3) is None
+        assert carregar_entrada(json.dumps({"data": []}), 1) is None
+        assert carregar_entrada(None, 1) is None
@@ -3,10 +3,12 @@ Testes para o LivroController.
 """
 import pytest
 from unittest.mock import Mock, MagicMock
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
+from sqlalchemy.exc import OperationalError
 from src.presentation.controllers.livro_controllers import LivroControllers
 from src.presentation.dto.livro_dto import LivroCreateRequest, EmprestimoCreateRequest
 from src.presentation.dto.common import PaginatedResponse, PaginationMeta
+from src.domain.enums.emprestimo_status import EmprestimoStatus
 
 
 class TestLivroController:
@@ -144,9 +146,9 @@ class TestLivroController:
         mock_livro_usecase.listar_emprestimos_paginado.return_value = ([
             Mock(id=1, livro_id=1, pessoa_id=1, usuario_id=1, data_emprestimo=Mock(isoformat=lambda: "2023-01-01"), data_devolucao=None)
         ], 1)
-        # Enriquecimento esperado pelo controller
-        mock_livro_usecase.obter_livro_por_id.return_value = Mock(id=1, titulo="Livro 1", autor="Autor 1")
-        mock_livro_usecase.obter_pessoa_por_id.return_value = Mock(id=1, nome="Pessoa 1", telefone="11999999999", email="p1@example.com")
+        # Enriquecimento esperado pelo controller, em lote
+        mock_livro_usecase.obter_livros_por_ids.return_value = {1: Mock(id=1, titulo="Livro 1", autor="Autor 1")}
+        mock_livro_usecase.obter_pessoas_por_ids.return_value = {1: Mock(id=1, nome="Pessoa 1", telefone="11999999999", email="p1@example.com")}
         
         controller = LivroControllers(mock_livro_usecase)
         mock_cache = Mock()
@@ -158,7 +160,10 @@ class TestLivroController:
         
         # Assert
         assert len(result.data) == 1
+        assert result.data[0].livro.titulo == "Livro 1"
         mock_livro_usecase.listar_emprestimos_paginado.assert_called_once_with(1, 10, EmprestimoStatus.ATIVOS)
+        mock_livro_usecase.obter_livros_por_ids.assert_called_once_with([1])
+        mock_livro_usecase.obter_livro_por_id.assert_not_called()
     
     def test_listar_emprestimos_paginado_com_cache(self, mock_livro_usecase):
         """Teste de listagem paginada de empréstimos com cache."""
@@ -211,4 +216,20 @@ class TestLivroController:
         
         # Assert
         assert len(result.data) == 0
-        mock_livro_usecase.listar_livros_paginado.assert_called_once_with(1, 10)
\ No newline at end of file
+        mock_livro_usecase.listar_livros_paginado.assert_called_once_with(1, 10)    
+    def test_listar_emprestimos_serve_stale_quando_banco_falha(self, mock_livro_usecase):
+        """Teste de fallback stale na listagem de empréstimos."""
+        # Arrange
+        mock_livro_usecase.listar_emprestimos_paginado.side_effect = OperationalError("SELECT", {}, Exception("timeout"))
+        controller = LivroControllers(mock_livro_usecase)
+        stale = '{"data": [{"id": 1, "livro_id": 1, "pessoa_id": 1, "usuario_id": 1, "data_emprestimo": "2025-01-01T10:00:00", "data_devolucao": null}], "meta": {"page": 1, "size": 10, "total": 1, "total_pages": 1, "has_next": false, "has_previous": false}}'
+        mock_cache = Mock()
+        mock_cache.get.side_effect = lambda key: stale if key.startswith("stale:") else None
+        response = Response()
+        
+        # Act
+        result = controller.listar_emprestimos_paginado(1, 10, EmprestimoStatus.ATIVOS, mock_cache, response)
+        
+        # Assert
+        assert result.data[0].livro_id == 1
+        assert response.headers["X-Cache"] == "STALE"
@@ -3,7 +3,8 @@ Testes para o PessoaController.
 """
 import pytest
 from unittest.mock import Mock, MagicMock
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
+from sqlalchemy.exc import OperationalError
 from datetime import date
 from src.presentation.controllers.pessoa_controllers import PessoaControllers
 from src.presentation.dto.pessoa_dto import PessoaCreateRequest
@@ -398,4 +399,49 @@ class TestPessoaController:
         
         # Assert
         assert len(result.data) == 0
-        mock_pessoa_usecase.listar_pessoas_paginado.assert_called_once_with(1, 10)
\ No newline at end of file
+        mock_pessoa_usecase.listar_pessoas_paginado.assert_called_once_with(1, 10)
+    def test_listar_paginado_serve_stale_quando_banco_falha(self, mock_pessoa_usecase):
+        """Teste de fallback para a cópia stale quando o banco está indisponível."""
+        # Arrange
+        mock_pessoa_usecase.listar_pessoas_paginado.side_effect = OperationalError("SELECT", {}, Exception("down"))
+        controller = PessoaControllers(mock_pessoa_usecase)
+        stale = '{"data": [{"id": 1, "nome": "Maria Santos", "telefone": "11999999999", "data_nascimento": "1990-01-01", "email": null}], "meta": {"page": 1, "size": 10, "total": 1, "total_pages": 1, "has_next": false, "has_previous": false}}'
+        mock_cache = Mock()
+        mock_cache.get.side_effect = lambda key: stale if key.startswith("stale:") else None
+        response = Response()
+        
+        # Act
+        result = controller.listar_paginado(1, 10, mock_cache, response)
+        
+        # Assert
+        assert result.data[0].nome == "Maria Santos"
+        assert response.headers["X-Cache"] == "STALE"
+        assert "110" in response.headers["Warning"]
+    
+    def test_buscar_por_id_sem_stale_propaga_erro_de_banco(self, mock_pessoa_usecase):
+        """Teste de erro de banco sem cópia stale disponível."""
+        # Arrange
+        mock_pessoa_usecase.buscar_por_id.side_effect = OperationalError("SELECT", {}, Exception("down"))
+        controller = PessoaControllers(mock_pessoa_usecase)
+        mock_cache = Mock()
+        mock_cache.get.return_value = None
+        
+        # Act & Assert
+        with pytest.raises(OperationalError):
+            controller.buscar_por_id(1, mock_cache, Response())
+    
+    def test_buscar_por_id_grava_copia_stale(self, mock_pessoa_usecase):
+        """Teste de gravação da cópia stale junto do cache."""
+        # Arrange
+        mock_pessoa_usecase.buscar_por_id.return_value = Mock(id=1, nome="Maria Santos", email=None, telefone="11999999999", data_nascimento=date(1990, 1, 1))
+        controller = PessoaControllers(mock_pessoa_usecase)
+        mock_cache = Mock()
+        mock_cache.get.return_value = None
+        
+        # Act
+        controller.buscar_por_id(1, mock_cache)
+        
+        # Assert
+        pipe = mock_cache.pipeline.return_value
+        chaves = [c.args[0] for c in pipe.setex.call_args_list]
+        assert chaves == ["pessoas:1", "stale:pessoas:1"]
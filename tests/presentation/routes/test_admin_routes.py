@@ -0,0 +1,50 @@
+"""
+Testes para as rotas de administração (perfis de requisição).
+"""
+import pytest
+from src.infrastructure.monitoring.profiling import RepositorioDePerfis
+
+PERFIL_ID = "6f1c2a9e-8d0b-4c1e-9a55-0c3f1b2d4e6a"
+ADMIN = {"X-Admin-Token": "segredo"}
+
+
+class TestAdminRoutes:
+    @pytest.fixture
+    def client(self, client, tmp_path, monkeypatch):
+        from src.main import app
+        from src.infrastructure.config.factories import get_profile_repository
+        from src.presentation.routes import admin_routes
+        monkeypatch.setattr(admin_routes, "PROFILING_ADMIN_TOKEN", "segredo")
+        repositorio = RepositorioDePerfis(str(tmp_path))
+        repositorio.salvar({
+            "id": PERFIL_ID, "criado_em": "2026-01-01T00:00:00+00:00", "gatilho": "admin",
+            "method": "GET", "path": "/api/v1/livros/", "status_code": 200, "duracao_ms": 12.5,
+            "intervalo_ms": 5, "amostras": 3, "pilhas": {"main;listar_livros": 3},
+        })
+        app.dependency_overrides[get_profile_repository] = lambda: repositorio
+        return client
+
+    def test_lista_perfis_recentes(self, client):
+        r = client.get("/api/v1/admin/profiles", headers=ADMIN)
+
+        assert r.status_code == 200
+        [perfil] = r.json()["data"]
+        assert perfil["id"] == PERFIL_ID
+        assert perfil["amostras"] == 3
+
+    def test_baixa_pilhas_em_formato_folded(self, client):
+        r = client.get(f"/api/v1/admin/profiles/{PERFIL_ID}", headers=ADMIN)
+
+        assert r.status_code == 200
+        assert r.text == "main;listar_livros 3\n"
+        assert client.get("/api/v1/admin/profiles/inexistente", headers=ADMIN).status_code == 404
+
+    def test_token_invalido(self, client):
+        assert client.get("/api/v1/admin/profiles").status_code == 403
+        assert client.get("/api/v1/admin/profiles", headers={"X-Admin-Token": "errado"}).status_code == 403
+
+    def test_rotas_inexistentes_sem_token_configurado(self, client, monkeypatch):
+        from src.presentation.routes import admin_routes
+        monkeypatch.setattr(admin_routes, "PROFILING_ADMIN_TOKEN", "")
+
+        assert client.get("/api/v1/admin/profiles", headers=ADMIN).status_code == 404
@@ -0,0 +1,70 @@
+"""
+Testes de API para os jobs de exportação em segundo plano.
+"""
+import gzip
+import json
+import pytest
+from src.application.usecase.export_usecases import ExportUseCase
+from src.infrastructure.exports.manager import criar_export_manager
+from src.presentation.controllers.export_controllers import ExportControllers
+
+
+@pytest.fixture
+def manager(tmp_path, db_session):
+    manager = criar_export_manager(backend="local", diretorio=str(tmp_path), workers=1, limite=5)
+    manager.writer._session_factory = lambda: db_session
+    yield manager
+    manager.parar()
+
+
+@pytest.fixture
+def client_exports(client, manager):
+    from src.main import app
+    from src.infrastructure.config.factories import get_export_controller
+    app.dependency_overrides[get_export_controller] = lambda: ExportControllers(ExportUseCase(manager.store, manager.fila))
+    return client
+
+
+class TestExportRoutes:
+    def test_fluxo_completo(self, client_exports, manager, auth_headers):
+        client = client_exports
+        for i in range(3):
+            client.post("/api/v1/livros/", json={"titulo": f"Livro {i}", "autor": "Autor"}, headers=auth_headers)
+
+        r = client.post("/api/v1/exports/", json={"recurso": "livros"}, headers=auth_headers)
+        assert r.status_code == 202
+        job = r.json()["data"]
+        assert r.headers["location"] == f"/api/v1/exports/{job['id']}"
+        manager.fila.aguardar()
+
+        status = client.get(f"/api/v1/exports/{job['id']}", headers=auth_headers).json()["data"]
+        assert status["status"] == "concluido"
+        assert (status["linhas"], status["total"], status["progresso"]) == (3, 3, 1.0)
+
+        download = client.get(status["download_url"], headers=auth_headers)
+        assert download.status_code == 200
+        linhas = gzip.decompress(download.content).decode().splitlines()
+        assert [json.loads(l)["titulo"] for l in linhas] == ["Livro 0", "Livro 1", "Livro 2"]
+
+        parcial = client.get(status["download_url"], headers=auth_headers | {"Range": "bytes=0-9"})
+        assert parcial.status_code == 206
+        assert parcial.content == download.content[:10]
+
+    def test_job_inexistente(self, client_exports, auth_headers):
+        assert client_exports.get("/api/v1/exports/nao-existe", headers=auth_headers).status_code == 404
+
+    def test_recurso_invalido(self, client_exports, auth_headers):
+        r = client_exports.post("/api/v1/exports/", json={"recurso": "usuarios"}, headers=auth_headers)
+        assert r.status_code == 422
+
+    def test_fila_cheia_retorna_503(self, client_exports, manager, auth_headers, monkeypatch):
+        from src.domain.exceptions import FilaDeExportacaoCheiaException
+
+        def cheia(job_id):
+            raise FilaDeExportacaoCheiaException(5)
+
+        monkeypatch.setattr(manager.fila, "enfileirar", cheia)
+        r = client_exports.post("/api/v1/exports/", json={"recurso": "pessoas"}, headers=auth_headers)
+        assert r.status_code == 503
+        assert r.headers["retry-after"] == "30"
+        assert r.json()["error"] == "EXPORT_QUEUE_FULL"
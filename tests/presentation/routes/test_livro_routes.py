@@ -1,6 +1,9 @@
 """
 Testes de API para as rotas de livro e empréstimo.
 """
+import csv
+import io
+import json
 import pytest
 from fastapi.testclient import TestClient
 
@@ -105,4 +108,155 @@ class TestEmprestimoRoutes:
         assert r1.status_code == 200
         # Segundo empréstimo do mesmo livro -> LivroIndisponivelException -> 422
         r2 = client.post("/api/v1/livros/emprestimos", json={"livro_id": 1, "pessoa_id": 1}, headers=auth_headers)
-        assert r2.status_code == 422 
\ No newline at end of file
+        assert r2.status_code == 422 
+
+class TestLivroRoutesConsistencia:
+    """Leitura das próprias escritas via token de consistência."""
+
+    @pytest.fixture
+    def client_com_cache(self, client, memory_redis):
+        from src.main import app
+        from src.infrastructure.config.factories import get_cache
+        app.dependency_overrides[get_cache] = lambda: memory_redis
+        return client
+
+    def test_token_ignora_pagina_em_cache_anterior_a_escrita(self, client_com_cache, auth_headers):
+        client = client_com_cache
+        client.post("/api/v1/livros/", json={"titulo": "Livro A", "autor": "Autor A"}, headers=auth_headers)
+        assert client.get("/api/v1/livros/", headers=auth_headers).json()["data"]["meta"]["total"] == 1
+
+        r = client.post("/api/v1/livros/", json={"titulo": "Livro B", "autor": "Autor B"}, headers=auth_headers)
+        token = r.headers["X-Consistency-Token"]
+        assert token == "livros:2"
+
+        # Sem token a página em cache continua sendo servida
+        assert client.get("/api/v1/livros/", headers=auth_headers).json()["data"]["meta"]["total"] == 1
+
+        com_token = auth_headers | {"X-Consistency-Token": token}
+        assert client.get("/api/v1/livros/", headers=com_token).json()["data"]["meta"]["total"] == 2
+        # A entrada renovada passa a valer para todos
+        assert client.get("/api/v1/livros/", headers=auth_headers).json()["data"]["meta"]["total"] == 2
+
+
+class TestLivroRoutesDisponibilidade:
+    """Consulta de disponibilidade em lote."""
+
+    @pytest.fixture
+    def client_com_cache(self, client, memory_redis):
+        from src.main import app
+        from src.infrastructure.config.factories import get_cache
+        app.dependency_overrides[get_cache] = lambda: memory_redis
+        return client
+
+    def test_consulta_em_lote(self, client_com_cache, auth_headers):
+        client = client_com_cache
+        a = client.post("/api/v1/livros/", json={"titulo": "Livro A", "autor": "Autor A"}, headers=auth_headers).json()["data"]
+        b = client.post("/api/v1/livros/", json={"titulo": "Livro B", "autor": "Autor B"}, headers=auth_headers).json()["data"]
+
+        r = client.post("/api/v1/livros/disponibilidade", json={"ids": [a["id"], b["id"], 999]}, headers=auth_headers)
+
+        assert r.status_code == 200
+        dados = r.json()["data"]
+        assert dados["disponibilidade"] == {str(a["id"]): True, str(b["id"]): True}
+        assert dados["nao_encontrados"] == [999]
+
+    def test_ids_invalidos(self, client_com_cache, auth_headers):
+        r = client_com_cache.post("/api/v1/livros/disponibilidade", json={"ids": [0]}, headers=auth_headers)
+        assert r.status_code == 422
+
+
+class TestLivroRoutesExportacao:
+    """Exportação em streaming (NDJSON / CSV)."""
+
+    def test_exportar_livros_ndjson(self, client, auth_headers):
+        for i in range(3):
+            client.post("/api/v1/livros/", json={"titulo": f"Livro {i}", "autor": "Autor"}, headers=auth_headers)
+
+        r = client.get("/api/v1/livros/export", headers=auth_headers)
+
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "application/x-ndjson"
+        assert 'filename="livros.ndjson"' in r.headers["content-disposition"]
+        linhas = [json.loads(l) for l in r.text.splitlines()]
+        assert [l["titulo"] for l in linhas] == ["Livro 0", "Livro 1", "Livro 2"]
+
+    def test_exportar_livros_csv(self, client, auth_headers):
+        client.post("/api/v1/livros/", json={"titulo": "Duna, o livro", "autor": "Frank Herbert"}, headers=auth_headers)
+
+        r = client.get("/api/v1/livros/export?formato=csv", headers=auth_headers)
+
+        assert r.headers["content-type"].startswith("text/csv")
+        linhas = list(csv.reader(io.StringIO(r.text)))
+        assert linhas[0] == ["id", "titulo", "autor", "disponivel"]
+        assert linhas[1][1:] == ["Duna, o livro", "Frank Herbert", "True"]
+
+    def test_exportar_emprestimos_por_status(self, client, auth_headers):
+        livro = client.post("/api/v1/livros/", json={"titulo": "Livro A", "autor": "Autor A"}, headers=auth_headers).json()["data"]
+        pessoa = client.post("/api/v1/pessoas/", json={"nome": "Ana", "telefone": "11999999999", "data_nascimento": "1990-01-01", "email": "ana@x.com"}, headers=auth_headers).json()["data"]
+        client.post("/api/v1/livros/emprestimos", json={"livro_id": livro["id"], "pessoa_id": pessoa["id"]}, headers=auth_headers)
+
+        ativos = client.get("/api/v1/emprestimos/export?status=ativos", headers=auth_headers)
+        devolvidos = client.get("/api/v1/emprestimos/export?status=devolvidos", headers=auth_headers)
+
+        assert [json.loads(l)["livro_id"] for l in ativos.text.splitlines()] == [livro["id"]]
+        assert devolvidos.text == ""
+
+    def test_formato_invalido(self, client, auth_headers):
+        assert client.get("/api/v1/livros/export?formato=xml", headers=auth_headers).status_code == 422
+
+
+class TestLivroRoutesProjecao:
+    """Sparse fieldsets (?fields=) e relações opcionais (?include=)."""
+
+    @pytest.fixture
+    def client_com_cache(self, client, memory_redis):
+        from src.main import app
+        from src.infrastructure.config.factories import get_cache
+        app.dependency_overrides[get_cache] = lambda: memory_redis
+        return client
+
+    @pytest.fixture
+    def emprestimo(self, client_com_cache, auth_headers):
+        livro = client_com_cache.post("/api/v1/livros/", json={"titulo": "Livro A", "autor": "Autor A"}, headers=auth_headers).json()["data"]
+        pessoa = client_com_cache.post("/api/v1/pessoas/", json={"nome": "Ana", "telefone": "11999999999", "data_nascimento": "1990-01-01", "email": "ana@x.com"}, headers=auth_headers).json()["data"]
+        client_com_cache.post("/api/v1/livros/emprestimos", json={"livro_id": livro["id"], "pessoa_id": pessoa["id"]}, headers=auth_headers)
+        return livro, pessoa
+
+    def test_livros_com_fields(self, client_com_cache, auth_headers):
+        client_com_cache.post("/api/v1/livros/", json={"titulo": "Livro A", "autor": "Autor A"}, headers=auth_headers)
+
+        r = client_com_cache.get("/api/v1/livros/?fields=titulo", headers=auth_headers)
+
+        assert r.status_code == 200
+        assert [set(l) for l in r.json()["data"]["data"]] == [{"id", "titulo"}]
+        # Segunda leitura vem do cache, sob chave própria da projeção
+        assert client_com_cache.get("/api/v1/livros/?fields=titulo", headers=auth_headers).json() == r.json()
+        assert set(client_com_cache.get("/api/v1/livros/", headers=auth_headers).json()["data"]["data"][0]) == {"id", "titulo", "autor", "disponivel"}
+
+    def test_fields_invalido(self, client_com_cache, auth_headers):
+        r = client_com_cache.get("/api/v1/livros/?fields=senha", headers=auth_headers)
+        assert r.status_code == 400
+
+    def test_emprestimos_padrao_embute_relacoes(self, client_com_cache, auth_headers, emprestimo):
+        livro, pessoa = emprestimo
+
+        item = client_com_cache.get("/api/v1/emprestimos/", headers=auth_headers).json()["data"]["data"][0]
+
+        assert item["livro"] == {"id": livro["id"], "titulo": "Livro A", "autor": "Autor A"}
+        assert item["pessoa"]["nome"] == "Ana"
+
+    def test_emprestimos_so_ids(self, client_com_cache, auth_headers, emprestimo):
+        livro, _ = emprestimo
+
+        r = client_com_cache.get("/api/v1/emprestimos/?fields=livro_id,pessoa_id&include=", headers=auth_headers)
+
+        item = r.json()["data"]["data"][0]
+        assert set(item) == {"id", "livro_id", "pessoa_id"}
+        assert item["livro_id"] == livro["id"]
+
+    def test_emprestimos_include_parcial(self, client_com_cache, auth_headers, emprestimo):
+        item = client_com_cache.get("/api/v1/emprestimos/?include=pessoa", headers=auth_headers).json()["data"]["data"][0]
+
+        assert "livro" not in item
+        assert item["pessoa"]["email"] == "ana@x.com"
+        assert item["data_devolucao"] is None
@@ -84,4 +84,37 @@ class TestPessoaRoutes:
         r = client.post("/api/v1/pessoas/", json={"nome": "Maria", "telefone": "11999999999", "data_nascimento": "1990/01/01", "email": "m@e.com"}, headers=auth_headers)
         assert r.status_code == 422
         r = client.post("/api/v1/pessoas/", json={"nome": "Maria", "telefone": "11999999999", "data_nascimento": "1990-13-45", "email": "m@e.com"}, headers=auth_headers)
-        assert r.status_code == 422 
\ No newline at end of file
+        assert r.status_code == 422 
+
+class TestPessoaRoutesPrazo:
+    def test_prazo_esgotado_retorna_504(self, client, auth_headers):
+        payload = {"nome": "Maria Santos", "telefone": "11999999999", "data_nascimento": "1990-01-01"}
+        response = client.post("/api/v1/pessoas/", json=payload, headers=auth_headers | {"X-Request-Timeout-Ms": "0.001"})
+        assert response.status_code == 504
+        assert response.json()["error"] == "DEADLINE_EXCEEDED"
+
+
+class TestPessoaRoutesExportacao:
+    def test_exportar_pessoas_nao_colide_com_busca_por_id(self, client, auth_headers):
+        client.post("/api/v1/pessoas/", json={"nome": "Ana", "telefone": "11999999999", "data_nascimento": "1990-01-01", "email": "ana@x.com"}, headers=auth_headers)
+
+        r = client.get("/api/v1/pessoas/export", headers=auth_headers)
+
+        assert r.status_code == 200
+        assert r.text.splitlines() == [r.text.strip()]
+        assert '"data_nascimento":"1990-01-01"' in r.text
+
+
+class TestPessoaRoutesProjecao:
+    def test_listar_pessoas_com_fields(self, client, auth_headers, memory_redis):
+        from src.main import app
+        from src.infrastructure.config.factories import get_cache
+        app.dependency_overrides[get_cache] = lambda: memory_redis
+        client.post("/api/v1/pessoas/", json={"nome": "Ana", "telefone": "11999999999", "data_nascimento": "1990-01-01", "email": "ana@x.com"}, headers=auth_headers)
+
+        r = client.get("/api/v1/pessoas/?fields=nome,data_nascimento", headers=auth_headers)
+
+        assert r.status_code == 200
+        pessoa = r.json()["data"]["data"][0]
+        assert set(pessoa) == {"id", "nome", "data_nascimento"}
+        assert pessoa["data_nascimento"] == "1990-01-01"
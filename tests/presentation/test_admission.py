@@ -0,0 +1,107 @@
+"""
+Testes para o controle de admissão (load shedding).
+"""
+import asyncio
+import json
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine, text
+from src.infrastructure.config.db.pool import PoolMonitorado
+from src.infrastructure.monitoring.metrics import http_requests_shed_total
+from src.presentation.admission import AdmissionControlMiddleware
+
+
+def scope(path="/api/v1/livros/"):
+	return {"type": "http", "method": "GET", "path": path, "headers": []}
+
+
+async def receive():
+	return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def app_ok(scope, receive, send):
+	await send({"type": "http.response.start", "status": 200, "headers": []})
+	await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def chamar(middleware, s=None):
+	mensagens = []
+
+	async def send(message):
+		mensagens.append(message)
+
+	await middleware(s or scope(), receive, send)
+	return mensagens[0]["status"], dict(mensagens[0]["headers"]), b"".join(m.get("body", b"") for m in mensagens[1:])
+
+
+def middleware(app=app_ok, pool=(0, 0.0), fila=0, **kwargs):
+	return AdmissionControlMiddleware(app, estado_pool=lambda classe: pool, fila_threadpool=lambda: fila, **kwargs)
+
+
+class TestAdmissionControlMiddleware:
+	@pytest.mark.asyncio
+	async def test_aceita_abaixo_dos_limites(self):
+		status, _, corpo = await chamar(middleware())
+		assert status == 200 and corpo == b"ok"
+
+	@pytest.mark.asyncio
+	@pytest.mark.parametrize("kwargs, motivo", [
+		({"fila": 50}, "threadpool"),
+		({"pool": (20, 0.0)}, "db_pool_waiters"),
+		({"pool": (1, 0.6)}, "db_pool_wait"),
+	])
+	async def test_recusa_com_503_e_retry_after(self, kwargs, motivo):
+		recusas = http_requests_shed_total.labels(reason=motivo)
+		antes = recusas._value.get()
+
+		status, headers, corpo = await chamar(middleware(retry_after=2, **kwargs))
+
+		assert status == 503
+		assert headers[b"retry-after"] == b"2"
+		dados = json.loads(corpo)
+		assert dados["error"] == "SERVICE_OVERLOADED" and dados["details"]["reason"] == motivo
+		assert recusas._value.get() == antes + 1
+
+	@pytest.mark.asyncio
+	async def test_limite_de_requisicoes_em_andamento(self):
+		liberar = asyncio.Event()
+
+		async def app_lento(scope, receive, send):
+			await liberar.wait()
+			await app_ok(scope, receive, send)
+
+		m = middleware(app_lento, max_em_andamento=1)
+		primeira = asyncio.create_task(chamar(m))
+		await asyncio.sleep(0)
+
+		status, _, corpo = await chamar(m)
+		assert status == 503 and json.loads(corpo)["details"]["reason"] == "in_flight"
+
+		liberar.set()
+		assert (await primeira)[0] == 200
+		assert m.em_andamento == 0
+
+	@pytest.mark.asyncio
+	async def test_rotas_isentas_passam_mesmo_saturado(self):
+		status, _, _ = await chamar(middleware(fila=1000), scope("/health"))
+		assert status == 200
+
+
+class TestPoolMonitorado:
+	def test_expoe_esperas_em_andamento(self):
+		engine = create_engine("sqlite:///:memory:", poolclass=PoolMonitorado, pool_size=1, max_overflow=0, pool_timeout=5)
+		ocupada = engine.connect()
+		ocupada.execute(text("SELECT 1"))
+		esperando = threading.Thread(target=lambda: engine.connect().close())
+		esperando.start()
+		try:
+			time.sleep(0.1)
+			aguardando, maior_espera = engine.pool.estatisticas()
+			assert aguardando == 1
+			assert maior_espera >= 0.05
+		finally:
+			ocupada.close()
+			esperando.join()
+
+		assert engine.pool.estatisticas() == (0, 0.0)
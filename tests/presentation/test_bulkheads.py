@@ -0,0 +1,134 @@
+"""
+Testes para os bulkheads por classe de tráfego.
+"""
+import asyncio
+import json
+import pytest
+from sqlalchemy import create_engine
+from src.infrastructure.config.db.pool import PoolMonitorado
+from src.infrastructure.config.traffic_classes import classe_atual, classificar
+from src.infrastructure.monitoring.metrics import bulkhead_rejected_total
+from src.presentation.admission import AdmissionControlMiddleware
+from src.presentation.bulkheads import BulkheadMiddleware
+
+
+def scope(path="/api/v1/pessoas/1", method="GET", query=b""):
+	return {"type": "http", "method": method, "path": path, "query_string": query, "headers": []}
+
+
+async def receive():
+	return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def chamar(middleware, s):
+	mensagens = []
+
+	async def send(message):
+		mensagens.append(message)
+
+	await middleware(s, receive, send)
+	return mensagens[0]["status"], dict(mensagens[0]["headers"]), b"".join(m.get("body", b"") for m in mensagens[1:])
+
+
+class TestClassificacao:
+	@pytest.mark.parametrize("s, classe", [
+		(scope("/api/v1/auth/login", "POST"), "auth"),
+		(scope("/api/v1/usuarios/", "POST"), "auth"),
+		(scope("/api/v1/usuarios/"), "interactive"),
+		(scope("/api/v1/exports/", "POST"), "bulk"),
+		(scope("/api/v1/livros/export"), "bulk"),
+		(scope("/api/v1/emprestimos/", query=b"status=todos&page=1"), "bulk"),
+		(scope("/api/v1/emprestimos/", query=b"status=ativos"), "interactive"),
+		(scope("/api/v1/emprestimos/", query=b"status=%74odos"), "bulk"),
+		(scope("/api/v1/emprestimos/", query=b"xstatus=todos"), "interactive"),
+		(scope("/api/v1/emprestimos/", query=b"status=todosx"), "interactive"),
+		(scope("/api/v1/emprestimos/", query=b"status=todos&status=ativos"), "interactive"),
+		(scope("/api/v1/pessoas/7"), "interactive"),
+	])
+	def test_classifica_pela_rota(self, s, classe):
+		assert classificar(s) == classe
+
+
+class TestBulkheadMiddleware:
+	@pytest.mark.asyncio
+	async def test_define_a_classe_no_contexto_da_requisicao(self):
+		vistas = []
+
+		async def app(scope, receive, send):
+			vistas.append(classe_atual())
+			await send({"type": "http.response.start", "status": 200, "headers": []})
+			await send({"type": "http.response.body", "body": b""})
+
+		middleware = BulkheadMiddleware(app, limites={"interactive": 1, "bulk": 1, "auth": 1})
+		await chamar(middleware, scope("/api/v1/auth/login", "POST"))
+		await chamar(middleware, scope())
+
+		assert vistas == ["auth", "interactive"]
+		assert classe_atual() == "interactive"
+
+	@pytest.mark.asyncio
+	async def test_classe_saturada_nao_bloqueia_as_demais(self):
+		liberar = asyncio.Event()
+
+		async def app(scope, receive, send):
+			if scope["path"].endswith("/export"):
+				await liberar.wait()
+			await send({"type": "http.response.start", "status": 200, "headers": []})
+			await send({"type": "http.response.body", "body": b"ok"})
+
+		middleware = BulkheadMiddleware(app, limites={"interactive": 1, "bulk": 1}, espera_maxima_ms=50, retry_after=3)
+		recusas = bulkhead_rejected_total.labels(classe="bulk")
+		antes = recusas._value.get()
+
+		exportacao = asyncio.create_task(chamar(middleware, scope("/api/v1/livros/export")))
+		await asyncio.sleep(0)
+		status_lote, headers, corpo = await chamar(middleware, scope("/api/v1/pessoas/export"))
+		status_interativo, _, _ = await chamar(middleware, scope())
+		liberar.set()
+		status_exportacao, _, _ = await exportacao
+
+		assert status_lote == 503
+		assert headers[b"retry-after"] == b"3"
+		assert json.loads(corpo)["details"]["reason"] == "bulkhead:bulk"
+		assert recusas._value.get() == antes + 1
+		assert status_interativo == 200
+		assert status_exportacao == 200
+
+	@pytest.mark.asyncio
+	async def test_libera_a_vaga_quando_a_requisicao_falha(self):
+		async def app(scope, receive, send):
+			raise RuntimeError("falha")
+
+		middleware = BulkheadMiddleware(app, limites={"interactive": 1})
+		with pytest.raises(RuntimeError):
+			await chamar(middleware, scope())
+
+		assert not middleware.vagas["interactive"].locked()
+
+
+class TestAdmissaoPorClasse:
+	@pytest.mark.asyncio
+	async def test_pool_de_lote_saturado_nao_recusa_leituras(self):
+		async def app(scope, receive, send):
+			await send({"type": "http.response.start", "status": 200, "headers": []})
+			await send({"type": "http.response.body", "body": b""})
+
+		estados = {"bulk": (50, 2.0), "interactive": (0, 0.0), "auth": (0, 0.0)}
+		middleware = AdmissionControlMiddleware(app, estado_pool=estados.__getitem__, fila_threadpool=lambda: 0)
+
+		status_leitura, _, _ = await chamar(middleware, scope())
+		status_exportacao, _, _ = await chamar(middleware, scope("/api/v1/livros/export"))
+
+		assert status_leitura == 200
+		assert status_exportacao == 503
+
+
+class TestPoolNomeado:
+	def test_nome_sobrevive_ao_dispose(self):
+		engine = create_engine("sqlite:///:memory:", poolclass=PoolMonitorado, pool_size=1, max_overflow=0)
+		engine.pool.nome = "bulk"
+
+		engine.dispose()
+
+		assert isinstance(engine.pool, PoolMonitorado)
+		assert engine.pool.nome == "bulk"
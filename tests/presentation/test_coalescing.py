@@ -0,0 +1,128 @@
+"""
+Testes para a coalescência de GETs idênticos e simultâneos.
+"""
+import asyncio
+import pytest
+from src.infrastructure.monitoring.metrics import http_requests_coalesced_total
+from src.presentation.coalescing import RequestCoalescingMiddleware, chave_requisicao
+
+
+def scope(path="/api/v1/livros/", query=b"page=1", method="GET", headers=None):
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": headers if headers is not None else [(b"authorization", b"Bearer a")],
+    }
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+class AppLenta:
+    """App ASGI que conta execuções e só responde quando liberada."""
+
+    def __init__(self, headers=None, falhar=False):
+        self.execucoes = 0
+        self.liberar = asyncio.Event()
+        self.headers = headers or [(b"content-type", b"application/json")]
+        self.falhar = falhar
+
+    async def __call__(self, scope, receive, send):
+        self.execucoes += 1
+        await self.liberar.wait()
+        if self.falhar and self.execucoes == 1:
+            raise RuntimeError("falha")
+        await send({"type": "http.response.start", "status": 200, "headers": list(self.headers)})
+        await send({"type": "http.response.body", "body": f"corpo {self.execucoes}".encode()})
+
+
+async def executar(middleware, scopes):
+    respostas = [[] for _ in scopes]
+
+    async def chamar(i, s):
+        async def send(message):
+            respostas[i].append(message)
+        try:
+            await middleware(s, receive, send)
+        except RuntimeError:
+            respostas[i].append("erro")
+
+    tarefas = [asyncio.create_task(chamar(i, s)) for i, s in enumerate(scopes)]
+    await asyncio.sleep(0)
+    middleware.app.liberar.set()
+    await asyncio.gather(*tarefas)
+    return respostas
+
+
+class TestChaveRequisicao:
+    def test_credenciais_e_accept_entram_na_chave(self):
+        a = chave_requisicao(scope(headers=[(b"authorization", b"Bearer a")]))
+        b = chave_requisicao(scope(headers=[(b"authorization", b"Bearer b")]))
+        c = chave_requisicao(scope(headers=[(b"authorization", b"Bearer a"), (b"accept", b"application/msgpack")]))
+        assert len({a, b, c}) == 3
+
+    def test_origin_entra_na_chave(self):
+        cookie = (b"cookie", b"sessao=1")
+        a = chave_requisicao(scope(headers=[cookie, (b"origin", b"https://a.example")]))
+        b = chave_requisicao(scope(headers=[cookie, (b"origin", b"https://b.example")]))
+        assert a != b
+
+    @pytest.mark.parametrize("s", [
+        scope(method="POST"),
+        scope(path="/api/v1/livros/export"),
+        scope(path="/api/v1/exports/abc/download"),
+        scope(path="/metrics"),
+    ])
+    def test_rotas_nao_coalesciveis(self, s):
+        assert chave_requisicao(s) is None
+
+
+class TestRequestCoalescingMiddleware:
+    @pytest.mark.asyncio
+    async def test_gets_identicos_compartilham_execucao(self):
+        middleware = RequestCoalescingMiddleware(AppLenta())
+        antes = http_requests_coalesced_total._value.get()
+
+        respostas = await executar(middleware, [scope(), scope(), scope()])
+
+        assert middleware.app.execucoes == 1
+        assert all(r[1]["body"] == b"corpo 1" for r in respostas)
+        assert http_requests_coalesced_total._value.get() == antes + 2
+        assert middleware._em_andamento == {}
+
+    @pytest.mark.asyncio
+    async def test_usuarios_diferentes_nao_compartilham(self):
+        middleware = RequestCoalescingMiddleware(AppLenta())
+
+        await executar(middleware, [scope(headers=[(b"authorization", b"Bearer a")]), scope(headers=[(b"authorization", b"Bearer b")])])
+
+        assert middleware.app.execucoes == 2
+
+    @pytest.mark.asyncio
+    async def test_set_cookie_nao_e_compartilhado(self):
+        middleware = RequestCoalescingMiddleware(AppLenta(headers=[(b"set-cookie", b"s=1")]))
+
+        respostas = await executar(middleware, [scope(), scope()])
+
+        assert middleware.app.execucoes == 2
+        assert {r[1]["body"] for r in respostas} == {b"corpo 1", b"corpo 2"}
+
+    @pytest.mark.asyncio
+    async def test_falha_do_lider_faz_espera_executar_por_conta_propria(self):
+        middleware = RequestCoalescingMiddleware(AppLenta(falhar=True))
+
+        respostas = await executar(middleware, [scope(), scope()])
+
+        assert respostas[0] == ["erro"]
+        assert respostas[1][1]["body"] == b"corpo 2"
+
+    @pytest.mark.asyncio
+    async def test_resposta_acima_do_limite_nao_e_compartilhada(self):
+        middleware = RequestCoalescingMiddleware(AppLenta(), limite_bytes=3)
+
+        await executar(middleware, [scope(), scope()])
+
+        assert middleware.app.execucoes == 2
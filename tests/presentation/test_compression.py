@@ -0,0 +1,140 @@
+"""
+Testes para a compressão de respostas e o cache de corpos comprimidos.
+"""
+import gzip
+import json
+import pytest
+from src.infrastructure.monitoring.metrics import http_compression_total
+from src.presentation.compression import (
+	CacheDeCompressao, CompressionMiddleware, negociar_codificacao, comprimir
+)
+
+
+def scope(accept_encoding=b"gzip"):
+	return {"type": "http", "method": "GET", "path": "/api/v1/livros/", "headers": [(b"accept-encoding", accept_encoding)]}
+
+
+async def receive():
+	return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def app_com(corpos, content_type=b"application/json", status=200):
+	async def app(scope, receive, send):
+		await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", content_type)]})
+		for i, corpo in enumerate(corpos):
+			await send({"type": "http.response.body", "body": corpo, "more_body": i < len(corpos) - 1})
+	return app
+
+
+async def chamar(middleware, s):
+	mensagens = []
+
+	async def send(message):
+		mensagens.append(message)
+
+	await middleware(s, receive, send)
+	headers = {k.decode(): v.decode() for k, v in mensagens[0]["headers"]}
+	return headers, b"".join(m.get("body", b"") for m in mensagens[1:])
+
+
+GRANDE = json.dumps({"data": [{"id": i, "titulo": f"Livro {i}"} for i in range(200)]}).encode()
+
+
+class TestNegociarCodificacao:
+	@pytest.mark.parametrize("accept, esperado", [
+		(None, None),
+		("identity", None),
+		("gzip", "gzip"),
+		("gzip;q=0", None),
+		("*", "br"),
+		("br;q=0.5, gzip", "gzip"),
+		("br, gzip", "br"),
+	])
+	def test_accept_encoding(self, accept, esperado):
+		assert negociar_codificacao(accept, ("br", "gzip")) == esperado
+
+
+class TestCompressionMiddleware:
+	@pytest.mark.asyncio
+	async def test_comprime_acima_do_minimo(self):
+		headers, corpo = await chamar(CompressionMiddleware(app_com([GRANDE])), scope())
+
+		assert headers["content-encoding"] == "gzip"
+		assert headers["vary"] == "Accept-Encoding"
+		assert int(headers["content-length"]) == len(corpo)
+		assert gzip.decompress(corpo) == GRANDE
+
+	@pytest.mark.asyncio
+	async def test_corpo_pequeno_ou_sem_accept_encoding_segue_intacto(self):
+		headers, corpo = await chamar(CompressionMiddleware(app_com([b'{"ok": true}'])), scope())
+		assert "content-encoding" not in headers
+		assert corpo == b'{"ok": true}'
+
+		headers, corpo = await chamar(CompressionMiddleware(app_com([GRANDE])), scope(b"identity"))
+		assert "content-encoding" not in headers
+		assert headers["vary"] == "Accept-Encoding"
+		assert corpo == GRANDE
+
+	@pytest.mark.asyncio
+	async def test_download_ja_comprimido_nao_e_recomprimido(self):
+		arquivo = gzip.compress(GRANDE)
+		headers, corpo = await chamar(CompressionMiddleware(app_com([arquivo], b"application/gzip")), scope())
+		assert "content-encoding" not in headers
+		assert corpo == arquivo
+
+	@pytest.mark.asyncio
+	async def test_streaming_comprimido_incrementalmente(self):
+		blocos = [GRANDE[:1000], GRANDE[1000:], b""]
+		headers, corpo = await chamar(CompressionMiddleware(app_com(blocos, b"application/x-ndjson")), scope())
+
+		assert headers["content-encoding"] == "gzip"
+		assert "content-length" not in headers
+		assert gzip.decompress(corpo) == GRANDE
+
+	@pytest.mark.asyncio
+	async def test_pagina_quente_servida_do_cache(self):
+		middleware = CompressionMiddleware(app_com([GRANDE]))
+		hits = http_compression_total.labels(encoding="gzip", cache="hit")
+		antes = hits._value.get()
+
+		_, primeiro = await chamar(middleware, scope())
+		_, segundo = await chamar(middleware, scope())
+
+		assert primeiro == segundo
+		assert hits._value.get() == antes + 1
+
+
+class TestBrotli:
+	@pytest.fixture(autouse=True)
+	def brotli(self):
+		return pytest.importorskip("brotli")
+
+	@pytest.mark.asyncio
+	async def test_prefere_br_quando_aceito(self, brotli):
+		headers, corpo = await chamar(CompressionMiddleware(app_com([GRANDE])), scope(b"gzip, br"))
+
+		assert headers["content-encoding"] == "br"
+		assert int(headers["content-length"]) == len(corpo)
+		assert brotli.decompress(corpo) == GRANDE
+
+	@pytest.mark.asyncio
+	async def test_streaming_em_br(self, brotli):
+		blocos = [GRANDE[:1000], GRANDE[1000:], b""]
+		headers, corpo = await chamar(CompressionMiddleware(app_com(blocos, b"application/x-ndjson")), scope(b"br"))
+
+		assert headers["content-encoding"] == "br"
+		assert "content-length" not in headers
+		assert brotli.decompress(corpo) == GRANDE
+
+
+class TestCacheDeCompressao:
+	def test_lru_descarta_o_menos_usado(self):
+		cache = CacheDeCompressao(capacidade=2)
+		for corpo in (b"a" * 10, b"b" * 10, b"a" * 10, b"c" * 10):
+			cache.obter(corpo, "gzip")
+
+		assert len(cache._entradas) == 2
+		assert gzip.decompress(cache.obter(b"a" * 10, "gzip")) == b"a" * 10
+
+	def test_gzip_deterministico(self):
+		assert comprimir(GRANDE, "gzip") == comprimir(GRANDE, "gzip")
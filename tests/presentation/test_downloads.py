@@ -0,0 +1,52 @@
+"""
+Testes para o envio de arquivos com suporte a Range.
+"""
+import pytest
+from fastapi import FastAPI, Header
+from fastapi.testclient import TestClient
+from src.presentation.downloads import resposta_arquivo, _intervalo
+
+
+@pytest.mark.parametrize("cabecalho, esperado", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=90-", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=95-200", (95, 99)),
+    ("bytes=100-", None),
+    ("bytes=5-2", None),
+    ("bytes=-0", None),
+    ("bytes=-", None),
+])
+def test_intervalo(cabecalho, esperado):
+    assert _intervalo(cabecalho, 100) == esperado
+
+
+class TestRespostaArquivo:
+    @pytest.fixture
+    def client(self, tmp_path):
+        arquivo = tmp_path / "dados.gz"
+        arquivo.write_bytes(bytes(range(100)))
+        app = FastAPI()
+
+        @app.get("/arquivo")
+        def baixar(range_header: str = Header(None, alias="Range")):
+            return resposta_arquivo(arquivo, "application/gzip", "dados.gz", range_header)
+
+        return TestClient(app)
+
+    def test_arquivo_completo(self, client):
+        r = client.get("/arquivo")
+        assert r.status_code == 200
+        assert r.content == bytes(range(100))
+        assert r.headers["accept-ranges"] == "bytes"
+
+    def test_intervalo_parcial(self, client):
+        r = client.get("/arquivo", headers={"Range": "bytes=10-19"})
+        assert r.status_code == 206
+        assert r.content == bytes(range(10, 20))
+        assert r.headers["content-range"] == "bytes 10-19/100"
+
+    def test_intervalo_invalido(self, client):
+        r = client.get("/arquivo", headers={"Range": "bytes=500-"})
+        assert r.status_code == 416
+        assert r.headers["content-range"] == "bytes */100"
@@ -0,0 +1,35 @@
+"""
+Testes para os geradores de exportação NDJSON / CSV.
+"""
+from src.presentation.exporters import em_blocos, gerar_csv, gerar_ndjson
+from src.presentation.dto.livro_dto import LivroResponse
+
+
+def livros(n):
+    return (LivroResponse(id=i, titulo=f"Livro {i}", autor="Autor", disponivel=True) for i in range(n))
+
+
+class TestExporters:
+    def test_ndjson_uma_linha_por_registro(self):
+        linhas = list(gerar_ndjson(livros(3), ["id", "titulo"]))
+        assert linhas[0] == b'{"id":0,"titulo":"Livro 0"}\n'
+        assert len(linhas) == 3
+
+    def test_csv_com_cabecalho(self):
+        corpo = b"".join(gerar_csv(livros(2), ["id", "titulo"])).decode()
+        assert corpo.splitlines() == ["id,titulo", "0,Livro 0", "1,Livro 1"]
+
+    def test_blocos_agrupam_linhas(self):
+        blocos = list(em_blocos((b"x" * 10 for _ in range(25)), tamanho=100))
+        assert [len(b) for b in blocos] == [100, 100, 50]
+
+    def test_geradores_sao_preguicosos(self):
+        consumidos = []
+
+        def origem():
+            for livro in livros(1000):
+                consumidos.append(livro.id)
+                yield livro
+
+        next(em_blocos(gerar_ndjson(origem(), ["id"]), tamanho=64))
+        assert len(consumidos) < 20
@@ -0,0 +1,69 @@
+"""
+Testes para a negociação de conteúdo JSON / MessagePack.
+"""
+import msgpack
+import pytest
+from src.presentation.negotiation import negociar_formato, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+
+
+class TestNegociarFormato:
+    @pytest.mark.parametrize("accept, esperado", [
+        (None, JSON_MEDIA_TYPE),
+        ("*/*", JSON_MEDIA_TYPE),
+        ("application/json", JSON_MEDIA_TYPE),
+        ("application/msgpack", MSGPACK_MEDIA_TYPE),
+        ("application/x-msgpack", MSGPACK_MEDIA_TYPE),
+        ("application/msgpack, application/json;q=0.5", MSGPACK_MEDIA_TYPE),
+        ("application/json, application/msgpack;q=0.5", JSON_MEDIA_TYPE),
+        ("application/msgpack;q=0", JSON_MEDIA_TYPE),
+        ("application/msgpack, */*;q=0.1", MSGPACK_MEDIA_TYPE),
+    ])
+    def test_accept(self, accept, esperado):
+        assert negociar_formato(accept) == esperado
+
+
+class TestRotasMessagePack:
+    MSGPACK = {"Accept": "application/msgpack"}
+
+    @pytest.fixture
+    def client(self, client, memory_redis):
+        from src.main import app
+        from src.infrastructure.config.factories import get_cache
+        app.dependency_overrides[get_cache] = lambda: memory_redis
+        return client
+
+    def test_listagem_em_msgpack_tem_mesmo_esquema(self, client, auth_headers):
+        client.post("/api/v1/livros/", json={"titulo": "Duna", "autor": "Frank Herbert"}, headers=auth_headers)
+
+        json_resp = client.get("/api/v1/livros/", headers=auth_headers)
+        mp_resp = client.get("/api/v1/livros/", headers=auth_headers | self.MSGPACK)
+
+        assert mp_resp.status_code == 200
+        assert mp_resp.headers["content-type"] == "application/msgpack"
+        assert "Accept" in mp_resp.headers["vary"]
+        assert msgpack.unpackb(mp_resp.content) == json_resp.json()
+
+    def test_corpo_em_msgpack(self, client, auth_headers):
+        corpo = msgpack.packb({"titulo": "Duna", "autor": "Frank Herbert"})
+        r = client.post(
+            "/api/v1/livros/",
+            content=corpo,
+            headers=auth_headers | self.MSGPACK | {"Content-Type": "application/msgpack"},
+        )
+
+        assert r.status_code == 200
+        assert msgpack.unpackb(r.content)["data"]["titulo"] == "Duna"
+
+    def test_corpo_msgpack_invalido(self, client, auth_headers):
+        r = client.post(
+            "/api/v1/livros/",
+            content=b"\xc1",
+            headers=auth_headers | {"Content-Type": "application/msgpack"},
+        )
+        assert r.status_code == 400
+        assert r.json()["error"] == "INVALID_MSGPACK"
+
+    def test_erros_de_dominio_no_formato_negociado(self, client, auth_headers):
+        r = client.get("/api/v1/pessoas/999", headers=auth_headers | self.MSGPACK)
+        assert r.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(r.content)["success"] is False
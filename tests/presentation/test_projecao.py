@@ -0,0 +1,40 @@
+"""
+Testes para a interpretação de ?fields= / ?include= e a projeção das linhas.
+"""
+from datetime import date, datetime
+import pytest
+from fastapi import HTTPException
+from src.presentation.projecao import parse_campos, parse_include, chave_projecao, projetar
+
+CAMPOS = ["id", "titulo", "autor", "disponivel"]
+
+
+class TestProjecao:
+    def test_sem_fields_mantem_resposta_completa(self):
+        assert parse_campos(None, CAMPOS) is None
+
+    def test_fields_inclui_id_e_segue_ordem_do_modelo(self):
+        assert parse_campos(" autor, titulo ", CAMPOS) == ["id", "titulo", "autor"]
+
+    def test_campo_invalido(self):
+        with pytest.raises(HTTPException) as exc:
+            parse_campos("titulo,senha", CAMPOS)
+        assert exc.value.status_code == 400
+        assert "senha" in exc.value.detail
+
+    def test_include(self):
+        assert parse_include(None, ("livro", "pessoa")) == ("livro", "pessoa")
+        assert parse_include("", ("livro", "pessoa")) == ()
+        assert parse_include("pessoa", ("livro", "pessoa")) == ("pessoa",)
+        with pytest.raises(HTTPException):
+            parse_include("usuario", ("livro", "pessoa"))
+
+    def test_chave_projecao(self):
+        assert chave_projecao(None) == ""
+        assert chave_projecao(["id"], ()) == ":fields:id:include:"
+
+    def test_projetar_formata_datas(self):
+        linha = {"id": 1, "data": datetime(2024, 1, 2, 3, 4, 5), "nascimento": date(1990, 1, 1), "extra": "x"}
+        assert projetar(linha, ["id", "data", "nascimento"]) == {
+            "id": 1, "data": "2024-01-02T03:04:05", "nascimento": "1990-01-01"
+        }
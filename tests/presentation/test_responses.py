@@ -0,0 +1,54 @@
+"""
+Testes para a serialização das respostas da API (ApiJSONResponse / api_response).
+"""
+import json
+from datetime import date
+from fastapi import Response
+from src.presentation.responses import ApiJSONResponse, api_response
+from src.presentation.dto.common import PaginatedResponse, PaginationMeta
+from src.presentation.dto.livro_dto import LivroResponse
+from src.presentation.dto.pessoa_dto import PessoaResponse
+
+
+class TestApiJSONResponse:
+    def test_renderiza_modelos_e_tipos_nativos(self):
+        pessoa = PessoaResponse(id=1, nome="Ana", telefone="11999999999", data_nascimento=date(1990, 5, 1), email="ana@x.com")
+        corpo = json.loads(ApiJSONResponse({"pessoa": pessoa}).body)
+        assert corpo["pessoa"]["data_nascimento"] == "1990-05-01"
+
+    def test_envelope_paginado(self):
+        pagina = PaginatedResponse(
+            data=[LivroResponse(id=1, titulo="Duna", autor="Frank Herbert", disponivel=True)],
+            meta=PaginationMeta.create(1, 10, 1),
+        )
+        corpo = json.loads(api_response(pagina).body)
+        assert corpo == {
+            "success": True,
+            "data": {
+                "data": [{"id": 1, "titulo": "Duna", "autor": "Frank Herbert", "disponivel": True}],
+                "meta": {"page": 1, "size": 10, "total": 1, "total_pages": 1, "has_next": False, "has_previous": False},
+            },
+            "message": None,
+            "error": None,
+            "details": None,
+        }
+
+
+class TestApiResponseHelper:
+    def test_preserva_cabecalhos_e_status_do_response_injetado(self):
+        injetado = Response()
+        injetado.headers["X-Consistency-Token"] = "livros:3"
+        injetado.status_code = 201
+
+        resposta = api_response(message="ok", response=injetado)
+
+        assert resposta.status_code == 201
+        assert resposta.headers["X-Consistency-Token"] == "livros:3"
+        assert resposta.headers["content-length"] == str(len(resposta.body))
+        assert len(resposta.headers.getlist("content-length")) == 1
+
+    def test_sem_response_injetado(self):
+        resposta = api_response({"a": 1})
+        assert resposta.status_code == 200
+        assert resposta.media_type == "application/json"
+        assert json.loads(resposta.body)["data"] == {"a": 1}
@@ -0,0 +1,145 @@
+"""
+Testes para o middleware de prazos (deadlines) e cancelamento por desconexão.
+"""
+import asyncio
+import json
+import pytest
+from src.infrastructure.config.deadlines import prazo_atual
+from src.infrastructure.monitoring.metrics import work_cancelled_total
+from src.presentation.timeouts import DeadlineMiddleware, parse_rotas
+
+
+def scope(path="/api/v1/pessoas/1", method="GET", headers=()):
+	return {"type": "http", "method": method, "path": path, "query_string": b"", "headers": list(headers)}
+
+
+def receive_que_desconecta(apos: float = None):
+	mensagens = [{"type": "http.request", "body": b"", "more_body": False}]
+
+	async def receive():
+		if mensagens:
+			return mensagens.pop(0)
+		if apos is None:
+			await asyncio.Event().wait()
+		await asyncio.sleep(apos)
+		return {"type": "http.disconnect"}
+	return receive
+
+
+async def chamar(middleware, s=None, receive=None):
+	mensagens = []
+
+	async def send(message):
+		mensagens.append(message)
+
+	await middleware(s or scope(), receive or receive_que_desconecta(), send)
+	return mensagens
+
+
+def app_lento(segundos: float, chamadas: list = None):
+	async def app(scope, receive, send):
+		try:
+			await asyncio.sleep(segundos)
+		except asyncio.CancelledError:
+			if chamadas is not None:
+				chamadas.append("cancelado")
+			raise
+		await send({"type": "http.response.start", "status": 200, "headers": []})
+		await send({"type": "http.response.body", "body": b"ok"})
+	return app
+
+
+class TestResolucaoDoPrazo:
+	def test_parse_rotas(self):
+		assert parse_rotas("/a=100, /b=2000,invalido") == {"/a": 100.0, "/b": 2000.0}
+
+	def test_prazo_por_classe_rota_e_cabecalho(self):
+		middleware = DeadlineMiddleware(app_lento(0), rotas={"/api/v1/emprestimos": 3000, "/api/v1/emprestimos/export": 0})
+
+		assert middleware.prazo_em_segundos(scope()) == 10.0
+		assert middleware.prazo_em_segundos(scope("/api/v1/auth/login", "POST")) == 5.0
+		assert middleware.prazo_em_segundos(scope("/api/v1/livros/export")) is None
+		assert middleware.prazo_em_segundos(scope("/api/v1/emprestimos/")) == 3.0
+		assert middleware.prazo_em_segundos(scope("/api/v1/emprestimos/export")) is None
+
+	def test_cabecalho_encurta_mas_respeita_o_maximo(self):
+		middleware = DeadlineMiddleware(app_lento(0), rotas={}, maximo_ms=20000)
+
+		assert middleware.prazo_em_segundos(scope(headers=[(b"x-request-timeout-ms", b"250")])) == 0.25
+		assert middleware.prazo_em_segundos(scope(headers=[(b"x-request-timeout-ms", b"99999")])) == 10.0
+		assert middleware.prazo_em_segundos(scope("/api/v1/exports/", headers=[(b"x-request-timeout-ms", b"99999")])) == 20.0
+		assert middleware.prazo_em_segundos(scope(headers=[(b"x-request-timeout-ms", b"abc")])) == 10.0
+
+
+class TestDeadlineMiddleware:
+	@pytest.mark.asyncio
+	async def test_dentro_do_prazo_responde_normalmente(self):
+		mensagens = await chamar(DeadlineMiddleware(app_lento(0), rotas={}))
+		assert mensagens[0]["status"] == 200
+
+	@pytest.mark.asyncio
+	async def test_prazo_vencido_responde_504_e_cancela(self):
+		chamadas = []
+		cancelados = work_cancelled_total.labels(reason="deadline", stage="request")
+		antes = cancelados._value.get()
+		middleware = DeadlineMiddleware(app_lento(5, chamadas), rotas={"/": 50})
+
+		mensagens = await chamar(middleware)
+
+		assert mensagens[0]["status"] == 504
+		assert json.loads(mensagens[1]["body"])["error"] == "DEADLINE_EXCEEDED"
+		assert len(mensagens) == 2
+		assert chamadas == ["cancelado"]
+		assert cancelados._value.get() == antes + 1
+
+	@pytest.mark.asyncio
+	async def test_desconexao_cancela_sem_responder(self):
+		chamadas = []
+		cancelados = work_cancelled_total.labels(reason="disconnect", stage="request")
+		antes = cancelados._value.get()
+		middleware = DeadlineMiddleware(app_lento(5, chamadas), rotas={})
+
+		mensagens = await chamar(middleware, receive=receive_que_desconecta(apos=0.05))
+
+		assert mensagens == []
+		assert chamadas == ["cancelado"]
+		assert cancelados._value.get() == antes + 1
+
+	@pytest.mark.asyncio
+	async def test_prazo_visivel_no_threadpool(self):
+		vistos = []
+
+		async def app(scope, receive, send):
+			vistos.append(await asyncio.to_thread(prazo_atual))
+			await send({"type": "http.response.start", "status": 200, "headers": []})
+			await send({"type": "http.response.body", "body": b""})
+
+		await chamar(DeadlineMiddleware(app, rotas={}))
+
+		assert vistos[0] is not None
+		assert 0 < vistos[0].restante() <= 10
+		assert prazo_atual() is None
+
+	@pytest.mark.asyncio
+	async def test_erros_do_endpoint_propagam(self):
+		async def app(scope, receive, send):
+			raise RuntimeError("falha")
+
+		with pytest.raises(RuntimeError):
+			await chamar(DeadlineMiddleware(app, rotas={}))
+
+	@pytest.mark.asyncio
+	async def test_endpoint_le_o_corpo_normalmente(self):
+		corpos = []
+
+		async def app(scope, receive, send):
+			corpos.append((await receive())["body"])
+			await send({"type": "http.response.start", "status": 200, "headers": []})
+			await send({"type": "http.response.body", "body": b""})
+
+		async def receive():
+			return {"type": "http.request", "body": b"dados", "more_body": False}
+
+		await chamar(DeadlineMiddleware(app, rotas={}), receive=receive)
+
+		assert corpos == [b"dados"]
@@ -0,0 +1,173 @@
+"""
+Testes para o entrypoint de produção (mestre prefork).
+"""
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import time
+import urllib.request
+import pytest
+from sqlalchemy import create_engine, text
+from src import server
+from src.infrastructure.config.db import database
+from src.infrastructure.config.logging_config import caminho_do_processo
+
+
+class TestConfiguracao:
+    def test_workers_pelo_ambiente_ou_cpus(self, monkeypatch):
+        monkeypatch.setenv("WEB_CONCURRENCY", "3")
+        assert server.calcular_workers() == 3
+
+        monkeypatch.delenv("WEB_CONCURRENCY")
+        assert server.calcular_workers() == len(os.sched_getaffinity(0))
+
+    def test_limite_com_jitter(self):
+        limites = {server.limite_de_requisicoes(100, 10) for _ in range(200)}
+        assert min(limites) >= 100 and max(limites) <= 110 and len(limites) > 1
+        assert server.limite_de_requisicoes(0, 10) is None
+
+    def test_varios_workers_exigem_estado_compartilhado(self, monkeypatch):
+        monkeypatch.setenv("WEB_CONCURRENCY", "4")
+        monkeypatch.delenv("EXPORT_QUEUE", raising=False)
+        with pytest.raises(SystemExit, match="EXPORT_QUEUE=redis"):
+            server.decidir_workers()
+
+        monkeypatch.setenv("EXPORT_QUEUE", "redis")
+        assert server.decidir_workers() == 4
+
+        monkeypatch.setenv("REDIS_ENABLED", "false")
+        with pytest.raises(SystemExit, match="REDIS_ENABLED=true"):
+            server.decidir_workers()
+
+    def test_sem_web_concurrency_e_sem_estado_compartilhado_usa_um_worker(self, monkeypatch):
+        monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+        monkeypatch.delenv("EXPORT_QUEUE", raising=False)
+        monkeypatch.setattr(server, "calcular_workers", lambda: 8)
+
+        assert server.decidir_workers() == 1
+
+    def test_arquivos_por_worker(self, monkeypatch):
+        monkeypatch.delenv("WORKER_ID", raising=False)
+        assert caminho_do_processo("logs/app.log") == "logs/app.log"
+
+        monkeypatch.setenv("WORKER_ID", "2")
+        assert caminho_do_processo("logs/app.log") == "logs/app.2.log"
+        assert caminho_do_processo("logs/traces.jsonl") == "logs/traces.2.jsonl"
+
+    def test_diretorio_de_metricas_limpo_na_partida(self, tmp_path, monkeypatch):
+        (tmp_path / "counter_123.db").write_bytes(b"x")
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+        assert server.configurar_metricas_multiprocesso() == str(tmp_path)
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestPoolAposFork:
+    def test_filho_abandona_conexoes_herdadas(self, monkeypatch):
+        engine = create_engine("sqlite://")
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        pool_herdado = engine.pool
+        monkeypatch.setitem(database._engines, "interactive", engine)
+
+        database.descartar_pool_herdado()
+
+        assert engine.pool is not pool_herdado
+
+
+_MESTRE = textwrap.dedent("""
+    import os, socket, sys, time
+    from src import server
+
+    class Servidor(server.ServidorPrefork):
+        def _executar_worker(self):
+            with open(sys.argv[1], "a") as f:
+                f.write(f"{os.getpid()}\\n")
+            time.sleep(0.1)  # termina sozinho, como um worker reciclado
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    Servidor(None, sock, workers=2, graceful_timeout=1).executar()
+""")
+
+
+class TestServidorPrefork:
+    def test_sigterm_durante_a_espera_nao_inicia_substituto(self, monkeypatch):
+        mestre = server.ServidorPrefork(None, None, workers=1)
+        iniciados = []
+        mestre._ativos[123] = time.monotonic()
+        mestre._iniciar_worker = iniciados.append
+        monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+        monkeypatch.setattr(server.time, "sleep", lambda segundos: mestre._pedir_encerramento(signal.SIGTERM, None))
+        monkeypatch.setattr(server.signal, "alarm", lambda segundos: None)
+
+        mestre._worker_encerrado(123, 256)
+
+        assert iniciados == []
+
+
+    def test_workers_encerrados_sao_substituidos_e_sigterm_encerra(self, tmp_path):
+        registro = tmp_path / "workers.txt"
+        mestre = subprocess.Popen([sys.executable, "-c", _MESTRE, str(registro)])
+        try:
+            time.sleep(1.8)
+            mestre.send_signal(signal.SIGTERM)
+            assert mestre.wait(timeout=10) == 0
+        finally:
+            if mestre.poll() is None:
+                mestre.kill()
+
+        assert len(registro.read_text().split()) > 2
+
+
+_MESTRE_UVICORN = textwrap.dedent("""
+    import os
+    from src import server
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                mensagem = await receive()
+                if mensagem["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                else:
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": f"{os.getpid()} {os.environ['WORKER_ID']}".encode()})
+
+    sock = server.criar_socket("127.0.0.1", 0)
+    print(sock.getsockname()[1], flush=True)
+    server.ServidorPrefork(app, sock, workers=1, graceful_timeout=1).executar()
+""")
+
+
+class TestWorkerReal:
+    def test_worker_uvicorn_atende_requisicao(self, tmp_path):
+        pytest.importorskip("uvicorn")
+        ambiente = {**os.environ, "LOG_DIR": str(tmp_path), "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+        mestre = subprocess.Popen([sys.executable, "-c", _MESTRE_UVICORN], stdout=subprocess.PIPE, text=True, env=ambiente)
+        try:
+            porta = int(mestre.stdout.readline())
+            resposta = None
+            limite = time.monotonic() + 15
+            while resposta is None and time.monotonic() < limite:
+                try:
+                    resposta = urllib.request.urlopen(f"http://127.0.0.1:{porta}/", timeout=2).read().decode()
+                except OSError:
+                    time.sleep(0.1)
+
+            pid, worker_id = resposta.split()
+            assert int(pid) != mestre.pid
+            # WORKER_ID mesmo com um único worker: o mestre tem os próprios arquivos de log
+            assert worker_id == "0"
+
+            mestre.send_signal(signal.SIGTERM)
+            assert mestre.wait(timeout=15) == 0
+        finally:
+            if mestre.poll() is None:
+                mestre.kill()
+
+        assert (tmp_path / f"app.{worker_id}.log").exists()